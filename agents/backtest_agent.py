@@ -64,15 +64,20 @@ class BacktestAgent:
                 result["raw_report"] = f"⚠️ {target_symbol}: データ不足（{len(df) if df is not None else 0}本）"
                 return result
 
-            # 2. 特徴量ビルド
-            feat = FeatureBuilder.build_from_memory(df)
+            # 2. 特徴量（collector が追記している特徴量ストア優先・無ければビルド）
+            # ストアは取得した OHLCV と同じ期間に切り出し、optuna も同じフレームで回す（期間ずれ防止）
+            feat = FeatureBuilder.load_from_store(clean_symbol, start=df["datetime"].iloc[0])
+            optuna_df = feat
+            if len(feat) < 10:
+                feat = FeatureBuilder.build_from_memory(df)
+                optuna_df = df
             if feat is None or feat.empty or len(feat) < 10:
                 result["status"]     = "feature_build_failed"
                 result["raw_report"] = f"⚠️ {target_symbol}: 特徴量ビルド失敗（{len(feat) if feat is not None else 0}行）"
                 return result
 
             # 3. 6戦略一括実行（optuna最適化パラメータ使用）
-            all_result = CoreBacktest.run_all_strategies(feat, symbol=target_symbol, use_optuna=True, optuna_df=df)
+            all_result = CoreBacktest.run_all_strategies(feat, symbol=target_symbol, use_optuna=True, optuna_df=optuna_df)
             best       = all_result["best"]
             all_r      = all_result["all_results"]
 
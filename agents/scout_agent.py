@@ -47,8 +47,14 @@ class MarketTool(BaseTool):
         indicators = {"status": "pending", "message": "データ不足"}
         
         if not ohlcv_df.empty and len(ohlcv_df) >= 20:
-            # テクニカル指標の計算（DataFrameのcloseカラムをリストとして渡す）
-            indicators = NeoIndicators.calculate_freqtrade_vibe(ohlcv_df["close"].tolist())
+            # テクニカル指標: collector のストリーミング指標を優先（未蓄積銘柄はOHLCVのcloseから計算）
+            try:
+                indicators = NeoIndicators.current_vibe(query)
+            except Exception as e:
+                logger.debug(f"Stream indicators unavailable for {query}: {e}")
+                indicators = None
+            if indicators is None:
+                indicators = NeoIndicators.calculate_freqtrade_vibe(ohlcv_df["close"].tolist())
             
             # 特徴量ビルド → バックテスト
             try:
@@ -21,6 +21,7 @@ from tools.vp_onchain_data import build_onchain_context
 from bridge.acp_client import get_market_intel
 from tools.portfolio_manager import PortfolioManager
 from tools.market_data import MarketData
+from tools.price_cache import PriceCache
 from tools.discord_reporter import DiscordReporter
 from tools.deepwiki_tool import DeepWikiTool
 from tools.moltbook_tool import MoltbookTool
@@ -64,27 +65,8 @@ class TrinityCouncil(NeoBaseCrew):
         # 1b. 現在価格の取得
         clean_symbol = target_symbol.split('/')[0].strip()
         # Tier0（BTC/ETH）: ローカルDB優先（Binance蓄積・API節約）
-        # VP銘柄: GeckoTerminal優先
-        current_price = 0.0
-        if clean_symbol in ("BTC", "ETH"):
-            from orchestration.data_collector import get_latest_price_from_db
-            _db_price = get_latest_price_from_db(clean_symbol)
-            if _db_price and _db_price > 0:
-                current_price = _db_price
-            else:
-                price_data = MarketData.fetch_token_data(clean_symbol)
-                if price_data and price_data.get("status") == "success":
-                    current_price = float(price_data.get("priceUsd", 0.0))
-        elif clean_symbol in ("VIRTUAL", "AIXBT"):
-            price_data = MarketData._fetch_price_from_geckoterminal(clean_symbol)
-            if not price_data:
-                price_data = MarketData.fetch_token_data(clean_symbol)
-            if price_data and price_data.get("status") == "success":
-                current_price = float(price_data.get("priceUsd", 0.0))
-        else:
-            price_data = MarketData.fetch_token_data(clean_symbol)
-            if price_data and price_data.get("status") == "success":
-                current_price = float(price_data.get("priceUsd", 0.0))
+        # VP銘柄: GeckoTerminal優先（PriceCache.default_sources — radarと同一サイクルならキャッシュヒット）
+        current_price = PriceCache.get_price(clean_symbol)
         
         print(f"  💰 USDC残高: ${current_usdc:.2f}")
         print(f"  📊 精度: {accuracy}% ({total_past_trades}件)")
@@ -724,13 +706,12 @@ class TrinityCouncil(NeoBaseCrew):
             _tz_label = f"US{TZ_SCORE_US:+d}"
         # ナンピン数ペナルティ（H.2分析: 20回ナンピン集中問題）
         _npin_count = 0
-        _hist = self.portfolio.get_full_state().get("history", [])
+        _hist = self.portfolio.wallet.history(symbol=clean_symbol)
         for _h in reversed(_hist):
-            if _h.get("symbol") == clean_symbol:
-                if _h.get("action") == "BUY":
-                    _npin_count += 1
-                elif _h.get("action") == "SELL":
-                    break
+            if _h.get("action") == "BUY":
+                _npin_count += 1
+            elif _h.get("action") == "SELL":
+                break
         if _npin_count >= 2:
             _calc_conf -= 5   # v6.5an: -10→-5 戦略書ありなら戦略的ナンピン許容
             _npin_label = f"npin{_npin_count}:-5"
@@ -983,10 +964,12 @@ class TrinityCouncil(NeoBaseCrew):
                 # ポートフォリオリスク制約計算
                 _strat_total_assets = current_usdc
                 try:
-                    for _ps, _pa in self.portfolio.get_balance().items():
+                    _strat_balances = self.portfolio.get_balance()
+                    _strat_prices = MarketData.fetch_token_data_many([s for s in _strat_balances if s != "USDC"])
+                    for _ps, _pa in _strat_balances.items():
                         if _ps == "USDC":
                             continue
-                        _pd = MarketData.fetch_token_data(_ps)
+                        _pd = _strat_prices.get(MarketData._normalize_symbol(_ps))
                         if _pd and _pd.get("status") == "success":
                             _strat_total_assets += float(_pa) * float(_pd.get("priceUsd", 0)) if not isinstance(_pa, dict) else float(_pa.get("amount", 0)) * float(_pd.get("priceUsd", 0))
                 except Exception:
@@ -1287,10 +1270,12 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
             balances = self.portfolio.get_balance()
             current_usdc = balances.get("USDC", 0.0)
             total_assets = current_usdc
+            # 保有銘柄の価格はプロバイダごとに一括取得（Tier1相関ガードでも再利用）
+            holding_prices = MarketData.fetch_token_data_many([s for s in balances if s != "USDC"])
             for sym, amount in balances.items():
                 if sym == "USDC":
                     continue
-                sym_data = MarketData.fetch_token_data(sym)
+                sym_data = holding_prices.get(MarketData._normalize_symbol(sym))
                 if sym_data and sym_data.get("status") == "success":
                     sym_price = float(sym_data.get("priceUsd", 0.0))
                     total_assets += amount * sym_price
@@ -1316,7 +1301,7 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
                     for _t1sym in ["VIRTUAL", "AIXBT"]:
                         _t1amount = balances.get(_t1sym, 0.0)
                         if _t1amount > 0:
-                            _t1data = MarketData.fetch_token_data(_t1sym)
+                            _t1data = holding_prices.get(_t1sym) or MarketData.fetch_token_data(_t1sym)
                             _t1price = float(_t1data.get("priceUsd", 0.0)) if _t1data else 0.0
                             _tier1_exposure += _t1amount * _t1price
                     _tier1_ratio = _tier1_exposure / total_assets if total_assets > 0 else 0
@@ -1342,13 +1327,12 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
                             # この値は能動的調整を意図しない（エージェントの裁量外）。
                             MAX_OPEN_BUYS_PER_SYMBOL = 2
                             _open_buy_count = 0
-                            _history = self.portfolio.get_full_state().get("history", [])
+                            _history = self.portfolio.wallet.history(symbol=clean_symbol)
                             for _h in reversed(_history):
-                                if _h.get("symbol") == clean_symbol:
-                                    if _h.get("action") == "BUY":
-                                        _open_buy_count += 1
-                                    elif _h.get("action") == "SELL":
-                                        break
+                                if _h.get("action") == "BUY":
+                                    _open_buy_count += 1
+                                elif _h.get("action") == "SELL":
+                                    break
                             if _open_buy_count >= MAX_OPEN_BUYS_PER_SYMBOL:
                                 trade_action = "WAIT"
                                 trade_result = {"status": "skipped", "reason": f"ナンピン上限到達 ({_open_buy_count}/{MAX_OPEN_BUYS_PER_SYMBOL}回)"}
@@ -1384,7 +1368,9 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
                                         action="BUY",
                                         amount_usd=trade_amount_usd,
                                         price=current_price,
-                                        reason=f"Trinity Council BUY verdict (accuracy: {accuracy}%, confidence: {bt_confidence})"
+                                        reason=f"Trinity Council BUY verdict (accuracy: {accuracy}%, confidence: {bt_confidence})",
+                                        # BUY historyにもstrategy_tag保存（H.2分析用）
+                                        extra={"strategy_tag": bt_best_strategy},
                                     )
                                     logger.info(f"Trade executed: BUY {clean_symbol} ${trade_amount_usd} @ ${current_price}")
                                     # 戦略タグをholdingsに保存（出口プロファイル用）
@@ -1395,16 +1381,8 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
                                         _exit_cat = _ai_tf
                                     else:
                                         _exit_cat = STRATEGY_TO_EXIT_PROFILE.get(bt_best_strategy, EXIT_PROFILE_DEFAULT)
-                                    _pw_state = self.portfolio.get_full_state()
-                                    if clean_symbol in _pw_state.get("holdings", {}):
-                                        _pw_state["holdings"][clean_symbol]["strategy_tag"] = bt_best_strategy
-                                        _pw_state["holdings"][clean_symbol]["exit_profile"] = _exit_cat
-                                        self.portfolio.wallet._save_wallet()
+                                    if self.portfolio.wallet.update_holding(clean_symbol, strategy_tag=bt_best_strategy, exit_profile=_exit_cat):
                                         logger.info(f"Strategy tag: {bt_best_strategy} → exit_profile: {_exit_cat}")
-                                        # BUY historyにもstrategy_tag保存（H.2分析用）
-                                        if _pw_state.get("history"):
-                                            _pw_state["history"][-1]["strategy_tag"] = bt_best_strategy
-                                            self.portfolio.wallet._save_wallet()
                                         # E1.3: エントリー時コンテキスト保存（自己進化用）
                                         _entry_ctx = {
                                             "rsi_14": float(df.iloc[-1].get("rsi_14", 0)) if "df" in dir() and len(df) > 0 else 0,
@@ -1438,8 +1416,7 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
                                         # Phase S1: 戦略書をentry_contextに保存
                                         if _position_strategy:
                                             _entry_ctx["strategy"] = _position_strategy
-                                        _pw_state["holdings"][clean_symbol]["entry_context"] = _entry_ctx
-                                        self.portfolio.wallet._save_wallet()
+                                        self.portfolio.wallet.update_holding(clean_symbol, entry_context=_entry_ctx)
                                         logger.info(f"Entry context saved for {clean_symbol}: conf={_calc_conf}, bt={bt_confidence}, strategy={'yes' if _position_strategy else 'no'}")
                                 else:
                                     trade_result = {"status": "skipped", "reason": f"投入額${trade_amount_usd:.2f}が最低額$10未満"}
@@ -1530,9 +1507,11 @@ RSI(14): {_strat_rsi:.1f} | MACD: {_strat_macd}
         _holding_amt = self.portfolio.get_holding(clean_symbol)
         _pnl_data = self.portfolio.get_unrealized_pnl(clean_symbol, current_price) if _holding_amt > 0 and current_price > 0 else {}
         _total_assets = current_usdc
-        for _s, _a in self.portfolio.get_balance().items():
+        _report_balances = self.portfolio.get_balance()
+        _report_prices = MarketData.fetch_token_data_many([s for s in _report_balances if s != "USDC"])
+        for _s, _a in _report_balances.items():
             if _s != "USDC":
-                _sd = MarketData.fetch_token_data(_s)
+                _sd = _report_prices.get(MarketData._normalize_symbol(_s))
                 if _sd and _sd.get("status") == "success":
                     _total_assets += _a * float(_sd.get("priceUsd", 0))
         _usdc_ratio = (current_usdc / _total_assets * 100) if _total_assets > 0 else 0
@@ -1,10 +1,12 @@
 import json
 import os
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field, ValidationError
 from core.memory_db import NeoMemoryDB
+from core.utils import file_lock
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +82,7 @@ class BlackboardSchemaV5_2(BaseModel):
 class NeoBlackboard:
     FILE_PATH = "vault/blackboard/live_intel.json"
     _memory = NeoMemoryDB()
+    _lock = threading.RLock()   # radar のレーン（Council・定期ジョブ）が同時に更新しても上書きし合わない
 
     @classmethod
     def _ensure_dict(cls, val):
@@ -106,8 +109,32 @@ class NeoBlackboard:
         except Exception:
             return BlackboardSchemaV5_2().model_dump()
 
+    @classmethod
+    def _write(cls, data: Dict[str, Any]):
+        """一時ファイルに書いて置き換える（読み手が書きかけのファイルを読んで既定スキーマに戻らない）"""
+        tmp = f"{cls.FILE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, cls.FILE_PATH)
+
+    @classmethod
+    def patch(cls, fields: Dict[str, Any], section: str = None):
+        """トップレベルのキーをそのまま書き換える（last_unified_council_ts 等・スキーマ検証なし）
+        section を渡すとそのセクション（dict）の中のキーを書き換える（council_results[銘柄] 等）"""
+        with cls._lock, file_lock(cls.FILE_PATH):
+            current_intel = cls.load()
+            target = current_intel.setdefault(section, {}) if section else current_intel
+            target.update(fields)
+            cls._write(current_intel)
+
     @classmethod
     def update(cls, section: str, data: Any):
+        # Council ワーカー（別プロセス）も書くので、読み込み〜書き込みをファイルロックで囲む
+        with cls._lock, file_lock(cls.FILE_PATH):
+            cls._update(section, data)
+
+    @classmethod
+    def _update(cls, section: str, data: Any):
         current_intel = cls.load()
         try:
             data = cls._ensure_dict(data)
@@ -126,8 +153,7 @@ class NeoBlackboard:
             elif section == "performance_summary":
                 current_intel["performance_summary"] = PerformanceSummary(**data).model_dump()
             
-            with open(cls.FILE_PATH, "w") as f:
-                json.dump(current_intel, f, indent=2, ensure_ascii=False)
+            cls._write(current_intel)
             
             # ChromaDB書き込み: Blackboardからは一切書き込まない（ノイズ防止）
             # Council判定・利確・損切の結果のみ trinity_council.py から直接書き込む
@@ -0,0 +1,151 @@
+"""
+共有キャッシュストア（data/neo_cache.sqlite）
+銘柄ごと・用途ごとに散らばっていたJSONキャッシュ
+（market_cache_{sym} / ohlcv_cache_{sym} / whale / vp_onchain / vp_discovery / f2b_macro）を
+1つのSQLiteキー・バリューファイルに集約する。
+
+- namespace（生成元）× key で1エントリ。値はJSONで保存
+- TTL: put(ttl=秒) で expires_at を記録。期限切れは get() で見えなくなる（include_expired=True で取得可）
+- 原子的書き込み: 1エントリ=1行のUPSERT（全体書き換え・書きかけJSONの読み込みが起きない）
+- サイズ上限: MAX_ENTRIES を超えたら最終アクセスが古い順に削除（LRU）
+- 接続は price_store のスレッド別プール（WAL）を共用し、複数サービスからの同時アクセスに耐える
+"""
+import json
+import time
+import sqlite3
+import logging
+from typing import Any, Optional, Tuple
+
+from core import price_store
+
+logger = logging.getLogger("neo.cache_store")
+
+DB_PATH = "data/neo_cache.sqlite"
+
+MAX_ENTRIES = 5000          # LRU上限（全namespace合計）
+EVICT_EVERY = 100           # put何回ごとに上限チェックするか
+TOUCH_INTERVAL = 60         # accessed_at の更新間隔（読み取りごとの書き込みを抑える）
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        ns          TEXT NOT NULL,
+        key         TEXT NOT NULL,
+        value       TEXT NOT NULL,
+        stored_at   REAL NOT NULL,
+        expires_at  REAL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (ns, key)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)",
+)
+
+_SQL_GET = "SELECT value, stored_at, expires_at, accessed_at FROM entries WHERE ns=? AND key=?"
+_SQL_PUT = (
+    "INSERT INTO entries (ns, key, value, stored_at, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (ns, key) DO UPDATE SET value=excluded.value, stored_at=excluded.stored_at, "
+    "expires_at=excluded.expires_at, accessed_at=excluded.accessed_at"
+)
+_SQL_TOUCH = "UPDATE entries SET accessed_at=? WHERE ns=? AND key=?"
+_SQL_EVICT = (
+    "DELETE FROM entries WHERE (ns, key) IN ("
+    "  SELECT ns, key FROM entries ORDER BY accessed_at ASC LIMIT ?)"
+)
+
+_schema_ready = set()
+_puts_since_evict = 0
+
+
+def _conn(path: str = None) -> sqlite3.Connection:
+    path = path or DB_PATH
+    conn = price_store.get_connection(path)
+    if path not in _schema_ready:
+        for ddl in SCHEMA:
+            conn.execute(ddl)
+        conn.commit()
+        _schema_ready.add(path)
+    return conn
+
+
+def get_entry(ns: str, key: str, include_expired: bool = False) -> Optional[Tuple[Any, float]]:
+    """(value, age秒) を返す。無い・期限切れ（include_expired=False時）は None"""
+    try:
+        conn = _conn()
+        row = conn.execute(_SQL_GET, (ns, key)).fetchone()
+        if row is None:
+            return None
+        value, stored_at, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and now >= expires_at and not include_expired:
+            return None
+        if now - accessed_at >= TOUCH_INTERVAL:
+            conn.execute(_SQL_TOUCH, (now, ns, key))
+            conn.commit()
+        return json.loads(value), now - stored_at
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"cache get failed {ns}/{key}: {e}")
+        return None
+
+
+def get(ns: str, key: str, max_age: Optional[float] = None, include_expired: bool = False) -> Any:
+    """値を返す（無い・期限切れ・max_age秒より古い場合は None）"""
+    entry = get_entry(ns, key, include_expired=include_expired)
+    if entry is None:
+        return None
+    value, age = entry
+    if max_age is not None and age > max_age:
+        return None
+    return value
+
+
+def put(ns: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+    """値を保存（同一キーは上書き）。ttl秒後に期限切れ（None=無期限・LRUでのみ削除）"""
+    global _puts_since_evict
+    now = time.time()
+    try:
+        conn = _conn()
+        payload = json.dumps(value, ensure_ascii=False)
+        conn.execute(_SQL_PUT, (ns, key, payload, now, now + ttl if ttl else None, now))
+        conn.commit()
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"cache put failed {ns}/{key}: {e}")
+        return False
+    _puts_since_evict += 1
+    if _puts_since_evict >= EVICT_EVERY:
+        _puts_since_evict = 0
+        evict()
+    return True
+
+
+def delete(ns: str, key: Optional[str] = None):
+    """エントリ削除（key=None で namespace 全体）"""
+    conn = _conn()
+    if key is None:
+        conn.execute("DELETE FROM entries WHERE ns=?", (ns,))
+    else:
+        conn.execute("DELETE FROM entries WHERE ns=? AND key=?", (ns, key))
+    conn.commit()
+
+
+def evict(max_entries: int = None) -> int:
+    """期限切れを削除し、上限超過分を最終アクセスの古い順に削除。削除件数を返す"""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    try:
+        conn = _conn()
+        removed = conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                               (time.time() - 86400,)).rowcount  # 期限切れ後1日は stale 参照用に残す
+        total = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if total > max_entries:
+            removed += conn.execute(_SQL_EVICT, (total - max_entries,)).rowcount
+        conn.commit()
+        return removed
+    except sqlite3.Error as e:
+        logger.warning(f"cache evict failed: {e}")
+        return 0
+
+
+def stats() -> dict:
+    """namespace別の件数"""
+    rows = _conn().execute("SELECT ns, COUNT(*) FROM entries GROUP BY ns").fetchall()
+    return {ns: n for ns, n in rows}
@@ -4,6 +4,8 @@ import re
 from datetime import date, datetime, timezone, timedelta
 from pathlib import Path
 
+from core.utils import file_lock, write_atomic
+
 BUDGET_FILE = Path("vault/cost_guard_daily.json")
 BREAKER_FILE = Path("vault/cost_guard_breaker.json")
 
@@ -67,8 +69,8 @@ class CostGuard:
         self._save_daily()
 
     def _save_daily(self):
-        BUDGET_FILE.parent.mkdir(parents=True, exist_ok=True)
-        BUDGET_FILE.write_text(json.dumps({
+        # radar と Council ワーカー（別プロセス）が読み書きするので書きかけを読ませない
+        write_atomic(str(BUDGET_FILE), json.dumps({
             "date": str(date.today()),
             "spent": self.daily_spent,
         }))
@@ -87,8 +89,7 @@ class CostGuard:
             self._breaker["hwm"] = self.INITIAL_CAPITAL
 
     def _save_breaker(self):
-        BREAKER_FILE.parent.mkdir(parents=True, exist_ok=True)
-        BREAKER_FILE.write_text(json.dumps(self._breaker, indent=2))
+        write_atomic(str(BREAKER_FILE), json.dumps(self._breaker, indent=2))
 
     # ================================================================
     # Layer 1: LLMコスト
@@ -97,15 +98,18 @@ class CostGuard:
                           estimated_input_tokens: int,
                           estimated_output_tokens: int) -> bool:
         cost = self._estimate_cost(model_name, estimated_input_tokens, estimated_output_tokens)
-        if self.daily_spent + cost > self.DAILY_BUDGET_USD:
-            logging.warning(f"[CFO-L1] DENIED: LLM日次予算超過 ({crew_name}) "
-                            f"消費=${self.daily_spent:.4f} 推定=${cost:.4f} 上限=${self.DAILY_BUDGET_USD}")
-            return False
         if self.retry_counts.get(crew_name, 0) >= self.MAX_RETRIES_PER_TASK:
             logging.error(f"[CFO-L1] BLOCKED: {crew_name} が{self.retry_counts[crew_name]}回ループ中")
             return False
-        self.daily_spent += cost
-        self._save_daily()
+        # 複数の Council ワーカーが同じ日次予算を消費するので、最新の消費額を読み直してから加算する
+        with file_lock(str(BUDGET_FILE)):
+            self._load_daily()
+            if self.daily_spent + cost > self.DAILY_BUDGET_USD:
+                logging.warning(f"[CFO-L1] DENIED: LLM日次予算超過 ({crew_name}) "
+                                f"消費=${self.daily_spent:.4f} 推定=${cost:.4f} 上限=${self.DAILY_BUDGET_USD}")
+                return False
+            self.daily_spent += cost
+            self._save_daily()
         return True
 
     def record_failure(self, crew_name: str):
@@ -133,28 +137,8 @@ class CostGuard:
         try:
             from tools.paper_wallet import PaperWallet
             pw = PaperWallet()
-            hist = pw.state.get("history", [])
-
-            today_str = str(date.today())
-            buy_queues = {}
-            daily_pnl = 0.0
-
-            for h in hist:
-                sym = h.get("symbol", "")
-                if h["action"] == "BUY":
-                    buy_queues.setdefault(sym, []).append({
-                        "price": float(h["price"]),
-                        "amount": float(h.get("amount", 0)),
-                    })
-                elif h["action"] == "SELL" and buy_queues.get(sym):
-                    buy_entry = buy_queues[sym].pop(0)
-                    sell_price = float(h["price"])
-                    amount = float(h.get("amount", buy_entry.get("amount", 0)))
-                    pnl = (sell_price - buy_entry["price"]) * amount
-                    # 今日の取引のみ集計
-                    ts = h.get("timestamp", "")
-                    if today_str in ts:
-                        daily_pnl += pnl
+            # FIFOロット照合（tools.lot_matcher）の決済レコードのうち今日決済した分の実現損益
+            daily_pnl = pw.lots().realized_pnl(since=str(date.today()))
 
             if daily_pnl < self.DAILY_LOSS_LIMIT_USD:
                 logging.warning(f"[CFO-L2] BLOCKED: 日次損失${daily_pnl:,.0f} < 上限${self.DAILY_LOSS_LIMIT_USD:,.0f}")
@@ -231,16 +215,24 @@ class CostGuard:
             from tools.paper_wallet import PaperWallet
             pw = PaperWallet()
             total = pw.state.get("usd_balance", 0)
-            # ポジション評価額も加算（時価で計算）
+            # ポジション評価額も加算（時価で計算・価格はプロバイダごとに一括取得）
+            _amounts = {}
             for sym, holding in pw.state.get("holdings", {}).items():
                 if isinstance(holding, dict):
                     _amt = float(holding.get("amount", 0))
                 else:
                     _amt = float(holding)
                 if _amt > 0:
+                    _amounts[sym] = _amt
+            if _amounts:
+                try:
+                    from tools.market_data import MarketData
+                    _prices = MarketData.fetch_token_data_many(list(_amounts))
+                except Exception:
+                    _prices = {}
+                for sym, _amt in _amounts.items():
                     try:
-                        from tools.market_data import MarketData
-                        _td = MarketData.fetch_token_data(sym)
+                        _td = _prices.get(MarketData._normalize_symbol(sym))
                         _price = float(_td.get("priceUsd", 0)) if _td else 0
                         total += _amt * _price
                     except Exception:
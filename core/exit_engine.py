@@ -0,0 +1,663 @@
+"""
+イベント駆動の出口エンジン（5層出口判定）
+旧実装は30秒ごとの check_tp_sl_all_positions が毎回 PaperWallet / NeoMemoryDB（ChromaDB PersistentClient）を作り直し、
+保有銘柄ごとに 出口プロファイル・AI戦略書の上書き・S2/S3・F2水準・exit_stages を導出し直してから判定していた。
+
+- ExitPlan: ポジションごとの事前計算済み閾値（SL価格・トレールHWM・固定TP・RSI出口・exit_stages・時間制限の期限）。
+  トリガー価格を昇順に並べた梯子（ladder）と区間ごとの静穏判定を持ち、現在価格の区間（low < price < high）の中の
+  ティックは比較2回で終わる。区間を出たら判定して bisect で次の区間（次に上/下で発火しうる価格）を引き直す
+- ExitEngine: 保有銘柄 → ExitPlan。sync() はポジションの中身かマクロ水準（F2/F2b）が変わった銘柄だけ作り直す。
+  on_price() が価格イベント（PriceCache への新着・prices.sqlite の新着ティック）ごとに判定し、
+  発火したシグナルを pending に積む（執行は呼び出し側 = run_trigger）
+- watch(): radar のサイクル間 sleep の置き換え。TICK_POLL_SEC ごとに保有銘柄の最新ティックだけを読み、
+  新着があれば判定する（出口の遅延はポーリング間隔ではなくティック到着で決まる）
+- MacroRefresher: F2/F2b マクロ水準をバックグラウンドで更新して公開する（yfinance 待ちで出口判定を止めない）
+
+判定順（旧 run_trigger と同じ・最初に成立した層で確定）:
+  F2/F2b（L3 全量・L2 含み益利確・L1 SL×0.5）→ 第0層 戦略書 exit_stages → 第1層 固定SL
+  → 第2層 トレール / 第2層b 固定TP / 第3層 RSI出口（排他）→ 第4層 時間制約
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from core import price_store, stream_indicators
+from core.config import EXIT_PROFILES, EXIT_PROFILE_DEFAULT
+
+logger = logging.getLogger("neo.exit_engine")
+
+TICK_POLL_SEC = 2            # watch() の最新ティック確認間隔
+SELL_COOLDOWN_SEC = 300      # シンボル別売却冷却（二重発火防止）v6.5ar
+TIGHTEN_MAP = {"long": "mid", "mid": "short"}   # S3-2: bear trigger接近時の1段階引き締め
+S3_BEAR_TIGHTEN_PCT = 70     # bear進行度（entry→stop）がこれ以上で引き締め
+RSI_EXIT_MIN_PNL = 1.5       # 第3層: 含み益がこれを超えたらRSIを見る
+RSI_EXIT_MIN_PROFIT = 3.0    # 第3層: 既定の最低利益（bull_stage1 の trigger_pct が上ならそちら）
+MACRO_REFRESH_SEC = 30       # MacroRefresher の F2/F2b 公開間隔
+MACRO_STALE_SEC = 300        # これより古い公開値は警告
+F2B_REFRESH_SEC = 1800       # F2b（yfinance SPY/Gold）キャッシュの更新間隔（30分）
+BAND_MARGIN_PCT = 0.01       # 静穏区間の余裕（pnl_pct は小数2桁に丸めて判定するため）
+
+_tighten_logged = set()      # S3 exit引き締めログ重複排除
+
+
+class ExitSignal(NamedTuple):
+    symbol: str
+    label: str          # SL / Trail TP / Hard TP / RSI Exit / Time Exit / Strategy SL / Strategy TP / F2-L2 / F2-L3
+    reason: str
+    price: float
+    pnl_pct: float
+    fraction: float = 1.0
+    stage_id: Optional[str] = None
+    profile: str = EXIT_PROFILE_DEFAULT
+    sl_pct: float = 0.0
+
+
+class Limits(NamedTuple):
+    """トレール・固定TP・時間制限（S3-2 の引き締め時は別の組）"""
+    trail_start: float
+    trail_drop: float
+    hard_tp: float
+    time_limit: float
+    deadline: Optional[float]   # entry_time + time_limit（エポック秒）
+
+
+class Stage(NamedTuple):
+    stage_id: str
+    bear: bool
+    index: int
+    trigger: float
+    fraction: float
+    note: str
+
+
+# ================================================================
+# マクロ水準（F2: BTC急落 / F2b: SPY・Gold 急変）
+# ================================================================
+class MacroState(NamedTuple):
+    level: int                 # F2/F2b の大きい方（0〜3）
+    btc_chg: float             # BTC 24h 変化率（%）
+    updated_at: float = 0.0    # 公開時刻（0 = 未更新）
+
+
+def _f2_level() -> tuple:
+    """F2: BTC 24h 変化率からのレベル (level, btc_24h_chg)（prices.sqlite のみ・ネットワークなし）"""
+    _f2_level = 0
+    _btc_24h_chg_f2 = 0.0
+    try:
+        _r1 = price_store.latest_tick("BTC")
+        # ts はミリ秒エポック（旧実装の datetime('now') 文字列比較は常に最新行を返していた）
+        _r2 = price_store.tick_at_or_before("BTC", int((time.time() - 86400) * 1000))
+        if _r1 and _r2 and _r2[0] > 0:
+            _btc_24h_chg_f2 = (_r1[0] - _r2[0]) / _r2[0] * 100
+            if _btc_24h_chg_f2 <= -12:
+                _f2_level = 3
+                logger.warning(f"\N{POLICE CARS REVOLVING LIGHT} [F2 L3] BTC急落 {_btc_24h_chg_f2:.1f}% — 全ポジション緊急売却モード")
+            elif _btc_24h_chg_f2 <= -8:
+                _f2_level = 2
+                logger.warning(f"⚠️ [F2 L2] BTC大幅下落 {_btc_24h_chg_f2:.1f}% — 含み益ポジション利確モード")
+            elif _btc_24h_chg_f2 <= -5:
+                _f2_level = 1
+                logger.info(f"\U0001f4c9 [F2 L1] BTC下落 {_btc_24h_chg_f2:.1f}% — SL引き締めモード(x0.5)")
+    except Exception:
+        pass
+    return _f2_level, _btc_24h_chg_f2
+
+
+# === F2b: マクロ急変検知（SPY/Gold — 30分間隔キャッシュ）v6.5ak ===
+# BTCより先に動くマクロ指標で「先回り」するお盆フレームワークの即時版
+def _f2b_stale() -> bool:
+    """F2b キャッシュ（cache_store macro/f2b）が F2B_REFRESH_SEC より古い（または無い）"""
+    from core import cache_store
+    _f2b_data = cache_store.get("macro", "f2b")
+    return not (_f2b_data and time.time() - _f2b_data.get("ts", 0) < F2B_REFRESH_SEC)
+
+
+def _fetch_f2b():
+    """yfinance で SPY/Gold の直近24h変化率を取り、cache_store macro/f2b に保存（数秒かかることがある）"""
+    from core import cache_store
+    try:
+        import yfinance as _yf_f2b
+        _spy_t = _yf_f2b.Ticker("SPY")
+        _spy_h = _spy_t.history(period="2d", interval="1h")
+        _gold_t = _yf_f2b.Ticker("GC=F")
+        _gold_h = _gold_t.history(period="2d", interval="1h")
+        _spy_now = float(_spy_h["Close"].iloc[-1]) if len(_spy_h) > 0 else 0
+        _spy_prev = float(_spy_h["Close"].iloc[-24]) if len(_spy_h) >= 25 else float(_spy_h["Close"].iloc[0])
+        _gold_now = float(_gold_h["Close"].iloc[-1]) if len(_gold_h) > 0 else 0
+        _gold_prev = float(_gold_h["Close"].iloc[-24]) if len(_gold_h) >= 25 else float(_gold_h["Close"].iloc[0])
+        _spy_chg = ((_spy_now - _spy_prev) / _spy_prev * 100) if _spy_prev > 0 else 0
+        _gold_chg = ((_gold_now - _gold_prev) / _gold_prev * 100) if _gold_prev > 0 else 0
+        _f2b_data = {"spy": _spy_now, "spy_chg": round(_spy_chg, 2), "gold": _gold_now, "gold_chg": round(_gold_chg, 2), "ts": time.time()}
+        cache_store.put("macro", "f2b", _f2b_data)
+        logger.info(f"[F2b] キャッシュ更新: SPY {_spy_chg:+.1f}% Gold {_gold_chg:+.1f}%")
+    except Exception as _yfe:
+        logger.warning(f"[F2b] yfinance取得失敗: {_yfe}")
+
+
+def _f2b_level() -> int:
+    """F2b: キャッシュ済みの SPY/Gold 変化率からのレベル（取得はしない）"""
+    _f2b_level = 0
+    try:
+        from core import cache_store
+        _f2b_data = cache_store.get("macro", "f2b")
+        if _f2b_data:
+            _spy_chg_val = _f2b_data.get("spy_chg", 0)
+            _gold_chg_val = _f2b_data.get("gold_chg", 0)
+            # SPY急落 + Gold急騰 = リスクオフ加速（お盆の傾き）
+            if _spy_chg_val <= -5 and _gold_chg_val >= 3:
+                _f2b_level = 3
+                logger.warning(f"[F2b L3] マクロ急変: SPY {_spy_chg_val:+.1f}% + Gold {_gold_chg_val:+.1f}% — 全ポジション緊急売却")
+            elif _spy_chg_val <= -3 and _gold_chg_val >= 1.5:
+                _f2b_level = 2
+                logger.warning(f"[F2b L2] マクロ警戒: SPY {_spy_chg_val:+.1f}% + Gold {_gold_chg_val:+.1f}% — 含み益利確モード")
+            elif _spy_chg_val <= -2:
+                _f2b_level = 1
+                logger.info(f"[F2b L1] SPY下落 {_spy_chg_val:+.1f}% — SL引き締めモード")
+    except Exception as _f2b_outer_e:
+        logger.warning(f"[F2b] 外部エラー: {_f2b_outer_e}")
+    return _f2b_level
+
+
+def macro_level() -> tuple:
+    """F2/F2b の大きい方のレベル（0〜3）と BTC 24h 変化率 (level, btc_24h_chg)。
+    F2b キャッシュが古ければその場で yfinance を呼ぶ（同期版。radar は MacroRefresher.current() を読む）"""
+    try:
+        if _f2b_stale():
+            _fetch_f2b()
+    except Exception as _f2b_outer_e:
+        logger.warning(f"[F2b] 外部エラー: {_f2b_outer_e}")
+    level, btc_chg = _f2_level()
+    # F2とF2bの最大レベルを採用
+    return max(level, _f2b_level()), btc_chg
+
+
+class MacroRefresher:
+    """F2/F2b マクロ水準のバックグラウンド更新。
+    MACRO_REFRESH_SEC ごとに F2（prices.sqlite）とキャッシュ済み F2b からレベルを出して state に公開する。
+    F2b の yfinance 取得はキャッシュ切れのときだけ別スレッドで走らせ、終わったら即公開し直す
+    （遅い上流で F2 の更新も出口判定も止めない）。current() は I/O なしで最新の公開値を返す"""
+
+    def __init__(self, interval: float = MACRO_REFRESH_SEC):
+        self.interval = interval
+        self.state = MacroState(0, 0.0)
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._fetcher: Optional[threading.Thread] = None
+
+    def start(self):
+        """初回の公開値を同期で作ってから更新スレッドを起動する（起動直後の出口判定が既定値 0 で走らない）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped = False
+        if not self.state.updated_at:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"[F2] マクロ水準の初回更新エラー: {e}")
+        self._thread = threading.Thread(target=self._run, name="neo-macro", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def refresh(self) -> MacroState:
+        """F2 とキャッシュ済み F2b から公開値を作り直す（F2b が古ければ取得スレッドを起こす）"""
+        try:
+            if _f2b_stale() and not (self._fetcher is not None and self._fetcher.is_alive()):
+                self._fetcher = threading.Thread(target=self._fetch, name="neo-macro-f2b", daemon=True)
+                self._fetcher.start()
+        except Exception as e:
+            logger.warning(f"[F2b] 外部エラー: {e}")
+        level, btc_chg = _f2_level()
+        self.state = MacroState(max(level, _f2b_level()), btc_chg, time.time())
+        return self.state
+
+    def _fetch(self):
+        _fetch_f2b()
+        self._wake.set()   # 新しい F2b をすぐ公開
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"[F2] マクロ水準更新エラー: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def current(self) -> MacroState:
+        """最新の公開値（通常は I/O なし）。更新スレッドが止まっていたら起こし直す（未起動なら初回更新を同期で行う）"""
+        if not self._stopped and (self._thread is None or not self._thread.is_alive()):
+            if self._thread is not None:
+                logger.warning("[F2] マクロ水準の更新スレッドが停止 → 再起動")
+            self.start()
+        state = self.state
+        if not state.updated_at:
+            logger.warning("[F2] マクロ水準が未取得（F2/F2b なしとして level 0 で判定）")
+        elif time.time() - state.updated_at > MACRO_STALE_SEC:
+            logger.warning(f"[F2] マクロ水準が {time.time() - state.updated_at:.0f}s 更新されていない（最後の値を使用）")
+        return state
+
+
+# ================================================================
+# ポジション別の事前計算
+# ================================================================
+def _parse_entry_time(entry_time_str: str) -> Optional[float]:
+    if not entry_time_str:
+        return None
+    try:
+        if entry_time_str.endswith('+00:00') or entry_time_str.endswith('Z'):
+            entry_time = datetime.fromisoformat(entry_time_str.replace('Z', '+00:00'))
+        else:
+            entry_time = datetime.fromisoformat(entry_time_str).replace(tzinfo=timezone.utc)
+        return entry_time.timestamp()
+    except Exception as _te:
+        logger.error(f"[TP/SL] entry_time解析エラー: {_te}")
+        return None
+
+
+def fingerprint(hdata: dict) -> str:
+    """閾値の導出に効くポジションの中身（HWM は判定中に動くので除く）"""
+    return json.dumps({k: v for k, v in hdata.items() if k != "high_water_pnl"}, sort_keys=True, default=str)
+
+
+class ExitPlan:
+    """1ポジションの出口閾値（保有内容・マクロ水準が変わるまで使い回す）"""
+
+    def __init__(self, symbol: str, hdata: dict, f2_level: int = 0, btc_chg: float = 0.0, key: str = None):
+        self.symbol = symbol
+        self.key = key if key is not None else fingerprint(hdata)
+        self.avg = float(hdata.get("avg_price", 0) or 0)
+        self.entry_time = hdata.get("entry_time", "")
+        self.entry_ts = _parse_entry_time(self.entry_time)
+        self.f2_level = f2_level
+        self.btc_chg = btc_chg
+        self.last_price = 0.0
+        hw = hdata.get("high_water_pnl")
+        self.hwm: Optional[float] = float(hw) if hw is not None else None
+        self.hwm_dirty = False
+
+        # === 戦略別出口プロファイル（AI戦略書の exit_params で上書き）===
+        self.profile = hdata.get("exit_profile", EXIT_PROFILE_DEFAULT)
+        p = EXIT_PROFILES.get(self.profile, EXIT_PROFILES[EXIT_PROFILE_DEFAULT])
+        sl_pct = p["sl_pct"]
+        trail_start, trail_drop = p["trailing_start"], p["trailing_drop"]
+        ec = hdata.get("entry_context", {}) if isinstance(hdata.get("entry_context"), dict) else {}
+        ai = ec.get("exit_profile", {}) or {}
+        self.rsi_exit = ai["rsi_exit"] if ai.get("rsi_exit") is not None else p.get("rsi_exit")
+        if ai.get("trailing_start"):
+            trail_start = ai["trailing_start"]
+        if ai.get("trailing_drop"):
+            trail_drop = ai["trailing_drop"]
+        self.base = self._limits(trail_start, trail_drop, p["hard_tp_pct"], p["time_limit_hours"])
+        self.tight: Optional[Limits] = None
+        self.tight_profile = None
+        self.tighten_price = 0.0
+        self.bear_stop = 0.0
+        self.bull_target = 0.0
+
+        # === S3: 戦略書動的出口 ===
+        strategy = ec.get("strategy")
+        if strategy:
+            try:
+                bear = strategy.get("bear_scenario", {})
+                stop = float(bear.get("stop_price", 0))
+                target = float(strategy.get("bull_scenario", {}).get("target_price", 0))
+                # S3-1: 戦略SLで固定SLを上書き（固定SLの2倍が安全上限）
+                if self.avg > 0 and stop > 0:
+                    strat_sl_pct = (self.avg - stop) / self.avg * 100
+                    if 0 < strat_sl_pct <= sl_pct * 2:
+                        sl_pct = strat_sl_pct
+                # S3-2: bear trigger接近(70%) → exit_profile 1段階引き締め（価格で判定）
+                if self.avg > 0 and stop > 0 and self.avg > stop:
+                    new_cat = TIGHTEN_MAP.get(self.profile)
+                    new_p = EXIT_PROFILES.get(new_cat) if new_cat else None
+                    if new_p:
+                        self.bear_stop = stop
+                        self.tighten_price = self.avg - (self.avg - stop) * S3_BEAR_TIGHTEN_PCT / 100
+                        self.tight_profile = new_cat
+                        self.tight = self._limits(new_p["trailing_start"], new_p["trailing_drop"],
+                                                  new_p["hard_tp_pct"], new_p["time_limit_hours"])
+                # S3-3: bull target到達(100%) → トレール早期開始
+                if self.avg > 0 and target > self.avg:
+                    self.bull_target = target
+            except Exception:
+                pass
+
+        # === F2: BTC急落リスク（L1 は SL 引き締め）===
+        if 1 <= f2_level <= 2:
+            sl_pct = sl_pct * 0.5
+        self.sl_pct = sl_pct
+
+        # === 第0層: 戦略書 exit_stages（bear → bull の順に評価）===
+        self.stages: List[Stage] = []
+        self.completed = set(hdata.get("completed_stages", []) or [])
+        self.min_profit = RSI_EXIT_MIN_PROFIT
+        if strategy:
+            for bear_side, scenario, default in ((True, "bear_scenario", -999), (False, "bull_scenario", 999)):
+                for i, stg in enumerate(strategy.get(scenario, {}).get("exit_stages", [])):
+                    try:
+                        self.stages.append(Stage(f"{'bear' if bear_side else 'bull'}_{i}", bear_side, i,
+                                                 float(stg.get("trigger_pct", default)),
+                                                 min(100, max(1, int(stg.get("sell_pct", 100)))) / 100.0,
+                                                 stg.get("note", "")))
+                    except (TypeError, ValueError, AttributeError) as e:
+                        logger.warning(f"[Exit Stage] {symbol} {scenario}[{i}] 解析失敗: {e}")
+            # v6.5as: AI戦略のbull_stage1未到達ならRSI Exitしない
+            try:
+                bull_stages = strategy.get("bull_scenario", {}).get("exit_stages", []) if isinstance(strategy, dict) else []
+                if bull_stages and isinstance(bull_stages[0], dict):
+                    self.min_profit = max(RSI_EXIT_MIN_PROFIT, bull_stages[0].get("trigger_pct", RSI_EXIT_MIN_PROFIT))
+            except Exception:
+                pass
+        self._index()
+        self._locate(self.avg)
+
+    def _limits(self, trail_start, trail_drop, hard_tp, time_limit) -> Limits:
+        deadline = self.entry_ts + time_limit * 3600 if self.entry_ts is not None else None
+        return Limits(trail_start, trail_drop, hard_tp, time_limit, deadline)
+
+    def _price(self, pct: float) -> float:
+        return self.avg * (1 + pct / 100)
+
+    def _index(self):
+        """閾値の梯子を作り直す: 全トリガー（SL・exit_stages・S3 引き締め/bull target・トレール開始/HWM/下限・
+        固定TP・RSI出口の最低利益・F2 L2 の損益ゼロ）を pnl_pct で昇順に並べ、隣り合う2本の間（区間）ごとに
+        「区間内のどの価格でも何も発火せず HWM も動かない」かを先に判定しておく。判定は _locate() の bisect 1回で引く"""
+        inf = float("inf")
+        limits = [self.base] + ([self.tight] if self.tight else [])
+        deadlines = [lim.deadline for lim in limits if lim.deadline is not None]
+        self.deadline = min(deadlines) if deadlines else inf
+        self.low, self.high = inf, -inf
+        self.ladder: List[float] = []
+        self.quiet: List[Optional[tuple]] = [None]
+        if self.avg <= 0 or self.f2_level >= 3:
+            return
+        levels = {-self.sl_pct}
+        levels.update(s.trigger for s in self.stages if s.stage_id not in self.completed)
+        for lim in limits:
+            levels.update((lim.trail_start, lim.hard_tp))
+            if self.hwm is not None:
+                levels.update((self.hwm, self.hwm - lim.trail_drop))
+        if self.rsi_exit is not None:
+            levels.update((RSI_EXIT_MIN_PNL, self.min_profit))
+        if self.f2_level >= 2:
+            levels.add(0.0)
+        for price in (self.tighten_price, self.bull_target):
+            if price:
+                levels.add((price - self.avg) / self.avg * 100)
+        levels = sorted(levels)
+        m = BAND_MARGIN_PCT
+        self.ladder = [self._price(p) for p in levels]
+        # 区間 i は ladder[i-1]..ladder[i]（両端は梯子の外側）。静穏なら (low, high) を余裕 m だけ内側に取る
+        self.quiet = []
+        for lo, hi in zip([None] + levels, levels + [None]):
+            mid = hi - 1.0 if lo is None else lo + 1.0 if hi is None else (lo + hi) / 2
+            if self._fires(self._price(mid)):
+                self.quiet.append(None)
+            else:
+                self.quiet.append((self._price(lo + m) if lo is not None else 0.0,
+                                   self._price(hi - m) if hi is not None else inf))
+
+    def _locate(self, price: float):
+        """price を含む区間を bisect で引き、静穏な区間なら low/high をその区間にする（発火しうる区間なら帯なし）"""
+        band = self.quiet[bisect.bisect_right(self.ladder, price)]
+        self.low, self.high = band if band is not None else (float("inf"), float("-inf"))
+
+    def _fires(self, price: float) -> bool:
+        """_decide() がこの価格で発火するか HWM を動かすか（RSI・時間制約は見ない = 発火しうる側に倒す）"""
+        pnl = (price - self.avg) / self.avg * 100
+        if self.f2_level >= 3 or (self.f2_level >= 2 and pnl > 0):
+            return True
+        for stg in self.stages:
+            if stg.stage_id not in self.completed and ((pnl <= stg.trigger) if stg.bear else (pnl >= stg.trigger)):
+                return True
+        lim = self.tight if self.tight and price <= self.tighten_price else self.base
+        if self.bull_target and price >= self.bull_target and pnl > 0:
+            return True   # S3-3: トレール開始が価格とともに動く
+        if pnl <= -self.sl_pct:
+            return True
+        if pnl >= lim.trail_start or (self.hwm or 0) >= lim.trail_start:
+            return self.hwm is None or pnl > self.hwm or self.hwm - pnl >= lim.trail_drop
+        if pnl >= lim.hard_tp:
+            return True
+        return pnl > RSI_EXIT_MIN_PNL and self.rsi_exit is not None and pnl >= self.min_profit
+
+    # ================================================================
+    # 判定
+    # ================================================================
+    def evaluate(self, price: float, now: float = None) -> Optional[ExitSignal]:
+        if price <= 0 or self.avg <= 0:
+            return None
+        now = time.time() if now is None else now
+        if self.low < price < self.high and now <= self.deadline:
+            return None
+        signal = self._decide(price, now)
+        if signal is None:
+            self._locate(price)
+        return signal
+
+    def _signal(self, label, reason, price, pnl, fraction=1.0, stage_id=None) -> ExitSignal:
+        return ExitSignal(self.symbol, label, reason, price, pnl, fraction, stage_id, self.profile, self.sl_pct)
+
+    def _decide(self, price: float, now: float) -> Optional[ExitSignal]:
+        sym, cat = self.symbol, self.profile
+        pnl = round((price - self.avg) / self.avg * 100, 2)   # PaperWallet.get_unrealized_pnl と同じ丸め
+
+        # === F2: BTC急落リスク適用 v6.5ai ===
+        if self.f2_level >= 3:
+            logger.warning(f"[F2 L3] {sym} 緊急売却")
+            return self._signal("F2-L3", f"F2 L3 Emergency: BTC {self.btc_chg:.1f}% — forced liquidation (profile: {cat})", price, pnl)
+        if self.f2_level >= 2 and pnl > 0:
+            logger.warning(f"[F2 L2] {sym} 含み益利確 +{pnl:.1f}%")
+            return self._signal("F2-L2", f"F2 L2 Profit-take: BTC {self.btc_chg:.1f}% + profit {pnl:+.1f}% (profile: {cat})", price, pnl)
+
+        # === 第0層: 戦略書exit_stages判定 ===
+        for stg in self.stages:
+            if stg.stage_id in self.completed:
+                continue
+            if (pnl <= stg.trigger) if stg.bear else (pnl >= stg.trigger):
+                self.completed.add(stg.stage_id)
+                self._index()
+                if stg.bear:
+                    reason = f"Strategy Bear Stage {stg.index}: {pnl:+.1f}% <= {stg.trigger:+.1f}% (sell {stg.fraction*100:.0f}%, {stg.note})"
+                    logger.warning(f'[Exit Stage] 📉 {sym} bear stage {stg.index}: {pnl:+.1f}% (sell {stg.fraction*100:.0f}%)')
+                else:
+                    reason = f"Strategy Bull Stage {stg.index}: {pnl:+.1f}% >= {stg.trigger:+.1f}% (sell {stg.fraction*100:.0f}%, {stg.note})"
+                    logger.info(f'[Exit Stage] 📈 {sym} bull stage {stg.index}: {pnl:+.1f}% (sell {stg.fraction*100:.0f}%)')
+                return self._signal("Strategy SL" if stg.bear else "Strategy TP", reason, price, pnl,
+                                    stg.fraction, stg.stage_id)
+
+        lim = self.base
+        if self.tight and price <= self.tighten_price:
+            lim = self.tight
+            log_key = f"{sym}_{self.profile}_{self.tight_profile}"
+            if log_key not in _tighten_logged:
+                bear_prog = (self.avg - price) / (self.avg - self.bear_stop) * 100
+                logger.warning(f"[S3] {sym} exit引き締め: {self.profile}→{self.tight_profile} (bear={bear_prog:.0f}%)")
+                _tighten_logged.add(log_key)
+        trail_start = lim.trail_start
+        if self.bull_target and price >= self.bull_target and pnl > 0:
+            trail_start = min(trail_start, max(2.0, pnl * 0.8))
+
+        # === 第1層: 固定SL（戦略別） ===
+        if pnl <= -self.sl_pct:
+            logger.warning(f"[TP/SL] 🛑 損切トリガー: {sym} {pnl:.1f}% (profile: {cat})")
+            return self._signal("SL", f"Stop Loss at {pnl:.1f}% (limit: -{self.sl_pct}%, profile: {cat})", price, pnl)
+
+        signal = None
+        # === 第2層: トレーリングストップ（戦略別開始・ドロップ幅） ===
+        if pnl >= trail_start or (self.hwm or 0) >= trail_start:
+            if self.hwm is None or pnl > self.hwm:
+                if self.hwm is not None:
+                    logger.info(f"[TP/SL] 📈 高値更新: {sym} +{pnl:.1f}% (HWM)")
+                self.hwm = pnl
+                self.hwm_dirty = True
+                self._index()
+            drawdown_from_hw = self.hwm - pnl
+            if drawdown_from_hw >= lim.trail_drop:
+                logger.warning(f"[TP/SL] 🎯 トレーリング利確: {sym} +{pnl:.1f}% (HWM: +{self.hwm:.1f}%, profile: {cat})")
+                signal = self._signal("Trail TP", f"Trailing Stop at +{pnl:.1f}% (HWM: +{self.hwm:.1f}%, drop: -{drawdown_from_hw:.1f}%, profile: {cat})", price, pnl)
+
+        # === 第2層b: 固定TP上限（戦略別） ===
+        elif pnl >= lim.hard_tp:
+            logger.warning(f"[TP/SL] 🎯 固定上限利確: {sym} +{pnl:.1f}% (profile: {cat})")
+            signal = self._signal("Hard TP", f"Hard TP Ceiling at +{pnl:.1f}% (ceiling: +{lim.hard_tp:.0f}%, profile: {cat})", price, pnl)
+
+        # === 第3層: テクニカル出口（RSI > 閾値 + 含み益）v6.5ai: プロファイル別RSI ===
+        elif pnl > RSI_EXIT_MIN_PNL and self.rsi_exit is not None and pnl >= self.min_profit:
+            rsi_val = _rsi(sym)
+            if rsi_val is not None and rsi_val > self.rsi_exit:
+                logger.warning(f"[TP/SL] 📊 テクニカル出口: {sym} RSI={rsi_val:.1f}>{self.rsi_exit} +{pnl:.1f}% (min={self.min_profit:.1f}%, profile: {cat})")
+                signal = self._signal("RSI Exit", f"RSI Exit at RSI={rsi_val:.1f} with +{pnl:.1f}% profit (RSI>{self.rsi_exit}, min_profit={self.min_profit:.1f}%, profile: {cat})", price, pnl)
+
+        # === 第4層: 時間制約（戦略別） ===
+        if signal is None and lim.deadline is not None and now > lim.deadline:
+            hours_held = (now - self.entry_ts) / 3600
+            logger.warning(f"[TP/SL] ⏰ 時間制約: {sym} {hours_held:.0f}h (limit: {lim.time_limit}h, profile: {cat}) {pnl:+.1f}%")
+            signal = self._signal("Time Exit", f"Time Exit after {hours_held:.0f}h (limit: {lim.time_limit}h, profile: {cat}) with {pnl:+.1f}%", price, pnl)
+        return signal
+
+
+def _rsi(symbol: str) -> Optional[float]:
+    """ストリーミング指標（Wilder 14・5分ティック）の現在値（新着ティックだけ適用・履歴は読み直さない）"""
+    try:
+        return stream_indicators.current(symbol)["rsi"]
+    except Exception:
+        return None
+
+
+# ================================================================
+# エンジン
+# ================================================================
+class ExitEngine:
+    """保有銘柄の ExitPlan を保持し、価格イベントごとに判定する（1プロセスに1つ・radar が所有）"""
+
+    def __init__(self):
+        self.plans: Dict[str, ExitPlan] = {}
+        self.pending: Dict[str, ExitSignal] = {}
+        self.cooldown: Dict[str, float] = {}
+        self.level = 0
+        self._last_tick: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def sync(self, holdings: Dict[str, dict], f2_level: int = 0, btc_chg: float = 0.0) -> int:
+        """保有内容・マクロ水準を反映。Returns: 作り直した ExitPlan の数"""
+        rebuilt = 0
+        with self._lock:
+            level_changed = f2_level != self.level
+            self.level = f2_level
+            held = {s: h for s, h in holdings.items() if h.get("amount", 0) > 0}
+            for sym in [s for s in self.plans if s not in held]:
+                del self.plans[sym]
+                self.pending.pop(sym, None)
+                self._last_tick.pop(sym, None)
+            for sym, hdata in held.items():
+                key = fingerprint(hdata)
+                old = self.plans.get(sym)
+                if old is not None and old.key == key and not level_changed:
+                    old.btc_chg = btc_chg
+                    continue
+                plan = ExitPlan(sym, hdata, f2_level, btc_chg, key)
+                # 古い計画（取得単価・数量・F2 水準が違う）で出たシグナルは執行させない。
+                # 直近ティックは新しい計画で判定し直す
+                self.pending.pop(sym, None)
+                self._last_tick.pop(sym, None)
+                # 未保存の HWM は同じポジション（取得単価・取得時刻が同じ）なら引き継ぐ
+                if (old is not None and old.hwm is not None and old.avg == plan.avg and old.entry_time == plan.entry_time
+                        and (plan.hwm is None or old.hwm > plan.hwm)):
+                    plan.hwm, plan.hwm_dirty = old.hwm, old.hwm_dirty
+                    plan._index()
+                    plan._locate(old.last_price or plan.avg)
+                plan.last_price = old.last_price if old is not None else 0.0
+                self.plans[sym] = plan
+                rebuilt += 1
+        return rebuilt
+
+    def on_price(self, symbol: str, price: float, now: float = None) -> Optional[ExitSignal]:
+        """価格イベント1件を判定し、発火したら pending に積んで返す"""
+        plan = self.plans.get(symbol)
+        if plan is None or price <= 0:
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            plan.last_price = price
+            if symbol in self.pending or now < self.cooldown.get(symbol, 0):
+                return None
+            signal = plan.evaluate(price, now)
+            if signal is not None:
+                self.pending[symbol] = signal
+            return signal
+
+    def drain(self) -> List[ExitSignal]:
+        with self._lock:
+            signals = list(self.pending.values())
+            self.pending.clear()
+            return signals
+
+    def hwm_updates(self) -> Dict[str, float]:
+        """判定中に更新された HWM（呼び出し側がウォレットへ保存する）"""
+        with self._lock:
+            updates = {s: p.hwm for s, p in self.plans.items() if p.hwm_dirty}
+            for s in updates:
+                self.plans[s].hwm_dirty = False
+            return updates
+
+    def start_cooldown(self, symbol: str, seconds: float = SELL_COOLDOWN_SEC):
+        self.cooldown[symbol] = time.time() + seconds
+
+    def forget(self, symbol: str):
+        """次の sync() で作り直させる（執行しなかったシグナルの exit_stages を戻す等）"""
+        with self._lock:
+            self.plans.pop(symbol, None)
+
+    # ================================================================
+    # ティック待ち
+    # ================================================================
+    def poll_ticks(self, conn=None) -> int:
+        """保有銘柄の最新ティックを読み、新着分を判定する。Returns: 新着ティック数"""
+        symbols = list(self.plans)
+        if not symbols:
+            return 0
+        try:
+            rows = price_store.latest_ticks(symbols, conn=conn)
+        except Exception as e:
+            logger.warning(f"tick poll failed: {e}")
+            return 0
+        fresh = 0
+        for sym, (price, ts) in rows.items():
+            if ts > self._last_tick.get(sym, 0):
+                self._last_tick[sym] = ts
+                self.on_price(sym, price)
+                fresh += 1
+        return fresh
+
+    def check_deadlines(self, now: float = None):
+        """ティックが来なくても時間制約は発火させる（直近価格で判定）"""
+        now = time.time() if now is None else now
+        for sym, plan in list(self.plans.items()):
+            if plan.last_price > 0 and now > plan.deadline:
+                self.on_price(sym, plan.last_price, now)
+
+    def watch(self, timeout: float, poll: float = TICK_POLL_SEC) -> bool:
+        """timeout 秒まで新着ティックを待ちながら判定する（radar のサイクル間 sleep の置き換え）。
+        シグナルが出たら待たずに True を返す"""
+        until = time.time() + timeout
+        while True:
+            if self.pending:
+                return True
+            remaining = until - time.time()
+            if remaining <= 0:
+                return False
+            if self.plans:
+                self.poll_ticks()
+                self.check_deadlines()
+                if self.pending:
+                    return True
+            time.sleep(min(poll, remaining))
@@ -0,0 +1,134 @@
+"""
+OHLCV バイナリキャッシュ（NumPy .npy 列ファイル + mmap）
+get_ohlcv_from_db の行リスト → pd.DataFrame 再構築、CoinGecko JSON → DataFrame 変換を
+バックテスト/gplearn/FeatureBuilder の読み込み経路から外す。
+
+配置: data/ohlcv_npy/{SYMBOL}_{interval}/
+  datetime.npy (datetime64[ns]) / open.npy / high.npy / low.npy / close.npy (float64) / meta.json
+- 読み込みは np.load(mmap_mode="c")（コピーオンライト mmap）で、DataFrame 列はファイルページを直接参照する
+  （行ごとのPythonオブジェクト生成なし・in-place書き換えはプロセス内にのみ反映されファイルは不変）
+- 書き込みは一時ディレクトリに全列を書いてからリネームで差し替える。読み込み途中に差し替えが挟まると
+  新旧の列が混ざり得るため、読み手は全列の長さ＝meta の rows を確認し、不一致なら1回読み直す（だめなら None）
+- collector が60分ごとに prices.sqlite から再構築する。古ければ読み手側でも再構築する
+"""
+import os
+import json
+import time
+import shutil
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("neo.ohlcv_cache")
+
+CACHE_DIR = "data/ohlcv_npy"
+COLUMNS = ("datetime", "open", "high", "low", "close")
+MAX_ROWS = 100_000          # 1銘柄あたりの保存上限（1h足で約11年分）
+MAX_AGE_SEC = 3900          # collector の60分更新 + 余裕5分
+
+
+def _dataset_dir(symbol: str, interval: Optional[str]) -> str:
+    return os.path.join(CACHE_DIR, f"{symbol.upper()}_{interval or 'default'}")
+
+
+def write(symbol: str, interval: Optional[str], ts_ms, o, h, l, c, source: str = "") -> int:
+    """昇順のOHLCV列を保存（既存データセットは丸ごと差し替え）。保存行数を返す"""
+    path = _dataset_dir(symbol, interval)
+    tmp = f"{path}.tmp{os.getpid()}"
+    old = f"{path}.old{os.getpid()}"
+    cols = {
+        "datetime": (np.asarray(ts_ms, dtype=np.int64) * 1_000_000).view("datetime64[ns]"),
+        "open": np.asarray(o, dtype=np.float64),
+        "high": np.asarray(h, dtype=np.float64),
+        "low": np.asarray(l, dtype=np.float64),
+        "close": np.asarray(c, dtype=np.float64),
+    }
+    n = len(cols["datetime"])
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        for name, arr in cols.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), arr)
+        meta = {"symbol": symbol.upper(), "interval": interval, "rows": n, "source": source,
+                "built_at": time.time(), "last_ts": int(ts_ms[-1]) if n else None}
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        if os.path.isdir(path):
+            os.rename(path, old)
+        os.rename(tmp, path)
+    except OSError as e:
+        logger.warning(f"OHLCV cache write failed for {symbol}: {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return 0
+    finally:
+        shutil.rmtree(old, ignore_errors=True)
+    return n
+
+
+def read_meta(symbol: str, interval: Optional[str] = None) -> Optional[dict]:
+    try:
+        with open(os.path.join(_dataset_dir(symbol, interval), "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_arrays(symbol: str, interval: Optional[str] = None, limit: Optional[int] = None,
+                max_age: Optional[float] = None) -> Optional[Dict[str, np.ndarray]]:
+    """{列名: mmap配列} を返す（直近limit行のビュー）。無い・max_age秒より古い・読み直しても列が揃わない場合は None"""
+    path = _dataset_dir(symbol, interval)
+    for _ in range(2):  # 列ごとの np.load の間に write() の差し替えが挟まったら1回だけ読み直す
+        meta = read_meta(symbol, interval)
+        if meta is None:
+            return None
+        if max_age is not None and time.time() - meta.get("built_at", 0) > max_age:
+            return None
+        try:
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c") for name in COLUMNS}
+        except (OSError, ValueError) as e:
+            error = e
+            continue
+        if all(len(arr) == meta.get("rows") for arr in arrays.values()):
+            break
+        error = f"column lengths {[len(arr) for arr in arrays.values()]} != rows {meta.get('rows')}"
+    else:
+        logger.warning(f"OHLCV cache read failed for {symbol}: {error}")
+        return None
+    if limit:
+        arrays = {name: arr[-limit:] for name, arr in arrays.items()}
+    return arrays
+
+
+def load_frame(symbol: str, interval: Optional[str] = None, limit: Optional[int] = None,
+               max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+    """[datetime, open, high, low, close] の DataFrame（列はmmap配列をコピーせず参照）"""
+    arrays = load_arrays(symbol, interval, limit=limit, max_age=max_age)
+    if arrays is None:
+        return None
+    try:
+        return pd.DataFrame(arrays, columns=list(COLUMNS), copy=False)
+    except ValueError as e:
+        logger.warning(f"OHLCV cache frame build failed for {symbol}: {e}")
+        return None
+
+
+def refresh_from_db(symbol: str, interval: Optional[str] = None, limit: int = MAX_ROWS) -> int:
+    """prices.sqlite（get_ohlcv_from_db と同じ選択: 本物キャンドル優先・不足時ロールアップ）から再構築"""
+    from orchestration.data_collector import get_ohlcv_from_db
+    rows = get_ohlcv_from_db(symbol, limit=limit, interval=interval)
+    if not rows:
+        return 0
+    data = np.asarray(rows, dtype=np.float64)
+    return write(symbol, interval, data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3], data[:, 4],
+                 source="prices.sqlite")
+
+
+def get_frame(symbol: str, interval: Optional[str] = None, limit: Optional[int] = None,
+              max_age: Optional[float] = MAX_AGE_SEC) -> Optional[pd.DataFrame]:
+    """キャッシュが新しければそのまま、古ければDBから再構築して返す（DBにも無ければ None）"""
+    df = load_frame(symbol, interval, limit=limit, max_age=max_age)
+    if df is None and refresh_from_db(symbol, interval):
+        df = load_frame(symbol, interval, limit=limit)
+    return df
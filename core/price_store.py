@@ -0,0 +1,294 @@
+"""
+prices.sqlite 共有アクセス層
+- プロセス内でスレッドごとに1本の接続をプールし、呼び出しごとの sqlite3.connect を廃止
+- WAL ジャーナル + synchronous/mmap_size/cache_size 調整済みPRAGMAで開く
+- 接続ごとのステートメントキャッシュ（cached_statements）でプリペアド文を再利用
+
+WALモードでは neo-collector の書き込みコミットと radar の読み取りが互いにブロックしない。
+
+スキーマ（v2 — 旧 prices テーブルの open=high=low=close 判別を廃止）:
+  ticks   (symbol, ts, price, volume)                     PK(symbol, ts)           WITHOUT ROWID
+  candles (symbol, interval, ts, o, h, l, c, v, source)   PK(symbol, interval, ts) WITHOUT ROWID
+  rollups (symbol, interval, ts, o, h, l, c, n, first_ts, last_ts) — ティックから逐次集約した1h/4h足
+ts はミリ秒エポック（candles は足の始値時刻）。旧DBは orchestration/migrate_price_schema.py で移行する。
+"""
+import os
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger("neo.price_store")
+
+DB_PATH = "vault/market_db/prices.sqlite"
+
+BUSY_TIMEOUT_SEC = 10           # 書き込みロック待ちの上限（WALでは読み取りは待たない）
+STATEMENT_CACHE_SIZE = 128      # 接続ごとのプリペアド文LRUキャッシュ
+PRAGMAS = (
+    ("journal_mode", "WAL"),     # 読み取りと書き込みの同時実行
+    ("synchronous", "NORMAL"),   # WALではNORMALで十分（チェックポイント時のみfsync）
+    ("mmap_size", 268435456),    # 256MB メモリマップ読み取り
+    ("cache_size", -16000),      # 約16MBのページキャッシュ（負値=KiB指定）
+    ("temp_store", "MEMORY"),
+)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS ticks (
+        symbol  TEXT    NOT NULL,
+        ts      INTEGER NOT NULL,
+        price   REAL    NOT NULL,
+        volume  REAL,
+        PRIMARY KEY (symbol, ts)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS candles (
+        symbol   TEXT    NOT NULL,
+        interval TEXT    NOT NULL,
+        ts       INTEGER NOT NULL,
+        o        REAL,
+        h        REAL,
+        l        REAL,
+        c        REAL,
+        v        REAL,
+        source   TEXT,
+        PRIMARY KEY (symbol, interval, ts)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollups (
+        symbol   TEXT    NOT NULL,
+        interval TEXT    NOT NULL,
+        ts       INTEGER NOT NULL,
+        o        REAL,
+        h        REAL,
+        l        REAL,
+        c        REAL,
+        n        INTEGER NOT NULL,
+        first_ts INTEGER NOT NULL,
+        last_ts  INTEGER NOT NULL,
+        PRIMARY KEY (symbol, interval, ts)
+    ) WITHOUT ROWID
+    """,
+)
+
+# ティック → 足の逐次集約対象（interval名 → バケット幅ms）
+ROLLUP_INTERVALS = {
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+}
+
+# 銘柄ごとの既定キャンドル足（collector の取得元に対応）
+DEFAULT_CANDLE_INTERVAL = "1h"
+CANDLE_INTERVALS = {
+    "VIRTUAL": "4h",   # GeckoTerminal 4h足
+    "AIXBT":   "4h",
+    "BTC":     "1h",   # Binance 1h足
+    "ETH":     "1h",
+}
+
+_SQL_INSERT_TICK = "INSERT OR IGNORE INTO ticks (symbol, ts, price, volume) VALUES (?, ?, ?, ?)"
+_SQL_INSERT_CANDLE = (
+    "INSERT OR IGNORE INTO candles (symbol, interval, ts, o, h, l, c, v, source) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# 開いている足へのUPSERT — 到着順が前後しても始値/終値はfirst_ts/last_tsで決める
+_SQL_UPSERT_ROLLUP = (
+    "INSERT INTO rollups (symbol, interval, ts, o, h, l, c, n, first_ts, last_ts) "
+    "VALUES (?1, ?2, ?3, ?4, ?4, ?4, ?4, 1, ?5, ?5) "
+    "ON CONFLICT (symbol, interval, ts) DO UPDATE SET "
+    "o = CASE WHEN excluded.first_ts < first_ts THEN excluded.o ELSE o END, "
+    "h = MAX(h, excluded.h), "
+    "l = MIN(l, excluded.l), "
+    "c = CASE WHEN excluded.last_ts >= last_ts THEN excluded.c ELSE c END, "
+    "n = n + 1, "
+    "first_ts = MIN(first_ts, excluded.first_ts), "
+    "last_ts = MAX(last_ts, excluded.last_ts)"
+)
+_SQL_REBUILD_ROLLUPS = (
+    "INSERT INTO rollups (symbol, interval, ts, o, h, l, c, n, first_ts, last_ts) "
+    "SELECT a.symbol, ?1, a.b, t1.price, a.h, a.l, t2.price, a.n, a.f, a.la FROM ("
+    "  SELECT symbol, (ts / ?2) * ?2 AS b, MIN(ts) AS f, MAX(ts) AS la, "
+    "         MAX(price) AS h, MIN(price) AS l, COUNT(*) AS n "
+    "  FROM ticks WHERE (?3 IS NULL OR symbol = ?3) GROUP BY symbol, b"
+    ") a "
+    "JOIN ticks t1 ON t1.symbol = a.symbol AND t1.ts = a.f "
+    "JOIN ticks t2 ON t2.symbol = a.symbol AND t2.ts = a.la"
+)
+_SQL_RECENT_ROLLUPS = (
+    "SELECT ts, o, h, l, c, n FROM rollups WHERE symbol=? AND interval=? ORDER BY ts DESC LIMIT ?"
+)
+_SQL_LATEST_TICK = "SELECT price, ts FROM ticks WHERE symbol=? ORDER BY ts DESC LIMIT 1"
+_SQL_RECENT_TICKS = "SELECT ts, price FROM ticks WHERE symbol=? ORDER BY ts DESC LIMIT ?"
+_SQL_TICK_AT_OR_BEFORE = "SELECT price, ts FROM ticks WHERE symbol=? AND ts <= ? ORDER BY ts DESC LIMIT 1"
+_SQL_TICKS_BETWEEN = "SELECT ts, price FROM ticks WHERE symbol=? AND ts BETWEEN ? AND ? ORDER BY ts"
+_SQL_TICKS_AFTER = "SELECT ts, price FROM ticks WHERE symbol=? AND ts > ? ORDER BY ts LIMIT ?"
+_SQL_RECENT_CANDLES = (
+    "SELECT ts, o, h, l, c FROM candles WHERE symbol=? AND interval=? ORDER BY ts DESC LIMIT ?"
+)
+
+_local = threading.local()
+
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    for name, value in PRAGMAS:
+        try:
+            conn.execute(f"PRAGMA {name}={value}")
+        except sqlite3.DatabaseError as e:
+            # readonly FS等でWAL切替に失敗しても読み取り自体は継続させる
+            logger.warning(f"PRAGMA {name}={value} failed: {e}")
+
+
+def open_connection(path: str = DB_PATH) -> sqlite3.Connection:
+    """PRAGMA適用済みの新規接続を返す（プール外・呼び出し側がclose責任を持つ）
+    neo-collector の長寿命書き込み接続など、所有者が明確な用途向け。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    _apply_pragmas(conn)
+    return conn
+
+
+def get_connection(path: str = DB_PATH) -> sqlite3.Connection:
+    """プール済み接続を返す（スレッド×パスごとに1本・fork後は再接続）
+    呼び出し側は close() しないこと。"""
+    pid = os.getpid()
+    pool = getattr(_local, "pool", None)
+    if pool is None or getattr(_local, "pid", None) != pid:
+        # fork後に親プロセスの接続を引き継がない
+        pool = {}
+        _local.pool = pool
+        _local.pid = pid
+    conn = pool.get(path)
+    if conn is None:
+        conn = open_connection(path)
+        pool[path] = conn
+    return conn
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    """ticks / candles テーブルを作成（冪等）"""
+    for ddl in SCHEMA:
+        conn.execute(ddl)
+    conn.commit()
+
+
+def candle_interval_for(symbol: str) -> str:
+    return CANDLE_INTERVALS.get(symbol.upper(), DEFAULT_CANDLE_INTERVAL)
+
+
+# ================================================================
+# 書き込み（呼び出し側がcommitする）
+# ================================================================
+def insert_tick(conn: sqlite3.Connection, symbol: str, ts: int, price: float, volume: float = 0.0) -> bool:
+    """ティックを挿入し、新規行なら1h/4hロールアップの該当足も更新する"""
+    symbol = symbol.upper()
+    ts = int(ts)
+    price = float(price)
+    cur = conn.execute(_SQL_INSERT_TICK, (symbol, ts, price, float(volume or 0)))
+    if cur.rowcount <= 0:
+        return False  # 重複ティック — ロールアップを二重計上しない
+    for interval, width in ROLLUP_INTERVALS.items():
+        conn.execute(_SQL_UPSERT_ROLLUP, (symbol, interval, (ts // width) * width, price, ts))
+    return True
+
+
+def insert_candle(conn: sqlite3.Connection, symbol: str, interval: str, ts: int,
+                  o: float, h: float, l: float, c: float, v: float, source: str) -> bool:
+    cur = conn.execute(_SQL_INSERT_CANDLE, (symbol.upper(), interval, int(ts), o, h, l, c, v, source))
+    return cur.rowcount > 0
+
+
+def rebuild_rollups(conn: sqlite3.Connection, symbol: str = None) -> int:
+    """ticksの全履歴からロールアップを再構築（バックフィル・移行直後用）
+    Returns: 再構築した足の本数"""
+    sym = symbol.upper() if symbol else None
+    total = 0
+    with conn:
+        if sym:
+            conn.execute("DELETE FROM rollups WHERE symbol=?", (sym,))
+        else:
+            conn.execute("DELETE FROM rollups")
+        for interval, width in ROLLUP_INTERVALS.items():
+            cur = conn.execute(_SQL_REBUILD_ROLLUPS, (interval, width, sym))
+            total += max(cur.rowcount, 0)
+    return total
+
+
+# ================================================================
+# 読み取り（すべて主キー範囲スキャン）
+# ================================================================
+def latest_tick(symbol: str, conn: sqlite3.Connection = None):
+    """最新ティック (price, ts_ms) or None"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_LATEST_TICK, (symbol.upper(),)).fetchone()
+
+
+def latest_ticks(symbols, conn: sqlite3.Connection = None) -> dict:
+    """複数銘柄の最新ティック {symbol: (price, ts_ms)}（銘柄ごとに主キー末尾を1行読むだけ）"""
+    conn = conn or get_connection()
+    result = {}
+    for sym in symbols:
+        row = conn.execute(_SQL_LATEST_TICK, (sym.upper(),)).fetchone()
+        if row:
+            result[sym.upper()] = row
+    return result
+
+
+def tick_at_or_before(symbol: str, ts_ms: int, conn: sqlite3.Connection = None):
+    """ts_ms以前で最も新しいティック (price, ts_ms) or None"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_TICK_AT_OR_BEFORE, (symbol.upper(), int(ts_ms))).fetchone()
+
+
+def recent_ticks(symbol: str, limit: int, conn: sqlite3.Connection = None) -> list:
+    """直近limit件のティック [(ts_ms, price), ...] 降順"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_RECENT_TICKS, (symbol.upper(), int(limit))).fetchall()
+
+
+def ticks_between(symbol: str, start_ms: int, end_ms: int, conn: sqlite3.Connection = None) -> list:
+    """[start_ms, end_ms] のティック [(ts_ms, price), ...] 昇順"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_TICKS_BETWEEN, (symbol.upper(), int(start_ms), int(end_ms))).fetchall()
+
+
+def ticks_after(symbol: str, ts_ms: int, limit: int = -1, conn: sqlite3.Connection = None) -> list:
+    """ts_ms より新しいティック [(ts_ms, price), ...] 昇順（limit=-1 で無制限）"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_TICKS_AFTER, (symbol.upper(), int(ts_ms), int(limit))).fetchall()
+
+
+def recent_candles(symbol: str, limit: int, interval: str = None, conn: sqlite3.Connection = None) -> list:
+    """直近limit本のキャンドル [(ts_ms, o, h, l, c), ...] 降順"""
+    conn = conn or get_connection()
+    interval = interval or candle_interval_for(symbol)
+    return conn.execute(_SQL_RECENT_CANDLES, (symbol.upper(), interval, int(limit))).fetchall()
+
+
+def recent_rollups(symbol: str, limit: int, interval: str = "1h", conn: sqlite3.Connection = None) -> list:
+    """直近limit本のロールアップ足 [(ts_ms, o, h, l, c, n_ticks), ...] 降順"""
+    conn = conn or get_connection()
+    return conn.execute(_SQL_RECENT_ROLLUPS, (symbol.upper(), interval, int(limit))).fetchall()
+
+
+def query_all(sql: str, params: tuple = (), path: str = DB_PATH) -> list:
+    """プール接続でSELECTを実行して全行を返す"""
+    return get_connection(path).execute(sql, params).fetchall()
+
+
+def query_one(sql: str, params: tuple = (), path: str = DB_PATH):
+    """プール接続でSELECTを実行して先頭行を返す（無ければNone）"""
+    return get_connection(path).execute(sql, params).fetchone()
+
+
+def close_all():
+    """呼び出しスレッドのプール接続をすべて閉じる（シャットダウン・ベンチマーク用）"""
+    pool = getattr(_local, "pool", None) or {}
+    if getattr(_local, "pid", None) == os.getpid():
+        for conn in pool.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+    _local.pool = {}
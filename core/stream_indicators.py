@@ -0,0 +1,299 @@
+"""
+ストリーミング（逐次更新）テクニカル指標
+30秒ごとの出口判定（check_tp_sl_all_positions）や Scout が、毎回ティック履歴を読み直して
+指標を再計算していたのを、銘柄ごとの状態を1ティックずつ O(1) で更新する方式に置き換える。
+
+- 指標: RSI（Wilder 14）/ EMA 9・20 / ATR（Wilder 14）/ ボリンジャー（20, 2σ）/ MACD（12, 26, 9）
+  EMA は pandas_ta.ema と同じく先頭 length 本のSMAを種にして ewm(adjust=False) で更新する
+- 入力: prices.sqlite の ticks（ティックは終値のみなので ATR の真の値幅は |Δ価格|。high/low を渡せば通常のTR）
+- 同期: sync() は状態の last_ts より新しいティックだけを読んで適用する（定常状態では0〜1行）
+- チェックポイント: 状態を core.cache_store の "stream_ind" namespace に JSON で保存。
+  コレクターが毎サイクル sync_all() で更新し、radar/Scout は起動時にそこから復元する。
+  チェックポイントが無い銘柄だけ直近 WARMUP_TICKS 本で初期化する
+"""
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from core import price_store
+
+logger = logging.getLogger("neo.stream_indicators")
+
+CHECKPOINT_NS = "stream_ind"
+STATE_VERSION = 1
+WARMUP_TICKS = 300          # チェックポイント無しで起動したときの初期化本数
+MAX_CATCHUP = 5000          # これ以上溜まっていたら追いかけずに直近から初期化し直す
+
+RSI_LEN = 14
+EMA_FAST = 9
+EMA_SLOW = 20
+ATR_LEN = 14
+BB_LEN = 20
+BB_STD = 2.0
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+
+class Ema:
+    """先頭 length 本のSMAを種にした指数移動平均（pandas_ta.ema 相当）"""
+
+    def __init__(self, length: int, n: int = 0, acc: float = 0.0, value: Optional[float] = None):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.n = n
+        self.acc = acc
+        self.value = value
+
+    def update(self, x: float) -> Optional[float]:
+        self.n += 1
+        if self.n < self.length:
+            self.acc += x
+        elif self.n == self.length:
+            self.value = (self.acc + x) / self.length
+            self.acc = 0.0
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def dump(self) -> list:
+        return [self.n, self.acc, self.value]
+
+    @classmethod
+    def load(cls, length: int, data: list) -> "Ema":
+        return cls(length, *data)
+
+
+class Wilder(Ema):
+    """Wilder 平滑（RMA）: 先頭 length 本のSMAを種に avg = (avg×(length-1) + x) / length"""
+
+    def __init__(self, length: int, n: int = 0, acc: float = 0.0, value: Optional[float] = None):
+        super().__init__(length, n, acc, value)
+        self.alpha = 1.0 / length
+
+
+class Window:
+    """固定長の直近値（ボリンジャー用）。平均・標準偏差は窓長ぶんの和で求める（履歴長に依存しない）"""
+
+    def __init__(self, length: int, values: Iterable[float] = ()):
+        self.length = length
+        self.values = deque(values, maxlen=length)
+
+    def update(self, x: float):
+        self.values.append(x)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.length
+
+    def mean_std(self):
+        mean = math.fsum(self.values) / self.length
+        var = math.fsum((v - mean) ** 2 for v in self.values) / self.length  # ddof=0（pandas_ta.bbands と同じ）
+        return mean, math.sqrt(var)
+
+    def dump(self) -> list:
+        return list(self.values)
+
+
+class SymbolIndicators:
+    """1銘柄ぶんの指標状態"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.n = 0
+        self.last_ts = 0
+        self.price = None
+        self.rsi_gain = Wilder(RSI_LEN)
+        self.rsi_loss = Wilder(RSI_LEN)
+        self.ema_fast = Ema(EMA_FAST)
+        self.ema_slow = Ema(EMA_SLOW)
+        self.prev_fast = None        # 1本前の EMA（クロス判定用）
+        self.prev_slow = None
+        self.atr = Wilder(ATR_LEN)
+        self.bb = Window(BB_LEN)
+        self.macd_fast = Ema(MACD_FAST)
+        self.macd_slow = Ema(MACD_SLOW)
+        self.macd_signal = Ema(MACD_SIGNAL)
+        self.macd = None
+
+    def update(self, price: float, ts: int = None, high: float = None, low: float = None):
+        price = float(price)
+        high = price if high is None else float(high)
+        low = price if low is None else float(low)
+        prev = self.price
+        if prev is not None:
+            delta = price - prev
+            self.rsi_gain.update(max(delta, 0.0))
+            self.rsi_loss.update(max(-delta, 0.0))
+            self.atr.update(max(high - low, abs(high - prev), abs(low - prev)))
+        self.prev_fast, self.prev_slow = self.ema_fast.value, self.ema_slow.value
+        self.ema_fast.update(price)
+        self.ema_slow.update(price)
+        self.bb.update(price)
+        fast, slow = self.macd_fast.update(price), self.macd_slow.update(price)
+        if fast is not None and slow is not None:
+            self.macd = fast - slow
+            self.macd_signal.update(self.macd)
+        self.price = price
+        self.n += 1
+        if ts is not None:
+            self.last_ts = int(ts)
+
+    # ------------------------------------------------------------
+    # 読み取り
+    # ------------------------------------------------------------
+    @property
+    def rsi(self) -> Optional[float]:
+        gain, loss = self.rsi_gain.value, self.rsi_loss.value
+        if gain is None:
+            return None
+        if loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+    def snapshot(self) -> dict:
+        """現在値（未ウォームアップの指標は None）"""
+        fast, slow = self.ema_fast.value, self.ema_slow.value
+        cross = None
+        if None not in (fast, slow, self.prev_fast, self.prev_slow):
+            if self.prev_fast <= self.prev_slow and fast > slow:
+                cross = "golden"
+            elif self.prev_fast >= self.prev_slow and fast < slow:
+                cross = "dead"
+        bb_mid = bb_upper = bb_lower = None
+        if self.bb.ready:
+            bb_mid, sd = self.bb.mean_std()
+            bb_upper, bb_lower = bb_mid + BB_STD * sd, bb_mid - BB_STD * sd
+        signal = self.macd_signal.value
+        return {
+            "symbol": self.symbol, "ts": self.last_ts, "price": self.price, "n": self.n,
+            "rsi": self.rsi,
+            "ema_fast": fast, "ema_slow": slow, "ema_cross": cross,
+            "atr": self.atr.value,
+            "bb_mid": bb_mid, "bb_upper": bb_upper, "bb_lower": bb_lower,
+            "macd": self.macd, "macd_signal": signal,
+            "macd_hist": self.macd - signal if signal is not None else None,
+        }
+
+    # ------------------------------------------------------------
+    # チェックポイント
+    # ------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "v": STATE_VERSION, "symbol": self.symbol, "n": self.n, "last_ts": self.last_ts, "price": self.price,
+            "rsi_gain": self.rsi_gain.dump(), "rsi_loss": self.rsi_loss.dump(),
+            "ema_fast": self.ema_fast.dump(), "ema_slow": self.ema_slow.dump(),
+            "prev_fast": self.prev_fast, "prev_slow": self.prev_slow,
+            "atr": self.atr.dump(), "bb": self.bb.dump(),
+            "macd_fast": self.macd_fast.dump(), "macd_slow": self.macd_slow.dump(),
+            "macd_signal": self.macd_signal.dump(), "macd": self.macd,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SymbolIndicators":
+        st = cls(data["symbol"])
+        st.n, st.last_ts, st.price = data["n"], data["last_ts"], data["price"]
+        st.rsi_gain = Wilder.load(RSI_LEN, data["rsi_gain"])
+        st.rsi_loss = Wilder.load(RSI_LEN, data["rsi_loss"])
+        st.ema_fast = Ema.load(EMA_FAST, data["ema_fast"])
+        st.ema_slow = Ema.load(EMA_SLOW, data["ema_slow"])
+        st.prev_fast, st.prev_slow = data["prev_fast"], data["prev_slow"]
+        st.atr = Wilder.load(ATR_LEN, data["atr"])
+        st.bb = Window(BB_LEN, data["bb"])
+        st.macd_fast = Ema.load(MACD_FAST, data["macd_fast"])
+        st.macd_slow = Ema.load(MACD_SLOW, data["macd_slow"])
+        st.macd_signal = Ema.load(MACD_SIGNAL, data["macd_signal"])
+        st.macd = data["macd"]
+        return st
+
+    @classmethod
+    def from_prices(cls, symbol: str, prices: Iterable[float]) -> "SymbolIndicators":
+        """価格列を先頭から流し込んだ状態（ts を持たない一時計算用）"""
+        st = cls(symbol)
+        for p in prices:
+            st.update(p)
+        return st
+
+
+# ================================================================
+# 銘柄別レジストリ（プロセス内）
+# ================================================================
+_states: Dict[str, SymbolIndicators] = {}
+_lock = threading.RLock()
+
+
+def _load_checkpoint(symbol: str) -> Optional[SymbolIndicators]:
+    try:
+        from core import cache_store
+        data = cache_store.get(CHECKPOINT_NS, symbol)
+        if data and data.get("v") == STATE_VERSION:
+            return SymbolIndicators.from_dict(data)
+    except Exception as e:
+        logger.warning(f"[{symbol}] checkpoint load failed: {e}")
+    return None
+
+
+def _warmup(symbol: str, conn=None) -> SymbolIndicators:
+    st = SymbolIndicators(symbol)
+    for ts, price in reversed(price_store.recent_ticks(symbol, WARMUP_TICKS, conn=conn)):
+        st.update(price, ts)
+    logger.info(f"[{symbol}] stream indicators warmed up from {st.n} ticks")
+    return st
+
+
+def sync(symbol: str, conn=None) -> SymbolIndicators:
+    """状態を最新ティックまで進めて返す（メモリ → チェックポイント → 直近ティックの順に復元）"""
+    symbol = symbol.upper()
+    with _lock:
+        st = _states.get(symbol) or _load_checkpoint(symbol)
+        if st is None:
+            st = _warmup(symbol, conn)
+        else:
+            rows = price_store.ticks_after(symbol, st.last_ts, MAX_CATCHUP + 1, conn=conn)
+            if len(rows) > MAX_CATCHUP:
+                st = _warmup(symbol, conn)
+            else:
+                for ts, price in rows:
+                    st.update(price, ts)
+        _states[symbol] = st
+        return st
+
+
+def current(symbol: str, conn=None) -> dict:
+    """最新ティックまで反映した指標の現在値"""
+    return sync(symbol, conn).snapshot()
+
+
+def checkpoint(symbols: Iterable[str] = None) -> int:
+    """メモリ上の状態をディスクへ保存。Returns: 保存した銘柄数"""
+    from core import cache_store
+    with _lock:
+        targets = [s.upper() for s in symbols] if symbols is not None else list(_states)
+        saved = 0
+        for sym in targets:
+            st = _states.get(sym)
+            if st is not None and st.n and cache_store.put(CHECKPOINT_NS, sym, st.to_dict()):
+                saved += 1
+        return saved
+
+
+def sync_all(symbols: Iterable[str], conn=None, checkpoint_after: bool = True) -> Dict[str, dict]:
+    """コレクター用: 全銘柄を同期してチェックポイントを更新"""
+    snaps = {}
+    for sym in symbols:
+        try:
+            snaps[sym.upper()] = sync(sym, conn).snapshot()
+        except Exception as e:
+            logger.warning(f"[{sym}] stream indicator sync failed: {e}")
+    if checkpoint_after:
+        checkpoint(snaps.keys())
+    return snaps
+
+
+def reset(symbol: str = None):
+    """メモリ上の状態を破棄（チェックポイントは残す）"""
+    with _lock:
+        if symbol is None:
+            _states.clear()
+        else:
+            _states.pop(symbol.upper(), None)
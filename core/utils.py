@@ -1,6 +1,9 @@
 import os
 import json
+import fcntl
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, Optional
 
@@ -64,3 +67,25 @@ class NeoUtils:
             logger.error(log_entry)
         else:
             logger.info(log_entry)
+
+
+@contextmanager
+def file_lock(path: str):
+    """path + ".lock" の排他ロック（flock）。radar と Council ワーカー等、別プロセスからの読み書きを直列化する
+    同じプロセス内でも入れ子にすると自分自身を待って止まるので、ロック区間から同じロックを取り直さないこと"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, text: str):
+    """一時ファイルに書いて置き換える（読み手が書きかけのファイルを読まない）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
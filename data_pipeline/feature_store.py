@@ -0,0 +1,248 @@
+"""
+特徴量ストア（ParquetDataLake 配下の data/features）
+BacktestAgent / gplearn / vp_market_pulse などが呼ぶたびに生キャンドルから FeatureBuilder で全特徴量を
+作り直していたのを、collector が確定足ぶんだけ逐次計算して Parquet に追記し、読み手はそれを読むだけにする。
+
+配置: data/features/v{FEATURE_SCHEMA_VERSION}/symbol={SYM}/interval={iv}/date=YYYY-MM-DD/part.parquet
+      + 同じ interval ディレクトリの meta.json（列・最終足・日付ごとの行数）
+- 追記: core.ohlcv_cache の確定足のうち meta.last_ts より新しい足だけを、直近 WARMUP_BARS 本を前置して
+  build_from_memory に通し、新しい行だけを該当日のパーティションに書き足す（1日1ファイル・一時ファイル経由で置換）
+  累積系の列（OBV）は前置区間の起点がずれるので、保存済みの最終値に合わせて平行移動する
+- スキーマ: FeatureBuilder の列や計算式を変えたら FEATURE_SCHEMA_VERSION を上げる（別ディレクトリに全再構築）。
+  同じバージョンでも出力列が変わった（pandas_ta の有無など）場合は全再構築
+- 読み込み: 必要な日付パーティションだけ読み、meta.json が変わるまでプロセス内で保持する。
+  返す DataFrame は浅いコピー（列追加・書き換えは呼び出し側にだけ反映される）
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.parquet_writer import ParquetDataLake
+
+logger = logging.getLogger("neo.quant.feature_store")
+
+FEATURE_SCHEMA_VERSION = 1
+WARMUP_BARS = 600               # 追記時に前置する過去足（EMA100・RSI/ATRの平滑が収束するのに十分な長さ）
+CUMULATIVE_COLS = ("obv",)      # 前置区間の起点に依存する累積列
+INTERVAL_MS = {"1h": 3_600_000, "4h": 14_400_000}
+
+
+def _to_ms(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[ns]").astype("datetime64[ms]").astype(np.int64)
+
+
+class FeatureStore(ParquetDataLake):
+    """symbol/interval/date パーティションの特徴量 Parquet"""
+
+    _frames: Dict[Tuple[str, Optional[int]], Tuple[float, pd.DataFrame]] = {}
+    _lock = threading.RLock()
+
+    def __init__(self, base_dir: str = "data"):
+        super().__init__(base_dir)
+        self.features_dir = self.base_dir / "features" / f"v{FEATURE_SCHEMA_VERSION}"
+
+    # ================================================================
+    # 配置・メタ
+    # ================================================================
+    @staticmethod
+    def resolve_interval(symbol: str, interval: Optional[str]) -> str:
+        from core import price_store
+        return interval or price_store.candle_interval_for(symbol)
+
+    def dataset_dir(self, symbol: str, interval: str) -> Path:
+        return self.features_dir / f"symbol={symbol.upper()}" / f"interval={interval}"
+
+    def read_meta(self, symbol: str, interval: Optional[str] = None) -> Optional[dict]:
+        interval = self.resolve_interval(symbol, interval)
+        try:
+            with open(self.dataset_dir(symbol, interval) / "meta.json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("schema") == FEATURE_SCHEMA_VERSION else None
+
+    def _write_meta(self, path: Path, meta: dict):
+        tmp = path / f"meta.json.tmp{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path / "meta.json")
+
+    def _write_partition(self, path: Path, date: str, df: pd.DataFrame):
+        part_dir = path / f"date={date}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        tmp = part_dir / f"part.parquet.tmp{os.getpid()}"
+        df.to_parquet(tmp, engine="pyarrow", compression="snappy", index=False)
+        os.replace(tmp, part_dir / "part.parquet")
+
+    # ================================================================
+    # 書き込み（collector）
+    # ================================================================
+    @staticmethod
+    def closed_bars(raw: pd.DataFrame, interval: str, now_ms: int = None) -> pd.DataFrame:
+        """形成中の足（始値時刻 + 足幅 > 現在）を除いた確定足"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        width = INTERVAL_MS.get(interval, INTERVAL_MS["1h"])
+        ts = _to_ms(raw["datetime"])
+        return raw.iloc[:int(np.searchsorted(ts, now_ms - width, side="right"))]
+
+    def _build(self, raw: pd.DataFrame) -> pd.DataFrame:
+        from feature_engineering.build_features import FeatureBuilder
+        return FeatureBuilder.build_from_memory(raw.reset_index(drop=True))
+
+    def _save(self, path: Path, symbol: str, interval: str, feats: pd.DataFrame, meta: Optional[dict]) -> dict:
+        """feats を日付パーティションに追記（meta=None なら新規作成）して新しい meta を返す"""
+        dates = pd.to_datetime(feats["datetime"]).dt.strftime("%Y-%m-%d").to_numpy()
+        counts = dict(meta["dates"]) if meta else {}
+        for date in pd.unique(dates):
+            part = feats[dates == date]
+            if date in counts:
+                old = pd.read_parquet(path / f"date={date}" / "part.parquet", engine="pyarrow")
+                part = pd.concat([old, part], ignore_index=True)
+            self._write_partition(path, date, part)
+            counts[date] = len(part)
+        new_meta = {
+            "schema": FEATURE_SCHEMA_VERSION, "symbol": symbol.upper(), "interval": interval,
+            "columns": list(feats.columns), "dtypes": {c: str(t) for c, t in feats.dtypes.items()},
+            "last_ts": int(_to_ms(feats["datetime"].iloc[-1:])[0]),
+            "last_values": {c: float(feats[c].iloc[-1]) for c in CUMULATIVE_COLS if c in feats.columns},
+            "rows": sum(counts.values()), "dates": dict(sorted(counts.items())), "built_at": time.time(),
+        }
+        self._write_meta(path, new_meta)
+        return new_meta
+
+    def rebuild(self, symbol: str, interval: Optional[str] = None, raw: pd.DataFrame = None) -> int:
+        """全確定足から作り直す。保存行数を返す"""
+        interval = self.resolve_interval(symbol, interval)
+        raw = self._source(symbol, interval) if raw is None else raw
+        if raw is None or raw.empty:
+            return 0
+        feats = self._build(self.closed_bars(raw, interval))
+        if feats.empty or "datetime" not in feats.columns:
+            return 0
+        path = self.dataset_dir(symbol, interval)
+        tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        old = path.with_name(f"{path.name}.old{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        try:
+            self._save(tmp, symbol, interval, feats, None)
+            if path.exists():
+                os.rename(path, old)
+            os.rename(tmp, path)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"[{symbol}/{interval}] feature store rebuilt: {len(feats)} rows")
+        return len(feats)
+
+    def append(self, symbol: str, interval: Optional[str] = None, raw: pd.DataFrame = None) -> int:
+        """前回以降に確定した足の特徴量だけを追記。追記行数を返す（スキーマ不一致・未作成なら全再構築）"""
+        interval = self.resolve_interval(symbol, interval)
+        meta = self.read_meta(symbol, interval)
+        raw = self._source(symbol, interval) if raw is None else raw
+        if raw is None or raw.empty:
+            return 0
+        if meta is None:
+            return self.rebuild(symbol, interval, raw)
+        closed = self.closed_bars(raw, interval)
+        ts = _to_ms(closed["datetime"])
+        start = int(np.searchsorted(ts, meta["last_ts"], side="right"))
+        if start >= len(closed):
+            return 0
+        if start == 0 or ts[start - 1] != meta["last_ts"]:
+            # 保存済みの最終足がソースに無い（ソース差し替え・長期停止）→ 継ぎ目を作らず作り直す
+            return self.rebuild(symbol, interval, raw)
+        full = self._build(closed.iloc[max(0, start - WARMUP_BARS):])
+        if list(full.columns) != meta["columns"]:
+            logger.info(f"[{symbol}/{interval}] feature columns changed → rebuild")
+            return self.rebuild(symbol, interval, raw)
+        full_ts = _to_ms(full["datetime"])
+        feats = full[full_ts > meta["last_ts"]].reset_index(drop=True)
+        if feats.empty:
+            return 0
+        # 累積列: 保存済み最終足の値と、前置区間で計算し直した同じ足の値の差だけ平行移動
+        joint = full[full_ts == meta["last_ts"]]
+        for col, value in meta.get("last_values", {}).items():
+            if col in feats.columns and len(joint):
+                feats[col] = feats[col] + (value - float(joint[col].iloc[0]))
+        self._save(self.dataset_dir(symbol, interval), symbol, interval, feats, meta)
+        logger.info(f"[{symbol}/{interval}] feature store +{len(feats)} rows")
+        return len(feats)
+
+    @staticmethod
+    def _source(symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """collector が60分ごとに作り直す npy キャッシュ（既定足は interval=None のデータセット）"""
+        from core import ohlcv_cache, price_store
+        default = interval == price_store.candle_interval_for(symbol)
+        return ohlcv_cache.get_frame(symbol, None if default else interval)
+
+    # ================================================================
+    # 読み込み（消費側）
+    # ================================================================
+    def load(self, symbol: str, interval: Optional[str] = None, limit: Optional[int] = None,
+             max_lag_bars: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        保存済み特徴量（build_from_memory と同じ列・datetime 昇順・RangeIndex）。無ければ None
+        max_lag_bars: 保存済み最終足より後に この本数を超えて足が確定していれば None（collector 停止時に古い特徴量を使わない）
+        """
+        interval = self.resolve_interval(symbol, interval)
+        path = self.dataset_dir(symbol, interval)
+        try:
+            stamp = os.stat(path / "meta.json").st_mtime
+        except OSError:
+            return None
+        meta = self.read_meta(symbol, interval)
+        if meta is None:
+            return None
+        if max_lag_bars is not None:
+            width = INTERVAL_MS.get(interval, INTERVAL_MS["1h"])
+            if time.time() * 1000 - meta["last_ts"] > (max_lag_bars + 2) * width:
+                return None
+        key = (str(path), limit)
+        with self._lock:
+            cached = self._frames.get(key)
+        if cached is None or cached[0] != stamp:
+            df = self._read(path, meta, limit)
+            if df is None:
+                return None
+            with self._lock:
+                self._frames[key] = (stamp, df)
+            cached = (stamp, df)
+        return cached[1].copy(deep=False)
+
+    def _read(self, path: Path, meta: dict, limit: Optional[int]) -> Optional[pd.DataFrame]:
+        dates, rows = [], 0
+        for date, n in reversed(list(meta["dates"].items())):
+            dates.append(date)
+            rows += n
+            if limit and rows >= limit:
+                break
+        try:
+            parts = [pd.read_parquet(path / f"date={d}" / "part.parquet", engine="pyarrow") for d in reversed(dates)]
+        except (OSError, ValueError) as e:
+            logger.warning(f"feature store read failed {path}: {e}")
+            return None
+        df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        if limit:
+            df = df.iloc[-limit:].reset_index(drop=True)
+        return df
+
+
+def refresh_all(symbols, base_dir: str = "data") -> Dict[str, int]:
+    """collector 用: 各銘柄の既定足で確定足を追記。{symbol: 追記行数}"""
+    store = FeatureStore(base_dir)
+    done = {}
+    for sym in symbols:
+        try:
+            done[sym] = store.append(sym)
+        except Exception as e:
+            logger.warning(f"[{sym}] feature store refresh failed: {e}")
+    return done
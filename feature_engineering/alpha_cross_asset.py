@@ -1,30 +1,53 @@
 import pandas as pd
 import numpy as np
 import logging
+from feature_engineering import feature_graph
+from feature_engineering.feature_graph import Feature
+from feature_engineering.indicator_store import IndicatorStore
+from feature_engineering.indicator_store import _HAS_TA  # pandas_ta の有無（指標はストア経由で計算する）
 
 logger = logging.getLogger("neo.quant.alpha.crossasset")
 
 class CrossAssetAlpha:
     """Measures relative strength and momentum acceleration."""
-    
+    WINDOW = 14
+
+    @staticmethod
+    def calculate_returns(src, out: dict):
+        """1次微分（速度: Returns）= pct_change"""
+        close = src["close"].to_numpy()
+        returns = out["returns"]
+        returns[:1] = np.nan
+        np.divide(close[1:], close[:-1], out=returns[1:])
+        returns[1:] -= 1
+
+    @staticmethod
+    def calculate_momentum_acceleration(src, out: dict):
+        """2次微分（加速度: 速度の変化率）"""
+        returns = src["returns"].to_numpy()
+        acceleration = out["acceleration"]
+        acceleration[:1] = np.nan
+        np.subtract(returns[1:], returns[:-1], out=acceleration[1:])
+        logger.info("Calculated Momentum Acceleration")
+
+    @staticmethod
+    def calculate_rsi(src, out: dict, window: int = 14):
+        """RSI。pandas-ta があればそちらを優先（より正確）・取れなければ指数移動平均ベース"""
+        close = src["close"]
+        _rsi = IndicatorStore.ta("rsi", close, length=window) if _HAS_TA else None
+        if _rsi is None:
+            _rsi = IndicatorStore.rsi_ewm(close, window)
+        np.copyto(out[f"rsi_{window}"], _rsi.to_numpy())
+        logger.info(f"Calculated RSI (window={window})")
+
+    FEATURES = (
+        Feature((("returns", "float64"),), ("close",), calculate_returns),
+        Feature((("acceleration", "float64"),), ("returns",), calculate_momentum_acceleration),
+        Feature(((f"rsi_{WINDOW}", "float64"),), ("close",),
+                lambda src, out: CrossAssetAlpha.calculate_rsi(src, out, CrossAssetAlpha.WINDOW)),
+    )
+
     @staticmethod
-    def calculate_momentum_acceleration(df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
-        if "close" not in df.columns:
-            return df
-            
-        df = df.copy()
-        # 1次微分（速度: Returns）
-        df["returns"] = df["close"].pct_change()
-        
-        # 2次微分（加速度: 速度の変化率）
-        df["acceleration"] = df["returns"].diff()
-        
-        # RSIの計算（指数移動平均ベース）
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).ewm(alpha=1/window, adjust=False).mean()
-        loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/window, adjust=False).mean()
-        rs = gain / (loss + 1e-8)
-        df[f"rsi_{window}"] = 100 - (100 / (1 + rs))
-        
-        logger.info(f"Calculated Momentum Acceleration and RSI (window={window})")
-        return df
+    def build_all_features(df: pd.DataFrame) -> pd.DataFrame:
+        """df に列を追加して返す（フレームはコピーしない）"""
+        return feature_graph.apply(CrossAssetAlpha, df)
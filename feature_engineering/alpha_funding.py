@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import logging
+from feature_engineering import feature_graph
+from feature_engineering.feature_graph import Feature
 
 logger = logging.getLogger("neo.quant.alpha.funding")
 
@@ -9,55 +11,53 @@ class FundingRateAlpha:
     Enterprise-grade Funding Rate Alpha extracted from institutional practices.
     Reference: Qlib & AlphaTrade concepts.
     """
-    
+    ZSCORE_WINDOWS = (24, 72)
+    SHORT_WINDOW, LONG_WINDOW = 8, 72
+
     @staticmethod
-    def calculate_zscore(df: pd.DataFrame, window: int = 24, column: str = "funding_rate") -> pd.DataFrame:
+    def calculate_zscore(x: pd.Series, out: np.ndarray, window: int = 24):
         """
         Calculates the Rolling Z-Score of the Funding Rate to detect statistical anomalies.
         Z = (X - μ) / σ
         """
-        if column not in df.columns:
-            logger.warning(f"Column '{column}' not found. Cannot calculate Funding Rate Z-Score.")
-            return df
-            
-        df = df.copy()
-        rolling_mean = df[column].rolling(window=window, min_periods=window//2).mean()
-        rolling_std = df[column].rolling(window=window, min_periods=window//2).std()
-        
+        rolling_mean = x.rolling(window=window, min_periods=window//2).mean()
+        rolling_std = x.rolling(window=window, min_periods=window//2).std()
+
         # ゼロ除算を回避
         rolling_std = rolling_std.replace(0, np.nan)
-        
-        feature_name = f"funding_zscore_{window}"
-        df[feature_name] = (df[column] - rolling_mean) / rolling_std
-        
-        logger.info(f"Calculated {feature_name}")
-        return df
+
+        np.subtract(x.to_numpy(), rolling_mean.to_numpy(), out=out)
+        np.divide(out, rolling_std.to_numpy(), out=out)
+        logger.info(f"Calculated funding_zscore_{window}")
 
     @staticmethod
-    def calculate_term_structure_momentum(df: pd.DataFrame, short_window: int = 8, long_window: int = 72) -> pd.DataFrame:
+    def calculate_term_structure_momentum(x: pd.Series, out: np.ndarray, short_window: int = 8, long_window: int = 72):
         """
         Calculates the difference between short-term and long-term average funding rates.
         A sudden spike in the short-term relative to the long-term indicates a potential squeeze.
         """
-        column = "funding_rate"
-        if column not in df.columns:
-            return df
-            
-        df = df.copy()
-        short_ma = df[column].rolling(window=short_window).mean()
-        long_ma = df[column].rolling(window=long_window).mean()
-        
-        feature_name = f"funding_momentum_{short_window}_{long_window}"
-        df[feature_name] = short_ma - long_ma
-        
-        logger.info(f"Calculated {feature_name}")
-        return df
+        short_ma = x.rolling(window=short_window).mean()
+        long_ma = x.rolling(window=long_window).mean()
+        np.subtract(short_ma.to_numpy(), long_ma.to_numpy(), out=out)
+        logger.info(f"Calculated funding_momentum_{short_window}_{long_window}")
+
+    @staticmethod
+    def _momentum(src, out: dict):
+        cls = FundingRateAlpha
+        cls.calculate_term_structure_momentum(src["funding_rate"], out[f"funding_momentum_{cls.SHORT_WINDOW}_{cls.LONG_WINDOW}"],
+                                              cls.SHORT_WINDOW, cls.LONG_WINDOW)
+
+    FEATURES = tuple(
+        Feature(((f"funding_zscore_{w}", "float64"),), ("funding_rate",),
+                lambda src, out, w=w: FundingRateAlpha.calculate_zscore(src["funding_rate"], out[f"funding_zscore_{w}"], w))
+        for w in ZSCORE_WINDOWS
+    ) + (
+        Feature(((f"funding_momentum_{SHORT_WINDOW}_{LONG_WINDOW}", "float64"),), ("funding_rate",), _momentum),
+    )
 
     @staticmethod
     def build_all_features(df: pd.DataFrame) -> pd.DataFrame:
-        """Master function to apply all Funding Rate related alphas."""
+        """Master function to apply all Funding Rate related alphas (appends columns to df in place)."""
         logger.info("Building Funding Rate Alpha features...")
-        df = FundingRateAlpha.calculate_zscore(df, window=24)
-        df = FundingRateAlpha.calculate_zscore(df, window=72)
-        df = FundingRateAlpha.calculate_term_structure_momentum(df)
-        return df
+        return feature_graph.apply(FundingRateAlpha, df)
+
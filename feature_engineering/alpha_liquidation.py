@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import logging
+from feature_engineering import feature_graph
+from feature_engineering.feature_graph import Feature
 
 logger = logging.getLogger("neo.quant.alpha.liquidation")
 
@@ -9,57 +11,65 @@ class LiquidationAlpha:
     Enterprise-grade Liquidation Cascade detection.
     Identifies panic selling/buying exhaustion using statistical thresholds.
     """
-    
+    IMBALANCE_WINDOW = 12
+    PANIC_WINDOW = 48
+    Z_THRESHOLD = 3.0
+
     @staticmethod
-    def calculate_liquidation_imbalance(df: pd.DataFrame, window: int = 12) -> pd.DataFrame:
+    def calculate_liquidation_imbalance(src, out: dict):
         """
         Calculates the normalized imbalance between Long and Short liquidations.
         +1 means 100% Long liquidations (Panic Sell), -1 means 100% Short liquidations (Short Squeeze).
         """
-        required_cols = ["liq_long", "liq_short"]
-        if not all(col in df.columns for col in required_cols):
-            logger.warning("Liquidation columns missing. Skipping imbalance calculation.")
-            return df
-            
-        df = df.copy()
-        total_liq = df["liq_long"] + df["liq_short"]
-        
+        liq_long = src["liq_long"].to_numpy()
+        liq_short = src["liq_short"].to_numpy()
+        imbalance = out["liq_imbalance"]
+
         # ゼロ除算回避のための微小値(epsilon)を追加
         epsilon = 1e-8
-        df["liq_imbalance"] = (df["liq_long"] - df["liq_short"]) / (total_liq + epsilon)
-        
-        # 移動平均で平滑化
-        df[f"liq_imbalance_ma_{window}"] = df["liq_imbalance"].rolling(window=window).mean()
-        
+        total_liq = liq_long + liq_short
+        np.subtract(liq_long, liq_short, out=imbalance)
+        np.divide(imbalance, total_liq + epsilon, out=imbalance)
+
+    @staticmethod
+    def smooth_imbalance(src, out: dict, window: int = 12):
+        """移動平均で平滑化"""
+        np.copyto(out[f"liq_imbalance_ma_{window}"], src["liq_imbalance"].rolling(window=window).mean().to_numpy())
         logger.info(f"Calculated Liquidation Imbalance (window={window})")
-        return df
 
     @staticmethod
-    def detect_panic_exhaustion(df: pd.DataFrame, window: int = 48, z_threshold: float = 3.0) -> pd.DataFrame:
+    def calculate_long_zscore(src, out: dict, window: int = 48):
         """
         Detects 'Exhaustion' (Climax) by calculating the Z-Score of Long liquidations.
         If the Z-score exceeds the threshold (e.g., 3 sigma), it signals a potential bottom.
         """
-        if "liq_long" not in df.columns:
-            return df
-            
-        df = df.copy()
-        rolling_mean = df["liq_long"].rolling(window=window, min_periods=window//4).mean()
-        rolling_std = df["liq_long"].rolling(window=window, min_periods=window//4).std()
-        
+        liq_long = src["liq_long"]
+        rolling_mean = liq_long.rolling(window=window, min_periods=window//4).mean()
+        rolling_std = liq_long.rolling(window=window, min_periods=window//4).std()
+
         rolling_std = rolling_std.replace(0, np.nan)
-        df["liq_long_zscore"] = (df["liq_long"] - rolling_mean) / rolling_std
-        
-        # スレッショルドを超えたかどうかのフラグ（1 = パニック発生, 0 = 平常）
-        df["panic_long_exhaustion"] = (df["liq_long_zscore"] > z_threshold).astype(int)
-        
+        zscore = out["liq_long_zscore"]
+        np.subtract(liq_long.to_numpy(), rolling_mean.to_numpy(), out=zscore)
+        np.divide(zscore, rolling_std.to_numpy(), out=zscore)
+
+    @staticmethod
+    def detect_panic_exhaustion(src, out: dict, z_threshold: float = 3.0):
+        """スレッショルドを超えたかどうかのフラグ（1 = パニック発生, 0 = 平常）"""
+        np.greater(src["liq_long_zscore"].to_numpy(), z_threshold, out=out["panic_long_exhaustion"], casting="unsafe")
         logger.info(f"Calculated Panic Exhaustion Z-Score (threshold={z_threshold}σ)")
-        return df
+
+    FEATURES = (
+        Feature((("liq_imbalance", "float64"),), ("liq_long", "liq_short"), calculate_liquidation_imbalance),
+        Feature(((f"liq_imbalance_ma_{IMBALANCE_WINDOW}", "float64"),), ("liq_imbalance",),
+                lambda src, out: LiquidationAlpha.smooth_imbalance(src, out, LiquidationAlpha.IMBALANCE_WINDOW)),
+        Feature((("liq_long_zscore", "float64"),), ("liq_long",),
+                lambda src, out: LiquidationAlpha.calculate_long_zscore(src, out, LiquidationAlpha.PANIC_WINDOW)),
+        Feature((("panic_long_exhaustion", "int64"),), ("liq_long_zscore",),
+                lambda src, out: LiquidationAlpha.detect_panic_exhaustion(src, out, LiquidationAlpha.Z_THRESHOLD)),
+    )
 
     @staticmethod
     def build_all_features(df: pd.DataFrame) -> pd.DataFrame:
-        """Master function to apply all Liquidation related alphas."""
+        """Master function to apply all Liquidation related alphas (appends columns to df in place)."""
         logger.info("Building Liquidation Alpha features...")
-        df = LiquidationAlpha.calculate_liquidation_imbalance(df)
-        df = LiquidationAlpha.detect_panic_exhaustion(df)
-        return df
+        return feature_graph.apply(LiquidationAlpha, df)
@@ -1,59 +1,78 @@
 import pandas as pd
+import numpy as np
 import logging
-try:
-    import pandas_ta as ta
-    _HAS_TA = True
-except ImportError:
-    _HAS_TA = False
+from feature_engineering import feature_graph
+from feature_engineering.feature_graph import Feature
+from feature_engineering.indicator_store import IndicatorStore
+from feature_engineering.indicator_store import _HAS_TA  # pandas_ta の有無（指標はストア経由で計算する）
 
 logger = logging.getLogger("neo.quant.alpha.regime")
 
 class RegimeAlpha:
     """Classifies the market regime (Trend vs Range, Bull vs Bear)."""
-    
+    SHORT_W, MID_W, LONG_W = 20, 50, 100
+    MACD_COLS = (("macd", "MACD_12_26_9"), ("macd_signal", "MACDs_12_26_9"), ("macd_hist", "MACDh_12_26_9"))
+
     @staticmethod
-    def detect_trend_regime(df: pd.DataFrame, short_w: int = 20, mid_w: int = 50, long_w: int = 100) -> pd.DataFrame:
+    def calculate_moving_averages(src, out: dict, short_w: int = 20, mid_w: int = 50, long_w: int = 100):
         """
-        移動平均線の配列でレジームを判定。
+        レジーム判定用の移動平均線。
         long_w を 200→100 に変更（4h足180本に適合）
         """
-        if "close" not in df.columns:
-            return df
-            
-        df = df.copy()
+        close = src["close"]
         if _HAS_TA:
             # pandas-ta EMA（自作rollingより精度が高い）
-            df["ma_short"] = ta.ema(df["close"], length=short_w)
-            df["ma_mid"]   = ta.ema(df["close"], length=mid_w)
-            df["ma_long"]  = ta.ema(df["close"], length=long_w)
-            # RSIもpandas-taで上書き（より正確）
-            _rsi = ta.rsi(df["close"], length=14)
-            if _rsi is not None:
-                df["rsi_14"] = _rsi
-            # MACDを追加
-            _macd = ta.macd(df["close"], fast=12, slow=26, signal=9)
-            if _macd is not None:
-                df["macd"]        = _macd.get("MACD_12_26_9", 0)
-                df["macd_signal"] = _macd.get("MACDs_12_26_9", 0)
-                df["macd_hist"]   = _macd.get("MACDh_12_26_9", 0)
-            # ATRを追加（ストップロス計算用）
-            if all(c in df.columns for c in ["high","low","close"]):
-                _atr = ta.atr(df["high"], df["low"], df["close"], length=14)
-                if _atr is not None:
-                    df["atr_14"] = _atr
+            np.copyto(out["ma_short"], IndicatorStore.ta("ema", close, length=short_w).to_numpy())
+            np.copyto(out["ma_mid"], IndicatorStore.ta("ema", close, length=mid_w).to_numpy())
+            np.copyto(out["ma_long"], IndicatorStore.ta("ema", close, length=long_w).to_numpy())
         else:
             # フォールバック: 自作rolling
-            df["ma_short"] = df["close"].rolling(window=short_w, min_periods=short_w//2).mean()
-            df["ma_mid"] = df["close"].rolling(window=mid_w, min_periods=mid_w//2).mean()
-            df["ma_long"] = df["close"].rolling(window=long_w, min_periods=long_w//2).mean()
-        
-        # レジーム判定 (1: Bull Trend, -1: Bear Trend, 0: Chop/Range)
-        bull_cond = (df["close"] > df["ma_short"]) & (df["ma_short"] > df["ma_mid"]) & (df["ma_mid"] > df["ma_long"])
-        bear_cond = (df["close"] < df["ma_short"]) & (df["ma_short"] < df["ma_mid"]) & (df["ma_mid"] < df["ma_long"])
-        
-        df["market_regime"] = 0
-        df.loc[bull_cond, "market_regime"] = 1
-        df.loc[bear_cond, "market_regime"] = -1
-        
-        logger.info(f"Calculated Market Regime (Bull=1, Bear=-1, Range=0) [windows: {short_w}/{mid_w}/{long_w}]")
-        return df
+            np.copyto(out["ma_short"], IndicatorStore.sma(close, short_w, min_periods=short_w//2).to_numpy())
+            np.copyto(out["ma_mid"], IndicatorStore.sma(close, mid_w, min_periods=mid_w//2).to_numpy())
+            np.copyto(out["ma_long"], IndicatorStore.sma(close, long_w, min_periods=long_w//2).to_numpy())
+
+    @staticmethod
+    def calculate_macd(src, out: dict):
+        _macd = IndicatorStore.ta("macd", src["close"], fast=12, slow=26, signal=9)
+        for name, col in RegimeAlpha.MACD_COLS:
+            if _macd is None:
+                out.pop(name)
+            else:
+                out[name][:] = _macd[col].to_numpy() if col in _macd.columns else 0
+
+    @staticmethod
+    def calculate_atr(src, out: dict):
+        """ATR（ストップロス計算用）"""
+        _atr = IndicatorStore.ta("atr", src["high"], src["low"], src["close"], length=14)
+        if _atr is not None:
+            np.copyto(out["atr_14"], _atr.to_numpy())
+        else:
+            out.pop("atr_14")
+
+    @staticmethod
+    def detect_trend_regime(src, out: dict):
+        """移動平均線の配列でレジームを判定 (1: Bull Trend, -1: Bear Trend, 0: Chop/Range)"""
+        c, s, m, l = (src[name].to_numpy() for name in ("close", "ma_short", "ma_mid", "ma_long"))
+        bull_cond = (c > s) & (s > m) & (m > l)
+        bear_cond = (c < s) & (s < m) & (m < l)
+
+        regime = out["market_regime"]
+        regime[:] = 0
+        regime[bull_cond] = 1
+        regime[bear_cond] = -1
+
+        cls = RegimeAlpha
+        logger.info(f"Calculated Market Regime (Bull=1, Bear=-1, Range=0) [windows: {cls.SHORT_W}/{cls.MID_W}/{cls.LONG_W}]")
+
+    FEATURES = (
+        Feature((("ma_short", "float64"), ("ma_mid", "float64"), ("ma_long", "float64")), ("close",),
+                lambda src, out: RegimeAlpha.calculate_moving_averages(src, out, RegimeAlpha.SHORT_W, RegimeAlpha.MID_W, RegimeAlpha.LONG_W)),
+        Feature(tuple((name, "float64") for name, _ in MACD_COLS), ("close",), calculate_macd, enabled=_HAS_TA),
+        Feature((("atr_14", "float64"),), ("high", "low", "close"), calculate_atr, enabled=_HAS_TA),
+        Feature((("market_regime", "int64"),), ("close", "ma_short", "ma_mid", "ma_long"), detect_trend_regime),
+    )
+
+    @staticmethod
+    def build_all_features(df: pd.DataFrame) -> pd.DataFrame:
+        """df に列を追加して返す（フレームはコピーしない）"""
+        return feature_graph.apply(RegimeAlpha, df)
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 import logging
+from feature_engineering import pipeline
+from feature_engineering.feature_graph import Feature, FeatureGraph
+from feature_engineering.indicator_store import IndicatorStore
 from feature_engineering.alpha_funding import FundingRateAlpha
 from feature_engineering.alpha_liquidation import LiquidationAlpha
 from feature_engineering.alpha_volatility import VolatilityAlpha
@@ -8,37 +12,42 @@ from feature_engineering.alpha_regime import RegimeAlpha
 
 logger = logging.getLogger("neo.quant.features")
 
+class BaseIndicators:
+    """基礎指標（ma20/ma50）"""
+
+    @staticmethod
+    def moving_average(window: int) -> Feature:
+        name = f"ma{window}"
+        return Feature(((name, "float64"),), ("close",),
+                       lambda src, out: np.copyto(out[name], IndicatorStore.sma(src["close"], window, min_periods=1).to_numpy()))
+
+    FEATURES = (moving_average(20), moving_average(50))
+
+
 class FeatureBuilder:
+    # 登録順 = 評価順 = 出力列の並び（依存先は必ず先に宣言する — FeatureGraph が検証）
+    PIPELINE = (BaseIndicators, FundingRateAlpha, LiquidationAlpha, VolatilityAlpha, CrossAssetAlpha, RegimeAlpha)
+    GRAPH = FeatureGraph(feature for alpha in PIPELINE for feature in alpha.FEATURES)
+
     @staticmethod
-    def build_from_memory(df: pd.DataFrame) -> pd.DataFrame:
+    def build_from_memory(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """
+        特徴量DAG（feature_engineering.feature_graph）を評価する。
+        columns を渡すとその列に必要なノードだけを計算し、入力列＋columns を返す（None なら全特徴量）。
+        欠損行の除去も返す列だけで判定する。
+        出力列は1回だけ確保した NumPy バッファに書き込み、入力 df は変更しない
+        （funding_rate / liq_long・liq_short が無ければ該当ノードはスキップ — CoinGecko mode）
+        """
         logger.info(f"Processing {len(df)} rows.")
-        
-        # 基礎指標
-        df['ma20'] = df['close'].rolling(window=20, min_periods=1).mean()
-        df['ma50'] = df['close'].rolling(window=50, min_periods=1).mean()
-
-        # アルファ計算
-        has_funding = "funding_rate" in df.columns
-        has_liquidation = all(c in df.columns for c in ["liq_long", "liq_short"])
-        if has_funding:
-            df = FundingRateAlpha.build_all_features(df)
-        else:
-            logger.info("funding_rate unavailable — skipping FundingRateAlpha (CoinGecko mode)")
-        if has_liquidation:
-            df = LiquidationAlpha.build_all_features(df)
-        else:
-            logger.info("liquidation data unavailable — skipping LiquidationAlpha (CoinGecko mode)")
-        df = VolatilityAlpha.calculate_bollinger_squeeze(df)
-        df = CrossAssetAlpha.calculate_momentum_acceleration(df)
-        df = RegimeAlpha.detect_trend_regime(df)
+        frame = FeatureBuilder.GRAPH.evaluate(df, columns)
 
         # 窓関数による欠損を許容し、データがある「後半部分」を確実に残す
-        df_clean = df.dropna().reset_index(drop=True)
+        df_clean = pipeline.drop_incomplete(frame)
         
         # もし全滅しそうなら、直近200件だけでも無理やり残す（インデックスエラー回避）
         if len(df_clean) < 1:
             logger.warning("Applying emergency recovery for zero-row state.")
-            df_clean = df.tail(200).ffill().fillna(0).reset_index(drop=True)
+            df_clean = frame.tail(200).ffill().fillna(0).reset_index(drop=True)
 
         logger.info(f"Final Valid Range: {len(df_clean)} rows.")
         return df_clean
@@ -46,3 +55,35 @@ class FeatureBuilder:
     @staticmethod
     def build_core_features(path: str) -> pd.DataFrame:
         return FeatureBuilder.build_from_memory(pd.read_parquet(path))
+
+    @staticmethod
+    def build_from_ohlcv_cache(symbol: str, limit: int = None) -> pd.DataFrame:
+        """npy mmapキャッシュ（core.ohlcv_cache）から直接ビルド"""
+        from core import ohlcv_cache
+        df = ohlcv_cache.get_frame(symbol, limit=limit)
+        if df is None:
+            return pd.DataFrame()
+        return FeatureBuilder.build_from_memory(df)
+
+    @staticmethod
+    def load_from_store(symbol: str, interval: str = None, limit: int = None, max_lag_bars: int = 1,
+                        start=None) -> pd.DataFrame:
+        """
+        特徴量ストア（collector が確定足ごとに追記する Parquet）から読む。無い・古い場合は空DataFrame
+        start: この時刻以降の行だけ返す（呼び出し側の OHLCV と同じ期間に揃える用）
+        """
+        try:
+            from data_pipeline.feature_store import FeatureStore
+            df = FeatureStore().load(symbol.split('/')[0].strip(), interval, limit=limit, max_lag_bars=max_lag_bars)
+        except Exception as e:
+            logger.warning(f"Feature store unavailable for {symbol}: {e}")
+            df = None
+        if df is None:
+            return pd.DataFrame()
+        if start is not None and len(df):
+            start = pd.Timestamp(start)
+            if start.tzinfo is not None:
+                start = start.tz_convert(None)  # ストアは UTC naive
+            ts = np.asarray(pd.to_datetime(df["datetime"]), dtype="datetime64[ns]")
+            df = df[ts >= start.to_datetime64()].reset_index(drop=True)
+        return df
@@ -0,0 +1,138 @@
+"""
+宣言的な特徴量DAG（依存関係つき遅延評価）
+FeatureBuilder.build_from_memory は呼び出し側が数列しか使わなくても全アルファを計算していた
+（gplearn は FEATURE_COLS、vp_market_pulse は rsi/ma20/ma50/bb_bandwidth/returns だけ）。
+
+各特徴量ノードは出力列・依存列・計算関数を宣言する:
+  Feature(outputs, deps, fn, enabled)
+    outputs : ((列名, dtype), ...)
+    deps    : 依存列（入力フレームの列 or 先に宣言された他ノードの出力列）
+    fn      : fn(src, out)。src[列名] で依存列を Series として読み、out[列名]（長さ n の1次元バッファ）に書く。
+              計算できなかった列は out から pop する（その列に依存する後段ノードはスキップされる）
+    enabled : False なら常に利用不可（pandas_ta が無い場合の TA 専用列など）
+- 呼び出し側が列リストを渡すと、その列に必要な部分グラフだけを評価する（None なら全ノード）
+- 評価順は登録順。登録時に「依存先は必ず先に宣言されている」ことを検証するので登録順がそのままトポロジカル順
+- 中間ノード（例: market_regime に必要な ma_short/ma_mid/ma_long）は1回の評価内で1度だけ計算してバッファを共有。
+  重いTA計算は IndicatorStore が呼び出しをまたいでメモ化する
+- 出力は feature_engineering.pipeline のバッファ（dtype ごとに一括確保）に書き、入力フレームは変更しない
+"""
+import logging
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import pipeline
+
+logger = logging.getLogger("neo.quant.feature_graph")
+
+
+class Feature(NamedTuple):
+    outputs: Tuple[Tuple[str, str], ...]
+    deps: Tuple[str, ...]
+    fn: Callable
+    enabled: bool = True
+
+    @property
+    def names(self) -> list:
+        return [name for name, _ in self.outputs]
+
+
+class Sources:
+    """計算中の列の読み取り口（同名なら出力バッファ優先・無ければ入力列）"""
+
+    def __init__(self, df: pd.DataFrame, out: Dict[str, np.ndarray]):
+        self._df = df
+        self._out = out
+
+    def __contains__(self, name) -> bool:
+        return name in self._out or name in self._df.columns
+
+    def __getitem__(self, name) -> pd.Series:
+        if name in self._out:
+            return pd.Series(self._out[name], index=self._df.index, name=name, copy=False)
+        return self._df[name]
+
+
+class FeatureGraph:
+    def __init__(self, features: Iterable[Feature]):
+        self.features = tuple(features)
+        self.producer: Dict[str, int] = {}
+        for i, feature in enumerate(self.features):
+            for name in feature.names:
+                if name in self.producer:
+                    raise ValueError(f"{name} is declared twice")
+                self.producer[name] = i
+        for i, feature in enumerate(self.features):
+            late = [d for d in feature.deps if self.producer.get(d, -1) >= i]
+            if late:
+                raise ValueError(f"{', '.join(feature.names)} depends on {', '.join(late)} declared at or after it")
+
+    @property
+    def columns(self) -> list:
+        return [name for feature in self.features for name in feature.names]
+
+    def required(self, columns: Optional[Iterable[str]], available) -> list:
+        """columns の計算に必要なノード番号（登録順）。None なら全ノード。未知の列名は KeyError"""
+        if columns is None:
+            return list(range(len(self.features)))
+        unknown = [name for name in columns if name not in self.producer and name not in available]
+        if unknown:
+            raise KeyError(f"unknown feature column: {', '.join(unknown)}")
+        need, stack = set(), list(columns)
+        while stack:
+            i = self.producer.get(stack.pop())
+            if i is not None and i not in need:
+                need.add(i)
+                stack.extend(self.features[i].deps)
+        return sorted(need)
+
+    def plan(self, available, columns: Optional[Iterable[str]] = None) -> list:
+        """評価するノード（登録順）。入力列が欠ける・無効なノードはスキップしてログに残す"""
+        have = set(available)
+        selected, skipped = [], {}
+        for i in self.required(columns, have):
+            feature = self.features[i]
+            missing = [d for d in feature.deps if d not in have]
+            if not feature.enabled:
+                missing.append("pandas_ta")
+            if missing:
+                skipped.setdefault(", ".join(missing), []).extend(feature.names)
+                continue
+            selected.append(feature)
+            have.update(feature.names)
+        for missing, names in skipped.items():
+            logger.info(f"{missing} unavailable — skipping {', '.join(names)}")
+        return selected
+
+    def compute(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """必要なノードだけを評価し、{列名: バッファ}（中間ノードの出力を含む）を返す"""
+        selected = self.plan(df.columns, columns)
+        out = pipeline.allocate(len(df), [spec for feature in selected for spec in feature.outputs])
+        src = Sources(df, out)
+        for feature in selected:
+            lost = [d for d in feature.deps if d not in src]
+            if lost:
+                logger.info(f"{', '.join(lost)} not computed — skipping {', '.join(feature.names)}")
+                for name in feature.names:
+                    out.pop(name, None)
+                continue
+            feature.fn(src, out)
+        return out
+
+    def evaluate(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """入力列＋要求列（None なら全出力列）の DataFrame を返す（欠損行は残す）"""
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+        out = self.compute(df, columns)
+        if columns is not None:
+            out = {name: out[name] for name in columns if name in out}
+        return pipeline.assemble(df, out)
+
+
+def apply(alpha, df: pd.DataFrame) -> pd.DataFrame:
+    """単体アルファの全ノードを df に適用（呼び出し側の df に列を追加して返す・フレームはコピーしない）"""
+    out = FeatureGraph(alpha.FEATURES).compute(df)
+    for name, buf in out.items():
+        df[name] = buf
+    return df
@@ -0,0 +1,176 @@
+"""
+テクニカル指標のプロセス内メモ化ストア
+FeatureBuilder（RegimeAlpha/VolatilityAlpha/CrossAssetAlpha）・CoreBacktest の各戦略・optuna目的関数が
+同じ系列に対して同じ指標（EMA/SMA/RSI/MACD/ATR/BB/真の値幅）を何度も計算していたのを1回に集約する。
+
+- キー: (入力系列の指紋, 指標名, パラメータ)。指紋は値バイト列のハッシュなので、
+  同じデータなら index や DataFrame が別物でもヒットし、データが変われば自動的に別エントリになる
+- 値は読み取り専用の ndarray で保持し、返すときはコピーを呼び出し側の index で Series/DataFrame に包む
+  （返り値・代入先フレームを in-place で書き換えても保持中の値は変わらない。コピーは再計算よりずっと安い）
+- LRU（MAX_ENTRIES）でメモリ上限。スレッドセーフ
+- ストアはプロセスごと。research/backtests/executor.py の process モードでは各プールワーカーが自分のストアを持ち、
+  プールを使い回す間は同じワーカーに来た戦略・後続スイープでだけヒットする（親プロセスやワーカー間では共有しない。
+  Council ワーカー同士も別ストア）
+- 計算式は置き換え前の各呼び出し箇所と同一（pandas_ta 由来は ta() 経由、pandas rolling/ewm 由来は専用メソッド）
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("neo.quant.indicator_store")
+
+try:
+    import pandas_ta as ta
+    _HAS_TA = True
+except ImportError:
+    ta = None
+    _HAS_TA = False
+
+
+class IndicatorStore:
+    MAX_ENTRIES = 512   # 1エントリ≒系列長×8byte（1万本で80KB）
+
+    _entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+    _lock = threading.RLock()
+    _hits = 0
+    _misses = 0
+
+    # ================================================================
+    # コア
+    # ================================================================
+    @staticmethod
+    def fingerprint(series) -> Tuple[int, str, str]:
+        values = series.to_numpy() if hasattr(series, "to_numpy") else np.asarray(series)
+        if values.dtype.kind not in "biufM":
+            values = pd.util.hash_array(values.astype(object))
+        values = np.ascontiguousarray(values)
+        return len(values), values.dtype.str, hashlib.blake2b(values.view(np.uint8), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _freeze(result):
+        """計算結果を (種類, 読み取り専用配列群, 列名) に変換して保持用にする"""
+        if result is None:
+            return ("none", None, None)
+        if isinstance(result, pd.DataFrame):
+            arrays = []
+            for col in result.columns:
+                arr = result[col].to_numpy(copy=True)
+                arr.flags.writeable = False
+                arrays.append(arr)
+            return ("frame", arrays, list(result.columns))
+        arr = np.array(result.to_numpy() if hasattr(result, "to_numpy") else result, copy=True)
+        arr.flags.writeable = False
+        return ("series", arr, getattr(result, "name", None))
+
+    @staticmethod
+    def _thaw(entry, index):
+        kind, data, names = entry
+        if kind == "none":
+            return None
+        if kind == "frame":
+            return pd.DataFrame({n: a.copy() for n, a in zip(names, data)}, index=index, columns=names, copy=False)
+        return pd.Series(data.copy(), index=index, name=names, copy=False)
+
+    @classmethod
+    def compute(cls, name: str, inputs: tuple, params: tuple, fn: Callable):
+        """inputs（Series群）に対する fn() の結果をメモ化して返す。index は inputs[0] のものを使う"""
+        key = (name, params) + tuple(cls.fingerprint(s) for s in inputs)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None:
+                cls._entries.move_to_end(key)
+                cls._hits += 1
+        if entry is None:
+            entry = cls._freeze(fn())
+            with cls._lock:
+                cls._misses += 1
+                cls._entries[key] = entry
+                while len(cls._entries) > cls.MAX_ENTRIES:
+                    cls._entries.popitem(last=False)
+        return cls._thaw(entry, inputs[0].index)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._hits = cls._misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {"entries": len(cls._entries), "hits": cls._hits, "misses": cls._misses}
+
+    # ================================================================
+    # 指標（pandas 実装）
+    # ================================================================
+    @classmethod
+    def sma(cls, close: pd.Series, length: int, min_periods: Optional[int] = None) -> pd.Series:
+        return cls.compute("sma", (close,), (length, min_periods),
+                           lambda: close.rolling(length, min_periods=min_periods).mean())
+
+    @classmethod
+    def ema(cls, close: pd.Series, length: int) -> pd.Series:
+        """close.ewm(span=length, adjust=False).mean()"""
+        return cls.compute("ema", (close,), (length,), lambda: close.ewm(span=length, adjust=False).mean())
+
+    @classmethod
+    def rolling_max(cls, series: pd.Series, length: int) -> pd.Series:
+        return cls.compute("rolling_max", (series,), (length,), lambda: series.rolling(length).max())
+
+    @classmethod
+    def rolling_min(cls, series: pd.Series, length: int) -> pd.Series:
+        return cls.compute("rolling_min", (series,), (length,), lambda: series.rolling(length).min())
+
+    @classmethod
+    def true_range(cls, high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+        """max(H-L, |H-前C|, |L-前C|)（先頭行は H-L）"""
+        return cls.compute("true_range", (high, low, close), (), lambda: pd.concat([
+            (high - low),
+            (high - close.shift()).abs(),
+            (low - close.shift()).abs(),
+        ], axis=1).max(axis=1))
+
+    @classmethod
+    def atr_sma(cls, high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> pd.Series:
+        """真の値幅の単純移動平均（pandas_ta の RMA版 ATR とは別物）"""
+        return cls.compute("atr_sma", (high, low, close), (length,),
+                           lambda: cls.true_range(high, low, close).rolling(length).mean())
+
+    @classmethod
+    def rsi_sma(cls, close: pd.Series, length: int = 14) -> pd.Series:
+        """上昇幅/下落幅の単純移動平均によるRSI（run_backtest._calc_rsi）"""
+        def _calc():
+            delta = close.diff()
+            gain = delta.clip(lower=0).rolling(length).mean()
+            loss = (-delta.clip(upper=0)).rolling(length).mean()
+            rs = gain / loss.replace(0, np.nan)
+            return 100 - (100 / (1 + rs))
+        return cls.compute("rsi_sma", (close,), (length,), _calc)
+
+    @classmethod
+    def rsi_ewm(cls, close: pd.Series, length: int = 14) -> pd.Series:
+        """alpha=1/length の指数平滑RSI（CrossAssetAlpha）"""
+        def _calc():
+            delta = close.diff()
+            gain = (delta.where(delta > 0, 0)).ewm(alpha=1 / length, adjust=False).mean()
+            loss = (-delta.where(delta < 0, 0)).ewm(alpha=1 / length, adjust=False).mean()
+            rs = gain / (loss + 1e-8)
+            return 100 - (100 / (1 + rs))
+        return cls.compute("rsi_ewm", (close,), (length,), _calc)
+
+    # ================================================================
+    # 指標（pandas_ta 経由）
+    # ================================================================
+    @classmethod
+    def ta(cls, indicator: str, *inputs: pd.Series, **params):
+        """pandas_ta.<indicator>(*inputs, **params) をメモ化（未導入なら ImportError）"""
+        if not _HAS_TA:
+            raise ImportError("No module named 'pandas_ta'")
+        fn = getattr(ta, indicator)
+        return cls.compute(f"ta.{indicator}", inputs, tuple(sorted(params.items())),
+                           lambda: fn(*inputs, **params))
@@ -0,0 +1,68 @@
+"""
+特徴量パイプライン（列追加・フレームコピーなし）
+旧実装は各アルファが df.copy() してから列を足していたため、build_from_memory 1回で全フレームが7〜9回複製されていた。
+
+出力列は事前確保した NumPy バッファに直接書き込む（ノードの宣言と評価順は feature_engineering.feature_graph）:
+- 出力は dtype ごとに1つの2次元ブロックを確保し、各列はその行ビュー（列ごとに連続）
+- 入力フレームは変更しない。最後に入力列＋出力バッファから DataFrame を1回だけ組み立てる
+  （入力と同名の出力列は入力列の位置で置換。入力列はコピーして渡す — 入力の読み取り専用ビューを
+  結果に混ぜると OHLC 列への書き込みが ValueError になる。特徴量バッファに比べれば数列分で安い）
+"""
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def allocate(n: int, specs: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    """宣言された出力列のバッファを dtype ごとに1回で確保（float は NaN・int は 0 で初期化）"""
+    names: Dict[str, str] = {}
+    for name, dtype in specs:
+        names.setdefault(name, dtype)
+    by_dtype: Dict[str, List[str]] = {}
+    for name, dtype in names.items():
+        by_dtype.setdefault(dtype, []).append(name)
+    out = {}
+    for dtype, cols in by_dtype.items():
+        block = np.full((len(cols), n), np.nan) if np.dtype(dtype).kind == "f" else np.zeros((len(cols), n), dtype=dtype)
+        out.update({name: block[i] for i, name in enumerate(cols)})
+    return {name: out[name] for name in names}
+
+
+def _valid_mask(arrays: Iterable[np.ndarray], n: int) -> np.ndarray:
+    valid = np.ones(n, dtype=bool)
+    for arr in arrays:
+        kind = arr.dtype.kind
+        if kind in "fc":
+            valid &= ~np.isnan(arr)
+        elif kind in "mM":
+            valid &= ~np.isnat(arr)
+        elif kind == "O":
+            valid &= ~pd.isna(arr)
+    return valid
+
+
+def assemble(df: pd.DataFrame, out: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """入力列（同名の出力があればそちらで置換）→ 新しい出力列 の順で DataFrame を組み立てる
+    （出力バッファはコピーなし・入力列は書き込み可能なコピー）"""
+    data = {}
+    for col in df.columns:
+        data[col] = out[col] if col in out else df[col].to_numpy(copy=True)
+    for name, buf in out.items():
+        if name not in data:
+            data[name] = buf
+    return pd.DataFrame(data, columns=list(data), copy=False)
+
+
+def drop_incomplete(frame: pd.DataFrame) -> pd.DataFrame:
+    """dropna().reset_index(drop=True) 相当。欠損が先頭の窓区間だけなら行スライス（ビュー）で済ませる"""
+    n = len(frame)
+    valid = _valid_mask((frame[c].to_numpy() for c in frame.columns), n)
+    if valid.all():
+        return frame
+    bad = np.flatnonzero(~valid)
+    start = int(bad[-1]) + 1
+    if start == n or not valid[:start].any():
+        return frame.iloc[start:].reset_index(drop=True)
+    return frame.loc[valid].reset_index(drop=True)
+
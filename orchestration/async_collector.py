@@ -0,0 +1,241 @@
+"""
+I.1b: 非同期コレクター（NEO_COLLECTOR_MODE=async）
+data_collector の直列収集（銘柄ごと time.sleep(1) / GeckoTerminal 10秒待ち）を
+aiohttp + プロバイダ別トークンバケットによる並行取得に置き換える。
+
+- DexScreener / GeckoTerminal / CoinGecko / Binance それぞれに TokenBucket(rate, capacity) を持ち、
+  各プロバイダの予算内で全銘柄を同時に取得する
+- 銘柄ごとのプロバイダ優先順は MarketData.fetch_token_data と同じ
+  （GeckoTerminal プール → CoinGecko ID → DexScreener 検索。失敗したら次を試す）
+- HTTPはすべて並行・DB書き込みは取得完了後に呼び出しスレッドで順次実行（SQLite接続は共有しない）
+- 銘柄が増えても壁時計時間は「最も遅いプロバイダの予算」で頭打ちになる
+
+BTC/ETH のティックは Binance のみから取得する（同期モードの CoinGecko + Binance 二重取得は行わない）。
+aiohttp 未インストール時は data_collector が同期モードにフォールバックする。
+"""
+import asyncio
+import time
+
+import aiohttp
+
+from core import price_store
+from tools.market_data import MarketData, COINGECKO_ID_MAP
+from orchestration.data_collector import (
+    logger,
+    COLLECT_SYMBOLS,
+    OHLCV_SYMBOLS,
+    BINANCE_SYMBOLS,
+    BINANCE_BASE_URL,
+    _passes_deviation_filter,
+)
+
+# プロバイダ別レート制限: (補充レート req/秒, バケット容量)
+# 任意の t 秒間のリクエスト数は capacity + rate * t を超えない
+PROVIDER_LIMITS = {
+    "dexscreener":   (4.0, 5),    # 公開上限 300 req/min に対し 240/min
+    "geckoterminal": (0.25, 2),   # 公開上限 30 req/min に対し 15/min
+    "coingecko":     (0.2, 2),    # 無料枠 10〜30 req/min に対し 12/min（フォールバック時のみ）
+    "binance":       (10.0, 10),  # weight上限 6000/min — ticker/klines は weight 1-2
+}
+PROVIDER_URLS = {
+    "dexscreener":   "https://api.dexscreener.com",
+    "geckoterminal": "https://api.geckoterminal.com/api/v2",
+    "coingecko":     "https://api.coingecko.com/api/v3",
+    "binance":       BINANCE_BASE_URL,
+}
+REQUEST_TIMEOUT = 15
+
+
+class TokenBucket:
+    """asyncio用トークンバケット（待ち手はFIFOで順番に払い出す）"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = None  # 実行中のイベントループで遅延生成
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class ProviderClient:
+    """共有 aiohttp セッション + プロバイダ別トークンバケット"""
+
+    def __init__(self, session: aiohttp.ClientSession, urls: dict = None, limits: dict = None):
+        self.session = session
+        self.urls = {**PROVIDER_URLS, **(urls or {})}
+        self.buckets = {name: TokenBucket(rate, cap)
+                        for name, (rate, cap) in {**PROVIDER_LIMITS, **(limits or {})}.items()}
+
+    async def get_json(self, provider: str, path: str, params: dict = None):
+        await self.buckets[provider].acquire()
+        url = f"{self.urls[provider]}{path}"
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with self.session.get(url, params=params, timeout=timeout,
+                                    headers={"Accept": "application/json"}) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+
+# ================================================================
+# プロバイダ別フェッチ（返り値: (price, volume) or None / キャンドル行リスト）
+# ================================================================
+async def _fetch_gt_price(client: ProviderClient, pool: str):
+    data = await client.get_json("geckoterminal", f"/networks/base/pools/{pool}")
+    attrs = data.get("data", {}).get("attributes", {})
+    price = float(attrs.get("base_token_price_usd", 0) or 0)
+    vol_h1 = float((attrs.get("volume_usd") or {}).get("h1", 0) or 0)
+    return (price, vol_h1) if price > 0 else None
+
+
+async def _fetch_dex_price(client: ProviderClient, symbol: str):
+    data = await client.get_json("dexscreener", "/latest/dex/search", params={"q": symbol})
+    pairs = data.get("pairs") or []
+    if not pairs:
+        return None
+    best = max(pairs, key=lambda p: float((p.get("liquidity") or {}).get("usd", 0) or 0))
+    price = float(best.get("priceUsd", 0) or 0)
+    vol_h1 = float((best.get("volume") or {}).get("h1", 0) or 0)
+    return (price, vol_h1) if price > 0 else None
+
+
+async def _fetch_cg_price(client: ProviderClient, cg_id: str):
+    data = await client.get_json("coingecko", "/simple/price", params={"ids": cg_id, "vs_currencies": "usd"})
+    price = float((data.get(cg_id) or {}).get("usd", 0) or 0)
+    return (price, 0.0) if price > 0 else None
+
+
+async def _fetch_binance_price(client: ProviderClient, pair: str):
+    data = await client.get_json("binance", "/ticker/price", params={"symbol": pair})
+    price = float(data.get("price", 0) or 0)
+    return (price, 0.0) if price > 0 else None
+
+
+async def _fetch_gt_candles(client: ProviderClient, pool: str):
+    data = await client.get_json("geckoterminal", f"/networks/base/pools/{pool}/ohlcv/hour",
+                                 params={"aggregate": "4", "limit": 10})
+    ohlcv = data.get("data", {}).get("attributes", {}).get("ohlcv_list", [])
+    return [(int(c[0]) * 1000, float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5])) for c in ohlcv]
+
+
+async def _fetch_binance_candles(client: ProviderClient, pair: str, limit: int = 24):
+    klines = await client.get_json("binance", "/klines", params={"symbol": pair, "interval": "1h", "limit": limit})
+    return [(int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])) for k in klines]
+
+
+def default_tick_targets() -> list:
+    """[(symbol, provider, key)] — 同じ銘柄の行は先頭から順に試すフォールバック
+    BTC,ETH: Binance / その他: GeckoTerminal（プールあり）→ CoinGecko（IDあり）→ DexScreener
+    （LUNA はどちらも無いので fetch_token_data と同じく DexScreener 検索のみ）"""
+    targets = []
+    for symbol in COLLECT_SYMBOLS:
+        if symbol in BINANCE_SYMBOLS:
+            targets.append((symbol, "binance", BINANCE_SYMBOLS[symbol]))
+            continue
+        if symbol in MarketData._GECKO_PAIRS:
+            targets.append((symbol, "geckoterminal", MarketData._GECKO_PAIRS[symbol]))
+        if symbol in COINGECKO_ID_MAP:
+            targets.append((symbol, "coingecko", COINGECKO_ID_MAP[symbol]))
+        targets.append((symbol, "dexscreener", symbol))
+    return targets
+
+
+def default_candle_targets() -> list:
+    """[(symbol, provider, key, interval, source)]"""
+    targets = [(s, "geckoterminal", pool, "4h", "geckoterminal") for s, pool in OHLCV_SYMBOLS.items()]
+    targets += [(s, "binance", pair, "1h", "binance") for s, pair in BINANCE_SYMBOLS.items()]
+    return targets
+
+
+_TICK_FETCHERS = {
+    "geckoterminal": _fetch_gt_price,
+    "dexscreener": _fetch_dex_price,
+    "coingecko": _fetch_cg_price,
+    "binance": _fetch_binance_price,
+}
+_CANDLE_FETCHERS = {
+    "geckoterminal": _fetch_gt_candles,
+    "binance": _fetch_binance_candles,
+}
+
+
+async def _guarded(label: str, coro):
+    try:
+        return await coro
+    except Exception as e:
+        logger.warning(f"async fetch error {label}: {e}")
+        return None
+
+
+async def _fetch_tick(client: ProviderClient, symbol: str, chain: list):
+    """chain [(provider, key)] を先頭から試し、最初に取れた (provider, (price, volume)) を返す"""
+    for provider, key in chain:
+        res = await _guarded(f"{symbol} ({provider})", _TICK_FETCHERS[provider](client, key))
+        if res:
+            return provider, res
+    return None
+
+
+async def collect_cycle_async(conn, include_ohlcv: bool = False, tick_targets: list = None,
+                              candle_targets: list = None, urls: dict = None, limits: dict = None) -> dict:
+    """1サイクル分を並行取得してDBへ書き込む
+    Returns: {"ticks": 挿入数, "candles": 新規キャンドル数, "elapsed": 秒}"""
+    t0 = time.monotonic()
+    tick_targets = default_tick_targets() if tick_targets is None else tick_targets
+    candle_targets = (default_candle_targets() if candle_targets is None else candle_targets) if include_ohlcv else []
+
+    async with aiohttp.ClientSession() as session:
+        client = ProviderClient(session, urls=urls, limits=limits)
+        chains = {}
+        for sym, prov, key in tick_targets:
+            chains.setdefault(sym, []).append((prov, key))
+        tick_jobs = [_fetch_tick(client, sym, chain) for sym, chain in chains.items()]
+        candle_jobs = [_guarded(f"{sym} OHLCV ({prov})", _CANDLE_FETCHERS[prov](client, key))
+                       for sym, prov, key, _iv, _src in candle_targets]
+        results = await asyncio.gather(*tick_jobs, *candle_jobs)
+    tick_results = results[:len(tick_jobs)]
+    candle_results = results[len(tick_jobs):]
+
+    # --- DB書き込み（呼び出しスレッドで順次） ---
+    now_ms = int(time.time() * 1000)
+    n_ticks = 0
+    for symbol, res in zip(chains, tick_results):
+        if not res:
+            continue
+        provider, (price, vol) = res
+        if not _passes_deviation_filter(conn, symbol, price, label=f"{provider} "):
+            continue
+        price_store.insert_tick(conn, symbol, now_ms, price, vol)
+        n_ticks += 1
+        logger.info(f"  {symbol}: ${price:.6f} ({provider})")
+    n_candles = 0
+    for (symbol, _prov, _key, interval, source), rows in zip(candle_targets, candle_results):
+        for ts_ms, o, h, l, c, v in rows or []:
+            if price_store.insert_candle(conn, symbol, interval, ts_ms, o, h, l, c, v, source):
+                n_candles += 1
+    conn.commit()
+
+    elapsed = time.monotonic() - t0
+    logger.info(f"Async cycle: ticks {n_ticks}/{len(chains)}"
+                + (f" | candles +{n_candles}" if include_ohlcv else "")
+                + f" | {elapsed:.1f}s")
+    return {"ticks": n_ticks, "candles": n_candles, "elapsed": elapsed}
+
+
+def collect_cycle(conn, include_ohlcv: bool = False, **kwargs) -> dict:
+    """同期呼び出し用ラッパー（data_collector.main から使用）"""
+    return asyncio.run(collect_cycle_async(conn, include_ohlcv=include_ohlcv, **kwargs))
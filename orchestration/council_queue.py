@@ -0,0 +1,390 @@
+"""
+Council ジョブキュー + ワーカープロセスプール（data/council_jobs.sqlite）
+旧 radar は TrinityCouncil.run() を Council レーンのスレッドで同期実行していたため、
+LLM 応答待ち（1回数分〜十数分）の間はトリガー監視が止まり、Council も同時に1件しか走らなかった。
+
+- radar はトリガー発火時に submit() でジョブを積むだけ（同じ銘柄が待機中・実行中なら積まない）
+- ワーカーは別プロセス（python -m orchestration.council_queue --worker）。claim() で1件ずつ取り出し、
+  実行直前に CostGuard（L1 LLM日次予算・L2〜L4 サーキットブレーカー）を再確認してから Council を回す
+- 結果はジョブ行（verdict / result / error）と Blackboard の council_results[銘柄] に書き戻す
+- radar は毎サイクル results() で未読の完了ジョブを受け取り、冷却・連続エラー・無取引監視に反映する
+- CouncilWorkerPool: 落ちたワーカーの作り直し・JOB_TIMEOUT_SEC 超過ジョブのワーカー停止（ensure()）
+- 接続は price_store のスレッド別プール（WAL）を共用。取り出しは BEGIN IMMEDIATE で二重取得しない
+
+使い方:
+  python -m orchestration.council_queue --status    # 直近のジョブ一覧
+  python -m orchestration.council_queue --worker    # ワーカー1本を前景で起動（通常は radar が起動する）
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import sqlite3
+import subprocess
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, List, NamedTuple, Optional
+
+sys.path.insert(0, '.')
+
+from core import price_store
+
+logger = logging.getLogger("neo.council_queue")
+
+DB_PATH = "data/council_jobs.sqlite"
+
+COUNCIL_WORKERS = 2         # 同時に走らせる Council の数（LLM レート制限・日次予算との兼ね合い）
+JOB_TIMEOUT_SEC = 1800      # 1件がこれを超えたらワーカーごと止めて failed にする
+QUEUE_TTL_SEC = 1800        # これより古い queued ジョブは実行しない（トリガー時点の前提が崩れている）
+WORKER_POLL_SEC = 2.0       # 空キュー時のワーカーのポーリング間隔
+KEEP_DAYS = 7               # 完了ジョブの保持期間
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"         # CostGuard ブロック・キュー滞留で実行しなかった
+FINISHED = (DONE, FAILED, SKIPPED)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol          TEXT NOT NULL,
+        trigger_type    TEXT NOT NULL,
+        context         TEXT,
+        sentiment_score REAL NOT NULL,
+        status          TEXT NOT NULL,
+        created_at      REAL NOT NULL,
+        started_at      REAL,
+        finished_at     REAL,
+        worker_pid      INTEGER,
+        verdict         TEXT,
+        result          TEXT,
+        error           TEXT,
+        acked           INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)",
+)
+
+_COLS = ("id, symbol, trigger_type, context, sentiment_score, status, created_at, started_at, finished_at, "
+         "worker_pid, verdict, error")
+
+_schema_ready = set()
+
+
+class CouncilJob(NamedTuple):
+    id: int
+    symbol: str
+    trigger_type: str
+    context: Optional[str]
+    sentiment_score: float
+    status: str
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    worker_pid: Optional[int]
+    verdict: Optional[str]
+    error: Optional[str]
+
+
+def normalize_symbol(symbol: str) -> str:
+    """ジョブ・重複判定・冷却のキー（アルファの "BTC/USDT" と定期の "BTC" を同じ銘柄として扱う）"""
+    return symbol.split('/')[0].strip()
+
+
+def _conn(path: str) -> sqlite3.Connection:
+    conn = price_store.get_connection(path)
+    if path not in _schema_ready:
+        for ddl in SCHEMA:
+            conn.execute(ddl)
+        conn.commit()
+        _schema_ready.add(path)
+    return conn
+
+
+@contextmanager
+def _immediate(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE … COMMIT（例外時は ROLLBACK）— 読んでから書くまでを他プロセスに割り込ませない"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class CouncilQueue:
+    """Council ジョブの SQLite キュー（radar・ワーカー・CLI が同じファイルを共有する）"""
+
+    def __init__(self, path: str = None):
+        self.path = path or DB_PATH
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return _conn(self.path)
+
+    def submit(self, symbol: str, trigger_type: str, context: str, sentiment_score: float) -> Optional[int]:
+        """ジョブを積んで id を返す。同じ銘柄が待機中・実行中なら積まずに None（銘柄は normalize_symbol で揃える）"""
+        symbol = normalize_symbol(symbol)
+        now = time.time()
+        with _immediate(self.conn) as conn:
+            dup = conn.execute("SELECT id FROM jobs WHERE symbol=? AND status IN (?, ?) LIMIT 1",
+                               (symbol, QUEUED, RUNNING)).fetchone()
+            if dup:
+                return None
+            cur = conn.execute(
+                "INSERT INTO jobs (symbol, trigger_type, context, sentiment_score, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (symbol, trigger_type, context, float(sentiment_score), QUEUED, now))
+            conn.execute("DELETE FROM jobs WHERE acked=1 AND finished_at < ?", (now - KEEP_DAYS * 86400,))
+            return cur.lastrowid
+
+    def claim(self, worker_pid: int) -> Optional[CouncilJob]:
+        """最も古い待機ジョブを running にして返す（無ければ None）。滞留しすぎたジョブは skipped にする"""
+        now = time.time()
+        with _immediate(self.conn) as conn:
+            conn.execute("UPDATE jobs SET status=?, finished_at=?, error=? WHERE status=? AND created_at < ?",
+                         (SKIPPED, now, f"expired: {QUEUE_TTL_SEC}s以上キュー滞留", QUEUED, now - QUEUE_TTL_SEC))
+            row = conn.execute(f"SELECT {_COLS} FROM jobs WHERE status=? ORDER BY id LIMIT 1",
+                               (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status=?, started_at=?, worker_pid=? WHERE id=?",
+                         (RUNNING, now, worker_pid, row[0]))
+        return CouncilJob(*row)._replace(status=RUNNING, started_at=now, worker_pid=worker_pid)
+
+    def finish(self, job_id: int, status: str, verdict: str = None, result: Any = None, error: str = None) -> bool:
+        """running のジョブを完了にする（時間切れで既に failed にされていたら何もせず False）"""
+        payload = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+        conn = self.conn
+        cur = conn.execute(
+            "UPDATE jobs SET status=?, finished_at=?, verdict=?, result=?, error=? WHERE id=? AND status=?",
+            (status, time.time(), verdict, payload, error, job_id, RUNNING))
+        conn.commit()
+        return cur.rowcount > 0
+
+    def fail_running(self, worker_pid: Optional[int], error: str) -> int:
+        """worker_pid のワーカーが実行中だったジョブを failed にする（None なら実行中の全ジョブ）"""
+        conn = self.conn
+        if worker_pid is None:
+            cur = conn.execute("UPDATE jobs SET status=?, finished_at=?, error=? WHERE status=?",
+                               (FAILED, time.time(), error, RUNNING))
+        else:
+            cur = conn.execute("UPDATE jobs SET status=?, finished_at=?, error=? WHERE status=? AND worker_pid=?",
+                               (FAILED, time.time(), error, RUNNING, worker_pid))
+        conn.commit()
+        return cur.rowcount
+
+    def running(self) -> List[CouncilJob]:
+        rows = self.conn.execute(f"SELECT {_COLS} FROM jobs WHERE status=? ORDER BY id", (RUNNING,)).fetchall()
+        return [CouncilJob(*r) for r in rows]
+
+    def pending(self) -> int:
+        """待機中＋実行中のジョブ数"""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)",
+                                 (QUEUED, RUNNING)).fetchone()[0]
+
+    def results(self) -> List[CouncilJob]:
+        """まだ受け取っていない完了ジョブを完了順に返し、受け取り済みにする（radar 専用・1プロセスから呼ぶ）"""
+        marks = ",".join("?" * len(FINISHED))
+        with _immediate(self.conn) as conn:
+            rows = conn.execute(f"SELECT {_COLS} FROM jobs WHERE acked=0 AND status IN ({marks}) "
+                                f"ORDER BY finished_at, id", FINISHED).fetchall()
+            if rows:
+                conn.executemany("UPDATE jobs SET acked=1 WHERE id=?", [(r[0],) for r in rows])
+        return [CouncilJob(*r) for r in rows]
+
+    def recent(self, limit: int = 20) -> List[CouncilJob]:
+        rows = self.conn.execute(f"SELECT {_COLS} FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [CouncilJob(*r) for r in rows]
+
+
+# ================================================================
+# ワーカー（別プロセス）
+# ================================================================
+def _budget_check() -> tuple:
+    """実行直前の CostGuard 再確認（待機中に SL 連続・DD・LLM 予算の状況が変わっている場合がある）"""
+    from core.cost_guard import CostGuard
+    try:
+        cg = CostGuard()
+        if cg.daily_spent >= cg.DAILY_BUDGET_USD:
+            return False, f"L1:LLM日次予算${cg.daily_spent:.2f}到達（上限${cg.DAILY_BUDGET_USD}）"
+        return cg.approve_council()
+    except Exception as e:
+        # radar の召集前チェックと同じく、チェック自体の失敗では止めない
+        logger.error(f"[CFO] サーキットブレーカーチェックエラー: {e}")
+        return True, "OK"
+
+
+def _publish(job: CouncilJob, verdict: str, error: str = None):
+    """Blackboard の council_results[銘柄] に最新の結果を書く"""
+    try:
+        from core.blackboard import NeoBlackboard
+        NeoBlackboard.patch({job.symbol: {
+            "job_id": job.id,
+            "trigger_type": job.trigger_type,
+            "verdict": verdict,
+            "error": error,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }}, section="council_results")
+    except Exception as e:
+        logger.warning(f"[Council Worker] Blackboard書き込み失敗 #{job.id}: {e}")
+
+
+def run_job(queue: CouncilQueue, job: CouncilJob):
+    """ジョブ1件を実行して結果を書き戻す"""
+    ok, reason = _budget_check()
+    if not ok:
+        logger.warning(f"🚫 [CFO] Council実行前にブロック #{job.id} {job.symbol}: {reason}")
+        queue.finish(job.id, SKIPPED, error=reason)
+        return
+
+    logger.info(f"🏛️ [Council Worker] #{job.id} [{job.trigger_type}] {job.symbol} 開始")
+    try:
+        from agents.trinity_council import TrinityCouncil
+        result = TrinityCouncil().run(
+            sentiment_score=job.sentiment_score,
+            context=job.context,
+            target_symbol=job.symbol
+        )
+    except Exception as e:
+        logger.error(f"⚠️ Council Error #{job.id} {job.symbol}: {e}", exc_info=True)
+        _publish(job, "ERROR", error=str(e)[:500])
+        queue.finish(job.id, FAILED, error=str(e)[:500])
+        return
+
+    verdict = (result or {}).get("verdict", "UNKNOWN")
+    _publish(job, verdict)
+    queue.finish(job.id, DONE, verdict=verdict, result=result)
+    logger.info(f"✅ [Council Worker] #{job.id} {job.symbol} 完了: {verdict}")
+    # 取引後に勝率を即時更新
+    try:
+        from orchestration.performance_evaluator import evaluate_performance
+        evaluate_performance(send_dashboard=False)
+    except Exception as e:
+        logger.error(f"[Evaluator] Post-council error: {e}")
+
+
+def worker_main(path: str = None, parent_pid: int = None):
+    """ワーカー本体: キューが空ならポーリング、親（radar）が居なくなったら終了"""
+    queue = CouncilQueue(path)
+    pid = os.getpid()
+    logger.info(f"[Council Worker] 起動 pid={pid} db={queue.path}")
+    while True:
+        if parent_pid and os.getppid() != parent_pid:
+            logger.info(f"[Council Worker] 親プロセス {parent_pid} 終了 → 停止")
+            return
+        try:
+            job = queue.claim(pid)
+        except sqlite3.Error as e:
+            logger.warning(f"[Council Worker] claim失敗: {e}")
+            job = None
+        if job is None:
+            time.sleep(WORKER_POLL_SEC)
+            continue
+        run_job(queue, job)
+
+
+# ================================================================
+# プロセスプール（radar 側）
+# ================================================================
+class CouncilWorkerPool:
+    """ワーカープロセスを workers 本に保つ（radar のサイクルごとに ensure() を呼ぶ）
+    multiprocessing の spawn は親の __main__（run_trigger）を再実行してしまうため、
+    ワーカーは本モジュールを -m で起動する独立プロセスにする"""
+
+    def __init__(self, workers: int = COUNCIL_WORKERS, path: str = None, job_timeout: float = JOB_TIMEOUT_SEC):
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.queue = CouncilQueue(path)
+        self.procs: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    def _spawn(self) -> subprocess.Popen:
+        cmd = [sys.executable, "-m", "orchestration.council_queue", "--worker",
+               "--db", self.queue.path, "--parent", str(os.getpid())]
+        proc = subprocess.Popen(cmd, cwd=os.getcwd())
+        logger.info(f"[Council Pool] ワーカー起動 pid={proc.pid}")
+        return proc
+
+    def start(self):
+        # 前回の radar で実行中のまま残ったジョブ（ワーカーごと落ちた）を片付ける
+        n = self.queue.fail_running(None, "radar再起動で中断")
+        if n:
+            logger.warning(f"[Council Pool] 中断ジョブ {n}件を failed に変更")
+        self.ensure()
+
+    def ensure(self):
+        """落ちたワーカーの作り直し・時間切れジョブのワーカー停止"""
+        with self._lock:
+            alive = []
+            for proc in self.procs:
+                if proc.poll() is None:
+                    alive.append(proc)
+                    continue
+                n = self.queue.fail_running(proc.pid, f"ワーカー異常終了 (exit={proc.returncode})")
+                logger.warning(f"[Council Pool] ワーカー pid={proc.pid} 終了 exit={proc.returncode}"
+                               + (f" — 実行中ジョブ {n}件を failed" if n else ""))
+
+            now = time.time()
+            for job in self.queue.running():
+                if not job.started_at or now - job.started_at <= self.job_timeout:
+                    continue
+                proc = next((p for p in alive if p.pid == job.worker_pid), None)
+                if proc is not None:
+                    proc.kill()
+                    proc.wait()
+                    alive.remove(proc)
+                self.queue.fail_running(job.worker_pid, f"timeout: {self.job_timeout:.0f}s超過")
+                logger.error(f"[Council Pool] #{job.id} {job.symbol} が {self.job_timeout:.0f}s を超過 → "
+                             f"ワーカー pid={job.worker_pid} 停止")
+
+            while len(alive) < self.workers:
+                alive.append(self._spawn())
+            self.procs = alive
+
+    def stop(self, timeout: float = 10.0):
+        with self._lock:
+            for proc in self.procs:
+                if proc.poll() is None:
+                    proc.terminate()
+            deadline = time.time() + timeout
+            for proc in self.procs:
+                try:
+                    proc.wait(max(0.0, deadline - time.time()))
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            self.procs = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Council ジョブキュー / ワーカー")
+    parser.add_argument("--worker", action="store_true", help="ワーカーを1本起動")
+    parser.add_argument("--status", action="store_true", help="直近のジョブ一覧")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--parent", type=int, default=None, help="親 radar の pid（終了したらワーカーも止まる）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(levelname)s: %(message)s')
+    if args.worker:
+        try:
+            worker_main(args.db, args.parent)
+        except KeyboardInterrupt:
+            pass
+        return
+    for job in CouncilQueue(args.db).recent():
+        created = datetime.fromtimestamp(job.created_at).strftime("%m-%d %H:%M:%S")
+        took = f"{job.finished_at - job.started_at:.0f}s" if job.finished_at and job.started_at else "-"
+        print(f"#{job.id:<5} {created} {job.symbol:<12} {job.trigger_type:<10} {job.status:<8} "
+              f"{job.verdict or '-':<8} {took:>6} {(job.error or '')[:60]}")
+
+
+if __name__ == "__main__":
+    main()
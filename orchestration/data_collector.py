@@ -3,7 +3,6 @@ I.1: ローカルデータ収集デーモン
 5分ごとにTier1/2銘柄の価格をDexScreenerから取得し、SQLiteに蓄積する。
 最大180日分保持（古いデータは自動パージ）。
 """
-import sqlite3
 import time
 import logging
 import os
@@ -12,6 +11,7 @@ import sys
 sys.path.insert(0, "/docker/openclaw-taan/data/.openclaw/workspace")
 
 from tools.market_data import MarketData
+from core import price_store
 import requests
 
 logger = logging.getLogger("neo.collector")
@@ -25,7 +25,7 @@ _sh.setFormatter(_fmt)
 logger.addHandler(_fh)
 logger.addHandler(_sh)
 
-DB_PATH = "vault/market_db/prices.sqlite"
+DB_PATH = price_store.DB_PATH
 COLLECT_INTERVAL = 300          # 5分
 PURGE_DAYS = 180                # 180日分保持
 PURGE_INTERVAL = 86400          # 1日ごとにパージ
@@ -34,6 +34,7 @@ PURGE_INTERVAL = 86400          # 1日ごとにパージ
 COLLECT_SYMBOLS = ["VIRTUAL", "AIXBT", "LUNA", "BTC", "ETH"]
 
 OHLCV_INTERVAL = 3600           # 60分ごとにOHLCVキャンドル取得
+COLLECTOR_MODE = os.environ.get("NEO_COLLECTOR_MODE", "sync")  # "async" でaiohttp並行収集
 OHLCV_SYMBOLS = {
     "VIRTUAL": "0x3f0296BF652e19bca772EC3dF08b32732F93014A",
     "AIXBT":   "0xf1fdc83c3a336bdbdc9fb06e318b08eaddc82ff4",
@@ -49,26 +50,27 @@ BINANCE_BASE_URL = "https://api.binance.com/api/v3"
 
 
 def get_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS prices (
-            id        INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol    TEXT    NOT NULL,
-            timestamp INTEGER NOT NULL,
-            open      REAL,
-            high      REAL,
-            low       REAL,
-            close     REAL,
-            volume    REAL,
-            UNIQUE(symbol, timestamp)
-        )
-    """)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_symbol_ts ON prices(symbol, timestamp)")
-    conn.commit()
+    # 書き込み専用の長寿命接続（WAL — radar側の読み取りをブロックしない）
+    conn = price_store.open_connection(DB_PATH)
+    price_store.ensure_schema(conn)
     return conn
 
 
+def _passes_deviation_filter(conn, symbol: str, price: float, label: str = "") -> bool:
+    """異常値フィルター: 直近ティックとの乖離が50%超なら棄却（初回データ等は通す）"""
+    try:
+        row = price_store.latest_tick(symbol, conn=conn)
+        if row and row[0] > 0:
+            last_price = row[0]
+            deviation = abs(price - last_price) / last_price
+            if deviation > 0.5:
+                logger.warning(f"⚠️ {symbol} {label}異常値棄却: ${price:.6f} (前回${last_price:.6f}, 乖離{deviation:.1%})")
+                return False
+    except Exception:
+        pass
+    return True
+
+
 def collect_once(conn):
     """全銘柄の現在価格を1件ずつ取得してINSERT"""
     now_ms = int(time.time() * 1000)
@@ -82,21 +84,9 @@ def collect_once(conn):
             price = float(data.get("priceUsd", 0))
             if price == 0:
                 continue
-            # 異常値フィルター: 直近価格との乖離が50%超なら棄却
-            try:
-                row = conn.execute(
-                    "SELECT close FROM prices WHERE symbol=? ORDER BY timestamp DESC LIMIT 1",
-                    (symbol,)
-                ).fetchone()
-                if row and row[0] > 0:
-                    last_price = row[0]
-                    deviation = abs(price - last_price) / last_price
-                    if deviation > 0.5:
-                        logger.warning(f"⚠️ {symbol} 異常値棄却: ${price:.6f} (前回${last_price:.6f}, 乖離{deviation:.1%})")
-                        continue
-            except Exception:
-                pass  # 初回データ等はフィルターなしで通す
-            # スナップショット価格（5分ティック）— open=high=low=closeだがvolume付き
+            if not _passes_deviation_filter(conn, symbol, price):
+                continue
+            # スナップショット価格（5分ティック）— volume付き
             vol_h1 = 0
             try:
                 vol_raw = data.get("volume", {})
@@ -106,11 +96,7 @@ def collect_once(conn):
                     vol_h1 = float(vol_raw or 0)
             except (TypeError, ValueError):
                 vol_h1 = 0
-            conn.execute(
-                "INSERT OR IGNORE INTO prices (symbol, timestamp, open, high, low, close, volume) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (symbol, now_ms, price, price, price, price, vol_h1)
-            )
+            price_store.insert_tick(conn, symbol, now_ms, price, vol_h1)
             inserted += 1
             logger.info(f"  {symbol}: ${price:.6f}")
             time.sleep(1)   # DexScreener負荷対策
@@ -123,10 +109,13 @@ def collect_once(conn):
 def purge_old(conn):
     """180日より古いデータを削除"""
     cutoff_ms = int((time.time() - PURGE_DAYS * 86400) * 1000)
-    cur = conn.execute("DELETE FROM prices WHERE timestamp < ?", (cutoff_ms,))
+    purged = 0
+    for table in ("ticks", "candles", "rollups"):
+        cur = conn.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff_ms,))
+        purged += max(cur.rowcount, 0)
     conn.commit()
-    if cur.rowcount > 0:
-        logger.info(f"Purged {cur.rowcount} old rows (>{PURGE_DAYS}d)")
+    if purged > 0:
+        logger.info(f"Purged {purged} old rows (>{PURGE_DAYS}d)")
 
 
 def collect_ohlcv_candles(conn):
@@ -147,12 +136,8 @@ def collect_ohlcv_candles(conn):
                 o, h, l, c, v = float(candle[1]), float(candle[2]), float(candle[3]), float(candle[4]), float(candle[5])
                 ts_ms = ts_s * 1000
                 try:
-                    conn.execute(
-                        "INSERT OR IGNORE INTO prices (symbol, timestamp, open, high, low, close, volume) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (symbol, ts_ms, o, h, l, c, v)
-                    )
-                    inserted += 1
+                    if price_store.insert_candle(conn, symbol, "4h", ts_ms, o, h, l, c, v, "geckoterminal"):
+                        inserted += 1
                 except Exception:
                     pass
             conn.commit()
@@ -164,82 +149,44 @@ def collect_ohlcv_candles(conn):
     return total_inserted
 
 
-def _aggregate_ticks_to_1h(conn, symbol: str, limit: int) -> list:
-    """5分ティック(flat O=H=L=C)を1時間足OHLCVに集約する。
-    12ティック/時間を集約するので、始値!=終値の本物のキャンドルが得られる。
+def _get_tick_rollups(conn, symbol: str, limit: int, interval: str = "1h") -> list:
+    """5分ティックから逐次集約済みのロールアップ足（1h/4h）を取得する。
+    collectorがティック挿入時に開いている足をUPSERTしているため、集約ループは不要。
     Returns: [[timestamp_ms, open, high, low, close], ...] 昇順
     """
-    # limit時間分 = limit * 12 ティック分を取得（余裕を持って+50%）
-    # フラットティック（DexScreener 5分足）のみ対象。GeckoTerminal 4hキャンドルを除外
-    tick_limit = int(limit * 12 * 1.5)
-    cur = conn.execute(
-        "SELECT timestamp, close FROM prices "
-        "WHERE symbol=? AND (open=high AND high=low AND low=close) "
-        "ORDER BY timestamp DESC LIMIT ?",
-        (symbol.upper(), tick_limit)
-    )
-    ticks = cur.fetchall()
-    if len(ticks) < 2:
+    rows = price_store.recent_rollups(symbol, limit, interval=interval, conn=conn)
+    if not rows or sum(r[5] for r in rows) < 2:
         return []
-    # 昇順に
-    ticks.reverse()
-    # 1時間バケットに集約（timestamp_msを3600000で切り捨て）
-    buckets = {}
-    for ts_ms, price in ticks:
-        hour_key = (ts_ms // 3600000) * 3600000
-        if hour_key not in buckets:
-            buckets[hour_key] = {"open": price, "high": price, "low": price, "close": price}
-        else:
-            b = buckets[hour_key]
-            if price > b["high"]:
-                b["high"] = price
-            if price < b["low"]:
-                b["low"] = price
-            b["close"] = price  # 最後のティックが終値
-    # リスト化して昇順ソート、最新limit件
-    result = []
-    for ts_ms in sorted(buckets.keys()):
-        b = buckets[ts_ms]
-        result.append([ts_ms, b["open"], b["high"], b["low"], b["close"]])
-    # 最新limit件に制限
-    if len(result) > limit:
-        result = result[-limit:]
-    return result
-
-
-def get_ohlcv_from_db(symbol: str, limit: int = 180) -> list:
+    return [[ts, o, h, l, c] for ts, o, h, l, c, _n in reversed(rows)]
+
+
+def get_ohlcv_from_db(symbol: str, limit: int = 180, interval: str = None) -> list:
     """
     SQLiteからOHLCVデータを取得。market_data.pyから呼ばれる。
     優先順位:
-      1. GeckoTerminal由来の本物のOHLCVキャンドル（O!=H or H!=L or L!=C）
-      2. 5分ティックから1時間足に自前集約したキャンドル
+      1. candlesテーブルの本物のOHLCVキャンドル（GeckoTerminal 4h / Binance 1h）
+      2. 5分ティックから逐次集約したロールアップ足（1h・interval=4h指定時は4h）
+    interval省略時は銘柄の既定足（price_store.CANDLE_INTERVALS）
     Returns: [[timestamp_ms, open, high, low, close], ...] or []
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = price_store.get_connection(DB_PATH)
         # Step 1: 本物のOHLCVキャンドルを試行（鮮度チェック付き）
-        cur = conn.execute(
-            "SELECT timestamp, open, high, low, close FROM prices "
-            "WHERE symbol=? AND NOT (open=high AND high=low AND low=close) "
-            "ORDER BY timestamp DESC LIMIT ?",
-            (symbol.upper(), limit)
-        )
-        rows = cur.fetchall()
+        rows = price_store.recent_candles(symbol, limit, interval=interval, conn=conn)
         if len(rows) >= 10:
             newest_ts = rows[0][0]  # DESC順なので先頭が最新
             age_hours = (time.time() * 1000 - newest_ts) / 3600000
             if age_hours <= 6:  # 6時間以内なら本物OHLCVを使用
-                conn.close()
                 rows_list = [list(r) for r in rows]
                 rows_list.reverse()
                 return rows_list
-            logger.info(f"Real OHLCV for {symbol} is stale ({age_hours:.1f}h old), using tick aggregation")
-        # Step 2: 不足時 → 5分ティックから1時間足を自前合成
-        logger.info(f"Real OHLCV insufficient for {symbol} ({len(rows)} rows), aggregating from ticks")
-        agg = _aggregate_ticks_to_1h(conn, symbol, limit)
-        conn.close()
+            logger.info(f"Real OHLCV for {symbol} is stale ({age_hours:.1f}h old), using tick rollups")
+        # Step 2: 不足時 → ティックロールアップ
+        rollup_interval = interval if interval in price_store.ROLLUP_INTERVALS else "1h"
+        logger.info(f"Real OHLCV insufficient for {symbol} ({len(rows)} rows), using {rollup_interval} tick rollups")
+        agg = _get_tick_rollups(conn, symbol, limit, interval=rollup_interval)
         if agg:
-            logger.info(f"Aggregated {len(agg)} 1h candles for {symbol} from ticks")
+            logger.info(f"Loaded {len(agg)} {rollup_interval} rollup candles for {symbol}")
         return agg
     except Exception as e:
         logger.warning(f"DB read error for {symbol}: {e}")
@@ -249,13 +196,7 @@ def get_ohlcv_from_db(symbol: str, limit: int = 180) -> list:
 def get_latest_price_from_db(symbol: str) -> float | None:
     """SQLiteから最新価格を取得（ボラティリティ監視用・API呼び出し削減）"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.execute(
-            "SELECT close, timestamp FROM prices WHERE symbol=? ORDER BY timestamp DESC LIMIT 1",
-            (symbol.upper(),)
-        )
-        row = cur.fetchone()
-        conn.close()
+        row = price_store.latest_tick(symbol, conn=price_store.get_connection(DB_PATH))
         if not row:
             return None
         price, ts = row
@@ -272,20 +213,23 @@ def get_latest_price_from_db(symbol: str) -> float | None:
 def get_db_stats() -> dict:
     """DB統計を返す（確認用）"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = price_store.get_connection(DB_PATH)
         stats = {}
         for symbol in COLLECT_SYMBOLS:
-            cur = conn.execute(
-                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM prices WHERE symbol=?",
+            count, ts_min, ts_max = conn.execute(
+                "SELECT COUNT(*), MIN(ts), MAX(ts) FROM ticks WHERE symbol=?",
                 (symbol,)
-            )
-            count, ts_min, ts_max = cur.fetchone()
+            ).fetchone()
+            candle_count = conn.execute(
+                "SELECT COUNT(*) FROM candles WHERE symbol=?",
+                (symbol,)
+            ).fetchone()[0]
             stats[symbol] = {
                 "count": count,
+                "candles": candle_count,
                 "oldest": ts_min,
                 "newest": ts_max,
             }
-        conn.close()
         return stats
     except Exception:
         return {}
@@ -306,24 +250,9 @@ def collect_binance_ticks(conn):
             price = float(resp.json()["price"])
             if price <= 0:
                 continue
-            # 異常値フィルター（既存と同じロジック）
-            try:
-                row = conn.execute(
-                    "SELECT close FROM prices WHERE symbol=? ORDER BY timestamp DESC LIMIT 1",
-                    (symbol,)
-                ).fetchone()
-                if row and row[0] > 0:
-                    deviation = abs(price - row[0]) / row[0]
-                    if deviation > 0.5:
-                        logger.warning(f"⚠️ {symbol} Binance異常値棄却: ${price:.2f} (前回${row[0]:.2f}, 乖離{deviation:.1%})")
-                        continue
-            except Exception:
-                pass
-            conn.execute(
-                "INSERT OR IGNORE INTO prices (symbol, timestamp, open, high, low, close, volume) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (symbol, now_ms, price, price, price, price, 0)
-            )
+            if not _passes_deviation_filter(conn, symbol, price, label="Binance"):
+                continue
+            price_store.insert_tick(conn, symbol, now_ms, price, 0)
             inserted += 1
             logger.info(f"  {symbol}: ${price:,.2f} (Binance)")
         except Exception as e:
@@ -349,12 +278,8 @@ def collect_binance_ohlcv(conn, limit=24):
                 ts_ms = int(k[0])
                 o, h, l, c = float(k[1]), float(k[2]), float(k[3]), float(k[4])
                 vol = float(k[5])  # Base asset volume
-                conn.execute(
-                    "INSERT OR IGNORE INTO prices (symbol, timestamp, open, high, low, close, volume) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (symbol, ts_ms, o, h, l, c, vol)
-                )
-                inserted += 1
+                if price_store.insert_candle(conn, symbol, "1h", ts_ms, o, h, l, c, vol, "binance"):
+                    inserted += 1
             conn.commit()
             total_inserted += inserted
             logger.info(f"  Binance OHLCV {symbol}: {len(klines)} fetched, {inserted} new")
@@ -368,7 +293,7 @@ def backfill_binance(conn, days=30):
     limit = days * 24  # 1h足 × 日数
     for symbol, pair in BINANCE_SYMBOLS.items():
         cur = conn.execute(
-            "SELECT COUNT(*) FROM prices WHERE symbol=? AND NOT (open=high AND high=low AND low=close)",
+            "SELECT COUNT(*) FROM candles WHERE symbol=? AND interval='1h'",
             (symbol,)
         )
         existing = cur.fetchone()[0]
@@ -390,12 +315,8 @@ def backfill_binance(conn, days=30):
                 o, h, l, c = float(k[1]), float(k[2]), float(k[3]), float(k[4])
                 vol = float(k[5])
                 try:
-                    conn.execute(
-                        "INSERT OR IGNORE INTO prices (symbol, timestamp, open, high, low, close, volume) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (symbol, ts_ms, o, h, l, c, vol)
-                    )
-                    inserted += 1
+                    if price_store.insert_candle(conn, symbol, "1h", ts_ms, o, h, l, c, vol, "binance"):
+                        inserted += 1
                 except Exception:
                     pass
             conn.commit()
@@ -404,15 +325,67 @@ def backfill_binance(conn, days=30):
             logger.error(f"Backfill error {symbol}: {e}")
 
 
-def main():
+def rebuild_rollups(symbol: str = None):
+    """ticksの全履歴から1h/4hロールアップを再構築（バックフィルコマンド）"""
+    conn = get_db()
+    try:
+        t0 = time.time()
+        n = price_store.rebuild_rollups(conn, symbol)
+        logger.info(f"Rollups rebuilt: {n} bars ({symbol or 'all symbols'}) in {time.time() - t0:.1f}s")
+        return n
+    finally:
+        conn.close()
+
+
+def refresh_ohlcv_cache():
+    """prices.sqlite → data/ohlcv_npy のmmapキャッシュを全収集銘柄ぶん再構築"""
+    from core import ohlcv_cache
+    for symbol in COLLECT_SYMBOLS:
+        try:
+            n = ohlcv_cache.refresh_from_db(symbol)
+            logger.info(f"  OHLCV cache {symbol}: {n} rows")
+        except Exception as e:
+            logger.warning(f"OHLCV cache refresh error for {symbol}: {e}")
+
+
+def refresh_feature_store():
+    """npy OHLCVキャッシュの確定足から特徴量ストア（data/features Parquet）へ新しい足だけ追記"""
+    from data_pipeline.feature_store import refresh_all
+    for symbol, n in refresh_all(COLLECT_SYMBOLS).items():
+        logger.info(f"  Feature store {symbol}: +{n} rows")
+
+
+def update_stream_indicators(conn):
+    """core.stream_indicators を今サイクルのティックまで進めてディスクに保存"""
+    from core import stream_indicators
+    try:
+        stream_indicators.sync_all(COLLECT_SYMBOLS, conn=conn)
+    except Exception as e:
+        logger.warning(f"Stream indicator update error: {e}")
+
+
+def _load_async_collector():
+    """非同期コレクターを読み込む（aiohttp未導入なら None → 同期モード）"""
+    try:
+        from orchestration import async_collector
+        return async_collector
+    except ImportError as e:
+        logger.warning(f"Async collector unavailable ({e}), falling back to sync mode")
+        return None
+
+
+def main(mode: str = COLLECTOR_MODE):
     logger.info("=== Neo Data Collector started ===")
     logger.info(f"Symbols: {COLLECT_SYMBOLS}")
     logger.info(f"Interval: {COLLECT_INTERVAL}s | Purge: {PURGE_DAYS}d")
+    async_collector = _load_async_collector() if mode == "async" else None
+    logger.info(f"Mode: {'async' if async_collector else 'sync'}")
 
     conn = get_db()
     last_purge = 0
     last_ohlcv = 0
     last_binance_ohlcv = 0
+    last_ohlcv_cache = 0
     consecutive_errors = 0
 
     # BTC/ETH初回バックフィル（30日分）
@@ -424,13 +397,24 @@ def main():
     while True:
         try:
             logger.info("--- Collecting ---")
-            collect_once(conn)
+            if async_collector:
+                # 全プロバイダを並行取得（OHLCVも60分ごとに同じサイクルへ相乗り）
+                include_ohlcv = time.time() - last_ohlcv > OHLCV_INTERVAL
+                async_collector.collect_cycle(conn, include_ohlcv=include_ohlcv)
+                if include_ohlcv:
+                    last_ohlcv = last_binance_ohlcv = time.time()
+            else:
+                collect_once(conn)
 
             # BTC/ETH 5分ティック（DexScreenerと同じサイクルで）
-            try:
-                collect_binance_ticks(conn)
-            except Exception as e:
-                logger.warning(f"Binance tick collection error: {e}")
+            if not async_collector:
+                try:
+                    collect_binance_ticks(conn)
+                except Exception as e:
+                    logger.warning(f"Binance tick collection error: {e}")
+
+            # ストリーミング指標を新ティックぶん進めてチェックポイント（radar/Scout は復元して差分だけ適用）
+            update_stream_indicators(conn)
 
             # 60分ごとにGeckoTerminal OHLCVキャンドル取得
             if time.time() - last_ohlcv > OHLCV_INTERVAL:
@@ -447,6 +431,12 @@ def main():
                     logger.warning(f"Binance OHLCV error: {e}")
                 last_binance_ohlcv = time.time()
 
+            # 60分ごとにnpy OHLCVキャッシュ再構築（バックテスト/gplearn/FeatureBuilder用）
+            if time.time() - last_ohlcv_cache > OHLCV_INTERVAL:
+                refresh_ohlcv_cache()
+                refresh_feature_store()
+                last_ohlcv_cache = time.time()
+
             # 1日ごとにパージ
             if time.time() - last_purge > PURGE_INTERVAL:
                 purge_old(conn)
@@ -487,4 +477,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    _ap = argparse.ArgumentParser(description="Neo data collector")
+    _ap.add_argument("--rebuild-rollups", action="store_true", help="ticksから1h/4hロールアップを再構築して終了")
+    _ap.add_argument("--symbol", default=None, help="--rebuild-rollups の対象銘柄（省略時は全銘柄）")
+    _ap.add_argument("--async", dest="use_async", action="store_true", help="aiohttp並行収集モードで起動（NEO_COLLECTOR_MODE=async と同等）")
+    _args = _ap.parse_args()
+    if _args.rebuild_rollups:
+        rebuild_rollups(_args.symbol)
+    else:
+        main(mode="async" if _args.use_async else COLLECTOR_MODE)
@@ -27,8 +27,10 @@ def monitor_and_signal():
                 # 1. 最新データ取得
                 df = fetcher.fetch_ohlcv(symbol=symbol, timeframe="1h", limit=100)
                 
-                # 2. 特徴量計算
-                feat_df = FeatureBuilder.build_from_memory(df)
+                # 2. 特徴量（collector 収集銘柄は特徴量ストアの最新行・それ以外はビルド）
+                feat_df = FeatureBuilder.load_from_store(symbol, interval="1h", limit=1)
+                if feat_df.empty:
+                    feat_df = FeatureBuilder.build_from_memory(df)
                 
                 # 3. 最新の1行からシグナル判定
                 # バックテストエンジンのロジックを流用し、最新の意思決定を取得
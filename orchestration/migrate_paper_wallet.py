@@ -0,0 +1,81 @@
+"""
+PaperWallet 移行ツール（一回実行）
+旧 data/paper_wallet.json（状態＋全 history を1ファイルに保持）を
+状態スナップショット＋追記専用の取引台帳（tools.trade_ledger → data/paper_wallet.sqlite）へ移す。
+
+PaperWallet() も台帳が空なら初回読み込み時に同じ取り込みを行うが、本番ではこのツールで
+件数・残高・保有の一致を確認してから運用に戻す。旧 JSON は消さない（--archive で .migrated に改名）。
+
+使い方:
+  python orchestration/migrate_paper_wallet.py                  # 移行＋検証
+  python orchestration/migrate_paper_wallet.py --dry-run        # 件数のみ表示
+  python orchestration/migrate_paper_wallet.py --json /path/to/paper_wallet.json --archive
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import json
+import logging
+import os
+
+from tools.trade_ledger import TradeLedger, ledger_path_for
+
+logger = logging.getLogger("neo.migrate_paper_wallet")
+
+DEFAULT_JSON = "data/paper_wallet.json"
+
+
+def verify(legacy: dict, ledger: TradeLedger) -> list:
+    """旧 JSON と台帳の差分（空リストなら一致）"""
+    problems = []
+    history = legacy.get("history", [])
+    migrated = ledger.history()
+    if len(migrated) != len(history):
+        problems.append(f"trade count {len(migrated)} != {len(history)}")
+    else:
+        for i, (a, b) in enumerate(zip(history, migrated)):
+            if any(b.get(k) != v for k, v in a.items()):
+                problems.append(f"trade #{i} differs: {a} != {b}")
+                break
+    state = ledger.load_state() or {}
+    for key in ("usd_balance", "holdings", "created_at"):
+        if state.get(key) != legacy.get(key):
+            problems.append(f"{key} differs")
+    return problems
+
+
+def migrate(json_path: str, ledger_path: str = None, dry_run: bool = False, archive: bool = False) -> dict:
+    ledger_path = ledger_path or ledger_path_for(json_path)
+    with open(json_path) as f:
+        legacy = json.load(f)
+    n = len(legacy.get("history", []))
+    result = {"json": json_path, "ledger": ledger_path, "trades": n, "holdings": len(legacy.get("holdings", {}))}
+    if dry_run:
+        return result
+    ledger = TradeLedger(ledger_path)
+    state = {k: v for k, v in legacy.items() if k != "history"}
+    result["imported"] = ledger.import_history(legacy.get("history", []), state)
+    if not result["imported"]:
+        logger.warning(f"{ledger_path} already has a wallet snapshot — import skipped (verifying only)")
+    result["problems"] = verify(legacy, ledger)
+    if archive and not result["problems"]:
+        os.replace(json_path, json_path + ".migrated")
+        result["archived"] = json_path + ".migrated"
+    return result
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    ap = argparse.ArgumentParser(description="paper_wallet.json → snapshot + trade ledger migration")
+    ap.add_argument("--json", default=DEFAULT_JSON)
+    ap.add_argument("--ledger", default=None, help="台帳のパス（既定: JSON と同じ場所の .sqlite）")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--archive", action="store_true", help="検証に通ったら旧 JSON を .migrated に改名")
+    args = ap.parse_args()
+    result = migrate(args.json, args.ledger, dry_run=args.dry_run, archive=args.archive)
+    print(result)
+    if result.get("problems"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
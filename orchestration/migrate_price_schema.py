@@ -0,0 +1,124 @@
+"""
+prices.sqlite スキーマ移行ツール（一回実行）
+旧 prices テーブル（5分ティックと本物のキャンドルが混在）を
+ticks / candles テーブル（WITHOUT ROWID・複合主キー）へ移行する。
+
+判別は移行時に一度だけ行う:
+  open=high=low=close の行 → ticks
+  それ以外               → candles（足の長さ・取得元は銘柄設定から決定）
+
+使い方:
+  python orchestration/migrate_price_schema.py            # 移行（旧テーブルは prices_legacy に改名して保持）
+  python orchestration/migrate_price_schema.py --dry-run  # 件数のみ表示
+  python orchestration/migrate_price_schema.py --drop-legacy
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import logging
+
+from core import price_store
+
+logger = logging.getLogger("neo.migrate_price_schema")
+
+LEGACY_TABLE = "prices"
+ARCHIVE_TABLE = "prices_legacy"
+
+# 旧テーブル由来キャンドルの取得元（data_collector の収集設定に対応）
+CANDLE_SOURCES = {
+    "VIRTUAL": "geckoterminal",
+    "AIXBT":   "geckoterminal",
+    "BTC":     "binance",
+    "ETH":     "binance",
+}
+
+_INTERVAL_MS = {"1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+
+
+def _table_exists(conn, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+    return row is not None
+
+
+def _infer_interval(conn, symbol: str) -> str:
+    """設定外の銘柄はキャンドル間隔の最頻値から足の長さを推定"""
+    if symbol in price_store.CANDLE_INTERVALS:
+        return price_store.CANDLE_INTERVALS[symbol]
+    rows = conn.execute(
+        f"SELECT timestamp FROM {LEGACY_TABLE} "
+        "WHERE symbol=? AND NOT (open=high AND high=low AND low=close) ORDER BY timestamp",
+        (symbol,)
+    ).fetchall()
+    gaps = {}
+    for (a,), (b,) in zip(rows, rows[1:]):
+        gaps[b - a] = gaps.get(b - a, 0) + 1
+    if gaps:
+        mode_gap = max(gaps, key=gaps.get)
+        for name, ms in _INTERVAL_MS.items():
+            if mode_gap == ms:
+                return name
+    return price_store.DEFAULT_CANDLE_INTERVAL
+
+
+def migrate(path: str = price_store.DB_PATH, dry_run: bool = False, drop_legacy: bool = False) -> dict:
+    conn = price_store.open_connection(path)
+    try:
+        if not _table_exists(conn, LEGACY_TABLE):
+            logger.info(f"No legacy '{LEGACY_TABLE}' table in {path} — nothing to migrate")
+            price_store.ensure_schema(conn)
+            return {"ticks": 0, "candles": 0, "status": "nothing_to_migrate"}
+
+        symbols = [r[0] for r in conn.execute(f"SELECT DISTINCT symbol FROM {LEGACY_TABLE}")]
+        n_ticks = conn.execute(
+            f"SELECT COUNT(*) FROM {LEGACY_TABLE} WHERE open=high AND high=low AND low=close"
+        ).fetchone()[0]
+        n_candles = conn.execute(
+            f"SELECT COUNT(*) FROM {LEGACY_TABLE} WHERE NOT (open=high AND high=low AND low=close)"
+        ).fetchone()[0]
+        logger.info(f"Legacy rows: ticks={n_ticks} candles={n_candles} symbols={symbols}")
+        if dry_run:
+            return {"ticks": n_ticks, "candles": n_candles, "status": "dry_run"}
+
+        price_store.ensure_schema(conn)
+        with conn:  # 単一トランザクション — 途中失敗時は全ロールバック
+            conn.execute(
+                "INSERT OR IGNORE INTO ticks (symbol, ts, price, volume) "
+                f"SELECT symbol, timestamp, close, volume FROM {LEGACY_TABLE} "
+                "WHERE open=high AND high=low AND low=close"
+            )
+            for symbol in symbols:
+                interval = _infer_interval(conn, symbol)
+                source = CANDLE_SOURCES.get(symbol, "legacy")
+                conn.execute(
+                    "INSERT OR IGNORE INTO candles (symbol, interval, ts, o, h, l, c, v, source) "
+                    f"SELECT symbol, ?, timestamp, open, high, low, close, volume, ? FROM {LEGACY_TABLE} "
+                    "WHERE symbol=? AND NOT (open=high AND high=low AND low=close)",
+                    (interval, source, symbol)
+                )
+                logger.info(f"  {symbol}: candles → interval={interval} source={source}")
+            if drop_legacy:
+                conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+            else:
+                conn.execute(f"DROP TABLE IF EXISTS {ARCHIVE_TABLE}")
+                conn.execute(f"ALTER TABLE {LEGACY_TABLE} RENAME TO {ARCHIVE_TABLE}")
+        n_rollups = price_store.rebuild_rollups(conn)
+        logger.info(f"Rollups rebuilt from ticks: {n_rollups} bars")
+        conn.execute("VACUUM")
+        logger.info(f"Migration complete: ticks={n_ticks} candles={n_candles} "
+                    f"({'dropped' if drop_legacy else 'kept as ' + ARCHIVE_TABLE})")
+        return {"ticks": n_ticks, "candles": n_candles, "status": "migrated"}
+    finally:
+        conn.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [Migrate] %(message)s")
+    ap = argparse.ArgumentParser(description="prices → ticks/candles schema migration")
+    ap.add_argument("--db", default=price_store.DB_PATH)
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--drop-legacy", action="store_true", help="旧prices表を保持せず削除")
+    args = ap.parse_args()
+    print(migrate(args.db, dry_run=args.dry_run, drop_legacy=args.drop_legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,13 +19,12 @@ except ImportError:
     HAS_EMPYRICAL = False
 
 from core.blackboard import NeoBlackboard
+from tools.lot_matcher import LotBook
 
 
 def _parse_log(log_path):
-    """paper_trade.logからBUY/SELLエントリを抽出してペアリング"""
-    buys = defaultdict(list)   # symbol -> [{"timestamp","price","amount_usd"}]
-    sells = defaultdict(list)  # symbol -> [{"timestamp","price","amount_usd"}]
-
+    """paper_trade.logからBUY/SELLエントリを抽出（ログ順の取引レコード・数量は amount_usd/price で照合）"""
+    trades = []
     pattern = re.compile(
         r"\[(.*?)\] (.*?): \$(.*?) \| Action: (BUY|SELL|WAIT) \| Amount: \$(.*?) \|"
     )
@@ -35,131 +34,65 @@ def _parse_log(log_path):
             if not m:
                 continue
             timestamp, symbol, price_str, action, amount_str = m.groups()
-            clean_symbol = symbol.split('/')[0].strip()
             try:
                 price = float(price_str)
                 amount_usd = float(amount_str)
             except ValueError:
                 continue
-
-            if action == "BUY" and amount_usd > 0:
-                buys[clean_symbol].append({
-                    "timestamp": timestamp,
-                    "price": price,
-                    "amount_usd": amount_usd
-                })
-            elif action == "SELL" and amount_usd > 0:
-                sells[clean_symbol].append({
-                    "timestamp": timestamp,
-                    "price": price,
-                    "amount_usd": amount_usd
-                })
-
-    return buys, sells
+            if action in ("BUY", "SELL") and amount_usd > 0:
+                trades.append({"timestamp": timestamp, "symbol": symbol, "action": action,
+                               "price": price, "amount_usd": amount_usd})
+    return trades
 
 
 def _parse_wallet_history():
-    """PaperWalletのhistoryから直接BUY/SELLエントリを取得（最も正確なソース）
-    
+    """PaperWalletのFIFOロット照合（tools.lot_matcher）から決済レコードと未決済ロットを取得（最も正確なソース）
+
     ウォレットリセット後のゴーストBUY対策:
-    現在のholdingsに存在しないシンボルで、BUY数>SELL数の場合、
-    FIFOで決済されない余剰BUYはリセットにより無効化されたものとみなす。
-    → SELLでカバーされる分のBUYのみを残す。
+    現在のholdingsに存在しないシンボルの未決済ロットはリセットにより無効化されたものとみなし、
+    保有中シンボルのロットだけを open_buys に残す（決済済み分はFIFOで消し込まれている）。
     """
-    import json
+    from tools.paper_wallet import PaperWallet
     wallet_path = BASE_DIR / "data" / "paper_wallet.json"
-    buys = defaultdict(list)
-    sells = defaultdict(list)
-    
+    closed, open_buys = [], defaultdict(list)
+
     try:
-        with open(wallet_path) as f:
-            data = json.load(f)
-        
-        # 現在のholdingsを取得（amount>0のシンボルのみ）
-        holdings = {}
-        for sym, info in data.get("holdings", {}).items():
-            amt = info.get("amount", 0) if isinstance(info, dict) else 0
-            if amt > 0:
-                holdings[sym.upper()] = amt
-        
-        for h in data.get("history", []):
-            action = h.get("action", "").upper()
-            symbol = h.get("symbol", "").split("/")[0].strip().upper()
-            price = float(h.get("price", 0))
-            amount_usd = float(h.get("amount_usd", 0))
-            amount_token = float(h.get("amount_token", 0))
-            timestamp = h.get("timestamp", "")
-            
-            if action == "BUY" and amount_token > 0:
-                buys[symbol].append({"timestamp": timestamp, "price": price, "amount_usd": amount_usd, "amount_token": amount_token})
-            elif action == "SELL" and amount_token > 0:
-                sells[symbol].append({"timestamp": timestamp, "price": price, "amount_usd": amount_usd, "amount_token": amount_token})
-        
-        # ゴーストBUY除外: holdingsにないシンボルはSELL分だけBUYを残す
-        for symbol in list(buys.keys()):
-            if symbol not in holdings:
-                sell_total_token = sum(s["amount_token"] for s in sells.get(symbol, []))
-                if sell_total_token == 0:
-                    # SELLもない → 全BUYがリセットで無効化
-                    removed = len(buys[symbol])
-                    del buys[symbol]
-                    print(f"  🧹 {symbol}: BUY {removed}件除外（holdings空・SELL履歴なし）")
-                else:
-                    # SELLがある → SELLでカバーされるBUYのみ残す（FIFO）
-                    trimmed_buys = []
-                    cumulative_token = 0
-                    for b in buys[symbol]:
-                        cumulative_token += b["amount_token"]
-                        trimmed_buys.append(b)
-                        if cumulative_token >= sell_total_token:
-                            break
-                    removed = len(buys[symbol]) - len(trimmed_buys)
-                    if removed > 0:
-                        buys[symbol] = trimmed_buys
-                        print(f"  🧹 {symbol}: BUY {removed}件除外（リセットによるゴースト）")
-        
+        wallet = PaperWallet(data_path=str(wallet_path))
+        holdings = {sym.upper() for sym, info in wallet.state.get("holdings", {}).items()
+                    if isinstance(info, dict) and info.get("amount", 0) > 0}
+        lots = wallet.lots()
+        closed = lots.closed_trades()
+        ghosts = defaultdict(int)
+        for lot in lots.open_lots():
+            if lot["symbol"] in holdings:
+                open_buys[lot["symbol"]].append(lot)
+            else:
+                ghosts[lot["symbol"]] += 1
+        for symbol, removed in ghosts.items():
+            print(f"  🧹 {symbol}: BUY {removed}件除外（リセットによるゴースト）")
     except Exception as e:
         print(f"⚠️ Wallet history parse error: {e}")
-    
-    return buys, sells
+
+    return closed, dict(open_buys)
 
 
-def _calc_closed_trades(buys, sells):
+def _calc_closed_trades(records, open_lots):
     """
-    決済済み取引のPnLを計算（FIFOマッチング）
-    戻り値: closed=[{symbol, entry_price, exit_price, pnl_pct}], open_buys={symbol:[...]}
+    FIFO照合済みの決済レコード・未決済ロットを評価用の形に整える
+    戻り値: closed=[{symbol, entry_price, exit_price, amount_usd, pnl_pct, sell_time}], open_buys={symbol:[...]}
     """
-    closed = []
-    open_buys = {}
-
-    all_symbols = set(list(buys.keys()) + list(sells.keys()))
-    for symbol in all_symbols:
-        buy_queue = list(buys.get(symbol, []))   # FIFO
-        sell_list = list(sells.get(symbol, []))
-
-        remaining_buys = list(buy_queue)
-        for sell in sell_list:
-            sell_token_left = sell["amount_token"]
-            while sell_token_left > 0.0001 and remaining_buys:
-                buy = remaining_buys[0]
-                matched_token = min(buy["amount_token"], sell_token_left)
-                pnl_pct = (sell["price"] - buy["price"]) / buy["price"] * 100
-                matched_usd = round(matched_token * buy["price"], 2)
-                closed.append({
-                    "symbol": symbol,
-                    "entry_price": buy["price"],
-                    "exit_price": sell["price"],
-                    "amount_usd": matched_usd,
-                    "pnl_pct": round(pnl_pct, 2),
-                    "sell_time": sell.get("timestamp", "")
-                })
-                sell_token_left -= matched_token
-                buy["amount_token"] -= matched_token
-                if buy["amount_token"] <= 0.0001:
-                    remaining_buys.pop(0)
-
-        if remaining_buys:
-            open_buys[symbol] = remaining_buys
+    closed = [{
+        "symbol": r["symbol"],
+        "entry_price": r["entry_price"],
+        "exit_price": r["exit_price"],
+        "amount_usd": round(r["amount_usd"], 2),
+        "pnl_pct": round(r["pnl_pct"], 2),
+        "sell_time": r["sell_ts"] or "",
+    } for r in records]
+    open_buys = {symbol: [{"timestamp": lot["timestamp"], "price": lot["price"],
+                           "amount_usd": round(lot["amount_token"] * lot["price"], 2),
+                           "amount_token": lot["amount_token"]} for lot in lots]
+                 for symbol, lots in open_lots.items()}
 
     # 時系列順にソート（直近5件表示用）
     closed.sort(key=lambda x: x.get("sell_time", ""))
@@ -174,18 +107,19 @@ def evaluate_performance(send_dashboard: bool = False):
         print("⚠️ Log file not found.")
         return
 
-    # PaperWallet historyを優先（最も正確なソース）
+    # PaperWallet のロット照合を優先（最も正確なソース）
     try:
-        buys, sells = _parse_wallet_history()
+        records, open_lots = _parse_wallet_history()
         source = "PaperWallet"
     except Exception:
-        buys, sells = {}, {}
+        records, open_lots = [], {}
         source = "none"
     
-    # フォールバック: wallet historyが空ならpaper_trade.logを使用
-    if not buys and not sells:
+    # フォールバック: wallet historyが空ならpaper_trade.logを同じFIFO照合に通す
+    if not records and not open_lots:
         try:
-            buys, sells = _parse_log(log_path)
+            records, book = LotBook.match(_parse_log(log_path))
+            open_lots = {s: book.open_lots(s) for s in book.lots if book.lots[s]}
             source = "paper_trade.log"
         except Exception as e:
             print(f"⚠️ Log parse error: {e}")
@@ -194,7 +128,7 @@ def evaluate_performance(send_dashboard: bool = False):
     print(f"  📂 データソース: {source}")
 
     # 決済済み取引の勝率
-    closed, open_buys = _calc_closed_trades(buys, sells)
+    closed, open_buys = _calc_closed_trades(records, open_lots)
     closed_wins = sum(1 for t in closed if t["pnl_pct"] > 0)
     closed_total = len(closed)
     closed_accuracy = (closed_wins / closed_total * 100) if closed_total > 0 else 0.0
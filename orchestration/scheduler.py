@@ -0,0 +1,135 @@
+"""
+radar 用 asyncio スケジューラ（レーン別スレッド・タイムアウト・ジッタ・多重起動防止）
+旧 start_hybrid_radar は1スレッドの while ループで cycle_count % N == 0 のジョブ（Evaluator・Capital Flow Radar・
+Sweep・Moltbook Engager・Heartbeat・Nightly）と出口判定・Council 召集を順番に回していたため、
+run_sweep（ScoutCrew の LLM 呼び出し＋銘柄ごと sleep）や Engager が数分かかるとその間 TP/SL 判定が止まっていた。
+
+- Job: 名前・同期関数・間隔（秒）・レーン・タイムアウト・ジッタ・初回遅延
+- レーン = 専用スレッドプール。ジョブ本体はレーンのスレッドで動き、イベントループは時刻管理だけを行う
+  LANE_EXIT（出口判定）/ LANE_COUNCIL（トリガー監視・Council 召集）/ LANE_BACKGROUND（定期リサーチ・報告）
+  Python のスレッドに優先度はないので、最優先の出口レーンは実行枠を他のジョブと共有しないことで保証する
+- 同じジョブは重ねて起動しない（前回が終わるまで次の回は来ない。間隔を超えた分の回はまとめて1回）
+- タイムアウトはスレッドを止められないので「超過を記録して待ち続ける」（計測はレーンで実行が始まってから）
+- 次回 = 前回開始 + interval + 0〜jitter 秒（前回が長引いて過ぎていれば終わり次第すぐ）
+"""
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("neo.scheduler")
+
+LANE_EXIT = "exit"
+LANE_COUNCIL = "council"
+LANE_BACKGROUND = "background"
+# レーン別スレッド数（background を1本にして定期ジョブ同士は旧ループと同じく直列に保つ）
+LANE_WORKERS = {LANE_EXIT: 1, LANE_COUNCIL: 1, LANE_BACKGROUND: 1}
+MIN_GAP_SEC = 1.0   # 同じジョブの連続起動の最小間隔（interval=0 のジョブがすぐ戻っても空回りしない）
+
+
+class Job:
+    """定期ジョブ1件の設定と実行記録"""
+
+    def __init__(self, name: str, fn: Callable[[], None], interval: float, lane: str = LANE_BACKGROUND,
+                 timeout: Optional[float] = None, jitter: float = 0.0, first_delay: Optional[float] = None):
+        self.name = name
+        self.fn = fn
+        self.interval = float(interval)
+        self.lane = lane
+        self.timeout = timeout
+        self.jitter = float(jitter)
+        self.first_delay = self.interval if first_delay is None else float(first_delay)
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0          # 前回が長引いて見送った回数
+        self.running = False
+        self.last_started = 0.0
+        self.last_duration = 0.0
+
+
+class Scheduler:
+    """レーン別スレッドプールで定期ジョブを回す asyncio スケジューラ"""
+
+    def __init__(self, lanes: Dict[str, int] = None):
+        self.lanes = {**LANE_WORKERS, **(lanes or {})}
+        self.jobs: List[Job] = []
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._stopping = False
+
+    def add(self, name: str, fn: Callable[[], None], interval: float, lane: str = LANE_BACKGROUND,
+            timeout: Optional[float] = None, jitter: float = 0.0, first_delay: Optional[float] = None) -> Job:
+        if lane not in self.lanes:
+            raise ValueError(f"unknown lane: {lane}")
+        job = Job(name, fn, interval, lane, timeout, jitter, first_delay)
+        self.jobs.append(job)
+        return job
+
+    def stop(self):
+        self._stopping = True
+
+    def status(self) -> List[Dict]:
+        return [{"name": j.name, "lane": j.lane, "runs": j.runs, "failures": j.failures, "timeouts": j.timeouts,
+                 "skipped": j.skipped, "running": j.running, "last_duration": round(j.last_duration, 1)}
+                for j in self.jobs]
+
+    # ================================================================
+    # 実行
+    # ================================================================
+    def run_forever(self):
+        asyncio.run(self.run())
+
+    async def run(self):
+        self._stopping = False
+        self._executors = {lane: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"neo-{lane}")
+                           for lane, n in self.lanes.items()}
+        try:
+            await asyncio.gather(*(self._loop(job) for job in self.jobs))
+        finally:
+            for ex in self._executors.values():
+                ex.shutdown(wait=False, cancel_futures=True)
+
+    async def _loop(self, job: Job):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(job.first_delay + random.uniform(0, job.jitter))
+        while not self._stopping:
+            started = loop.time()
+            await self._execute(job)
+            elapsed = loop.time() - started
+            if job.interval > 0 and elapsed > job.interval:
+                job.skipped += int(elapsed // job.interval)
+            await asyncio.sleep(max(MIN_GAP_SEC - elapsed, job.interval - elapsed, 0.0) + random.uniform(0, job.jitter))
+
+    async def _execute(self, job: Job):
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        fut = loop.run_in_executor(self._executors[job.lane], self._call, job, loop, started)
+        if job.timeout:
+            # レーンの待ち行列にいる間は数えない
+            waiter = asyncio.ensure_future(started.wait())
+            await asyncio.wait({fut, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not fut.done():
+                done, _ = await asyncio.wait({fut}, timeout=job.timeout)
+                if not done:
+                    job.timeouts += 1
+                    logger.warning(f"[Scheduler] {job.name} が {job.timeout:.0f}s を超過 — 終わるまで次の回は見送り")
+        await fut
+
+    @staticmethod
+    def _call(job: Job, loop: asyncio.AbstractEventLoop, started: asyncio.Event):
+        loop.call_soon_threadsafe(started.set)
+        job.running = True
+        job.last_started = time.time()
+        t = time.monotonic()
+        try:
+            job.fn()
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"[Scheduler] {job.name} エラー: {e}", exc_info=True)
+        finally:
+            job.runs += 1
+            job.last_duration = time.monotonic() - t
+            job.running = False
@@ -1,6 +1,6 @@
 """
 M.2: quantstatsによるHTMLティアシート生成
-Nightly Batch実行時に paper_trade.log からリターン系列を生成し
+Nightly Batch実行時に PaperWallet の決済レコード（無ければ paper_trade.log）からリターン系列を生成し
 HTMLレポートを出力する
 """
 import re
@@ -8,58 +8,44 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
 BASE_DIR = Path("/docker/openclaw-taan/data/.openclaw/workspace")
 OUTPUT_DIR = BASE_DIR / "data" / "tearsheets"
 
 def _parse_closed_trades(log_path: Path) -> list:
-    """paper_trade.logから決済済み取引のPnL系列を生成（FIFOマッチング）"""
-    buys = defaultdict(list)
-    sells = defaultdict(list)
-    pattern = re.compile(
-        r"\[(.*?)\] (.*?): \$(.*?) \| Action: (BUY|SELL) \| Amount: \$([\d.]+) \|"
-    )
-    with open(log_path, "r", encoding="utf-8") as f:
-        for line in f:
-            m = pattern.search(line)
-            if not m:
-                continue
-            timestamp, symbol, price_str, action, amount_str = m.groups()
-            clean_symbol = symbol.split('/')[0].strip()
-            try:
-                price = float(price_str)
-                amount_usd = float(amount_str)
-            except ValueError:
-                continue
-            if amount_usd <= 0:
-                continue
-            entry = {"timestamp": timestamp, "price": price, "amount_usd": amount_usd}
-            if action == "BUY":
-                buys[clean_symbol].append(entry)
-            else:
-                sells[clean_symbol].append(entry)
+    """決済済み取引のPnL系列（FIFOロット照合 tools.lot_matcher）。
+    PaperWallet の決済レコードを優先し、空なら paper_trade.log を同じ照合に通す"""
+    from tools.lot_matcher import LotBook
+    from tools.paper_wallet import PaperWallet
+    try:
+        records = PaperWallet(data_path=str(BASE_DIR / "data" / "paper_wallet.json")).lots().closed_trades()
+    except Exception as e:
+        print(f"⚠️ [Tearsheet] Wallet lot parse error: {e}")
+        records = []
+    if not records and log_path.exists():
+        pattern = re.compile(
+            r"\[(.*?)\] (.*?): \$(.*?) \| Action: (BUY|SELL) \| Amount: \$([\d.]+) \|"
+        )
+        trades = []
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = pattern.search(line)
+                if not m:
+                    continue
+                timestamp, symbol, price_str, action, amount_str = m.groups()
+                try:
+                    trades.append({"timestamp": timestamp, "symbol": symbol, "action": action,
+                                   "price": float(price_str), "amount_usd": float(amount_str)})
+                except ValueError:
+                    continue
+        records, _ = LotBook.match(trades)
 
-    # FIFOマッチング
-    closed = []
-    for symbol in set(list(buys.keys()) + list(sells.keys())):
-        remaining = list(buys.get(symbol, []))
-        for sell in sells.get(symbol, []):
-            sell_left = sell["amount_usd"]
-            while sell_left > 0 and remaining:
-                buy = remaining[0]
-                matched = min(buy["amount_usd"], sell_left)
-                pnl_pct = (sell["price"] - buy["price"]) / buy["price"]
-                closed.append({
-                    "timestamp": sell["timestamp"],
-                    "symbol": symbol,
-                    "pnl_pct": pnl_pct,
-                    "amount_usd": matched
-                })
-                sell_left -= matched
-                buy["amount_usd"] -= matched
-                if buy["amount_usd"] <= 0:
-                    remaining.pop(0)
+    closed = [{
+        "timestamp": r["sell_ts"],
+        "symbol": r["symbol"],
+        "pnl_pct": r["pnl_pct"] / 100,
+        "amount_usd": r["amount_usd"]
+    } for r in records]
     closed.sort(key=lambda x: x["timestamp"])
     return closed
 
@@ -77,10 +63,6 @@ def generate_tearsheet() -> str | None:
         return None
 
     log_path = BASE_DIR / "paper_trade.log"
-    if not log_path.exists():
-        print("⚠️ [Tearsheet] paper_trade.log が見つかりません")
-        return None
-
     closed = _parse_closed_trades(log_path)
     if len(closed) < 3:
         print(f"⚠️ [Tearsheet] 決済済み取引が{len(closed)}件（最低3件必要）。スキップ。")
@@ -17,6 +17,7 @@ sys.path.append(str(BASE_DIR))
 
 from core.blackboard import NeoBlackboard
 from core.memory_db import NeoMemoryDB
+from core import cache_store
 
 logger = logging.getLogger("neo.vp_discovery")
 
@@ -28,7 +29,7 @@ MAX_SYMBOLS      = 10           # Sweep監視リスト上限
 # 固定銘柄（常に含める）
 CORE_SYMBOLS = ["VIRTUAL", "AIXBT", "LUNA"]
 
-DISCOVERY_CACHE = Path("data/vp_discovery_cache.json")
+DISCOVERY_CACHE_NS  = "vp_discovery"   # core.cache_store のnamespace（key="latest"）
 
 
 def _fetch_vp_ecosystem() -> list:
@@ -85,24 +86,18 @@ def run_vp_discovery() -> dict:
     new_symbols = CORE_SYMBOLS + [c["symbol"] for c in non_core[:MAX_SYMBOLS - len(CORE_SYMBOLS)]]
 
     # 現在の監視リストと比較
-    prev_cache = {}
-    if DISCOVERY_CACHE.exists():
-        try:
-            prev_cache = json.loads(DISCOVERY_CACHE.read_text())
-        except Exception:
-            pass
+    prev_cache = cache_store.get(DISCOVERY_CACHE_NS, "latest") or {}
     prev_symbols = prev_cache.get("symbols", CORE_SYMBOLS)
 
     added   = [s for s in new_symbols if s not in prev_symbols]
     removed = [s for s in prev_symbols if s not in new_symbols and s not in CORE_SYMBOLS]
 
     # キャッシュ更新
-    DISCOVERY_CACHE.parent.mkdir(parents=True, exist_ok=True)
-    DISCOVERY_CACHE.write_text(json.dumps({
+    cache_store.put(DISCOVERY_CACHE_NS, "latest", {
         "symbols":    new_symbols,
         "scanned_at": datetime.now(timezone.utc).isoformat(),
         "qualified":  qualified,
-    }, ensure_ascii=False))
+    })
 
     # Blackboardの監視リストを更新
     try:
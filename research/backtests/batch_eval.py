@@ -0,0 +1,168 @@
+"""
+MACD/RSI パラメータ候補の一括評価（param_optimizer のバッチモード用）
+optuna の逐次試行（試行ごとに ta.macd + _manual_sharpe）を、全候補まとめての配列計算に置き換える。
+
+- ema_matrix: 複数スパンのEMAを時間方向1パスで同時計算（スパン方向はベクトル化）。
+  pandas_ta.ema（先頭length本のSMAを種にした ewm(adjust=False)）と同じ再帰式・同じ浮動小数演算順
+- macd_grid: 全 (fast, slow) の MACD線 → 全 signal のシグナル線を行列で作り、クロス判定も行列演算
+- 採点は trade_kernel.simulate_trades（shift=False）で候補ごとに _manual_sharpe と同一の値を返す
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from research.backtests.trade_kernel import simulate_trades, sharpe_ratio
+
+INVALID = -999.0     # optuna 目的関数と同じ「評価不能」値
+CHUNK = 512          # signal EMA を同時計算する列数（n本×CHUNK×8byte）
+
+
+def manual_sharpe(close, entries, exits, fees: float = 0.001) -> Tuple[float, int]:
+    """vectorbt不使用の手動バックテスト + Sharpe計算（シグナル当日足で約定・シフトなし）"""
+    sim = simulate_trades(close, entries, exits, fees=fees, shift=False)
+    n = len(sim.returns)
+    if n < 2:
+        return 0.0, n
+    sharpe = sharpe_ratio(sim.returns)  # std≈0・非有限・|SR|>100 は None（v6.5q）
+    if sharpe is None:
+        return 0.0, n
+    return round(sharpe, 3), n
+
+
+def _alpha(span: np.ndarray) -> np.ndarray:
+    """pandas ewm(span=) と同じ式で alpha を求める（com 経由）"""
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+def _ewm_columns(x: np.ndarray, start: np.ndarray, span: np.ndarray) -> np.ndarray:
+    """
+    x: (n, k) 列ごとの入力。列 j は start[j] 行目から有効（それ以前は NaN 扱い）。
+    pandas_ta.ema と同じく start+span-1 行目に先頭span本のSMAを置き、以降を ewm(adjust=False) で更新。
+    """
+    n, k = x.shape
+    out = np.full((n, k), np.nan)
+    alpha = _alpha(span.astype(np.float64))
+    old_wt = 1.0 - alpha
+    denom = old_wt + alpha      # pandas の正規化（1.0 にならない場合があるのでそのまま割る）
+    seed_row = start + span - 1
+    valid = seed_row < n
+    # 種（SMA）: 累積和ではなく区間ごとの mean で pandas_ta と同じ丸めにする
+    seeds = np.full(k, np.nan)
+    for j in np.flatnonzero(valid):
+        seeds[j] = x[start[j]:seed_row[j] + 1, j].mean()
+    prev = np.full(k, np.nan)
+    first = int(seed_row[valid].min()) if valid.any() else n
+    for t in range(first, n):
+        cur = x[t]
+        upd = (old_wt * prev + alpha * cur) / denom
+        upd = np.where(prev == cur, prev, upd)
+        hit = seed_row == t
+        if hit.any():
+            upd[hit] = seeds[hit]
+        prev = upd
+        out[t] = upd
+    return out
+
+
+def ema_matrix(close: np.ndarray, spans: Sequence[int]) -> np.ndarray:
+    """(n, len(spans)) の EMA 行列（pandas_ta.ema(close, length=span) 相当）"""
+    c = np.asarray(close, dtype=np.float64)
+    spans = np.asarray(spans, dtype=np.int64)
+    x = np.repeat(c[:, None], len(spans), axis=1)
+    return _ewm_columns(x, np.zeros(len(spans), dtype=np.int64), spans)
+
+
+def _cross_up(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(a > b) & (a.shift(1) <= b.shift(1))（NaN比較は False）— 列方向に計算"""
+    out = np.zeros(a.shape, dtype=bool)
+    out[1:] = (a[1:] > b[1:]) & (a[:-1] <= b[:-1])
+    return out
+
+
+def _cross_down(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    out = np.zeros(a.shape, dtype=bool)
+    out[1:] = (a[1:] < b[1:]) & (a[:-1] >= b[:-1])
+    return out
+
+
+def macd_grid(close, fasts: Iterable[int], slows: Iterable[int], signals: Iterable[int],
+              candidates: List[Tuple[int, int, int]] = None) -> List[dict]:
+    """
+    候補 (fast, slow, signal) をまとめて採点する。candidates 省略時は fast<slow の全組合せ。
+    戻り値: [{"fast", "slow", "signal", "sharpe", "trades"}]（optuna 目的関数と同じ値・INVALID含む）
+    """
+    c = np.asarray(close, dtype=np.float64)
+    if candidates is None:
+        candidates = [(f, s, g) for f in fasts for s in slows for g in signals if f < s]
+    if not candidates:
+        return []
+    spans = sorted({p for f, s, _ in candidates for p in (f, s)})
+    ema = ema_matrix(c, spans)
+    col = {span: i for i, span in enumerate(spans)}
+
+    pairs = sorted({(f, s) for f, s, _ in candidates})
+    pair_idx = {p: i for i, p in enumerate(pairs)}
+    macd = np.stack([ema[:, col[f]] - ema[:, col[s]] for f, s in pairs], axis=1)
+    # MACD線の有効開始行（pandas_ta は first_valid_index 以降にシグナルEMAをかける）
+    macd_start = np.array([s - 1 for _, s in pairs], dtype=np.int64)
+
+    results = []
+    for lo in range(0, len(candidates), CHUNK):
+        chunk = candidates[lo:lo + CHUNK]
+        cols = np.array([pair_idx[(f, s)] for f, s, _ in chunk])
+        line = macd[:, cols]
+        sig = _ewm_columns(line, macd_start[cols], np.array([g for _, _, g in chunk]))
+        entries = _cross_up(line, sig).T.copy()
+        exits = _cross_down(line, sig).T.copy()
+        n_entries = entries.sum(axis=1)
+        for j, (f, s, g) in enumerate(chunk):
+            if n_entries[j] < 2:
+                sharpe, n = INVALID, 0
+            else:
+                sharpe, n = manual_sharpe(c, entries[j], exits[j])
+                if not np.isfinite(sharpe):
+                    sharpe = INVALID
+            results.append({"fast": f, "slow": s, "signal": g, "sharpe": sharpe, "trades": n})
+    return results
+
+
+def rsi_grid(close, rsi, macd_hist, los: Iterable[int], his: Iterable[int], exs: Iterable[int],
+             candidates: List[Tuple[int, int, int]] = None) -> List[dict]:
+    """
+    RSI閾値候補 (lo, hi, ex) をまとめて採点（optimize_rsi_params の目的関数と同一の判定）。
+    entries = lo<RSI<hi & MACDヒストグラムが0を上抜け / exits = RSI>ex or ヒストグラム<0
+    """
+    c = np.asarray(close, dtype=np.float64)
+    r = np.asarray(rsi, dtype=np.float64)
+    h = np.asarray(macd_hist, dtype=np.float64)
+    if candidates is None:
+        candidates = [(a, b, e) for a in los for b in his for e in exs if a < b < e]
+    hist_up = np.zeros(len(h), dtype=bool)
+    hist_up[1:] = (h[1:] > 0) & (h[:-1] <= 0)
+    hist_neg = h < 0
+    # エントリーは hist_up 足に限られるため、閾値が違っても同じエントリー集合になる候補が多い → 採点結果を共有
+    entry_cache: Dict[Tuple[int, int], Tuple[np.ndarray, bytes]] = {}
+    exit_cache: Dict[int, np.ndarray] = {}
+    score_cache: Dict[Tuple[bytes, int], Tuple[float, int]] = {}
+    results = []
+    for a, b, e in candidates:
+        en_key = entry_cache.get((a, b))
+        if en_key is None:
+            en = (r > a) & (r < b) & hist_up
+            en_key = entry_cache[(a, b)] = (en, np.flatnonzero(en).tobytes())
+        en, key = en_key
+        scored = score_cache.get((key, e))
+        if scored is None:
+            ex = exit_cache.get(e)
+            if ex is None:
+                ex = exit_cache[e] = (r > e) | hist_neg
+            if np.count_nonzero(en) < 2:
+                scored = (INVALID, 0)
+            else:
+                sharpe, n = manual_sharpe(c, en, ex)
+                scored = (sharpe if np.isfinite(sharpe) else INVALID, n)
+            score_cache[(key, e)] = scored
+        results.append({"rsi_entry_lo": a, "rsi_entry_hi": b, "rsi_exit": e,
+                        "sharpe": scored[0], "trades": scored[1]})
+    return results
@@ -0,0 +1,241 @@
+"""
+戦略スイープ実行器（CoreBacktest.run_all_strategies 用）
+戦略本体は pandas + Python ループで GIL を握るため ThreadPoolExecutor では並列化されない。
+
+モード（NEO_BACKTEST_EXECUTOR 環境変数 / run_strategies(mode=...)）:
+  process: プロセスプール（既定）。特徴量フレームの数値列を SharedMemory に1回だけ書き、
+           ワーカーはコピーせずに DataFrame を組み立てる（戦略ごとのpickle転送なし）
+  thread : 従来の ThreadPoolExecutor(max_workers=2)
+  serial : 順番に実行（デバッグ用・戦略の例外はトレースバック付きでログ出力）
+プールはプロセス内で使い回す（spawn起動・コア数ぶん）。ワーカーが落ちた・詰まった場合はワーカープロセスを止めてプールを破棄し、
+並列で終わらなかった戦略だけを serial で再実行する（再実行も最初の呼び出しから TIMEOUT_SEC の期限内・
+間に合わなかった戦略は timeout 扱い）。
+"""
+import os
+import pickle
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("neo.quant.executor")
+
+EXECUTOR_MODE = os.environ.get("NEO_BACKTEST_EXECUTOR", "process")
+TIMEOUT_SEC = 60
+THREAD_WORKERS = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# ワーカー側: 直近にアタッチした共有フレーム（同一スイープ内の後続戦略で再利用）
+_attached: Dict[str, object] = {"name": None, "shm": None, "df": None}
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=available_cores(), mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool(terminate: bool = False):
+    """プールを破棄する。terminate=True なら実行中のワーカープロセスも止める（詰まった戦略を残さない）"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            # ProcessPoolExecutor.shutdown は実行中のワーカーを止めないので、プロセスを直接終了させる
+            procs = list((_pool._processes or {}).values()) if terminate else []
+            _pool.shutdown(wait=False, cancel_futures=True)
+            for proc in procs:
+                if proc.is_alive():
+                    proc.terminate()
+            for proc in procs:
+                proc.join(5)
+                if proc.is_alive():
+                    proc.kill()
+            _pool = None
+
+
+# ---------------------------------------------------------------
+# SharedMemory 上のフレーム
+# ---------------------------------------------------------------
+def _shareable(values: np.ndarray) -> bool:
+    return isinstance(values, np.ndarray) and values.dtype.kind in "biufM"
+
+
+def share_frame(df: pd.DataFrame):
+    """数値/bool/datetime 列と index を1つの SharedMemory に詰める。(shm, spec) を返す"""
+    arrays, extra = {}, {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if _shareable(values):
+            arrays[col] = np.ascontiguousarray(values)
+        else:
+            extra[col] = df[col]
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_spec = ("range", (index.start, index.stop, index.step), index.name)
+    elif _shareable(index.to_numpy()):
+        arrays[None] = np.ascontiguousarray(index.to_numpy())
+        index_spec = ("shm", None, index.name)
+    else:
+        index_spec = ("pickle", index, index.name)
+
+    layout, offset = [], 0
+    for key, arr in arrays.items():
+        offset = -(-offset // 8) * 8  # 8バイト境界
+        layout.append((key, arr.dtype.str, arr.shape, offset))
+        offset += arr.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (key, dtype, shape, off), arr in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)[...] = arr
+    spec = {"layout": layout, "columns": list(df.columns), "index": index_spec,
+            "extra": pickle.dumps(extra) if extra else None}
+    return shm, spec
+
+
+def attach_frame(name: str, spec: dict):
+    """share_frame の逆。列は共有メモリを直接参照する読み取り専用配列。(shm, df) を返す"""
+    shm = shared_memory.SharedMemory(name=name)
+    data, index_values = {}, None
+    for key, dtype, shape, off in spec["layout"]:
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)
+        arr.flags.writeable = False
+        if key is None:
+            index_values = arr
+        else:
+            data[key] = arr
+    kind, payload, index_name = spec["index"]
+    if kind == "range":
+        index = pd.RangeIndex(*payload, name=index_name)
+    elif kind == "shm":
+        index = pd.Index(index_values, name=index_name, copy=False)
+    else:
+        index = payload
+    if spec["extra"]:
+        data.update({col: s.to_numpy() for col, s in pickle.loads(spec["extra"]).items()})
+    df = pd.DataFrame(data, index=index, columns=spec["columns"], copy=False)
+    return shm, df
+
+
+def _run_shared(func: Callable, name: str, spec: dict) -> dict:
+    """ワーカー側エントリ: 共有フレームにアタッチ（同名なら再利用）して戦略を実行"""
+    if _attached["name"] != name:
+        if _attached["shm"] is not None:
+            _attached["df"] = None
+            _attached["shm"].close()
+        _attached["shm"], _attached["df"] = attach_frame(name, spec)
+        _attached["name"] = name
+    return func(_attached["df"])
+
+
+# ---------------------------------------------------------------
+# 実行
+# ---------------------------------------------------------------
+def _error_result(name: str, e: Exception) -> dict:
+    return {"strategy": name, "sharpe": 0.0, "confidence": "LOW", "trades": 0,
+            "win_rate": 0.0, "error": str(e)}
+
+
+def _collect(futures: dict, deadline: float, results: Dict[str, dict]) -> Dict[str, dict]:
+    """終わった順に results へ入れる（途中で失敗しても終わった分は results に残る）"""
+    for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            results[name] = _error_result(name, e)
+    return results
+
+
+def _run_process(strategy_map: Dict[str, Callable], df: pd.DataFrame, deadline: float,
+                 results: Dict[str, dict]) -> Dict[str, dict]:
+    shm, spec = share_frame(df)
+    try:
+        pool = _get_pool()
+        futures = {pool.submit(_run_shared, func, shm.name, spec): name
+                   for name, func in strategy_map.items()}
+        return _collect(futures, deadline, results)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _run_serial(strategy_map: Dict[str, Callable], df: pd.DataFrame, results: Dict[str, dict] = None,
+                stop: threading.Event = None) -> Dict[str, dict]:
+    results = {} if results is None else results
+    for name, func in strategy_map.items():
+        if stop is not None and stop.is_set():
+            break
+        try:
+            results[name] = func(df)
+        except Exception as e:
+            logger.exception(f"[{name}] strategy failed")
+            results[name] = _error_result(name, e)
+    return results
+
+
+def _run_serial_until(strategy_map: Dict[str, Callable], df: pd.DataFrame, deadline: float) -> Dict[str, dict]:
+    """deadline までの serial 再実行。間に合わなかった戦略は timeout の結果にし、残りは始めない
+    （スレッドは止められないので、実行中の1戦略だけは裏で終わるまで走る）"""
+    results, stop = {}, threading.Event()
+    if deadline <= time.monotonic():
+        logger.warning(f"No time left for sequential fallback ({TIMEOUT_SEC}s) — remaining strategies marked as timeout")
+        return {name: _error_result(name, TimeoutError(f"timeout {TIMEOUT_SEC}s")) for name in strategy_map}
+    worker = threading.Thread(target=_run_serial, args=(strategy_map, df, results, stop),
+                              name="neo-backtest-serial", daemon=True)
+    worker.start()
+    worker.join(max(0.0, deadline - time.monotonic()))
+    if worker.is_alive():
+        stop.set()
+        logger.warning(f"Sequential fallback exceeded {TIMEOUT_SEC}s — unfinished strategies marked as timeout")
+    done = dict(results)
+    return {name: done[name] if name in done else _error_result(name, TimeoutError(f"timeout {TIMEOUT_SEC}s"))
+            for name in strategy_map}
+
+
+def _run_thread(strategy_map: Dict[str, Callable], df: pd.DataFrame, deadline: float,
+                results: Dict[str, dict]) -> Dict[str, dict]:
+    executor = ThreadPoolExecutor(max_workers=THREAD_WORKERS)
+    try:
+        return _collect({executor.submit(func, df): name for name, func in strategy_map.items()}, deadline, results)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)  # 詰まったスレッドの終了を待たない
+
+
+def run_strategies(strategy_map: Dict[str, Callable], df: pd.DataFrame,
+                   mode: Optional[str] = None) -> Dict[str, dict]:
+    """{戦略名: 関数(df)->dict} を実行して {戦略名: 結果dict} を返す。並列実行に失敗したら serial で再実行
+    （並列実行と再実行を合わせて TIMEOUT_SEC 以内。mode="serial" の明示指定は期限なし）"""
+    mode = mode or EXECUTOR_MODE
+    if mode == "serial":
+        return _run_serial(strategy_map, df)
+    deadline = time.monotonic() + TIMEOUT_SEC
+    results = {}
+    try:
+        if mode == "process":
+            return _run_process(strategy_map, df, deadline, results)
+        return _run_thread(strategy_map, df, deadline, results)
+    except Exception as e:
+        if mode == "process":
+            shutdown_pool(terminate=True)  # 落ちた/詰まったワーカーを次回に持ち越さない
+        logger.warning(f"Parallel backtest ({mode}) failed, falling back to sequential: {e}")
+    rest = {name: func for name, func in strategy_map.items() if name not in results}
+    results.update(_run_serial_until(rest, df, deadline))
+    return {name: results[name] for name in strategy_map}
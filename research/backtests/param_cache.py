@@ -0,0 +1,113 @@
+"""
+最適化パラメータの永続キャッシュ（core.cache_store の "param_opt" namespace）
+Council の2時間ローテーションで同じ銘柄を99%同じ足で再最適化していたのを、データが十分変わったときだけに絞る。
+
+キー: {symbol}:{strategy}:{mode}:w{窓長バケット}
+値  : 最適化結果 + 上位パラメータ（TPEのウォームスタート用）+ 最適化時のデータ指紋
+  - tail      : 最終足を除く直近 TAIL_BARS 本の終値（新データ内で位置を探して「何本増えたか」を数える。
+                最終足は形成中で終値が変わるため指紋に含めない）
+  - regime    : トレンド方向（短期SMA vs 長期SMA）と直近実現ボラ
+無効化: 新しい足が max(MIN_NEW_BARS, 窓長×NEW_BAR_RATIO) 本以上 / tail が見つからない（データ差し替え）/
+        トレンド反転 / ボラが VOL_RATIO 倍以上変化 / TTL 切れ
+無効化されても上位パラメータは warm_start として返し、次の TPE で最初に評価させる。
+"""
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core import cache_store
+
+logger = logging.getLogger("neo.param_cache")
+
+CACHE_NS = "param_opt"
+TTL_SEC = 48 * 3600           # 足が増えなくても2日で再最適化
+TAIL_BARS = 8
+MIN_NEW_BARS = 12
+NEW_BAR_RATIO = 0.02
+WINDOW_BUCKET = 250
+REGIME_FAST = 25
+REGIME_SLOW = 100
+VOL_BARS = 100
+VOL_RATIO = 1.5
+TOP_K = 5
+
+
+def cache_key(symbol: str, strategy: str, mode: str, n_bars: int) -> str:
+    return f"{symbol.split('/')[0].strip().upper()}:{strategy}:{mode}:w{n_bars // WINDOW_BUCKET * WINDOW_BUCKET}"
+
+
+def regime_signature(close: np.ndarray) -> dict:
+    """トレンド方向（短期SMAが長期SMA以上なら1）と直近VOL_BARS本の対数リターン標準偏差"""
+    c = np.asarray(close, dtype=np.float64)
+    trend = 1 if c[-REGIME_FAST:].mean() >= c[-REGIME_SLOW:].mean() else -1
+    rets = np.diff(np.log(c[-(VOL_BARS + 1):]))
+    vol = float(rets.std()) if len(rets) > 1 else 0.0
+    return {"trend": trend, "vol": vol}
+
+
+def _tail(close: np.ndarray) -> np.ndarray:
+    return close[-(TAIL_BARS + 1):-1]
+
+
+def count_new_bars(close: np.ndarray, tail: List[float]) -> Optional[int]:
+    """保存時の tail が新データのどこにあるかを探し、保存時から増えた本数を返す（見つからなければ None）"""
+    c = np.asarray(close, dtype=np.float64)
+    t = np.asarray(tail, dtype=np.float64)
+    k = len(t)
+    if k == 0 or len(c) < k + 1:
+        return None
+    windows = np.lib.stride_tricks.sliding_window_view(c[:-1], k)
+    hits = np.flatnonzero((windows == t).all(axis=1))
+    if not len(hits):
+        return None
+    return len(c) - 1 - (int(hits[-1]) + k)
+
+
+def _stale_reason(entry: dict, close: np.ndarray) -> Optional[str]:
+    new_bars = count_new_bars(close, entry.get("tail", []))
+    if new_bars is None:
+        return "data replaced"
+    limit = max(MIN_NEW_BARS, int(len(close) * NEW_BAR_RATIO))
+    if new_bars >= limit:
+        return f"{new_bars} new bars"
+    old, cur = entry.get("regime", {}), regime_signature(close)
+    if old.get("trend") != cur["trend"]:
+        return "trend flipped"
+    if old.get("vol") and cur["vol"]:
+        ratio = cur["vol"] / old["vol"]
+        if ratio >= VOL_RATIO or ratio <= 1 / VOL_RATIO:
+            return f"vol x{ratio:.2f}"
+    return None
+
+
+def lookup(symbol: str, strategy: str, mode: str, close) -> Tuple[Optional[dict], List[dict]]:
+    """(有効なキャッシュ結果 or None, ウォームスタート用の上位パラメータ) を返す"""
+    c = np.asarray(close, dtype=np.float64)
+    key = cache_key(symbol, strategy, mode, len(c))
+    entry = cache_store.get(CACHE_NS, key, include_expired=True)
+    if not entry:
+        return None, []
+    warm = entry.get("top", [])
+    if time.time() - entry.get("stored_at", 0) > TTL_SEC:
+        logger.info(f"[{key}] param cache expired → re-optimize (warm start {len(warm)})")
+        return None, warm
+    reason = _stale_reason(entry, c)
+    if reason:
+        logger.info(f"[{key}] param cache stale ({reason}) → re-optimize (warm start {len(warm)})")
+        return None, warm
+    return {**entry["result"], "cached": True}, warm
+
+
+def store(symbol: str, strategy: str, mode: str, close, result: dict, top: List[dict]):
+    c = np.asarray(close, dtype=np.float64)
+    entry = {
+        "result": result,
+        "top": top[:TOP_K],
+        "tail": _tail(c).tolist(),
+        "regime": regime_signature(c),
+        "n_bars": len(c),
+        "stored_at": time.time(),
+    }
+    cache_store.put(CACHE_NS, cache_key(symbol, strategy, mode, len(c)), entry, ttl=TTL_SEC * 2)
@@ -1,55 +1,119 @@
 """
 optuna ベイズ最適化パラメータ最適化モジュール（グリッドサーチから置き換え）
 各戦略のハイパーパラメータをTPEサンプラーで効率的に最適化する
+
+最適化モード（NEO_PARAM_OPT_MODE / mode=）:
+  grid     : 探索空間の全候補を batch_eval で一括採点（既定。MACD 3454通り・RSI 9750通りを1秒未満）
+  tpe_batch: optuna ask/tell で TPE_BATCH 件ずつ候補を出させ、各バッチを一括採点して tell
+  tpe      : 従来の逐次 TPE（試行ごとに ta.macd + _manual_sharpe）
+run_param_optimization は結果を param_cache に保存し、足が十分増えるかレジームが変わるまで再利用する。
+再最適化時は前回の上位パラメータを TPE に enqueue してウォームスタートする。
 """
+import os
 import numpy as np
 import pandas as pd
 import vectorbt as vbt
 import optuna
 import logging
 
+from research.backtests.batch_eval import manual_sharpe as _manual_sharpe, macd_grid, rsi_grid, INVALID
+from research.backtests import param_cache
+from feature_engineering.indicator_store import IndicatorStore
+
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 logger = logging.getLogger("neo.param_optimizer")
 
-def _manual_sharpe(close, entries, exits, fees=0.001):
-    """vectorbt不使用の手動バックテスト + Sharpe計算"""
-    import numpy as np
-    import pandas as pd
-    close   = pd.Series(close).reset_index(drop=True)
-    entries = pd.Series(entries).reset_index(drop=True).fillna(False).astype(bool)
-    exits   = pd.Series(exits).reset_index(drop=True).fillna(False).astype(bool)
-    in_pos, entry_price, returns = False, 0.0, []
-    for i in range(len(close)):
-        if not in_pos and entries.iloc[i]:
-            entry_price = close.iloc[i] * (1 + fees)
-            in_pos = True
-        elif in_pos and exits.iloc[i]:
-            ret = (close.iloc[i] * (1 - fees) - entry_price) / entry_price
-            returns.append(ret)
-            in_pos = False
-    if len(returns) < 2:
-        return 0.0, len(returns)
-    r = np.array(returns)
-    if r.std() < 1e-6:  # 全勝or全敗でstd≈0 → Sharpe爆発防止（v6.5q）
-        return 0.0, len(returns)
-    sharpe = (r.mean() / r.std()) * np.sqrt(252)
-    if not np.isfinite(sharpe) or abs(sharpe) > 100:  # 異常値ガード（v6.5q）
-        return 0.0, len(returns)
-    return round(float(sharpe), 3), len(returns)
-
-
-
-def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30) -> dict:
+OPT_MODE = os.environ.get("NEO_PARAM_OPT_MODE", "grid")
+TPE_BATCH = 8
+MACD_SPACE = {"fast": (6, 20), "slow": (20, 40), "signal": (5, 15)}
+RSI_SPACE = {"rsi_entry_lo": (25, 50), "rsi_entry_hi": (55, 75), "rsi_exit": (65, 85)}
+OPTIMIZER_LABELS = {"grid": "grid-batch", "tpe_batch": "optuna-TPE-batch", "tpe": "optuna-TPE"}
+
+
+def _space_range(space: dict, name: str) -> range:
+    lo, hi = space[name]
+    return range(lo, hi + 1)
+
+
+def _best(results: list) -> dict:
+    """採点結果から最良（同点は先に評価した候補）を選ぶ"""
+    return max(results, key=lambda r: r["sharpe"])
+
+
+def _top_params(results: list, keys) -> list:
+    ranked = sorted(results, key=lambda r: r["sharpe"], reverse=True)[:param_cache.TOP_K]
+    return [{k: r[k] for k in keys} for r in ranked]
+
+
+def _top_trials(study) -> list:
+    done = [t for t in study.trials if t.value is not None]
+    return [t.params for t in sorted(done, key=lambda t: t.value, reverse=True)[:param_cache.TOP_K]]
+
+
+def _create_study(warm_start: list = None):
+    """TPE study を作り、前回の上位パラメータを先頭試行として enqueue（ウォームスタート）"""
+    study = optuna.create_study(direction="maximize",
+                                sampler=optuna.samplers.TPESampler(seed=42))
+    for params in warm_start or []:
+        study.enqueue_trial(params)
+    return study
+
+
+def _tpe_batch(space: dict, n_trials: int, evaluate, warm_start: list = None):
+    """ask/tell で TPE_BATCH 件ずつ候補を生成し evaluate(候補リスト)->スコアリスト で一括採点。study を返す"""
+    study = _create_study(warm_start)
+    done = 0
+    while done < n_trials:
+        trials = [study.ask() for _ in range(min(TPE_BATCH, n_trials - done))]
+        params = [tuple(t.suggest_int(k, lo, hi) for k, (lo, hi) in space.items()) for t in trials]
+        for trial, value in zip(trials, evaluate(params)):
+            study.tell(trial, value)
+        done += len(trials)
+    return study
+
+
+def _optimize_macd_batch(close: pd.Series, symbol: str, n_trials: int, mode: str, warm_start: list = None) -> dict:
+    if mode == "grid":
+        results = macd_grid(close, _space_range(MACD_SPACE, "fast"), _space_range(MACD_SPACE, "slow"),
+                            _space_range(MACD_SPACE, "signal"))
+        best = _best(results)
+        best_params, best_value, evaluated = best, best["sharpe"], len(results)
+        top = _top_params(results, MACD_SPACE)
+    else:
+        def evaluate(cands):
+            valid = [c for c in cands if c[0] < c[1]]
+            scored = {(r["fast"], r["slow"], r["signal"]): r["sharpe"]
+                      for r in macd_grid(close, (), (), (), candidates=valid)} if valid else {}
+            return [scored.get(c, INVALID) for c in cands]
+        study = _tpe_batch(MACD_SPACE, n_trials, evaluate, warm_start)
+        best_params, best_value, evaluated = study.best_params, study.best_value, len(study.trials)
+        top = _top_trials(study)
+    result = {
+        "fast": best_params["fast"], "slow": best_params["slow"],
+        "signal": best_params["signal"],
+        "sharpe": round(best_value, 3) if np.isfinite(best_value) else 0.0,
+        "n_trials": evaluated, "optimizer": OPTIMIZER_LABELS[mode], "top": top,
+    }
+    logger.info(f"[{symbol}] MACD最適({mode}): fast={result['fast']}, slow={result['slow']}, signal={result['signal']}, Sharpe={result['sharpe']} ({evaluated}候補)")
+    return result
+
+
+def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30, mode: str = None,
+                         warm_start: list = None) -> dict:
     """
     optunaでMACD戦略のfast/slow/signal期間を最適化
     グリッドサーチ(27通り)からTPEベイズ最適化(30試行)に変更
     → 同じ時間でより良いパラメータを発見できる
+    mode=grid/tpe_batch は batch_eval でEMA行列から一括採点（grid は n_trials を無視して全候補）
+    warm_start: 先に評価させるパラメータ（前回の上位。TPE系のみ）
     """
+    mode = mode or OPT_MODE
     try:
-        import pandas_ta as ta
         close = df["close"].copy()
         if len(close) < 50:
             return {"fast": 12, "slow": 26, "signal": 9, "sharpe": 0.0, "note": "データ不足"}
+        if mode in ("grid", "tpe_batch"):
+            return _optimize_macd_batch(close, symbol, n_trials, mode, warm_start)
 
         def objective(trial):
             fast   = trial.suggest_int("fast", 6, 20)
@@ -58,7 +122,8 @@ def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: in
             if fast >= slow:
                 return -999.0
             try:
-                _macd = ta.macd(close, fast=fast, slow=slow, signal=signal)
+                # 同じ(fast, slow, signal)の再試行・他戦略と同一パラメータはメモ化済みの結果を使う
+                _macd = IndicatorStore.ta("macd", close, fast=fast, slow=slow, signal=signal)
                 if _macd is None:
                     return -999.0
                 # カラム名は動的に取得
@@ -80,8 +145,7 @@ def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: in
             except Exception:
                 return -999.0
 
-        study = optuna.create_study(direction="maximize",
-                                    sampler=optuna.samplers.TPESampler(seed=42))
+        study = _create_study(warm_start)
         study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
 
         best = study.best_params
@@ -89,7 +153,7 @@ def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: in
         result = {
             "fast": best["fast"], "slow": best["slow"],
             "signal": best["signal"], "sharpe": best_sharpe,
-            "n_trials": n_trials
+            "n_trials": n_trials, "optimizer": OPTIMIZER_LABELS["tpe"], "top": _top_trials(study)
         }
         logger.info(f"[{symbol}] MACD最適: fast={result['fast']}, slow={result['slow']}, signal={result['signal']}, Sharpe={result['sharpe']}")
         return result
@@ -99,23 +163,29 @@ def optimize_macd_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: in
         return {"fast": 12, "slow": 26, "signal": 9, "sharpe": 0.0, "note": str(e)[:60]}
 
 
-def optimize_rsi_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30) -> dict:
+def optimize_rsi_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30, mode: str = None,
+                        warm_start: list = None) -> dict:
     """
     optunaでVP固有モメンタム戦略のRSI閾値を最適化
+    mode=grid/tpe_batch は batch_eval で一括採点（grid は n_trials を無視して全候補）
+    warm_start: 先に評価させるパラメータ（前回の上位。TPE系のみ）
     """
+    mode = mode or OPT_MODE
     try:
-        import pandas_ta as ta
         close = df["close"].copy()
         if len(close) < 50:
             return {"rsi_entry_lo": 40, "rsi_entry_hi": 65, "rsi_exit": 72, "sharpe": 0.0, "note": "データ不足"}
 
-        rsi = ta.rsi(close, length=14)
+        rsi = IndicatorStore.ta("rsi", close, length=14)
         if rsi is None:
             return {"rsi_entry_lo": 40, "rsi_entry_hi": 65, "rsi_exit": 72, "sharpe": 0.0, "note": "RSI計算失敗"}
 
-        _macd = ta.macd(close, fast=12, slow=26, signal=9)
+        _macd = IndicatorStore.ta("macd", close, fast=12, slow=26, signal=9)
         macd_hist = _macd.get("MACDh_12_26_9", pd.Series(0, index=close.index)) if _macd is not None else pd.Series(0, index=close.index)
 
+        if mode in ("grid", "tpe_batch"):
+            return _optimize_rsi_batch(close, rsi, macd_hist, symbol, n_trials, mode, warm_start)
+
         def objective(trial):
             lo = trial.suggest_int("rsi_entry_lo", 25, 50)
             hi = trial.suggest_int("rsi_entry_hi", 55, 75)
@@ -134,8 +204,7 @@ def optimize_rsi_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int
             except Exception:
                 return -999.0
 
-        study = optuna.create_study(direction="maximize",
-                                    sampler=optuna.samplers.TPESampler(seed=42))
+        study = _create_study(warm_start)
         study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
 
         best = study.best_params
@@ -145,7 +214,9 @@ def optimize_rsi_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int
             "rsi_entry_hi": best["rsi_entry_hi"],
             "rsi_exit":     best["rsi_exit"],
             "sharpe":       best_sharpe,
-            "n_trials":     n_trials
+            "n_trials":     n_trials,
+            "optimizer":    OPTIMIZER_LABELS["tpe"],
+            "top":          _top_trials(study)
         }
         logger.info(f"[{symbol}] RSI最適: lo={result['rsi_entry_lo']}, hi={result['rsi_entry_hi']}, exit={result['rsi_exit']}, Sharpe={result['sharpe']}")
         return result
@@ -155,17 +226,73 @@ def optimize_rsi_params(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int
         return {"rsi_entry_lo": 40, "rsi_entry_hi": 65, "rsi_exit": 72, "sharpe": 0.0, "note": str(e)[:60]}
 
 
-def run_param_optimization(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30) -> dict:
+def _optimize_rsi_batch(close, rsi, macd_hist, symbol: str, n_trials: int, mode: str,
+                        warm_start: list = None) -> dict:
+    if mode == "grid":
+        results = rsi_grid(close, rsi, macd_hist, _space_range(RSI_SPACE, "rsi_entry_lo"),
+                           _space_range(RSI_SPACE, "rsi_entry_hi"), _space_range(RSI_SPACE, "rsi_exit"))
+        best = _best(results)
+        best_params, best_value, evaluated = best, best["sharpe"], len(results)
+        top = _top_params(results, RSI_SPACE)
+    else:
+        def evaluate(cands):
+            # 目的関数と同じく lo>=hi / ex<=hi は -999
+            valid = [c for c in cands if c[0] < c[1] < c[2]]
+            scored = {(r["rsi_entry_lo"], r["rsi_entry_hi"], r["rsi_exit"]): r["sharpe"]
+                      for r in rsi_grid(close, rsi, macd_hist, (), (), (), candidates=valid)} if valid else {}
+            return [scored.get(c, INVALID) for c in cands]
+        study = _tpe_batch(RSI_SPACE, n_trials, evaluate, warm_start)
+        best_params, best_value, evaluated = study.best_params, study.best_value, len(study.trials)
+        top = _top_trials(study)
+    result = {
+        "rsi_entry_lo": best_params["rsi_entry_lo"],
+        "rsi_entry_hi": best_params["rsi_entry_hi"],
+        "rsi_exit":     best_params["rsi_exit"],
+        "sharpe":       round(best_value, 3) if np.isfinite(best_value) else 0.0,
+        "n_trials":     evaluated,
+        "optimizer":    OPTIMIZER_LABELS[mode],
+        "top":          top,
+    }
+    logger.info(f"[{symbol}] RSI最適({mode}): lo={result['rsi_entry_lo']}, hi={result['rsi_entry_hi']}, exit={result['rsi_exit']}, Sharpe={result['sharpe']} ({evaluated}候補)")
+    return result
+
+
+def _cached_optimize(optimize, strategy: str, df: pd.DataFrame, symbol: str, n_trials: int, mode: str,
+                     use_cache: bool) -> dict:
+    """param_cache が有効ならそれを返し、無ければ（前回上位でウォームスタートして）最適化して保存"""
+    warm = []
+    if use_cache:
+        try:
+            cached, warm = param_cache.lookup(symbol, strategy, mode, df["close"])
+            if cached:
+                logger.info(f"[{symbol}] {strategy} params from cache: {cached}")
+                return cached
+        except Exception as e:
+            logger.warning(f"[{symbol}] param cache lookup failed: {e}")
+    result = optimize(df, symbol, n_trials, mode=mode, warm_start=warm)
+    top = result.pop("top", [])
+    if use_cache and "note" not in result:
+        try:
+            param_cache.store(symbol, strategy, mode, df["close"], result, top)
+        except Exception as e:
+            logger.warning(f"[{symbol}] param cache store failed: {e}")
+    return result
+
+
+def run_param_optimization(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials: int = 30, mode: str = None,
+                           use_cache: bool = True) -> dict:
     """
-    全パラメータ最適化を実行して結果を返す（optuna TPEサンプラー使用）
+    全パラメータ最適化を実行して結果を返す（既定は全候補一括採点、mode=tpe で従来の optuna TPE）
+    use_cache=True: 前回結果を param_cache から再利用（足が十分増える/レジーム変化で再最適化）
     """
+    mode = mode or OPT_MODE
     if len(df) < 50:
         return {"symbol": symbol, "status": "skip", "note": "データ不足（50件未満）"}
 
-    logger.info(f"[{symbol}] optuna最適化開始 (データ{len(df)}件, {n_trials}試行)")
+    logger.info(f"[{symbol}] パラメータ最適化開始 (データ{len(df)}件, mode={mode}, {n_trials}試行)")
 
-    macd_params = optimize_macd_params(df, symbol, n_trials)
-    rsi_params  = optimize_rsi_params(df, symbol, n_trials)
+    macd_params = _cached_optimize(optimize_macd_params, "macd", df, symbol, n_trials, mode, use_cache)
+    rsi_params  = _cached_optimize(optimize_rsi_params, "rsi", df, symbol, n_trials, mode, use_cache)
 
     result = {
         "symbol":      symbol,
@@ -173,10 +300,10 @@ def run_param_optimization(df: pd.DataFrame, symbol: str = "UNKNOWN", n_trials:
         "macd":        macd_params,
         "rsi":         rsi_params,
         "status":      "ok",
-        "optimizer":   "optuna-TPE"
+        "optimizer":   OPTIMIZER_LABELS.get(mode, mode)
     }
 
-    print(f"✅ [{symbol}] optuna最適化完了:")
+    print(f"✅ [{symbol}] パラメータ最適化完了 ({result['optimizer']}):")
     print(f"   MACD: fast={macd_params['fast']}, slow={macd_params['slow']}, signal={macd_params['signal']} → Sharpe={macd_params['sharpe']}")
     print(f"   RSI:  lo={rsi_params['rsi_entry_lo']}, hi={rsi_params['rsi_entry_hi']}, exit={rsi_params['rsi_exit']} → Sharpe={rsi_params['sharpe']}")
 
@@ -1,40 +1,42 @@
 import pandas as pd
 import numpy as np
-import math
+import os
 import logging
+from typing import Optional
+
+from research.backtests.trade_kernel import simulate_trades, sharpe_ratio
+from research.backtests.monte_carlo import bootstrap_sharpes, suggest_block_length
+from feature_engineering.indicator_store import IndicatorStore
 
 logger = logging.getLogger("neo.quant.backtest")
 
+MC_N_SIM = 10_000   # ブートストラップ試行回数（ベクトル化で旧500回ループより高速）
+MC_SEED = int(os.environ["NEO_MC_SEED"]) if os.environ.get("NEO_MC_SEED") else None  # 再現用シード
+
 
-def _monte_carlo_confidence(rets: list, n_sim: int = 500) -> dict:
+def _monte_carlo_confidence(rets, n_sim: int = MC_N_SIM, block: Optional[int] = None,
+                            seed: Optional[int] = MC_SEED) -> dict:
     """
     ブートストラップ・モンテカルロによるSharpe信頼区間計算。
-    同じ取引リターン列をランダムシャッフルしてn_sim回Sharpeを計算。
+    同じ取引リターン列を重複ありでリサンプリングしてn_sim回Sharpeを計算（monte_carlo でベクトル化）。
+    block=None は自己相関から自動選択（1=通常のiid、>1=循環ブロック・ブートストラップ）。
     Returns: p5/p50/p95 Sharpe, 負Sharpe確率, 信頼ラベル
     """
-    import random
     if len(rets) < 3:
         return {"mc_sharpe_p5": 0.0, "mc_sharpe_p50": 0.0, "mc_sharpe_p95": 0.0,
                 "mc_neg_prob": 1.0, "mc_label": "INSUFFICIENT"}
-    sharpes = []
-    ra = list(rets)
-    for _ in range(n_sim):
-        sample = random.choices(ra, k=len(ra))  # リサンプリング（重複あり）
-        arr = np.array(sample)
-        if arr.std() < 1e-6:
-            continue
-        sr = float((arr.mean() / arr.std()) * np.sqrt(252))
-        if math.isfinite(sr) and abs(sr) < 100:
-            sharpes.append(sr)
+    if block is None:
+        block = suggest_block_length(rets)
+    sharpes = bootstrap_sharpes(rets, n_sim=n_sim, block=block, seed=seed)
     if len(sharpes) < 10:
         return {"mc_sharpe_p5": 0.0, "mc_sharpe_p50": 0.0, "mc_sharpe_p95": 0.0,
                 "mc_neg_prob": 1.0, "mc_label": "INSUFFICIENT"}
     sharpes.sort()
     n = len(sharpes)
-    p5  = sharpes[int(n * 0.05)]
-    p50 = sharpes[int(n * 0.50)]
-    p95 = sharpes[int(n * 0.95)]
-    neg_prob = sum(1 for s in sharpes if s < 0) / n
+    p5  = float(sharpes[int(n * 0.05)])
+    p50 = float(sharpes[int(n * 0.50)])
+    p95 = float(sharpes[int(n * 0.95)])
+    neg_prob = float(np.count_nonzero(sharpes < 0)) / n
     # 信頼ラベル: 下振れ5%ラインで判定
     if p5 >= 2.0:
         label = "ROBUST"    # 最悪ケースでもSharpe2以上
@@ -49,7 +51,8 @@ def _monte_carlo_confidence(rets: list, n_sim: int = 500) -> dict:
         "mc_sharpe_p50": round(p50, 3),
         "mc_sharpe_p95": round(p95, 3),
         "mc_neg_prob":   round(neg_prob, 3),
-        "mc_label":      label
+        "mc_label":      label,
+        "mc_block":      block,
     }
 
 def _manual_backtest(close, entries, exits, strategy_name, fees=0.001):
@@ -58,26 +61,10 @@ def _manual_backtest(close, entries, exits, strategy_name, fees=0.001):
              "total_return": "0.00%", "max_dd": "0.00%",
              "win_rate": 0.0, "trades": 0, "confidence": "LOW"}
     try:
-        cs = pd.Series(close.values if hasattr(close,"values") else close).reset_index(drop=True)
-        en = pd.Series(entries).reset_index(drop=True).fillna(False).astype(bool)
-        ex = pd.Series(exits).reset_index(drop=True).fillna(False).astype(bool)
-        # ルックアヘッドバイアス対策: シグナルを1本シフトして次足でエントリー
-        en = en.shift(1).fillna(False).infer_objects(copy=False).astype(bool)
-        ex = ex.shift(1).fillna(False).infer_objects(copy=False).astype(bool)
-        in_pos, ep, rets, wins = False, 0.0, [], 0
-        equity, peak, mdd = 1.0, 1.0, 0.0
-        for i in range(len(cs)):
-            if not in_pos and en.iloc[i]:
-                ep = cs.iloc[i] * (1 + fees); in_pos = True
-            elif in_pos and ex.iloc[i]:
-                r = (cs.iloc[i] * (1 - fees) - ep) / ep
-                rets.append(r)
-                if r > 0: wins += 1
-                equity *= (1 + r)
-                if equity > peak: peak = equity
-                dd = (peak - equity) / peak * 100
-                if dd > mdd: mdd = dd
-                in_pos = False
+        # ルックアヘッドバイアス対策: シグナルを1本シフトして次足でエントリー（shift=True）
+        sim = simulate_trades(close, entries, exits, fees=fees, shift=True)
+        rets, wins, mdd = sim.returns, sim.wins, sim.max_dd
+        equity = float(sim.equity[-1]) if len(sim.equity) else 1.0
         n = len(rets)
         total_ret = (equity - 1.0) * 100
         wr = (wins / n * 100) if n > 0 else 0.0
@@ -88,11 +75,9 @@ def _manual_backtest(close, entries, exits, strategy_name, fees=0.001):
             min_t = 3
         if n < max(min_t, 2):  # 最低2取引必須（1取引はSharpe爆発防止）
             return {**empty, "trades": n}
-        ra = np.array(rets)
-        if ra.std() < 1e-6:  # 全勝or全敗でstd≈0 → Sharpe爆発防止
-            return {**empty, "trades": n}
-        sr = float((ra.mean() / ra.std()) * np.sqrt(252))
-        if not math.isfinite(sr) or abs(sr) > 100:
+        # 全勝or全敗でstd≈0・非有限・|SR|>100 → Sharpe爆発防止
+        sr = sharpe_ratio(rets)
+        if sr is None:
             return {**empty, "trades": n}
         conf = "HIGH" if n >= 10 else "MED" if n >= 3 else "LOW"
         mc = _monte_carlo_confidence(rets)
@@ -123,14 +108,14 @@ class CoreBacktest:
     # ═══════════════════════════════════════════════════════════
 
     # ── 短期戦略1: MACD Cross（MACDクロス+ATRフィルター）──────
+    @staticmethod
     def run_macd_cross(df: pd.DataFrame) -> dict:
         """K.2/J.4: MACDクロス戦略 + ATRフィルター（VP固有の急騰/急落に対応）"""
         try:
-            import pandas_ta as ta
             close = df["close"].copy()
-            # MACDが既に計算済みなら再利用、なければ計算
+            # MACDが既に計算済みなら再利用、なければ計算（IndicatorStore経由）
             if "macd" not in df.columns or "macd_signal" not in df.columns:
-                _macd = ta.macd(close, fast=12, slow=26, signal=9)
+                _macd = IndicatorStore.ta("macd", close, fast=12, slow=26, signal=9)
                 if _macd is None:
                     return {"strategy": "macd_cross", "sharpe": 0.0, "trades": 0,
                             "confidence": "LOW", "win_rate": 0.0, "note": "MACD計算失敗"}
@@ -142,8 +127,8 @@ class CoreBacktest:
 
             # ATRフィルター（ボラが低すぎる時はエントリーしない）
             if all(c in df.columns for c in ["high", "low", "close"]):
-                _atr = ta.atr(df["high"], df["low"], df["close"], length=14)
-                atr_filter = _atr > (_atr.rolling(50, min_periods=10).mean() * 0.5) if _atr is not None else pd.Series(True, index=close.index)
+                _atr = IndicatorStore.ta("atr", df["high"], df["low"], df["close"], length=14)
+                atr_filter = _atr > (IndicatorStore.sma(_atr, 50, min_periods=10) * 0.5) if _atr is not None else pd.Series(True, index=close.index)
             else:
                 atr_filter = pd.Series(True, index=close.index)
 
@@ -163,8 +148,6 @@ class CoreBacktest:
             return {"strategy": "macd_cross", "sharpe": 0.0, "trades": 0,
                     "confidence": "LOW", "win_rate": 0.0, "note": str(e)[:60]}
 
-    @staticmethod
-
     # ── 短期戦略2: Mean Reversion（RSI30+レンジエントリー）────
     # ── 戦略4: Mean Reversion（新規）────────────────────────────────
     @staticmethod
@@ -177,13 +160,8 @@ class CoreBacktest:
             # ATRベースのレンジ判定
             high = df["high"] if "high" in df.columns else close
             low  = df["low"]  if "low"  in df.columns else close
-            tr   = pd.concat([
-                (high - low),
-                (high - close.shift()).abs(),
-                (low  - close.shift()).abs()
-            ], axis=1).max(axis=1)
-            atr    = tr.rolling(14).mean()
-            atr_ma = atr.rolling(30).mean()
+            atr    = IndicatorStore.atr_sma(high, low, close, 14)
+            atr_ma = IndicatorStore.sma(atr, 30)
             is_range = atr < atr_ma  # ATR平均以下 = レンジ相場
 
             entries = (rsi < 30) & is_range
@@ -197,8 +175,6 @@ class CoreBacktest:
             return {"strategy": "mean_reversion", "sharpe": 0.0, "trades": 0,
                     "confidence": "LOW", "win_rate": 0.0, "note": str(e)[:60]}
 
-    @staticmethod
-
     # ── 短期戦略3: gplearn Evolved（遺伝的プログラミング自動発見）──
     # ── 戦略9: gplearn Evolved（遺伝的プログラミング自動発見）──────────
     @staticmethod
@@ -298,9 +274,9 @@ class CoreBacktest:
         """Triple MA Cross: EMA20/50ゴールデンクロス + EMA100が方向フィルター"""
         try:
             close = df["close"]
-            ema20 = close.ewm(span=20, adjust=False).mean()
-            ema50 = close.ewm(span=50, adjust=False).mean()
-            ema100 = close.ewm(span=100, adjust=False).mean()
+            ema20 = IndicatorStore.ema(close, 20)
+            ema50 = IndicatorStore.ema(close, 50)
+            ema100 = IndicatorStore.ema(close, 100)
 
             # エントリー: EMA20がEMA50を上抜け + EMA100が下向きでない（横ばい以上）
             cross_up = (ema20 > ema50) & (ema20.shift(1) <= ema50.shift(1))
@@ -329,10 +305,11 @@ class CoreBacktest:
             low = df["low"]
 
             # 一目均衡表の各線
-            tenkan = (high.rolling(9).max() + low.rolling(9).min()) / 2      # 転換線
-            kijun = (high.rolling(26).max() + low.rolling(26).min()) / 2     # 基準線
+            hh, ll = IndicatorStore.rolling_max, IndicatorStore.rolling_min
+            tenkan = (hh(high, 9) + ll(low, 9)) / 2                          # 転換線
+            kijun = (hh(high, 26) + ll(low, 26)) / 2                         # 基準線
             span_a = ((tenkan + kijun) / 2).shift(26)                        # 先行スパンA
-            span_b = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)  # 先行スパンB
+            span_b = ((hh(high, 52) + ll(low, 52)) / 2).shift(26)            # 先行スパンB
             cloud_top = pd.concat([span_a, span_b], axis=1).max(axis=1)
             cloud_bottom = pd.concat([span_a, span_b], axis=1).min(axis=1)
 
@@ -362,9 +339,9 @@ class CoreBacktest:
             high = df["high"]
             low = df["low"]
 
-            range_high = close.rolling(50).max().shift(1)
-            atr = (high - low).rolling(14).mean()
-            atr_avg = atr.rolling(50).mean()
+            range_high = IndicatorStore.rolling_max(close, 50).shift(1)
+            atr = IndicatorStore.sma(high - low, 14)
+            atr_avg = IndicatorStore.sma(atr, 50)
 
             # エントリー: 50本高値を上抜け + ATRが平均の1.5倍以上（モメンタム確認）
             entries = (close > range_high) & (atr > atr_avg * 1.5)
@@ -393,8 +370,8 @@ class CoreBacktest:
         """Macro Value: close < SMA200 & close > SMA50 = 底値圏で安定化中"""
         try:
             close = df["close"]
-            sma50 = close.rolling(50).mean()
-            sma200 = close.rolling(200).mean()
+            sma50 = IndicatorStore.sma(close, 50)
+            sma200 = IndicatorStore.sma(close, 200)
 
             # エントリー: 長期MA以下（割安）だが中期MA以上（安定化中）
             entries = (close < sma200) & (close > sma50) & (close.shift(1) <= sma50.shift(1))
@@ -417,8 +394,8 @@ class CoreBacktest:
         """Golden Cross: SMA50がSMA200を上抜け = 大局トレンド転換"""
         try:
             close = df["close"]
-            sma50 = close.rolling(50).mean()
-            sma200 = close.rolling(200).mean()
+            sma50 = IndicatorStore.sma(close, 50)
+            sma200 = IndicatorStore.sma(close, 200)
 
             # エントリー: SMA50がSMA200を上抜け（ゴールデンクロス）
             entries = (sma50 > sma200) & (sma50.shift(1) <= sma200.shift(1))
@@ -442,9 +419,9 @@ class CoreBacktest:
         try:
             close = df["close"]
             rsi = _calc_rsi(close, 14)
-            sma100 = close.rolling(100).mean()
+            sma100 = IndicatorStore.sma(close, 100)
 
-            low_200 = close.rolling(200).min()
+            low_200 = IndicatorStore.rolling_min(close, 200)
             # エントリー: 200本最安値から10%以内 + RSI35以下
             near_bottom = close <= low_200 * 1.10
             entries = near_bottom & (rsi < 35)
@@ -464,10 +441,9 @@ class CoreBacktest:
 
     # ── 全戦略一括実行（Task 2.2 メインAPI）─────────────────────────
     @staticmethod
-    def run_all_strategies(df: pd.DataFrame, symbol: str = 'UNKNOWN', use_optuna: bool = True, optuna_df=None) -> dict:
-        """8戦略並列実行。use_optuna=TrueでMACD/RSIをTPE最適化"""
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import functools
+    def run_all_strategies(df: pd.DataFrame, symbol: str = 'UNKNOWN', use_optuna: bool = True, optuna_df=None,
+                           executor_mode: str = None) -> dict:
+        """9戦略並列実行。use_optuna=TrueでMACD/RSIをTPE最適化。executor_mode: process/thread/serial（None=環境変数）"""
 
         macd_params = None
         rsi_params  = None
@@ -509,28 +485,9 @@ class CoreBacktest:
         except ImportError:
             pass
 
-        results = {}
-
-        # ThreadPoolExecutor: pickle不要・GIL解放で数値計算は並列動作
-        try:
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                future_to_name = {
-                    executor.submit(func, df): name
-                    for name, func in strategy_map.items()
-                }
-                for future in as_completed(future_to_name, timeout=60):
-                    name = future_to_name[future]
-                    try:
-                        results[name] = future.result()
-                    except Exception as e:
-                        results[name] = {"strategy": name, "sharpe": 0.0,
-                                         "confidence": "LOW", "trades": 0,
-                                         "win_rate": 0.0, "error": str(e)}
-        except Exception as e:
-            import logging
-            logging.getLogger("neo.backtest").warning(
-                f"Parallel backtest failed, falling back to sequential: {e}")
-            results = {name: func(df) for name, func in strategy_map.items()}
+        # プロセスプール + 共有メモリで並列実行（NEO_BACKTEST_EXECUTOR=thread/serial で切替）
+        from research.backtests.executor import run_strategies
+        results = run_strategies(strategy_map, df, mode=executor_mode)
 
         best = max(results.values(), key=lambda r: r.get("sharpe", 0.0))
         summary = (
@@ -544,9 +501,5 @@ class CoreBacktest:
 
 
 def _calc_rsi(close: pd.Series, period: int = 14) -> pd.Series:
-    """FeatureBuilderが使えない場合のRSIフォールバック計算"""
-    delta = close.diff()
-    gain  = delta.clip(lower=0).rolling(period).mean()
-    loss  = (-delta.clip(upper=0)).rolling(period).mean()
-    rs    = gain / loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
+    """FeatureBuilderが使えない場合のRSIフォールバック計算（単純移動平均版・IndicatorStoreでメモ化）"""
+    return IndicatorStore.rsi_sma(close, period)
@@ -0,0 +1,105 @@
+"""
+ロングオンリー売買シミュレーションのNumPyカーネル
+_manual_backtest / _manual_sharpe の `for i in range(len(cs))` + `.iloc[i]` ループを置き換える。
+
+状態遷移は旧ループと同一:
+  - ポジション無し & entries[i] → close[i]*(1+fees) でエントリー
+  - ポジション有り & exits[i]   → close[i]*(1-fees) でエグジット（エントリー足では判定しない）
+  - エグジット足では再エントリーしない（次の足から判定）
+shift=True で旧 _manual_backtest と同じくシグナルを1本後ろにずらす（ルックアヘッド対策）。
+
+バー単位の処理はすべて配列演算で行い、Pythonループは約定回数ぶんのリスト参照のみ。
+リターン・エクイティ（逐次積）・最大DDの浮動小数演算順は旧ループと同じなので結果はビット一致する。
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class TradeSim(NamedTuple):
+    returns: np.ndarray      # 取引ごとのリターン（手数料込み）
+    entry_idx: np.ndarray    # エントリー足のインデックス
+    exit_idx: np.ndarray     # エグジット足のインデックス
+    equity: np.ndarray       # 各取引決済後のエクイティ（初期値1.0）
+    max_dd: float            # 最大ドローダウン（%・決済時エクイティ基準）
+
+    @property
+    def wins(self) -> int:
+        return int(np.count_nonzero(self.returns > 0))
+
+
+def _as_float(x) -> np.ndarray:
+    a = x.to_numpy() if hasattr(x, "to_numpy") else np.asarray(x)
+    return a.astype(np.float64, copy=False)
+
+
+def _as_bool(x) -> np.ndarray:
+    a = x.to_numpy() if hasattr(x, "to_numpy") else np.asarray(x)
+    if a.dtype != np.bool_:
+        a = pd.Series(a).fillna(False).astype(bool).to_numpy()
+    return a
+
+
+def _shift1(a: np.ndarray) -> np.ndarray:
+    out = np.zeros_like(a)
+    out[1:] = a[:-1]
+    return out
+
+
+def match_trades(entries: np.ndarray, exits: np.ndarray):
+    """エントリー/エグジット足のインデックス対を返す（決済されなかった最後の建玉は含まない）"""
+    e_pos = np.flatnonzero(entries)
+    x_pos = np.flatnonzero(exits)
+    ei, xi = [], []
+    if len(e_pos) and len(x_pos):
+        # 各エントリーの「次のエグジット」・各エグジットの「次のエントリー」を一括で求めてから辿る
+        next_x = np.searchsorted(x_pos, e_pos, side="right").tolist()
+        next_e = np.searchsorted(e_pos, x_pos, side="right").tolist()
+        n_e, n_x = len(e_pos), len(x_pos)
+        k = 0
+        while k < n_e:
+            j = next_x[k]
+            if j >= n_x:
+                break
+            ei.append(k)
+            xi.append(j)
+            k = next_e[j]
+        return e_pos[ei], x_pos[xi]
+    return np.asarray(ei, dtype=np.int64), np.asarray(xi, dtype=np.int64)
+
+
+def simulate_trades(close, entries, exits, fees: float = 0.001, shift: bool = True) -> TradeSim:
+    """close/entries/exits（Series・ndarray可、位置ベース）から全取引を1パスで計算"""
+    c = _as_float(close)
+    en = _as_bool(entries)
+    ex = _as_bool(exits)
+    if not (len(c) == len(en) == len(ex)):
+        raise ValueError(f"length mismatch: close={len(c)} entries={len(en)} exits={len(ex)}")
+    if shift:
+        en, ex = _shift1(en), _shift1(ex)
+
+    ei, xi = match_trades(en, ex)
+    ep = c[ei] * (1 + fees)
+    rets = (c[xi] * (1 - fees) - ep) / ep
+    equity = np.cumprod(1 + rets)
+    if len(equity):
+        peak = np.fmax.accumulate(np.fmax(equity, 1.0))
+        dd = (peak - equity) / peak * 100
+        max_dd = float(np.fmax.reduce(dd, initial=0.0))
+    else:
+        max_dd = 0.0
+    return TradeSim(rets, ei, xi, equity, max_dd)
+
+
+def sharpe_ratio(rets: np.ndarray):
+    """旧実装と同じ年率Sharpe（std<1e-6・非有限・|SR|>100 は None）"""
+    if len(rets) == 0:
+        return None
+    std = rets.std()
+    if std < 1e-6:
+        return None
+    sr = float((rets.mean() / std) * np.sqrt(252))
+    if not np.isfinite(sr) or abs(sr) > 100:
+        return None
+    return sr
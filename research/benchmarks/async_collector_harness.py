@@ -0,0 +1,165 @@
+"""
+async_collector 偽サーバーハーネス
+ローカル aiohttp サーバーで DexScreener / GeckoTerminal / Binance を模擬し、
+  1) 各プロバイダへのリクエスト列がトークンバケット予算（任意区間で capacity + rate*t 以下）を守るか検証
+  2) 銘柄数を増やしたときの1サイクル壁時計時間を、旧直列コレクター相当の待ち時間と比較
+する。外部APIには一切アクセスしない。
+
+使い方: python research/benchmarks/async_collector_harness.py [--scales 5,20,50] [--latency 0.05]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from aiohttp import web
+
+from core import price_store
+from orchestration import async_collector
+
+# 検証用の小さめ予算（本番値だとGT側の待ちが長くなるため）
+TEST_LIMITS = {
+    "dexscreener":   (8.0, 4),
+    "geckoterminal": (2.0, 2),
+    "binance":       (20.0, 5),
+}
+
+
+class FakeProviders:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.hits = defaultdict(list)   # provider -> [monotonic時刻]
+
+    async def _hit(self, provider: str):
+        self.hits[provider].append(time.monotonic())
+        await asyncio.sleep(self.latency)
+
+    async def dex_search(self, request):
+        await self._hit("dexscreener")
+        return web.json_response({"pairs": [
+            {"priceUsd": "1.2345", "liquidity": {"usd": 100000}, "volume": {"h1": 5000}},
+            {"priceUsd": "9.9", "liquidity": {"usd": 10}, "volume": {"h1": 1}},
+        ]})
+
+    async def gt_pool(self, request):
+        await self._hit("geckoterminal")
+        return web.json_response({"data": {"attributes": {
+            "base_token_price_usd": "0.75", "volume_usd": {"h1": "1200"}}}})
+
+    async def gt_ohlcv(self, request):
+        await self._hit("geckoterminal")
+        now = int(time.time()) // 14400 * 14400
+        return web.json_response({"data": {"attributes": {"ohlcv_list": [
+            [now - i * 14400, 0.7, 0.8, 0.6, 0.75, 1000.0] for i in range(10)]}}})
+
+    async def bn_price(self, request):
+        await self._hit("binance")
+        return web.json_response({"symbol": request.query.get("symbol"), "price": "65000.5"})
+
+    async def bn_klines(self, request):
+        await self._hit("binance")
+        now = int(time.time()) // 3600 * 3600 * 1000
+        return web.json_response([[now - i * 3_600_000, "1", "2", "0.5", "1.5", "10"] for i in range(24)])
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/dex/latest/dex/search", self.dex_search)
+        app.router.add_get("/gt/networks/base/pools/{pool}", self.gt_pool)
+        app.router.add_get("/gt/networks/base/pools/{pool}/ohlcv/hour", self.gt_ohlcv)
+        app.router.add_get("/bn/ticker/price", self.bn_price)
+        app.router.add_get("/bn/klines", self.bn_klines)
+        return app
+
+
+def check_budget(stamps: list, rate: float, capacity: int, slack: float = 0.02) -> int:
+    """任意区間 [t_i, t_j] のリクエスト数が capacity + rate*(t_j - t_i) を超えた件数を返す"""
+    stamps = sorted(stamps)
+    violations = 0
+    for i in range(len(stamps)):
+        for j in range(i, len(stamps)):
+            allowed = capacity + rate * (stamps[j] - stamps[i] + slack)
+            if j - i + 1 > allowed:
+                violations += 1
+    return violations
+
+
+def make_targets(n: int):
+    """n銘柄をプロバイダに振り分け（DEX:GT:Binance ≒ 3:1:1）"""
+    ticks, candles = [], []
+    for i in range(n):
+        sym = f"SYM{i}"
+        if i % 5 == 3:
+            ticks.append((sym, "geckoterminal", f"0xpool{i}"))
+            candles.append((sym, "geckoterminal", f"0xpool{i}", "4h", "geckoterminal"))
+        elif i % 5 == 4:
+            ticks.append((sym, "binance", f"{sym}USDT"))
+            candles.append((sym, "binance", f"{sym}USDT", "1h", "binance"))
+        else:
+            ticks.append((sym, "dexscreener", sym))
+    return ticks, candles
+
+
+def serial_estimate(ticks: list, candles: list, latency: float) -> float:
+    """旧直列コレクターの所要時間見積り（銘柄ごと sleep(1) + GT 10秒間隔 + レイテンシ）"""
+    n_gt = sum(1 for t in ticks if t[1] == "geckoterminal") + sum(1 for c in candles if c[1] == "geckoterminal")
+    return len(ticks) * (1.0 + latency) + len(candles) * latency + max(0, n_gt - 1) * 10
+
+
+async def run_scale(n: int, latency: float, db_path: str) -> dict:
+    fake = FakeProviders(latency)
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    urls = {"dexscreener": f"{base}/dex", "geckoterminal": f"{base}/gt", "binance": f"{base}/bn"}
+
+    ticks, candles = make_targets(n)
+    conn = price_store.open_connection(db_path)
+    price_store.ensure_schema(conn)
+    try:
+        stats = await async_collector.collect_cycle_async(
+            conn, include_ohlcv=True, tick_targets=ticks, candle_targets=candles,
+            urls=urls, limits=TEST_LIMITS)
+    finally:
+        conn.close()
+        await runner.cleanup()
+
+    violations = {p: check_budget(fake.hits[p], *TEST_LIMITS[p]) for p in TEST_LIMITS}
+    return {
+        "n": n,
+        "requests": {p: len(fake.hits[p]) for p in TEST_LIMITS},
+        "violations": violations,
+        "elapsed": stats["elapsed"],
+        "ticks": stats["ticks"],
+        "serial_est": serial_estimate(ticks, candles, latency),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="5,20,50")
+    ap.add_argument("--latency", type=float, default=0.05, help="偽サーバーの応答遅延（秒）")
+    args = ap.parse_args()
+    async_collector.logger.setLevel(logging.WARNING)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(x) for x in args.scales.split(",")]:
+            r = asyncio.run(run_scale(n, args.latency, os.path.join(tmp, f"prices_{n}.sqlite")))
+            bad = {p: v for p, v in r["violations"].items() if v}
+            ok &= not bad and r["ticks"] == n
+            print(f"n={r['n']:>3} | async {r['elapsed']:6.2f}s | 直列見積 {r['serial_est']:7.1f}s | "
+                  f"req {r['requests']} | ticks {r['ticks']}/{n} | "
+                  f"{'予算OK' if not bad else f'予算超過 {bad}'}")
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+trade_kernel ベンチマーク + ビット一致検証
+旧 _manual_backtest / _manual_sharpe の `.iloc[i]` ループ（本ファイルに凍結コピー）と
+research.backtests.trade_kernel.simulate_trades を同一シグナルで実行し、
+  1) 取引リターン列・総リターン・最大DD・勝率・Sharpe が完全一致すること
+  2) 戦略スイープ（CoreBacktest のうち pandas_ta/gplearn 非依存の7戦略）の所要時間
+を確認する。
+
+使い方: python research/benchmarks/backtest_kernel_bench.py [--bars 5000] [--cases 200]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from research.backtests import run_backtest
+from research.backtests.run_backtest import CoreBacktest
+from research.backtests.trade_kernel import simulate_trades, sharpe_ratio
+
+# 旧実装の infer_objects(copy=False) は pandas 3 で非推奨警告が出る（結果には影響しない）
+warnings.filterwarnings("ignore", message="The copy keyword")
+
+
+# ---------------------------------------------------------------
+# 旧実装（凍結コピー・比較用）
+# ---------------------------------------------------------------
+def legacy_backtest(close, entries, exits, fees=0.001):
+    cs = pd.Series(close.values if hasattr(close, "values") else close).reset_index(drop=True)
+    en = pd.Series(entries).reset_index(drop=True).fillna(False).astype(bool)
+    ex = pd.Series(exits).reset_index(drop=True).fillna(False).astype(bool)
+    en = en.shift(1).fillna(False).infer_objects(copy=False).astype(bool)
+    ex = ex.shift(1).fillna(False).infer_objects(copy=False).astype(bool)
+    in_pos, ep, rets, wins = False, 0.0, [], 0
+    equity, peak, mdd = 1.0, 1.0, 0.0
+    for i in range(len(cs)):
+        if not in_pos and en.iloc[i]:
+            ep = cs.iloc[i] * (1 + fees); in_pos = True
+        elif in_pos and ex.iloc[i]:
+            r = (cs.iloc[i] * (1 - fees) - ep) / ep
+            rets.append(r)
+            if r > 0: wins += 1
+            equity *= (1 + r)
+            if equity > peak: peak = equity
+            dd = (peak - equity) / peak * 100
+            if dd > mdd: mdd = dd
+            in_pos = False
+    return rets, wins, equity, mdd
+
+
+def legacy_sharpe(close, entries, exits, fees=0.001):
+    close = pd.Series(close).reset_index(drop=True)
+    entries = pd.Series(entries).reset_index(drop=True).fillna(False).astype(bool)
+    exits = pd.Series(exits).reset_index(drop=True).fillna(False).astype(bool)
+    in_pos, entry_price, returns = False, 0.0, []
+    for i in range(len(close)):
+        if not in_pos and entries.iloc[i]:
+            entry_price = close.iloc[i] * (1 + fees)
+            in_pos = True
+        elif in_pos and exits.iloc[i]:
+            ret = (close.iloc[i] * (1 - fees) - entry_price) / entry_price
+            returns.append(ret)
+            in_pos = False
+    if len(returns) < 2:
+        return 0.0, len(returns)
+    r = np.array(returns)
+    if r.std() < 1e-6:
+        return 0.0, len(returns)
+    sharpe = (r.mean() / r.std()) * np.sqrt(252)
+    if not np.isfinite(sharpe) or abs(sharpe) > 100:
+        return 0.0, len(returns)
+    return round(float(sharpe), 3), len(returns)
+
+
+def kernel_sharpe(close, entries, exits, fees=0.001):
+    """param_optimizer._manual_sharpe と同一（optuna/vectorbt 未導入環境でも比較できるよう再掲）"""
+    sim = simulate_trades(close, entries, exits, fees=fees, shift=False)
+    n = len(sim.returns)
+    if n < 2:
+        return 0.0, n
+    sr = sharpe_ratio(sim.returns)
+    return (0.0, n) if sr is None else (round(sr, 3), n)
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    return pd.DataFrame({"close": close, "high": high, "low": low})
+
+
+def verify(cases: int, bars: int) -> int:
+    mismatches = 0
+    for seed in range(cases):
+        rng = np.random.default_rng(seed)
+        n = int(rng.integers(5, bars))
+        df = _frame(n, seed)
+        p_en, p_ex = rng.uniform(0.005, 0.3, 2)
+        en = pd.Series(rng.random(n) < p_en)
+        ex = pd.Series(rng.random(n) < p_ex)
+        if seed % 4 == 0:  # NaN混在（rolling由来のobject列）
+            en = en.astype(object); en.iloc[: n // 10] = np.nan
+            ex = ex.astype(object); ex.iloc[: n // 7] = np.nan
+        rets, wins, equity, mdd = legacy_backtest(df["close"], en, ex)
+        sim = simulate_trades(df["close"], en, ex, shift=True)
+        new_eq = float(sim.equity[-1]) if len(sim.equity) else 1.0
+        ok = (np.array_equal(np.asarray(rets), sim.returns) and wins == sim.wins
+              and equity == new_eq and mdd == sim.max_dd
+              and legacy_sharpe(df["close"], en, ex) == kernel_sharpe(df["close"], en, ex))
+        if not ok:
+            mismatches += 1
+            print(f"  MISMATCH seed={seed} n={n}")
+    return mismatches
+
+
+def time_sweep(bars: int, repeat: int):
+    """7戦略が生成したシグナルで旧ループ/カーネルを計測（MC・Sharpe集計は除く）"""
+    df = _frame(bars, 123)
+    strategies = [CoreBacktest.run_mean_reversion, CoreBacktest.run_triple_ma_cross,
+                  CoreBacktest.run_ichimoku_cloud, CoreBacktest.run_atr_breakout,
+                  CoreBacktest.run_macro_value, CoreBacktest.run_golden_cross,
+                  CoreBacktest.run_dca_accumulation]
+    captured = []
+    orig_bt = run_backtest._manual_backtest
+
+    def _capture(close, entries, exits, name, fees=0.001):
+        captured.append((close, entries, exits))
+        return {"strategy": name}
+    run_backtest._manual_backtest = _capture
+    try:
+        for fn in strategies:
+            fn(df)
+    finally:
+        run_backtest._manual_backtest = orig_bt
+
+    def run_legacy():
+        for c, e, x in captured:
+            legacy_backtest(c, e, x)
+
+    def run_kernel():
+        for c, e, x in captured:
+            simulate_trades(c, e, x, shift=True)
+
+    out = {}
+    for label, fn in (("legacy", run_legacy), ("kernel", run_kernel)):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        out[label] = (time.perf_counter() - t0) / repeat * 1000
+    return len(captured), out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bars", type=int, default=5000)
+    ap.add_argument("--cases", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    bad = verify(args.cases, args.bars)
+    print(f"ビット一致検証: {args.cases}ケース中 不一致 {bad}件")
+    for bars in (1000, args.bars, args.bars * 4):
+        n_strat, t = time_sweep(bars, args.repeat)
+        print(f"bars={bars:>6} | {n_strat}戦略スイープ: 旧ループ {t['legacy']:8.1f}ms | "
+              f"カーネル {t['kernel']:6.2f}ms | {t['legacy'] / t['kernel']:5.0f}x")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
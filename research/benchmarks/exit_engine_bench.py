@@ -0,0 +1,242 @@
+"""
+出口エンジン（core.exit_engine）マイクロベンチマーク
+ランダムなポジション（short/mid/long・AI戦略書あり/なし・exit_stages あり/なし・F2 水準）と価格パスで
+  A) 旧実装: ティック（旧実装では30秒サイクル）ごとに 出口プロファイル・戦略書上書き・S3・F2・exit_stages を導出し直して判定
+     （run_trigger.check_tp_sl_all_positions の判定部分を凍結。PaperWallet / NeoMemoryDB の構築コストは含まない）
+  B) ExitEngine.on_price（事前計算した閾値・静穏帯）
+の判定（発火した層）が各ティックで一致することを確認し、同時保有 40 銘柄・静かな相場での1ティックあたりの判定コストと
+トリガー区間を出たティック（全判定＋梯子の bisect が走った割合）を表示する。
+
+旧実装との既知の差（一致判定から除外して件数だけ表示）:
+  - 旧実装は exit_stages / F2 L2 で決まった理由を後段の elif（トレール・固定TP・RSI）が上書きしていた（エンジンは先に成立した層で確定）
+  - 旧実装は HWM が未保存だと毎回 HWM=現在値 になりトレールが発火しなかった（ここでは両者に同じ HWM を渡して比べる）
+
+使い方: python research/benchmarks/exit_engine_bench.py [--positions 300] [--ticks 1500]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import copy
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from core import exit_engine
+from core.config import EXIT_PROFILES, EXIT_PROFILE_DEFAULT
+
+TICK_SEC = 600
+_rsi_now = [50.0]
+
+
+# ---------------------------------------------------------------
+# 旧実装（比較用に凍結 — check_tp_sl_all_positions の判定部分）
+# ---------------------------------------------------------------
+def legacy_decide(hdata: dict, current_price: float, _f2_level: int, now: datetime, _calc_rsi):
+    avg_price = hdata["avg_price"]
+    pnl_pct = round((current_price - avg_price) / avg_price * 100, 2) if avg_price > 0 else 0.0
+    pnl = {"pnl_pct": pnl_pct}
+    _exit_cat = hdata.get("exit_profile", EXIT_PROFILE_DEFAULT)
+    _exit_p = EXIT_PROFILES.get(_exit_cat, EXIT_PROFILES[EXIT_PROFILE_DEFAULT])
+    sl_pct = _exit_p["sl_pct"]
+    _trail_start = _exit_p["trailing_start"]
+    _trail_drop = _exit_p["trailing_drop"]
+    _hard_tp = _exit_p["hard_tp_pct"]
+    _time_limit = _exit_p["time_limit_hours"]
+    _ai_ep = hdata.get("entry_context", {}).get("exit_profile", {}) if isinstance(hdata.get("entry_context"), dict) else {}
+    if _ai_ep.get("rsi_exit") is not None:
+        _exit_p = dict(_exit_p)
+        _exit_p["rsi_exit"] = _ai_ep["rsi_exit"]
+    if _ai_ep.get("trailing_start"):
+        _trail_start = _ai_ep["trailing_start"]
+    if _ai_ep.get("trailing_drop"):
+        _trail_drop = _ai_ep["trailing_drop"]
+    _strategy = hdata.get("entry_context", {}).get("strategy") if isinstance(hdata.get("entry_context"), dict) else None
+    if _strategy and current_price > 0:
+        try:
+            _s3_entry = float(hdata.get("avg_price", 0))
+            _s3_stop = float(_strategy.get("bear_scenario", {}).get("stop_price", 0))
+            _s3_target = float(_strategy.get("bull_scenario", {}).get("target_price", 0))
+            if _s3_entry > 0 and _s3_stop > 0:
+                _strat_sl_pct = (_s3_entry - _s3_stop) / _s3_entry * 100
+                if 0 < _strat_sl_pct <= sl_pct * 2:
+                    sl_pct = _strat_sl_pct
+            if _s3_entry > 0 and _s3_stop > 0 and _s3_entry > _s3_stop:
+                _s3_bear_prog = (_s3_entry - current_price) / (_s3_entry - _s3_stop) * 100
+                if _s3_bear_prog >= 70:
+                    _new_cat = {"long": "mid", "mid": "short"}.get(_exit_cat)
+                    if _new_cat:
+                        _new_p = EXIT_PROFILES.get(_new_cat)
+                        if _new_p:
+                            _trail_start = _new_p["trailing_start"]
+                            _trail_drop = _new_p["trailing_drop"]
+                            _hard_tp = _new_p["hard_tp_pct"]
+                            _time_limit = _new_p["time_limit_hours"]
+            if _s3_entry > 0 and _s3_target > _s3_entry:
+                _s3_bull_prog = (current_price - _s3_entry) / (_s3_target - _s3_entry) * 100
+                if _s3_bull_prog >= 100 and pnl['pnl_pct'] > 0:
+                    _trail_start = min(_trail_start, max(2.0, pnl['pnl_pct'] * 0.8))
+        except Exception:
+            pass
+
+    sell_label = ""
+    if _f2_level >= 3:
+        sell_label = "F2-L3"
+    elif _f2_level >= 2 and pnl['pnl_pct'] > 0:
+        sell_label = "F2-L2"
+    elif _f2_level >= 1:
+        sl_pct = sl_pct * 0.5
+    _sell_fraction = 1.0
+    if not sell_label and _strategy:
+        _completed = hdata.get('completed_stages', [])
+        for _si, _stg in enumerate(_strategy.get('bear_scenario', {}).get('exit_stages', [])):
+            if f'bear_{_si}' in _completed:
+                continue
+            if pnl['pnl_pct'] <= float(_stg.get('trigger_pct', -999)):
+                _sell_fraction = min(100, max(1, int(_stg.get('sell_pct', 100)))) / 100.0
+                sell_label = 'Strategy SL'
+                break
+        if not sell_label:
+            for _si, _stg in enumerate(_strategy.get('bull_scenario', {}).get('exit_stages', [])):
+                if f'bull_{_si}' in _completed:
+                    continue
+                if pnl['pnl_pct'] >= float(_stg.get('trigger_pct', 999)):
+                    _sell_fraction = min(100, max(1, int(_stg.get('sell_pct', 100)))) / 100.0
+                    sell_label = 'Strategy TP'
+                    break
+    if not sell_label and pnl['pnl_pct'] <= -sl_pct:
+        sell_label = "SL"
+    elif pnl['pnl_pct'] >= _trail_start or hdata.get("high_water_pnl", 0) >= _trail_start:
+        prev_hw = hdata.get("high_water_pnl", pnl['pnl_pct'])
+        if pnl['pnl_pct'] > prev_hw:
+            hdata["high_water_pnl"] = pnl['pnl_pct']
+            prev_hw = pnl['pnl_pct']
+        if prev_hw - pnl['pnl_pct'] >= _trail_drop:
+            sell_label = "Trail TP"
+    elif pnl['pnl_pct'] >= _hard_tp:
+        sell_label = "Hard TP"
+    elif pnl['pnl_pct'] > 1.5:
+        _rsi_exit_threshold = _exit_p.get("rsi_exit")
+        if _rsi_exit_threshold is not None:
+            _min_profit_for_rsi = 3.0
+            try:
+                _ec_strat = hdata.get("entry_context", {}) if isinstance(hdata.get("entry_context"), dict) else {}
+                _bull_stages = _ec_strat.get("strategy", {}).get("bull_scenario", {}).get("exit_stages", []) if isinstance(_ec_strat.get("strategy"), dict) else []
+                if _bull_stages and isinstance(_bull_stages[0], dict):
+                    _min_profit_for_rsi = max(3.0, _bull_stages[0].get("trigger_pct", 3.0))
+            except Exception:
+                pass
+            if pnl['pnl_pct'] >= _min_profit_for_rsi:
+                rsi_val = _calc_rsi()
+                if rsi_val is not None and rsi_val > _rsi_exit_threshold:
+                    sell_label = "RSI Exit"
+    if not sell_label:
+        entry_time = datetime.fromisoformat(hdata["entry_time"])
+        if (now - entry_time).total_seconds() / 3600 > _time_limit:
+            sell_label = "Time Exit"
+    return sell_label, _sell_fraction
+
+
+# ---------------------------------------------------------------
+def make_position(rng, t0: datetime) -> dict:
+    avg = float(rng.uniform(0.5, 100))
+    h = {"amount": 100.0, "avg_price": avg, "entry_time": t0.isoformat(),
+         "exit_profile": str(rng.choice(list(EXIT_PROFILES)))}
+    if rng.random() < 0.6:
+        strategy = {"thesis": "bench",
+                    "bear_scenario": {"stop_price": avg * (1 - rng.uniform(0.02, 0.12))},
+                    "bull_scenario": {"target_price": avg * (1 + rng.uniform(0.03, 0.3))}}
+        if rng.random() < 0.5:
+            strategy["bear_scenario"]["exit_stages"] = [{"trigger_pct": -float(rng.uniform(1, 6)), "sell_pct": 50}]
+            strategy["bull_scenario"]["exit_stages"] = [{"trigger_pct": float(rng.uniform(2, 10)), "sell_pct": 50},
+                                                        {"trigger_pct": float(rng.uniform(10, 20)), "sell_pct": 100}]
+        ec = {"strategy": strategy}
+        if rng.random() < 0.3:
+            ec["exit_profile"] = {"rsi_exit": 70, "trailing_start": 4.0}
+        h["entry_context"] = ec
+    return h
+
+
+def run(positions: int, ticks: int, seed: int = 0):
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(seed)
+    exit_engine._rsi = lambda symbol: _rsi_now[0]
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    checked = fired = quirks = 0
+    labels = {}
+    paths = []
+    for i in range(positions):
+        hdata = make_position(rng, t0)
+        level = int(rng.choice([0, 0, 0, 1, 2, 3]))
+        vol = rng.uniform(0.002, 0.01)
+        prices = hdata["avg_price"] * np.exp(np.cumsum(rng.normal(0, vol, ticks)))
+        rsis = rng.uniform(30, 90, ticks)
+        paths.append((hdata, level, prices, rsis))
+
+        engine = exit_engine.ExitEngine()
+        engine.sync({"SYM": copy.deepcopy(hdata)}, level, -9.0)
+        legacy_h = copy.deepcopy(hdata)
+        for k in range(ticks):
+            now = t0 + timedelta(seconds=TICK_SEC * (k + 1))
+            _rsi_now[0] = float(rsis[k])
+            plan = engine.plans["SYM"]
+            if plan.hwm is not None:
+                legacy_h["high_water_pnl"] = plan.hwm
+            want, want_frac = legacy_decide(legacy_h, float(prices[k]), level, now, lambda: _rsi_now[0])
+            sig = engine.on_price("SYM", float(prices[k]), now.timestamp())
+            got = sig.label if sig else ""
+            checked += 1
+            if got != want:
+                assert got in ("Strategy SL", "Strategy TP", "F2-L2") and want in ("Trail TP", "Hard TP", "RSI Exit"), \
+                    (i, k, got, want, hdata, level, float(prices[k]))
+                quirks += 1
+            elif sig:
+                assert abs(sig.fraction - want_frac) < 1e-12
+            if got or want:
+                fired += 1
+                labels[got or want] = labels.get(got or want, 0) + 1
+                break
+    print(f"{positions} positions, {checked:,} ticks checked: decisions match "
+          f"({fired} exits, {quirks} legacy stage/F2-L2 overwrites excluded)")
+    print("  exits by layer: " + ", ".join(f"{k}={v}" for k, v in sorted(labels.items())))
+
+    # 判定コスト: 同時保有 held 銘柄・静かな相場（ティックごとの変動 0.1%）で全銘柄にティックを流す（準備は計測外）
+    now = t0 + timedelta(hours=1)
+    ts = now.timestamp()
+    held, steps = 40, 500
+    cases = [(f"S{j}", make_position(rng, t0)) for j in range(held)]
+    walks = [h["avg_price"] * np.exp(np.cumsum(rng.normal(0, 0.001, steps))) for _, h in cases]
+    ticks_ = [(sym, h, float(w[k])) for k in range(steps) for (sym, h), w in zip(cases, walks)]
+    engine = exit_engine.ExitEngine()
+    engine.sync({sym: copy.deepcopy(h) for sym, h in cases}, 0, 0.0)
+    legacy_h = {sym: copy.deepcopy(h) for sym, h in cases}
+    rsi = lambda: 50.0
+
+    t = time.perf_counter()
+    for sym, h, p in ticks_:
+        legacy_decide(legacy_h[sym], p, 0, now, rsi)
+    a = (time.perf_counter() - t) / len(ticks_) * 1e6
+
+    decided = [0]
+    decide = exit_engine.ExitPlan._decide
+
+    def counting(plan, price, now):
+        decided[0] += 1
+        return decide(plan, price, now)
+    exit_engine.ExitPlan._decide = counting
+    t = time.perf_counter()
+    for sym, h, p in ticks_:
+        if engine.on_price(sym, p, ts):
+            engine.pending.clear()
+    b = (time.perf_counter() - t) / len(ticks_) * 1e6
+    exit_engine.ExitPlan._decide = decide
+    print(f"{held} held positions, {len(ticks_):,} quiet-market ticks: "
+          f"{decided[0] / len(ticks_):.1%} left their trigger interval (full decision + bisect)")
+    print(f"  per-tick decision: legacy re-derive {a:6.2f} us | ExitEngine.on_price {b:5.2f} us  x{a / b:.1f}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--positions", type=int, default=300)
+    ap.add_argument("--ticks", type=int, default=1500)
+    a = ap.parse_args()
+    run(a.positions, a.ticks)
@@ -0,0 +1,74 @@
+"""
+特徴量DAG（feature_engineering.feature_graph）マイクロベンチマーク
+FeatureBuilder.build_from_memory を
+  A) 全特徴量（columns=None・旧実装と同じ全アルファ計算）
+  B) 消費側が使う列だけ（gplearn の FEATURE_COLS / vp_market_pulse の5列 / ma20 だけ）
+で比較する。IndicatorStore は毎回クリアする（呼び出しをまたいだメモ化なしの計算量で比べる）。
+あわせて部分ビルドの各列が全ビルドの同じ datetime の値と完全一致することを確認する。
+
+使い方: python research/benchmarks/feature_graph_bench.py [--rows 5000] [--repeat 5]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering.build_features import FeatureBuilder
+from feature_engineering.indicator_store import IndicatorStore
+from research.benchmarks.feature_pipeline_bench import make_frame
+
+GPLEARN_COLS = [
+    "ma20", "ma50", "bb_bandwidth_20", "returns", "acceleration",
+    "rsi_14", "ma_short", "ma_mid", "ma_long",
+    "macd", "macd_signal", "macd_hist", "atr_14",
+]
+PULSE_COLS = ["rsi_14", "ma20", "ma50", "bb_bandwidth_20", "returns"]
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        IndicatorStore.clear()
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1e3
+
+
+def check_subset(df: pd.DataFrame, full: pd.DataFrame, columns: list):
+    part = FeatureBuilder.build_from_memory(df, columns)
+    wanted = [c for c in columns if c in full.columns]
+    assert list(part.columns) == list(df.columns) + wanted, list(part.columns)
+    assert len(part) >= len(full)
+    merged = full[["datetime"] + wanted].merge(part[["datetime"] + wanted], on="datetime", suffixes=("", "_part"))
+    assert len(merged) == len(full)
+    for c in wanted:
+        np.testing.assert_array_equal(merged[c].to_numpy(), merged[f"{c}_part"].to_numpy())
+
+
+def main(rows: int, repeat: int):
+    logging.disable(logging.INFO)
+    df = make_frame(rows, 30)
+    full = FeatureBuilder.build_from_memory(df)
+    cases = [("all features", None), ("gplearn FEATURE_COLS", GPLEARN_COLS),
+             ("vp_market_pulse", PULSE_COLS), ("ma20 only", ["ma20"])]
+    for _, columns in cases[1:]:
+        check_subset(df, full, columns)
+    print(f"subset builds match the full build ({rows} rows x {df.shape[1]} cols input)")
+    base = None
+    for label, columns in cases:
+        ms = _timeit(lambda: FeatureBuilder.build_from_memory(df, columns), repeat)
+        base = base or ms
+        n = len(FeatureBuilder.GRAPH.plan(df.columns, columns))
+        print(f"  {label:22s}: {ms:7.2f} ms  ({n:2d} nodes)  x{base / ms:.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    main(a.rows, a.repeat)
@@ -0,0 +1,197 @@
+"""
+FeatureBuilder メモリベンチマーク
+build_from_memory を
+  A) 旧実装: 各アルファが df.copy() してから列追加（1回のビルドでフレームを7〜9回複製）→ dropna().reset_index()
+  B) 列追加パイプライン（feature_engineering.pipeline）: 出力列を1回だけ確保して NumPy バッファに書き込み
+で実行し、それぞれ新しいサブプロセスで ピークRSS の増分（ビルド前後の ru_maxrss 差）と
+tracemalloc のピーク確保量を測る。あわせて A/B の出力が一致することを確認する。
+
+入力: rows 行 × cols 列（OHLCV + funding_rate + liq_long/liq_short + 追加の数値列で cols 列にする）
+
+使い方: python research/benchmarks/feature_pipeline_bench.py [--rows 5000] [--cols 30] [--repeat 3]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering.build_features import FeatureBuilder
+from feature_engineering.indicator_store import IndicatorStore
+from feature_engineering import alpha_regime, alpha_volatility
+
+
+# ---------------------------------------------------------------
+# 旧実装（比較用に凍結 — df.copy() の回数と列の作り方を再現）
+# ---------------------------------------------------------------
+def _legacy_zscore(df, window, column="funding_rate"):
+    df = df.copy()
+    m = df[column].rolling(window=window, min_periods=window//2).mean()
+    s = df[column].rolling(window=window, min_periods=window//2).std().replace(0, np.nan)
+    df[f"funding_zscore_{window}"] = (df[column] - m) / s
+    return df
+
+
+def _legacy_funding(df):
+    df = _legacy_zscore(df, 24)
+    df = _legacy_zscore(df, 72)
+    df = df.copy()
+    df["funding_momentum_8_72"] = df["funding_rate"].rolling(8).mean() - df["funding_rate"].rolling(72).mean()
+    return df
+
+
+def _legacy_liquidation(df):
+    df = df.copy()
+    df["liq_imbalance"] = (df["liq_long"] - df["liq_short"]) / (df["liq_long"] + df["liq_short"] + 1e-8)
+    df["liq_imbalance_ma_12"] = df["liq_imbalance"].rolling(window=12).mean()
+    df = df.copy()
+    m = df["liq_long"].rolling(window=48, min_periods=12).mean()
+    s = df["liq_long"].rolling(window=48, min_periods=12).std().replace(0, np.nan)
+    df["liq_long_zscore"] = (df["liq_long"] - m) / s
+    df["panic_long_exhaustion"] = (df["liq_long_zscore"] > 3.0).astype(int)
+    return df
+
+
+def _legacy_volatility(df, window=20):
+    df = df.copy()
+    if alpha_volatility._HAS_TA:
+        _bb = IndicatorStore.ta("bbands", df["close"], length=window, std=2)
+        u = _bb[next(c for c in _bb.columns if c.startswith(f"BBU_{window}"))]
+        l = _bb[next(c for c in _bb.columns if c.startswith(f"BBL_{window}"))]
+        m = _bb[next(c for c in _bb.columns if c.startswith(f"BBM_{window}"))]
+        if "volume" in df.columns:
+            df["obv"] = IndicatorStore.ta("obv", df["close"], df["volume"])
+    else:
+        m = IndicatorStore.sma(df["close"], window)
+        s = df["close"].rolling(window=window).std()
+        u, l = m + s * 2, m - s * 2
+    df[f"bb_bandwidth_{window}"] = (u - l) / (m + 1e-8)
+    mn = df[f"bb_bandwidth_{window}"].rolling(window=100, min_periods=20).min()
+    df["is_vol_squeeze"] = (df[f"bb_bandwidth_{window}"] <= (mn * 1.1)).astype(int)
+    return df
+
+
+def _legacy_cross(df, window=14):
+    df = df.copy()
+    df["returns"] = df["close"].pct_change()
+    df["acceleration"] = df["returns"].diff()
+    df[f"rsi_{window}"] = IndicatorStore.rsi_ewm(df["close"], window)
+    return df
+
+
+def _legacy_regime(df):
+    df = df.copy()
+    if alpha_regime._HAS_TA:
+        df["ma_short"] = IndicatorStore.ta("ema", df["close"], length=20)
+        df["ma_mid"] = IndicatorStore.ta("ema", df["close"], length=50)
+        df["ma_long"] = IndicatorStore.ta("ema", df["close"], length=100)
+        df["rsi_14"] = IndicatorStore.ta("rsi", df["close"], length=14)
+        _macd = IndicatorStore.ta("macd", df["close"], fast=12, slow=26, signal=9)
+        df["macd"], df["macd_signal"], df["macd_hist"] = \
+            _macd["MACD_12_26_9"], _macd["MACDs_12_26_9"], _macd["MACDh_12_26_9"]
+        df["atr_14"] = IndicatorStore.ta("atr", df["high"], df["low"], df["close"], length=14)
+    else:
+        df["ma_short"] = IndicatorStore.sma(df["close"], 20, min_periods=10)
+        df["ma_mid"] = IndicatorStore.sma(df["close"], 50, min_periods=25)
+        df["ma_long"] = IndicatorStore.sma(df["close"], 100, min_periods=50)
+    bull = (df["close"] > df["ma_short"]) & (df["ma_short"] > df["ma_mid"]) & (df["ma_mid"] > df["ma_long"])
+    bear = (df["close"] < df["ma_short"]) & (df["ma_short"] < df["ma_mid"]) & (df["ma_mid"] < df["ma_long"])
+    df["market_regime"] = 0
+    df.loc[bull, "market_regime"] = 1
+    df.loc[bear, "market_regime"] = -1
+    return df
+
+
+def legacy_build(df):
+    df['ma20'] = IndicatorStore.sma(df['close'], 20, min_periods=1)
+    df['ma50'] = IndicatorStore.sma(df['close'], 50, min_periods=1)
+    if "funding_rate" in df.columns:
+        df = _legacy_funding(df)
+    if all(c in df.columns for c in ["liq_long", "liq_short"]):
+        df = _legacy_liquidation(df)
+    df = _legacy_volatility(df)
+    df = _legacy_cross(df)
+    df = _legacy_regime(df)
+    return df.dropna().reset_index(drop=True)
+
+
+# ---------------------------------------------------------------
+def make_frame(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    data = {
+        "datetime": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "open": c, "high": c * 1.01, "low": c * 0.99, "close": c,
+        "volume": rng.uniform(1, 10, rows),
+        "funding_rate": rng.normal(0, 1e-4, rows),
+        "liq_long": rng.exponential(1, rows), "liq_short": rng.exponential(1, rows),
+    }
+    for i in range(max(0, cols - len(data))):
+        data[f"x{i}"] = rng.normal(size=rows)
+    return pd.DataFrame(data)
+
+
+def _measure(impl: str, rows: int, cols: int) -> dict:
+    """サブプロセス内: 1回ウォームアップ（import・遅延初期化）してから計測"""
+    logging.disable(logging.INFO)
+    build = legacy_build if impl == "legacy" else FeatureBuilder.build_from_memory
+    build(make_frame(200, cols))
+    IndicatorStore.clear()
+    df = make_frame(rows, cols)
+    frame_kb = int(df.memory_usage(index=False).sum()) // 1024
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    t = time.perf_counter()
+    out = build(df)
+    elapsed = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"rss_kb": rss1 - rss0, "traced_kb": peak // 1024, "ms": elapsed * 1e3,
+            "shape": list(out.shape), "frame_kb": frame_kb}
+
+
+def _spawn(impl: str, rows: int, cols: int) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", impl, "--rows", str(rows), "--cols", str(cols)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_equal(rows: int, cols: int):
+    logging.disable(logging.INFO)
+    IndicatorStore.clear()
+    a = legacy_build(make_frame(rows, cols))
+    b = FeatureBuilder.build_from_memory(make_frame(rows, cols))
+    assert list(a.columns) == list(b.columns), (list(a.columns), list(b.columns))
+    assert (a.dtypes == b.dtypes).all()
+    pd.testing.assert_frame_equal(a, b, check_exact=True)
+    print(f"outputs identical ({a.shape[0]} rows x {a.shape[1]} cols)")
+
+
+def main(rows: int, cols: int, repeat: int):
+    check_equal(rows, cols)
+    print(f"build_from_memory peak memory ({rows} rows x {cols} cols input, median of {repeat} fresh processes)")
+    for impl, label in (("legacy", "A) df.copy() per alpha"), ("pipeline", "B) column-append pipeline")):
+        runs = [_spawn(impl, rows, cols) for _ in range(repeat)]
+        med = lambda k: float(np.median([r[k] for r in runs]))
+        print(f"  {label:28s}: peak RSS +{med('rss_kb') / 1024:6.1f} MB | traced peak {med('traced_kb') / 1024:6.1f} MB"
+              f" | {med('ms'):6.1f} ms  (input frame {runs[0]['frame_kb'] / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--cols", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--child", choices=["legacy", "pipeline"])
+    a = ap.parse_args()
+    if a.child:
+        print(json.dumps(_measure(a.child, a.rows, a.cols)))
+    else:
+        main(a.rows, a.cols, a.repeat)
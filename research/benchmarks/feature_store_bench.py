@@ -0,0 +1,87 @@
+"""
+data_pipeline.feature_store マイクロベンチマーク
+消費側（BacktestAgent / gplearn / vp_market_pulse）の特徴量取得を
+  A) 生キャンドルから FeatureBuilder.build_from_memory で毎回全計算（旧実装）
+  B) 特徴量ストアから読み込み（cold: Parquet 読み込み / warm: プロセス内保持）
+で比較する。あわせて「全再構築 → 確定足ごとの逐次追記」の結果が一括ビルドと一致することを確認する。
+
+使い方: python research/benchmarks/feature_store_bench.py [--rows 5000] [--appends 24]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import logging
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.feature_store import FeatureStore, INTERVAL_MS
+from feature_engineering.build_features import FeatureBuilder
+from feature_engineering.indicator_store import IndicatorStore
+
+
+def _raw(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    width = INTERVAL_MS["1h"]
+    now = int(time.time() * 1000) // width * width
+    ts = now - np.arange(n)[::-1] * width          # 最終足は形成中
+    return pd.DataFrame({"datetime": (ts * 1_000_000).view("datetime64[ns]"),
+                         "open": c, "high": c * 1.01, "low": c * 0.99, "close": c, "volume": 1.0})
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1e3
+
+
+def main(rows: int, appends: int, repeat: int):
+    logging.disable(logging.INFO)
+    raw = _raw(rows)
+    store = FeatureStore(tempfile.mkdtemp())
+
+    t = time.perf_counter()
+    store.rebuild("BTC", "1h", raw.iloc[:rows - appends])
+    t_rebuild = time.perf_counter() - t
+    t = time.perf_counter()
+    for k in range(rows - appends + 1, rows + 1):
+        store.append("BTC", "1h", raw.iloc[:k])
+    t_append = (time.perf_counter() - t) / appends
+
+    IndicatorStore.clear()
+    ref = FeatureBuilder.build_from_memory(raw.iloc[:-1].reset_index(drop=True))
+    got = store.load("BTC", "1h")
+    assert list(got.columns) == list(ref.columns) and len(got) == len(ref)
+    diff = (got.drop(columns="datetime") - ref.drop(columns="datetime")).abs().max().max()
+
+    def build():
+        IndicatorStore.clear()
+        FeatureBuilder.build_from_memory(raw.copy())
+
+    def cold():
+        FeatureStore._frames.clear()
+        store.load("BTC", "1h")
+
+    print(f"feature store ({rows} 1h bars, {len(ref.columns)} columns)")
+    print(f"  rebuild once        : {t_rebuild * 1e3:8.1f} ms")
+    print(f"  append 1 closed bar : {t_append * 1e3:8.1f} ms  (avg of {appends})")
+    print(f"  incremental vs full build: max abs diff {diff:.2e}")
+    print("consumer read:")
+    print(f"  A) build_from_memory : {_timeit(build, repeat):8.1f} ms")
+    print(f"  B) load (cold)       : {_timeit(cold, repeat):8.1f} ms")
+    print(f"  B) load (warm)       : {_timeit(lambda: store.load('BTC', '1h'), repeat):8.3f} ms")
+    print(f"  B) load limit=1      : {_timeit(lambda: store.load('BTC', '1h', limit=1), repeat):8.3f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--appends", type=int, default=24)
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    main(a.rows, a.appends, a.repeat)
@@ -0,0 +1,144 @@
+"""
+FIFO ロット照合（tools.lot_matcher）マイクロベンチマーク
+取引履歴 N 件（既定 10k / 100k）の台帳で、取引1件が追加されたあとの
+  A) 旧実装: 全履歴を読み直して FIFO を最初から組み直す（performance_evaluator._calc_closed_trades の形を凍結）
+  B) LotMatcher.sync()（カーソル以降の1件だけ照合）＋ 決済レコード／今日の実現損益の照会
+を比較する。あわせて B の決済レコードが A の全件照合と一致することを確認する。
+
+使い方: python research/benchmarks/lot_matcher_bench.py [--trades 10000 100000] [--repeat 5]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from tools.lot_matcher import LotMatcher
+from tools.trade_ledger import TradeLedger
+
+
+# ---------------------------------------------------------------
+# 旧実装（比較用に凍結 — performance_evaluator の全件 FIFO 照合）
+# ---------------------------------------------------------------
+def legacy_closed_trades(history: list) -> list:
+    buys, sells = defaultdict(list), defaultdict(list)
+    for h in history:
+        symbol = h.get("symbol", "").split("/")[0].strip().upper()
+        entry = {"timestamp": h.get("timestamp", ""), "price": float(h.get("price", 0)),
+                 "amount_token": float(h.get("amount_token", 0))}
+        if h.get("action", "").upper() == "BUY" and entry["amount_token"] > 0:
+            buys[symbol].append(entry)
+        elif h.get("action", "").upper() == "SELL" and entry["amount_token"] > 0:
+            sells[symbol].append(entry)
+    closed = []
+    for symbol in set(buys) | set(sells):
+        remaining = list(buys.get(symbol, []))
+        for sell in sells.get(symbol, []):
+            left = sell["amount_token"]
+            while left > 1e-6 and remaining:
+                buy = remaining[0]
+                matched = min(buy["amount_token"], left)
+                closed.append({"symbol": symbol, "entry_price": buy["price"], "exit_price": sell["price"],
+                               "pnl_usd": (sell["price"] - buy["price"]) * matched, "sell_time": sell["timestamp"]})
+                left -= matched
+                buy["amount_token"] -= matched
+                if buy["amount_token"] <= 1e-6:
+                    remaining.pop(0)
+    closed.sort(key=lambda x: x["sell_time"])
+    return closed
+
+
+# ---------------------------------------------------------------
+SYMBOLS = ["VIRTUAL", "AIXBT", "ETH", "BTC", "SOL"]
+
+
+def make_history(n: int, seed: int = 0) -> list:
+    """PaperWallet と同じく保有分だけを売る取引列（部分売却あり）"""
+    rng = np.random.default_rng(seed)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    held = defaultdict(float)
+    history = []
+    for i in range(n):
+        sym = SYMBOLS[int(rng.integers(len(SYMBOLS)))]
+        price = float(rng.uniform(0.5, 100))
+        if held[sym] > 1e-6 and rng.random() < 0.45:
+            token = held[sym] * (0.5 if rng.random() < 0.3 else 1.0)
+            action = "SELL"
+            held[sym] -= token
+        else:
+            token = float(rng.uniform(10, 500)) / price
+            action = "BUY"
+            held[sym] += token
+        history.append({"timestamp": (t0 + timedelta(minutes=5 * i)).isoformat(), "symbol": sym, "action": action,
+                        "price": price, "amount_token": token, "amount_usd": token * price, "reason": f"bench {i}"})
+    return history
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1e3
+
+
+def run(n: int, repeat: int):
+    tmp = tempfile.mkdtemp(prefix="lot_bench_")
+    try:
+        ledger = TradeLedger(os.path.join(tmp, "paper_wallet.sqlite"))
+        state = {"usd_balance": 0.0, "holdings": {}, "created_at": "2026-01-01T00:00:00+00:00"}
+        ledger.import_history(make_history(n), state)
+        matcher = LotMatcher(ledger)
+
+        t = time.perf_counter()
+        matcher.sync()
+        build_ms = (time.perf_counter() - t) * 1e3
+
+        legacy = legacy_closed_trades(ledger.history())
+        closed = matcher.closed_trades()
+        assert len(closed) == len(legacy), (len(closed), len(legacy))
+        got = sorted((c["symbol"], c["sell_ts"], round(c["pnl_usd"], 6)) for c in closed)
+        want = sorted((c["symbol"], c["sell_time"], round(c["pnl_usd"], 6)) for c in legacy)
+        assert got == want
+
+        tick = [0]
+
+        def append():
+            tick[0] += 1
+            tx = {"timestamp": f"2099-01-01T00:00:{tick[0] % 60:02d}", "symbol": "ETH",
+                  "action": "BUY" if tick[0] % 2 else "SELL", "price": 2500.0 + tick[0],
+                  "amount_token": 0.01, "amount_usd": 25.0, "reason": "bench"}
+            ledger.append(tx, state)
+
+        def legacy_step():
+            append()
+            legacy_closed_trades(ledger.history())
+
+        def new_step():
+            append()
+            matcher.sync()
+            matcher.realized_pnl(since="2099-01-01")
+
+        a = _timeit(legacy_step, repeat)
+        b = _timeit(new_step, repeat)
+        q = _timeit(lambda: matcher.closed_trades(symbol="AIXBT"), repeat)
+        print(f"{n:,} trades  ({len(closed):,} closed records, initial build {build_ms:.0f} ms, verified)")
+        print(f"  append + closed trades : legacy rescan {a:9.2f} ms | incremental {b:7.3f} ms  x{a / b:,.0f}")
+        print(f"  symbol closed trades   : {q:7.2f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trades", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    for n in a.trades:
+        run(n, a.repeat)
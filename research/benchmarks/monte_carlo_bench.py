@@ -0,0 +1,87 @@
+"""
+ブートストラップ・モンテカルロ ベンチマーク
+旧 _monte_carlo_confidence（random.choices × n_sim 回の Python ループ・本ファイルに凍結コピー）と
+research.backtests.monte_carlo のベクトル化版を比較する。
+  1) 所要時間: 旧500回 / 新500回 / 新10k回
+  2) 分位点の整合: 新10k の p5/p50/p95 が旧（大きめの n_sim）と統計誤差内で一致
+  3) seed 指定時の再現性、自己相関列での block 自動選択
+
+使い方: python research/benchmarks/monte_carlo_bench.py [--trades 20,100,500] [--repeat 5]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from research.backtests.monte_carlo import bootstrap_sharpes, suggest_block_length
+from research.backtests.run_backtest import _monte_carlo_confidence
+
+
+def legacy_sharpes(rets, n_sim=500):
+    sharpes = []
+    ra = list(rets)
+    for _ in range(n_sim):
+        sample = random.choices(ra, k=len(ra))
+        arr = np.array(sample)
+        if arr.std() < 1e-6:
+            continue
+        sr = float((arr.mean() / arr.std()) * np.sqrt(252))
+        if math.isfinite(sr) and abs(sr) < 100:
+            sharpes.append(sr)
+    return np.sort(np.asarray(sharpes))
+
+
+def _q(s: np.ndarray):
+    n = len(s)
+    return s[int(n * 0.05)], s[int(n * 0.50)], s[int(n * 0.95)]
+
+
+def _timeit(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trades", default="20,100,500")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"{'trades':>6} | {'旧500':>9} | {'新500':>8} | {'新10k':>8} | p5/p50/p95 旧(20k) vs 新(10k)")
+    for n in [int(x) for x in args.trades.split(",")]:
+        rets = rng.normal(0.004, 0.03, n)
+        t_old = _timeit(lambda: legacy_sharpes(rets, 500), args.repeat)
+        t_500 = _timeit(lambda: bootstrap_sharpes(rets, 500), args.repeat)
+        t_10k = _timeit(lambda: bootstrap_sharpes(rets, 10_000), args.repeat)
+        random.seed(1)
+        q_old = _q(legacy_sharpes(rets, 20_000))
+        q_new = _q(np.sort(bootstrap_sharpes(rets, 10_000, seed=1)))
+        qs = " / ".join(f"{a:.2f}~{b:.2f}" for a, b in zip(q_old, q_new))
+        print(f"{n:>6} | {t_old:7.1f}ms | {t_500:6.2f}ms | {t_10k:6.2f}ms | {qs}")
+
+    rets = rng.normal(0.004, 0.03, 200)
+    a = _monte_carlo_confidence(rets, seed=42)
+    b = _monte_carlo_confidence(rets, seed=42)
+    print(f"seed再現性: {a == b}  ({a['mc_label']} p5={a['mc_sharpe_p5']} block={a['mc_block']})")
+
+    # AR(1) 係数0.6の自己相関列 → ブロック・ブートストラップが選ばれ、iidより分布が広がる
+    ar = np.empty(300)
+    ar[0] = 0.0
+    eps = rng.normal(0.002, 0.02, 300)
+    for i in range(1, 300):
+        ar[i] = 0.6 * ar[i - 1] + eps[i]
+    blk = suggest_block_length(ar)
+    iid = _q(np.sort(bootstrap_sharpes(ar, 10_000, block=1, seed=3)))
+    mbb = _q(np.sort(bootstrap_sharpes(ar, 10_000, block=blk, seed=3)))
+    print(f"AR(1)列: block={blk} | iid p5~p95 幅 {iid[2] - iid[0]:.2f} | block p5~p95 幅 {mbb[2] - mbb[0]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+OHLCV 読み込みベンチマーク
+同一の1h足データを
+  A) JSON（旧 ohlcv_cache_{sym}.json 経路: json.load → pd.DataFrame(columns) → to_datetime）
+  B) prices.sqlite 行リスト（旧 get_ohlcv_from_db → pd.DataFrame 再構築）
+  C) core.ohlcv_cache（npy列 + コピーオンライト mmap → ゼロコピー DataFrame）
+で読み込み、1回あたりの所要時間を比較する。C はDataFrame列がmmap領域を直接参照していることも確認する。
+
+使い方: python research/benchmarks/ohlcv_cache_bench.py [--years 1,3,10] [--repeat 20]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import ohlcv_cache, price_store
+
+COLS = ["timestamp", "open", "high", "low", "close"]
+
+
+def _synthetic(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ts = (int(time.time()) // 3600 - n) * 3_600_000 + np.arange(n, dtype=np.int64) * 3_600_000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, n))
+    return ts, open_, high, low, close
+
+
+def _timeit(fn, repeat: int) -> float:
+    fn()  # ウォームアップ（ページキャッシュ）
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def run(years: float, repeat: int, tmp: str) -> dict:
+    n = int(years * 365 * 24)
+    ts, o, h, l, c = _synthetic(n)
+    sym = f"BENCH{int(years * 10)}"
+
+    # A) JSON
+    json_path = os.path.join(tmp, f"ohlcv_cache_{sym}.json")
+    with open(json_path, "w") as f:
+        json.dump(np.column_stack([ts, o, h, l, c]).tolist(), f)
+
+    def load_json():
+        with open(json_path) as f:
+            data = json.load(f)
+        df = pd.DataFrame(data, columns=COLS)
+        df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+        return df.drop(columns=["timestamp"])
+
+    # B) SQLite 行リスト
+    db_path = os.path.join(tmp, f"prices_{sym}.sqlite")
+    conn = price_store.open_connection(db_path)
+    price_store.ensure_schema(conn)
+    conn.executemany(
+        "INSERT INTO candles (symbol, interval, ts, o, h, l, c, v, source) VALUES (?,?,?,?,?,?,?,0,'bench')",
+        [(sym, "1h", int(t), float(a), float(b), float(d), float(e)) for t, a, b, d, e in zip(ts, o, h, l, c)])
+    conn.commit()
+
+    def load_sqlite():
+        rows = price_store.recent_candles(sym, n, interval="1h", conn=conn)
+        rows_list = [list(r) for r in rows]
+        rows_list.reverse()
+        df = pd.DataFrame(rows_list, columns=COLS)
+        df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+        return df.drop(columns=["timestamp"])
+
+    # C) npy mmap
+    ohlcv_cache.write(sym, "1h", ts, o, h, l, c, source="bench")
+
+    def load_npy():
+        return ohlcv_cache.load_frame(sym, "1h")
+
+    df_a, df_c = load_json(), load_npy()
+    assert np.array_equal(df_a["close"].to_numpy(), df_c["close"].to_numpy())
+    assert np.array_equal(df_a["datetime"].to_numpy(), df_c["datetime"].to_numpy())
+    zero_copy = all(_is_mmap_backed(df_c[col].to_numpy()) for col in ohlcv_cache.COLUMNS)
+
+    result = {
+        "rows": n,
+        "json_ms": _timeit(load_json, repeat),
+        "sqlite_ms": _timeit(load_sqlite, repeat),
+        "npy_ms": _timeit(load_npy, repeat),
+        "zero_copy": zero_copy,
+    }
+    conn.close()
+    return result
+
+
+def _is_mmap_backed(arr: np.ndarray) -> bool:
+    base = arr
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--years", default="1,3,10")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ohlcv_cache.CACHE_DIR = os.path.join(tmp, "ohlcv_npy")
+        print(f"{'years':>5} {'rows':>7} | {'JSON':>9} | {'SQLite行':>9} | {'npy mmap':>9} | 対JSON  | zero-copy")
+        for y in [float(x) for x in args.years.split(",")]:
+            r = run(y, args.repeat, tmp)
+            print(f"{y:>5.0f} {r['rows']:>7} | {r['json_ms']:7.2f}ms | {r['sqlite_ms']:7.2f}ms | "
+                  f"{r['npy_ms']:7.3f}ms | {r['json_ms'] / r['npy_ms']:6.0f}x | {r['zero_copy']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+PaperWallet マイクロベンチマーク
+取引履歴 N 件（既定 10k / 100k）のウォレットで
+  A) 旧実装: paper_wallet.json（状態＋全 history・indent=2）を毎回全パース／取引ごとに全書き直し
+  B) 状態スナップショット＋追記専用台帳（tools.trade_ledger）
+の PaperWallet() 構築・取引1件・同銘柄の直近50件取得 を比較する。
+B の台帳は旧 JSON から orchestration/migrate_paper_wallet.migrate で作り、検証（件数・各取引・残高・保有の一致）も行う。
+
+使い方: python research/benchmarks/paper_wallet_bench.py [--trades 10000 100000] [--repeat 5]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from orchestration.migrate_paper_wallet import migrate
+from tools.paper_wallet import PaperWallet
+
+SYMBOLS = ["VIRTUAL", "AIXBT", "ETH", "BTC", "SOL"]
+
+
+# ---------------------------------------------------------------
+# 旧実装（比較用に凍結 — 読み込みと保存の形だけを再現）
+# ---------------------------------------------------------------
+class LegacyPaperWallet:
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        with open(self.data_path, 'r') as f:
+            self.state = json.load(f)
+
+    def _save_wallet(self):
+        self.state["last_updated"] = datetime.now(timezone.utc).isoformat()
+        with open(self.data_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def execute_trade(self, symbol: str, action: str, amount_usd: float, price: float, reason: str = ""):
+        tx = {"timestamp": datetime.now(timezone.utc).isoformat(), "symbol": symbol, "action": action,
+              "price": price, "amount_token": amount_usd / price, "amount_usd": amount_usd, "reason": reason}
+        self.state["history"].append(tx)
+        self._save_wallet()
+        return {"status": "success", "tx": tx}
+
+
+# ---------------------------------------------------------------
+def make_legacy_json(path: str, n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    history = []
+    for i in range(n):
+        sym = SYMBOLS[int(rng.integers(len(SYMBOLS)))]
+        price = float(rng.uniform(0.5, 100))
+        usd = float(rng.uniform(10, 500))
+        tx = {"timestamp": (t0 + timedelta(minutes=5 * i)).isoformat(), "symbol": sym,
+              "action": "BUY" if rng.random() < 0.55 else "SELL", "price": price,
+              "amount_token": usd / price, "amount_usd": usd, "reason": f"bench trade {i} (pnl {rng.normal():+.2f}%)"}
+        if i % 7 == 0:
+            tx["strategy_tag"] = "macd_cross"
+        history.append(tx)
+    holdings = {s: {"amount": 100.0, "avg_price": 2.5, "entry_time": t0.isoformat()} for s in SYMBOLS[:3]}
+    state = {"usd_balance": 50000.0, "holdings": holdings, "history": history,
+             "created_at": t0.isoformat(), "last_updated": t0.isoformat()}
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1e3
+
+
+def run(n: int, repeat: int):
+    tmp = tempfile.mkdtemp(prefix="pw_bench_")
+    try:
+        legacy_path = os.path.join(tmp, "legacy", "paper_wallet.json")
+        new_json = os.path.join(tmp, "new", "paper_wallet.json")
+        os.makedirs(os.path.dirname(legacy_path)); os.makedirs(os.path.dirname(new_json))
+        make_legacy_json(legacy_path, n)
+        shutil.copy(legacy_path, new_json)
+
+        t = time.perf_counter()
+        result = migrate(new_json)
+        migrate_ms = (time.perf_counter() - t) * 1e3
+        assert result["imported"] and not result["problems"], result
+        json_mb = os.path.getsize(legacy_path) / 2**20
+        db_mb = sum(os.path.getsize(p) for p in (result["ledger"], result["ledger"] + "-wal") if os.path.exists(p)) / 2**20
+
+        load_a = _timeit(lambda: LegacyPaperWallet(legacy_path), repeat)
+        load_b = _timeit(lambda: PaperWallet(data_path=new_json), repeat)
+
+        wa, wb = LegacyPaperWallet(legacy_path), PaperWallet(data_path=new_json)
+        trade_a = _timeit(lambda: wa.execute_trade("ETH", "BUY", 10.0, 2500.0, "bench"), repeat)
+        trade_b = _timeit(lambda: wb.execute_trade("ETH", "BUY", 10.0, 2500.0, "bench"), repeat)
+
+        recent_a = _timeit(lambda: [h for h in LegacyPaperWallet(legacy_path).state["history"]
+                                    if h.get("symbol") == "AIXBT"][-50:], repeat)
+        recent_b = _timeit(lambda: PaperWallet(data_path=new_json).history(symbol="AIXBT", limit=50), repeat)
+        legacy_recent = [h for h in LegacyPaperWallet(legacy_path).state["history"] if h.get("symbol") == "AIXBT"][-50:]
+        assert PaperWallet(data_path=new_json).history(symbol="AIXBT", limit=50) == legacy_recent
+
+        print(f"{n:,} trades  (JSON {json_mb:.1f} MB → ledger {db_mb:.1f} MB, migration {migrate_ms:.0f} ms, verified)")
+        for label, a, b in (("PaperWallet() load", load_a, load_b),
+                            ("execute_trade (1 trade)", trade_a, trade_b),
+                            ("load + symbol last 50", recent_a, recent_b)):
+            print(f"  {label:24s}: legacy {a:9.2f} ms | ledger {b:7.3f} ms  x{a / b:,.0f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trades", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    for n in a.trades:
+        run(n, a.repeat)
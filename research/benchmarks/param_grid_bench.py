@@ -0,0 +1,102 @@
+"""
+MACD/RSI パラメータ一括評価ベンチマーク
+research.backtests.batch_eval の一括採点と、従来の「候補ごとに MACD を計算 → _manual_sharpe」を比較する。
+  1) ema_matrix が pandas_ta.ema と同じ式（先頭SMA種 + ewm(adjust=False)）の pandas 実装とビット一致
+  2) macd_grid / rsi_grid の各候補スコアが逐次評価と完全一致（--check 件おきに照合）
+  3) 全候補（MACD 3454通り・RSI 9750通り）の一括採点時間 vs 逐次評価の1候補あたり時間
+pandas_ta 未導入環境でも動くよう、比較用の MACD は pandas_ta の計算式を pandas で再現したものを使う。
+
+使い方: python research/benchmarks/param_grid_bench.py [--bars 3000] [--check 7]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from research.backtests.batch_eval import ema_matrix, macd_grid, rsi_grid, manual_sharpe, INVALID
+
+FASTS, SLOWS, SIGNALS = range(6, 21), range(20, 41), range(5, 16)
+LOS, HIS, EXS = range(25, 51), range(55, 76), range(65, 86)
+
+
+def ref_ema(close: pd.Series, length: int) -> pd.Series:
+    """pandas_ta.ema（sma=True, adjust=False）の計算式"""
+    close = close.copy()
+    sma_nth = close[0:length].mean()
+    close[:length - 1] = np.nan
+    close.iloc[length - 1] = sma_nth
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def ref_macd(close: pd.Series, fast: int, slow: int, signal: int):
+    macd = ref_ema(close, fast) - ref_ema(close, slow)
+    sig = ref_ema(macd.loc[macd.first_valid_index():], signal).reindex(macd.index)
+    return macd, sig
+
+
+def ref_macd_score(close, fast, slow, signal) -> float:
+    m, s = ref_macd(close, fast, slow, signal)
+    entries = ((m > s) & (m.shift(1) <= s.shift(1))).fillna(False)
+    exits = ((m < s) & (m.shift(1) >= s.shift(1))).fillna(False)
+    if entries.sum() < 2:
+        return INVALID
+    return manual_sharpe(close, entries, exits)[0]
+
+
+def ref_rsi_score(close, rsi, hist, lo, hi, ex) -> float:
+    entries = ((rsi > lo) & (rsi < hi) & (hist > 0) & (hist.shift(1) <= 0)).fillna(False)
+    exits = ((rsi > ex) | (hist < 0)).fillna(False)
+    if entries.sum() < 2:
+        return INVALID
+    return manual_sharpe(close, entries, exits)[0]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bars", type=int, default=3000)
+    ap.add_argument("--check", type=int, default=7, help="N件おきに逐次評価と照合")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(1)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, args.bars))))
+
+    spans = sorted(set(FASTS) | set(SLOWS))
+    mat = ema_matrix(close.to_numpy(), spans)
+    ema_ok = all(np.array_equal(ref_ema(close, L).to_numpy(), mat[:, j], equal_nan=True) for j, L in enumerate(spans))
+    print(f"ema_matrix ビット一致 ({len(spans)}スパン): {ema_ok}")
+
+    t0 = time.perf_counter()
+    macd_res = macd_grid(close, FASTS, SLOWS, SIGNALS)
+    t_macd = time.perf_counter() - t0
+    sample = macd_res[::args.check]
+    t0 = time.perf_counter()
+    bad_macd = sum(ref_macd_score(close, r["fast"], r["slow"], r["signal"]) != r["sharpe"] for r in sample)
+    t_macd_ref = (time.perf_counter() - t0) / len(sample)
+
+    m, s = ref_macd(close, 12, 26, 9)
+    hist = m - s
+    d = close.diff()
+    rsi = 100 - 100 / (1 + d.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+                       / (-d.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean())
+    t0 = time.perf_counter()
+    rsi_res = rsi_grid(close, rsi, hist, LOS, HIS, EXS)
+    t_rsi = time.perf_counter() - t0
+    sample_r = rsi_res[::args.check * 5]
+    t0 = time.perf_counter()
+    bad_rsi = sum(ref_rsi_score(close, rsi, hist, r["rsi_entry_lo"], r["rsi_entry_hi"], r["rsi_exit"]) != r["sharpe"]
+                  for r in sample_r)
+    t_rsi_ref = (time.perf_counter() - t0) / len(sample_r)
+
+    for label, res, t_all, t_ref, bad, n_chk in (("MACD", macd_res, t_macd, t_macd_ref, bad_macd, len(sample)),
+                                                  ("RSI ", rsi_res, t_rsi, t_rsi_ref, bad_rsi, len(sample_r))):
+        print(f"{label}: 全{len(res)}候補 一括 {t_all * 1000:7.1f}ms | 逐次 {t_ref * 1000:5.2f}ms/候補 "
+              f"(30試行≈{t_ref * 30 * 1000:6.1f}ms・全候補≈{t_ref * len(res):5.1f}s) | 不一致 {bad}/{n_chk}")
+    best = max(macd_res, key=lambda r: r["sharpe"])
+    print(f"MACD最良: fast={best['fast']} slow={best['slow']} signal={best['signal']} Sharpe={best['sharpe']}")
+    sys.exit(1 if (bad_macd or bad_rsi or not ema_ok) else 0)
+
+
+if __name__ == "__main__":
+    main()
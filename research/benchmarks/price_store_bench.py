@@ -0,0 +1,96 @@
+"""
+price_store マイクロベンチマーク
+radar 1サイクル分の prices.sqlite 読み取り（ボラ監視・TP/SL現在価格・F2・RSI）を
+  A) 呼び出しごとに sqlite3.connect（旧実装）
+  B) core.price_store のプール接続（WAL + プリペアド文再利用）
+で実行し、1サイクルあたりの接続回数と所要時間を比較する。
+
+使い方: python research/benchmarks/price_store_bench.py [--cycles 500] [--holdings 3]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from core import price_store
+
+SQL_LATEST = "SELECT price, ts FROM ticks WHERE symbol=? ORDER BY ts DESC LIMIT 1"
+SQL_RSI = "SELECT ts, price FROM ticks WHERE symbol=? ORDER BY ts DESC LIMIT ?"
+SQL_F2 = "SELECT price, ts FROM ticks WHERE symbol='BTC' ORDER BY ts DESC LIMIT 1"
+
+
+def _build_db(path: str, symbols: list, rows_per_symbol: int):
+    conn = price_store.open_connection(path)
+    price_store.ensure_schema(conn)
+    now_ms = int(time.time() * 1000)
+    for sym in symbols:
+        conn.executemany(
+            "INSERT OR IGNORE INTO ticks (symbol, ts, price, volume) VALUES (?,?,?,?)",
+            [(sym, now_ms - i * 300_000, 1.0 + (i % 7) * 0.01, 0) for i in range(rows_per_symbol)]
+        )
+    conn.commit()
+    conn.close()
+
+
+def _cycle_reads(symbols: list) -> list:
+    """radar 1サイクルで発行される読み取りクエリ列"""
+    reads = [(SQL_F2, ()), (SQL_F2, ())]               # F2: BTC現在値 + 24h前
+    reads += [(SQL_LATEST, ("VIRTUAL",))]              # ボラティリティ監視
+    for sym in symbols:
+        reads.append((SQL_LATEST, (sym,)))             # TP/SL 現在価格
+        reads.append((SQL_RSI, (sym, 15)))             # _calc_rsi
+    return reads
+
+
+def run_fresh(path: str, reads: list, cycles: int):
+    connects = 0
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        for sql, params in reads:
+            conn = sqlite3.connect(path)
+            connects += 1
+            conn.execute(sql, params).fetchall()
+            conn.close()
+    return time.perf_counter() - t0, connects
+
+
+def run_pooled(path: str, reads: list, cycles: int):
+    price_store.close_all()
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        for sql, params in reads:
+            price_store.query_all(sql, params, path=path)
+    elapsed = time.perf_counter() - t0
+    price_store.close_all()
+    return elapsed, 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=500)
+    ap.add_argument("--holdings", type=int, default=3)
+    ap.add_argument("--rows", type=int, default=20000, help="銘柄あたりの行数")
+    args = ap.parse_args()
+
+    symbols = ["BTC", "ETH", "VIRTUAL", "AIXBT", "LUNA"][:max(1, args.holdings)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prices.sqlite")
+        _build_db(path, list({*symbols, "BTC", "VIRTUAL"}), args.rows)
+        reads = _cycle_reads(symbols)
+
+        t_fresh, c_fresh = run_fresh(path, reads, args.cycles)
+        t_pool, c_pool = run_pooled(path, reads, args.cycles)
+
+    per_cycle_fresh = c_fresh / args.cycles
+    print(f"=== price_store benchmark ({args.cycles} cycles, {len(reads)} reads/cycle) ===")
+    print(f"fresh connect : {t_fresh / args.cycles * 1000:.3f} ms/cycle | {per_cycle_fresh:.0f} connects/cycle")
+    print(f"pooled (WAL)  : {t_pool / args.cycles * 1000:.3f} ms/cycle | {c_pool} connect total")
+    print(f"connects saved: {per_cycle_fresh:.0f}/cycle "
+          f"(= {per_cycle_fresh * 2:.0f}/min at 30s interval, {c_fresh - c_pool} over the run)")
+    print(f"speedup       : {t_fresh / t_pool:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+戦略スイープ実行器ベンチマーク
+BTC/ETH/VIRTUAL 相当の3フレームで CoreBacktest.run_all_strategies を連続実行し、
+serial / thread / process（共有メモリ）モードの所要時間と、全モードで結果dictが一致することを確認する。
+process モードの初回はワーカー起動（spawn + import）を含むため、計測前に1回ウォームアップする。
+
+使い方: python research/benchmarks/strategy_sweep_bench.py [--bars 8000] [--repeat 3]
+"""
+import sys; sys.path.insert(0, '.')
+import os
+os.environ.setdefault("NEO_MC_SEED", "7")  # MC分位点をモード間で比較できるよう固定（ワーカーにも継承）
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from research.backtests.run_backtest import CoreBacktest
+from research.backtests import executor
+
+MODES = ("serial", "thread", "process")
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    delta = np.diff(close, prepend=close[0])
+    gain = pd.Series(np.clip(delta, 0, None)).rolling(14).mean()
+    loss = pd.Series(np.clip(-delta, 0, None)).rolling(14).mean()
+    idx = pd.date_range("2024-01-01", periods=n, freq="h", name="datetime")
+    return pd.DataFrame({
+        "open": close, "close": close,
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "rsi_14": (100 - 100 / (1 + gain / loss.replace(0, np.nan))).to_numpy(),
+    }, index=idx)
+
+
+def sweep(frames: dict, mode: str) -> dict:
+    return {sym: CoreBacktest.run_all_strategies(df, symbol=sym, use_optuna=False, executor_mode=mode)["all_results"]
+            for sym, df in frames.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bars", type=int, default=8000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)  # pandas_ta/sklearn 未導入時の戦略エラーログを抑制
+
+    frames = {sym: _frame(args.bars, i) for i, sym in enumerate(("BTC", "ETH", "VIRTUAL"))}
+    print(f"cores={executor.available_cores()} bars={args.bars} symbols={list(frames)}")
+    baseline, times = None, {}
+    for mode in MODES:
+        res = sweep(frames, mode)  # ウォームアップ兼一致確認
+        if baseline is None:
+            baseline = res
+        elif res != baseline:
+            print(f"  MISMATCH: {mode} の結果が serial と異なる")
+            sys.exit(1)
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            sweep(frames, mode)
+        times[mode] = (time.perf_counter() - t0) / args.repeat
+    for mode in MODES:
+        print(f"{mode:>8}: {times[mode] * 1000:8.1f}ms / 3銘柄 | 対serial {times['serial'] / times[mode]:4.2f}x")
+    print("結果一致: True")
+    executor.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
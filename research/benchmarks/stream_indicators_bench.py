@@ -0,0 +1,144 @@
+"""
+core.stream_indicators マイクロベンチマーク
+30秒出口ループの1サイクル（保有銘柄ごとのRSI読み取り）と、その間に collector が1ティック足す運用を
+  A) 旧 _calc_rsi: 毎回15行を読み直して単純平均RSIを再計算
+  B) stream_indicators.current: 状態に新着ティックだけ適用して現在値を読む
+で比較する。あわせて逐次更新の値を pandas の全履歴計算と突き合わせ、
+チェックポイント復元後の値が途切れなく一致することを確認する。
+
+使い方: python research/benchmarks/stream_indicators_bench.py [--cycles 2000] [--holdings 3]
+"""
+import sys; sys.path.insert(0, '.')
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import price_store, cache_store, stream_indicators
+from core.stream_indicators import SymbolIndicators
+
+
+def _legacy_rsi(symbol, conn, period=14):
+    """旧 run_trigger._calc_rsi（15行読み直し・単純平均）"""
+    rows = price_store.recent_ticks(symbol, period + 1, conn=conn)
+    if len(rows) < period + 1:
+        return None
+    closes = [r[1] for r in reversed(rows)]
+    gains = [max(closes[i] - closes[i-1], 0) for i in range(1, len(closes))]
+    losses_list = [max(closes[i-1] - closes[i], 0) for i in range(1, len(closes))]
+    avg_gain = sum(gains) / period
+    avg_loss = sum(losses_list) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def _ta_ema(s: pd.Series, length: int) -> pd.Series:
+    """pandas_ta.ema と同じ: 先頭 length 本のSMAを種に ewm(adjust=False)"""
+    x = s.copy()
+    x.iloc[:length - 1] = np.nan
+    x.iloc[length - 1] = s.iloc[:length].mean()
+    return x.ewm(span=length, adjust=False).mean()
+
+
+def _reference(prices: np.ndarray) -> dict:
+    s = pd.Series(prices)
+    d = s.diff().iloc[1:]
+    wilder = lambda x: _rma(x.reset_index(drop=True), stream_indicators.RSI_LEN)
+    g, l = wilder(d.clip(lower=0)), wilder(-d.clip(upper=0))
+    rsi = 100 - 100 / (1 + g.iloc[-1] / l.iloc[-1])
+    atr = wilder(d.abs()).iloc[-1]
+    fast = _ta_ema(s, stream_indicators.MACD_FAST)
+    slow = _ta_ema(s, stream_indicators.MACD_SLOW)
+    macd = (fast - slow).dropna().reset_index(drop=True)
+    signal = _ta_ema(macd, stream_indicators.MACD_SIGNAL)
+    bb = s.iloc[-stream_indicators.BB_LEN:]
+    return {
+        "rsi": rsi, "atr": atr,
+        "ema_fast": _ta_ema(s, stream_indicators.EMA_FAST).iloc[-1],
+        "ema_slow": _ta_ema(s, stream_indicators.EMA_SLOW).iloc[-1],
+        "bb_upper": bb.mean() + stream_indicators.BB_STD * bb.std(ddof=0),
+        "macd": macd.iloc[-1], "macd_signal": signal.iloc[-1],
+    }
+
+
+def _rma(x: pd.Series, length: int) -> pd.Series:
+    out = x.copy()
+    out.iloc[:length - 1] = np.nan
+    out.iloc[length - 1] = x.iloc[:length].mean()
+    return out.ewm(alpha=1 / length, adjust=False).mean()
+
+
+def check_accuracy(n: int = 3000, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    snap = SymbolIndicators.from_prices("X", prices).snapshot()
+    ref = _reference(prices)
+    worst = max(abs(snap[k] - v) / max(abs(v), 1e-12) for k, v in ref.items())
+    print(f"accuracy vs pandas ({n} ticks): max rel err {worst:.2e}")
+    return worst
+
+
+def main(cycles: int, holdings: int, history: int):
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "prices.sqlite")
+    cache_store.DB_PATH = os.path.join(tmp, "cache.sqlite")
+    symbols = [f"SYM{i}" for i in range(holdings)]
+    rng = np.random.default_rng(1)
+    conn = price_store.open_connection(db_path)        # collector の書き込み接続
+    price_store.ensure_schema(conn)
+    t0_ms = 1_700_000_000_000
+    series = {s: 1.0 + np.cumsum(rng.normal(0, 0.002, history + cycles)) for s in symbols}
+    for s in symbols:
+        conn.executemany("INSERT INTO ticks (symbol, ts, price, volume) VALUES (?,?,?,0)",
+                         [(s, t0_ms + i * 300_000, float(p)) for i, p in enumerate(series[s][:history])])
+    conn.commit()
+    reader = price_store.open_connection(db_path)      # radar 側の読み取り接続
+
+    stream_indicators.sync_all(symbols, conn=conn)   # collector 側の初期化＋チェックポイント
+    stream_indicators.reset()                        # radar 再起動相当: チェックポイントから復元させる
+
+    t_legacy = t_stream = 0.0
+    for c in range(cycles):
+        i = history + c
+        for s in symbols:
+            price_store.insert_tick(conn, s, t0_ms + i * 300_000, float(series[s][i]))
+        conn.commit()
+        t = time.perf_counter()
+        for s in symbols:
+            _legacy_rsi(s, reader)
+        t_legacy += time.perf_counter() - t
+        t = time.perf_counter()
+        for s in symbols:
+            stream_indicators.current(s, reader)
+        t_stream += time.perf_counter() - t
+    conn.close()
+
+    per = 1e6 / cycles
+    print(f"exit-loop RSI reads ({holdings} holdings x {cycles} cycles, 1 new tick/cycle):")
+    print(f"  A) legacy re-query : {t_legacy * per:8.1f} us/cycle")
+    print(f"  B) stream current  : {t_stream * per:8.1f} us/cycle  ({t_legacy / max(t_stream, 1e-12):.1f}x)")
+
+    # チェックポイント復元 + 差分適用の状態が、同じティック列を一括で流した状態と一致するか
+    n_fed = min(history, stream_indicators.WARMUP_TICKS) + cycles
+    for s in symbols:
+        live = stream_indicators.current(s, reader)
+        full = SymbolIndicators.from_prices(s, series[s][history + cycles - n_fed:history + cycles]).snapshot()
+        assert live["n"] == n_fed, (live["n"], n_fed)
+        for k in ("rsi", "ema_slow", "atr", "bb_upper", "macd_hist"):
+            assert live[k] == full[k], (s, k, live[k], full[k])
+    reader.close()
+    print("checkpoint restore + incremental catch-up: consistent")
+    check_accuracy()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=2000)
+    ap.add_argument("--holdings", type=int, default=3)
+    ap.add_argument("--history", type=int, default=2000)
+    a = ap.parse_args()
+    main(a.cycles, a.holdings, a.history)
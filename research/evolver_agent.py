@@ -21,42 +21,17 @@ MIN_SAMPLE_SIZE = 3
 
 
 def _get_fifo_closed_trades():
-    """EvaluatorのFIFOロット方式で決済済み取引を取得（最も正確）"""
+    """EvaluatorのFIFOロット方式で決済済み取引を取得（tools.lot_matcher の決済レコードに buy_ts/sell_reason が載っている）"""
     import pandas as pd
     from orchestration.performance_evaluator import _parse_wallet_history, _calc_closed_trades
-    from tools.paper_wallet import PaperWallet
-    buys, sells = _parse_wallet_history()
-    closed, _ = _calc_closed_trades(buys, sells)
+    records, open_lots = _parse_wallet_history()
+    closed, _ = _calc_closed_trades(records, open_lots)
     if not closed:
         return pd.DataFrame()
-    # historyからbuy_hourを復元するためtimestamp情報を付加
-    pw = PaperWallet()
-    hist = pw.state.get("history", [])
-    buy_ts_map = {}  # symbol -> [timestamps] (FIFO順)
-    sell_ts_map = {}
-    sell_reason_map = {}
-    for h in hist:
-        sym = h.get("symbol", "").split("/")[0].strip().upper()
-        if h["action"] == "BUY":
-            buy_ts_map.setdefault(sym, []).append(h.get("timestamp", ""))
-        elif h["action"] == "SELL":
-            sell_ts_map.setdefault(sym, []).append(h.get("timestamp", ""))
-            sell_reason_map.setdefault(sym, []).append(h.get("reason", ""))
-    # closedにbuy_ts/sell_reason付加
-    sym_buy_idx = {}
-    sym_sell_idx = {}
-    for c in closed:
-        sym = c["symbol"]
-        bi = sym_buy_idx.get(sym, 0)
-        si = sym_sell_idx.get(sym, 0)
-        c["buy_ts"] = buy_ts_map.get(sym, [""])[min(bi, len(buy_ts_map.get(sym, []))-1)] if buy_ts_map.get(sym) else ""
-        c["sell_reason"] = sell_reason_map.get(sym, [""])[min(si, len(sell_reason_map.get(sym, []))-1)] if sell_reason_map.get(sym) else ""
+    for c, r in zip(sorted(records, key=lambda r: r["sell_ts"] or ""), closed):
+        c["buy_ts"] = r["buy_ts"] or ""
+        c["sell_reason"] = r["sell_reason"] or ""
         c["result"] = "win" if c["pnl_pct"] > 0 else "loss"
-        sym_buy_idx[sym] = bi + 1
-        # sell_timeが変わったらsellインデックスも進める
-        if si < len(sell_ts_map.get(sym, [])) - 1:
-            if c.get("sell_time", "") != sell_ts_map.get(sym, [""])[si]:
-                sym_sell_idx[sym] = si + 1
     df = pd.DataFrame(closed)
     if "buy_ts" in df.columns and len(df) > 0:
         df["buy_hour"] = pd.to_datetime(df["buy_ts"], errors="coerce").dt.hour.fillna(0).astype(int)
@@ -6,7 +6,6 @@ import sys
 import json
 import warnings
 import numpy as np
-import pandas as pd
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -56,21 +55,17 @@ def prepare_data(symbol: str, days: int = 30) -> tuple:
     """4h足OHLCVデータ取得 → 特徴量構築 → ターゲット変数生成 → 訓練/テスト分割"""
     print(f"  📊 データ取得: {symbol} (4h足・ローカルDB)")
     # 4h足を直接取得（5分足より時系列として意味がある）
-    from orchestration.data_collector import get_ohlcv_from_db
-    rows = get_ohlcv_from_db(symbol, limit=5000)
-    if not rows or len(rows) < 100:
-        print(f"  ⚠️ 4h足データ不足: {len(rows) if rows else 0}行")
+    # npy mmapキャッシュ（昇順・float64済み）— 行リストからのDataFrame再構築なし
+    from core import ohlcv_cache
+    df = ohlcv_cache.get_frame(symbol, limit=5000)
+    if df is None or len(df) < 100:
+        print(f"  ⚠️ 4h足データ不足: {len(df) if df is not None else 0}行")
         # フォールバック: fetch_ohlcv_custom
         df = MarketData.fetch_ohlcv_custom(symbol, days=days)
-    else:
-        df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close"])
-        df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
-        df = df.drop(columns=["timestamp"]).sort_values("datetime").reset_index(drop=True)
-        # open/high/low/closeをfloatに
-        for col in ["open", "high", "low", "close"]:
-            df[col] = df[col].astype(float)
     print(f"  📐 生データ: {len(df)}行")
-    df = FeatureBuilder.build_from_memory(df)
+    # 特徴量ストア（確定足のみ・collector 追記）にあれば上の OHLCV と同じ期間に切り出して使う
+    feat = FeatureBuilder.load_from_store(symbol, limit=5000, start=df["datetime"].iloc[0])
+    df = feat if len(feat) >= 100 else FeatureBuilder.build_from_memory(df, FEATURE_COLS)
 
     # ターゲット: HORIZON足先の将来リターン（%表記にスケーリング）
     df["future_return"] = (df["close"].shift(-HORIZON) / df["close"] - 1) * 100
@@ -12,7 +12,6 @@ import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone
-from collections import defaultdict
 from tools.paper_wallet import PaperWallet
 
 # === 設定 ===
@@ -22,49 +21,42 @@ MIN_PAIRS_FOR_ANALYSIS = 20
 
 
 def get_clean_pairs():
-    """v6.3以降のクリーンなBUY→SELLペアを組み立て"""
+    """v6.3以降のクリーンなBUY→SELLペア（FIFOロット照合 tools.lot_matcher の決済レコード）"""
     w = PaperWallet()
-    history = w.state.get('history', [])
+    lots = w.lots()
     
-    # フィルタ: v6.3以降 + Tier1のみ
-    clean = [h for h in history 
-             if h['timestamp'] >= CLEAN_START 
-             and h['symbol'] in VALID_SYMBOLS]
-    
-    # FIFO方式でペア組み立て
-    buys = defaultdict(list)
+    # フィルタ: v6.3以降のBUYから始まったロット + Tier1のみ
     pairs = []
-    unpaired_buys = 0
-    
-    for h in clean:
-        sym = h['symbol']
-        if h['action'] == 'BUY':
-            buys[sym].append(h)
-        elif h['action'] == 'SELL' and buys[sym]:
-            buy = buys[sym].pop(0)
-            pnl_pct = (h['price'] - buy['price']) / buy['price'] * 100
+    for sym in VALID_SYMBOLS:
+        for c in lots.closed_trades(symbol=sym):
+            if (c['buy_ts'] or '') < CLEAN_START:
+                continue
+            pnl_pct = c['pnl_pct']
             
             # 手数料考慮後の損益（BUY時-0.5%, SELL時-0.5%）
             pnl_pct_after_fee = pnl_pct - 1.0  # 概算: 往復1%
             
             pairs.append({
                 'symbol': sym,
-                'buy_ts': buy['timestamp'],
-                'sell_ts': h['timestamp'],
-                'buy_price': buy['price'],
-                'sell_price': h['price'],
-                'amount_usd': buy['amount_usd'],
+                'buy_ts': c['buy_ts'],
+                'sell_ts': c['sell_ts'],
+                'buy_price': c['entry_price'],
+                'sell_price': c['exit_price'],
+                'amount_usd': c['amount_usd'],
                 'pnl_pct': pnl_pct,
                 'pnl_pct_after_fee': pnl_pct_after_fee,
                 'result': 'win' if pnl_pct_after_fee > 0 else 'loss',
-                'buy_reason': buy.get('reason', ''),
-                'sell_reason': h.get('reason', ''),
-                'strategy_tag': buy.get('strategy_tag', 'unknown'),
-                'hold_hours': _calc_hold_hours(buy['timestamp'], h['timestamp']),
+                'buy_reason': c['buy_reason'] or '',
+                'sell_reason': c['sell_reason'] or '',
+                'strategy_tag': c['strategy_tag'] or 'unknown',
+                'hold_hours': _calc_hold_hours(c['buy_ts'], c['sell_ts']),
             })
+    pairs.sort(key=lambda p: p['sell_ts'])
     
-    unpaired_buys = sum(len(v) for v in buys.values())
-    return pairs, unpaired_buys, len(clean)
+    unpaired_buys = sum(1 for sym in VALID_SYMBOLS for lot in lots.open_lots(sym)
+                        if (lot['timestamp'] or '') >= CLEAN_START)
+    total_clean = sum(w.ledger.count(symbol=sym, since=CLEAN_START) for sym in VALID_SYMBOLS)
+    return pairs, unpaired_buys, total_clean
 
 
 def _calc_hold_hours(buy_ts, sell_ts):
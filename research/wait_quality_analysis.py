@@ -5,10 +5,10 @@ WAIT品質検証スクリプト
 - 4h/12h/24h/48h後の価格変動 + TP(+7%)/SL(-3%)ヒット判定
 """
 import sys; sys.path.insert(0, '.')
-import sqlite3
 import json
 from datetime import datetime, timezone, timedelta
 from core.memory_db import NeoMemoryDB
+from core import price_store
 
 # === 設定 ===
 TP_PCT = 0.07   # +7%
@@ -25,12 +25,7 @@ def iso_to_epoch_ms(iso_str):
 def get_prices_after(conn, symbol, start_ms, hours):
     """start_msからhours時間分の価格データを取得"""
     end_ms = start_ms + int(hours * 3600 * 1000)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT timestamp, close FROM prices WHERE symbol=? AND timestamp BETWEEN ? AND ? ORDER BY timestamp",
-        (symbol, start_ms, end_ms)
-    )
-    return cur.fetchall()
+    return price_store.ticks_between(symbol, start_ms, end_ms, conn=conn)
 
 def simulate_trade(prices, entry_price):
     """
@@ -117,7 +112,7 @@ def main():
     print()
     
     # SQLite接続
-    conn = sqlite3.connect('vault/market_db/prices.sqlite')
+    conn = price_store.get_connection()
     
     # === 各WAIT記録を検証 ===
     all_results = []
@@ -145,8 +140,6 @@ def main():
         
         all_results.append({**w, 'sim': sim, 'windows': window_pcts, 'data_points': len(prices)})
     
-    conn.close()
-    
     # === サマリー出力 ===
     valid = [r for r in all_results if r.get('sim')]
     insufficient = [r for r in all_results if not r.get('sim')]
@@ -240,7 +233,6 @@ def run_nightly_summary():
     Nightly Batch用の軽量版。サマリーdictを返す。
     Discord報告用のテキストも生成する。
     """
-    import sqlite3
     from core.memory_db import NeoMemoryDB
 
     TARGET_SYMBOLS = ['VIRTUAL', 'ETH', 'BTC']  # Council対象銘柄に合わせる
@@ -267,7 +259,7 @@ def run_nightly_summary():
             'discord_text': f"📊 WAIT品質: データ不足（{len(waits)}件・5件未満）"
         }
 
-    conn = sqlite3.connect('vault/market_db/prices.sqlite')
+    conn = price_store.get_connection()
 
     symbol_stats = {}
     total_correct = 0
@@ -324,8 +316,6 @@ def run_nightly_summary():
             total_missed += missed
             total_valid += valid_count
 
-    conn.close()
-
     # 全体正解率
     overall_correct_rate = (total_correct / total_valid * 100) if total_valid > 0 else 0.0
 
@@ -3,6 +3,7 @@ Neo Hybrid Radar v2 — 統合トリガーシステム
 修正点:
   1. ボラティリティトリガー → TrinityCouncil直結（壊れたautonomous_post_cycle廃止）
   2. アルファトリガー → TrinityCouncil（既存、変更なし）
+     Council はジョブキュー経由で別プロセスのワーカーが実行（orchestration/council_queue.py）
   3. 冷却期間をボラ/アルファ共通で管理
   4. 構造化ログ
 """
@@ -10,11 +11,10 @@ import time
 import logging
 from datetime import datetime, timezone
 from tools.market_data import MarketData
+from tools.price_cache import PriceCache
 from core.blackboard import NeoBlackboard
-from agents.trinity_council import TrinityCouncil
 from tools.discord_reporter import DiscordReporter
 from orchestration.alpha_sweep_operation import run_sweep
-from orchestration.data_collector import get_latest_price_from_db
 from core.config import VOLATILITY_WATCH_SYMBOLS, COUNCIL_ELIGIBLE_SYMBOLS, TIER0_SYMBOLS
 from orchestration.performance_evaluator import evaluate_performance
 from orchestration.nightly_research import run_nightly_research
@@ -22,13 +22,20 @@ from orchestration.nightly_research import run_nightly_research
 from orchestration.vp_discovery import run_vp_discovery
 from core.config import LEARNING_MODE, LEARNING_TARGET_TRADES, LEARNING_SHARPE_THRESHOLD
 from core.cost_guard import CostGuard
+from core import stream_indicators
+from core import exit_engine
+from orchestration.scheduler import Scheduler, LANE_EXIT, LANE_COUNCIL
+from orchestration.council_queue import CouncilQueue, CouncilWorkerPool, DONE, FAILED, normalize_symbol
 
-# --- TP/SLサイクルチェック（Council非依存・毎30秒） ---
-_s3_dedup_cache = {}  # S3 exit引き締めログ重複排除
+# --- 出口エンジン（Council非依存・価格イベント駆動）---
+# PriceCache に新しい価格が入るたび・サイクル間の新着ティックごとに保有ポジションの出口を判定する
+_EXITS = exit_engine.ExitEngine()
+PriceCache.subscribe(lambda entry: _EXITS.on_price(entry.symbol, entry.price))
+# F2/F2b マクロ水準はバックグラウンドで更新（出口判定は公開値を読むだけ・yfinance 待ちで SL を遅らせない）
+_MACRO = exit_engine.MacroRefresher()
 
-# === シンボル別売却冷却（二重発火防止）v6.5ar ===
-_sell_cooldown = {}  # {symbol: timestamp}
-SELL_COOLDOWN_SEC = 300  # 5分
+# 出口判定・評価額に使う価格の許容鮮度（PriceCache max_age）
+PRICE_MAX_AGE_SEC = 600  # 10分
 
 def check_sell_aftermath():
     """売却後1h/6h/24hの価格を追跡し、売却判断の良否を記録 v6.5ar"""
@@ -46,11 +53,7 @@ def check_sell_aftermath():
             _sym = t['symbol']
             _cur = 0.0
             try:
-                if _sym in ('BTC','ETH'):
-                    from orchestration.data_collector import get_latest_price_from_db
-                    _cur = get_latest_price_from_db(_sym) or 0
-                else:
-                    _cur = float((MarketData._fetch_price_from_geckoterminal(_sym) or MarketData.fetch_token_data(_sym) or {}).get('priceUsd', 0))
+                _cur = PriceCache.get_price(_sym)
             except Exception:
                 continue
             if _cur <= 0:
@@ -71,380 +74,100 @@ def check_sell_aftermath():
     except Exception as e:
         logger.error(f'[売却追跡] エラー: {e}')
 
+def _log_strategy_monitor(clean_symbol, hdata, current_price):
+    """S2: 戦略書シナリオモニタリング（Phase 0）— bull/bear 進行度を60サイクル(30分)ごとにログ出力"""
+    _strategy = hdata.get("entry_context", {}).get("strategy") if isinstance(hdata.get("entry_context"), dict) else None
+    if not _strategy or current_price <= 0:
+        return
+    try:
+        _avg = float(hdata.get("avg_price", 0) or 0)
+        _pnl_pct = round((current_price - _avg) / _avg * 100, 2) if _avg > 0 else 0.0
+        _s_thesis = _strategy.get("thesis", "?")[:50]
+        _s_entry = float(_strategy.get("entry_price", hdata.get("avg_price", 0)))
+        _s_bull = _strategy.get("bull_scenario", {})
+        _s_bear = _strategy.get("bear_scenario", {})
+        _s_target = float(_s_bull.get("target_price", 0))
+        _s_stop = float(_s_bear.get("stop_price", 0))
+        # bull進行度: entry→targetの何%まで来たか
+        _bull_prog = 0
+        if _s_target > _s_entry and _s_entry > 0:
+            _bull_prog = (current_price - _s_entry) / (_s_target - _s_entry) * 100
+        # bear進行度: entry→stopの何%まで来たか
+        _bear_prog = 0
+        if _s_entry > _s_stop and _s_entry > 0:
+            _bear_prog = (_s_entry - current_price) / (_s_entry - _s_stop) * 100
+        # 60サイクル(30分)ごとにログ出力（毎30秒は過剰）
+        _s2_cycle = getattr(_log_strategy_monitor, '_s2_cycle', 0)
+        _log_strategy_monitor._s2_cycle = _s2_cycle + 1
+        if _s2_cycle % 60 == 0:
+            _s_tf = _strategy.get("thesis_timeframe", "?")
+            logger.info(
+                f"[S2] {clean_symbol} 戦略モニタ: {_s_thesis} | "
+                f"TF={_s_tf} | bull={_bull_prog:.0f}% | bear={_bear_prog:.0f}% | "
+                f"PnL={_pnl_pct:+.1f}% | "
+                f"target=${_s_target:.4f} stop=${_s_stop:.4f}"
+            )
+            if _bear_prog >= 70:
+                logger.warning(f"[S2] ⚠️ {clean_symbol} bear trigger接近: {_bear_prog:.0f}% → stop=${_s_stop:.4f}")
+            if _bull_prog >= 80:
+                logger.info(f"[S2] 🎯 {clean_symbol} bull target接近: {_bull_prog:.0f}% → target=${_s_target:.4f}")
+    except Exception:
+        pass
+
+
 def check_tp_sl_all_positions():
-    """保有中ポジションの利確/損切を毎サイクルチェック（Council召集不要）
-    売却4層: SL固定(-3%) → TP固定(+7%) → テクニカル出口(RSI>65+含み益) → 時間制約(96h)
+    """保有中ポジションの利確/損切を執行（Council召集不要）
+    判定は core.exit_engine.ExitEngine（ポジション別の閾値を事前計算し、価格イベントごとに評価）。
+    ここでは 保有内容・F2/F2b水準を同期 → 保有銘柄の現在価格を流し込み → 発火したシグナル
+    （サイクル間のティックで発火した分を含む）を執行する。
+    売却5層: F2/F2b → 戦略書exit_stages → SL → トレール/固定TP/RSI → 時間制約（プロファイル別）
     Returns: True if any SELL was executed (triggers cooldown)"""
     from tools.paper_wallet import PaperWallet
-    from core.memory_db import NeoMemoryDB
-    import sqlite3, os
+    import os
     from datetime import datetime, timezone
     pw = PaperWallet()
     holdings = pw.state.get("holdings", {})
+    _f2_level, _btc_24h_chg_f2, _ = _MACRO.current()
+    _EXITS.sync(holdings, _f2_level, _btc_24h_chg_f2)
     if not holdings:
         return False
     sell_executed = False
-    memory = NeoMemoryDB()
-    # === F2: BTC急落リスクチェック（5層出口の前に判定）v6.5ai ===
-    _f2_level = 0
-    _btc_24h_chg_f2 = 0.0
-    try:
-        import sqlite3 as _sq_f2
-        _conn_f2 = _sq_f2.connect("vault/market_db/prices.sqlite")
-        _cur_f2 = _conn_f2.cursor()
-        _cur_f2.execute("SELECT close FROM prices WHERE symbol='BTC' ORDER BY timestamp DESC LIMIT 1")
-        _r1 = _cur_f2.fetchone()
-        _cur_f2.execute("SELECT close FROM prices WHERE symbol='BTC' AND timestamp <= datetime('now', '-24 hours') ORDER BY timestamp DESC LIMIT 1")
-        _r2 = _cur_f2.fetchone()
-        _conn_f2.close()
-        if _r1 and _r2 and _r2[0] > 0:
-            _btc_24h_chg_f2 = (_r1[0] - _r2[0]) / _r2[0] * 100
-            if _btc_24h_chg_f2 <= -12:
-                _f2_level = 3
-                logger.warning(f"\N{POLICE CARS REVOLVING LIGHT} [F2 L3] BTC急落 {_btc_24h_chg_f2:.1f}% — 全ポジション緊急売却モード")
-            elif _btc_24h_chg_f2 <= -8:
-                _f2_level = 2
-                logger.warning(f"\u26a0\ufe0f [F2 L2] BTC大幅下落 {_btc_24h_chg_f2:.1f}% — 含み益ポジション利確モード")
-            elif _btc_24h_chg_f2 <= -5:
-                _f2_level = 1
-                logger.info(f"\U0001f4c9 [F2 L1] BTC下落 {_btc_24h_chg_f2:.1f}% — SL引き締めモード(x0.5)")
-    except Exception:
-        pass
-
-    # === F2b: マクロ急変検知（SPY/Gold — 30分間隔キャッシュ）v6.5ak ===
-    # BTCより先に動くマクロ指標で「先回り」するお盆フレームワークの即時版
-    _f2b_level = 0
-    try:
-        import time as _time_f2b
-        _f2b_cache_path = "vault/blackboard/f2b_macro_cache.json"
-        _f2b_interval = 1800  # 30分
-        _f2b_data = None
-        _need_fetch = True
-        if os.path.exists(_f2b_cache_path):
-            try:
-                import json as _json_f2b
-                with open(_f2b_cache_path) as _fc:
-                    _f2b_data = _json_f2b.load(_fc)
-                if _time_f2b.time() - _f2b_data.get("ts", 0) < _f2b_interval:
-                    _need_fetch = False
-            except Exception:
-                pass
-        if _need_fetch:
-            try:
-                import yfinance as _yf_f2b
-                import json as _json_f2b
-                _spy_t = _yf_f2b.Ticker("SPY")
-                _spy_h = _spy_t.history(period="2d", interval="1h")
-                _gold_t = _yf_f2b.Ticker("GC=F")
-                _gold_h = _gold_t.history(period="2d", interval="1h")
-                _spy_now = float(_spy_h["Close"].iloc[-1]) if len(_spy_h) > 0 else 0
-                _spy_prev = float(_spy_h["Close"].iloc[-24]) if len(_spy_h) >= 25 else float(_spy_h["Close"].iloc[0])
-                _gold_now = float(_gold_h["Close"].iloc[-1]) if len(_gold_h) > 0 else 0
-                _gold_prev = float(_gold_h["Close"].iloc[-24]) if len(_gold_h) >= 25 else float(_gold_h["Close"].iloc[0])
-                _spy_chg = ((_spy_now - _spy_prev) / _spy_prev * 100) if _spy_prev > 0 else 0
-                _gold_chg = ((_gold_now - _gold_prev) / _gold_prev * 100) if _gold_prev > 0 else 0
-                _f2b_data = {"spy": _spy_now, "spy_chg": round(_spy_chg, 2), "gold": _gold_now, "gold_chg": round(_gold_chg, 2), "ts": _time_f2b.time()}
-                os.makedirs(os.path.dirname(_f2b_cache_path), exist_ok=True)
-                with open(_f2b_cache_path, "w") as _fc:
-                    _json_f2b.dump(_f2b_data, _fc)
-                logger.info(f"[F2b] キャッシュ更新: SPY {_spy_chg:+.1f}% Gold {_gold_chg:+.1f}%")
-            except Exception as _yfe:
-                logger.warning(f"[F2b] yfinance取得失敗: {_yfe}")
-        if _f2b_data:
-            _spy_chg_val = _f2b_data.get("spy_chg", 0)
-            _gold_chg_val = _f2b_data.get("gold_chg", 0)
-            # SPY急落 + Gold急騰 = リスクオフ加速（お盆の傾き）
-            if _spy_chg_val <= -5 and _gold_chg_val >= 3:
-                _f2b_level = 3
-                logger.warning(f"[F2b L3] マクロ急変: SPY {_spy_chg_val:+.1f}% + Gold {_gold_chg_val:+.1f}% — 全ポジション緊急売却")
-            elif _spy_chg_val <= -3 and _gold_chg_val >= 1.5:
-                _f2b_level = 2
-                logger.warning(f"[F2b L2] マクロ警戒: SPY {_spy_chg_val:+.1f}% + Gold {_gold_chg_val:+.1f}% — 含み益利確モード")
-            elif _spy_chg_val <= -2:
-                _f2b_level = 1
-                logger.info(f"[F2b L1] SPY下落 {_spy_chg_val:+.1f}% — SL引き締めモード")
-            # F2とF2bの最大レベルを採用
-            if _f2b_level > _f2_level:
-                _f2_level = _f2b_level
-    except Exception as _f2b_outer_e:
-        logger.warning(f"[F2b] 外部エラー: {_f2b_outer_e}")
-
-    # RSI計算用ヘルパー（SQLiteの5分足から14期間RSI）
-    def _calc_rsi(symbol, period=14):
+    memory = None  # NeoMemoryDB（ChromaDB）は SELL を記録するときだけ作る
+    # 保有銘柄の現在価格を一括取得 → 価格イベントとして判定（以降の同一サイクル内参照はキャッシュヒット）
+    _held = [s for s, h in holdings.items() if h.get("amount", 0) > 0]
+    PriceCache.get_prices(_held, max_age=PRICE_MAX_AGE_SEC)
+    for clean_symbol in _held:
+        # Tier0（BTC/ETH）: ローカルDB優先（Binance蓄積・API節約）
+        # VP銘柄: GeckoTerminal優先（PriceCache.default_sources）
+        current_price = PriceCache.get_price(clean_symbol, max_age=PRICE_MAX_AGE_SEC)
+        if current_price > 0:
+            _log_strategy_monitor(clean_symbol, holdings[clean_symbol], current_price)
+            _EXITS.on_price(clean_symbol, current_price)
+
+    # トレーリングの高値更新（HWM）を保存
+    for _sym, _hw in _EXITS.hwm_updates().items():
+        if _sym in holdings:
+            holdings[_sym]["high_water_pnl"] = _hw
+            pw.update_holding(_sym, high_water_pnl=_hw)
+
+    # RSI: ストリーミング指標（Wilder 14・5分ティック）の現在値（新着ティックだけ適用・履歴は読み直さない）
+    def _calc_rsi(symbol):
         try:
-            conn = sqlite3.connect("vault/market_db/prices.sqlite")
-            cur = conn.cursor()
-            cur.execute("SELECT close FROM prices WHERE symbol=? ORDER BY timestamp DESC LIMIT ?", (symbol, period + 1))
-            rows = cur.fetchall()
-            conn.close()
-            if len(rows) < period + 1:
-                return None
-            closes = [r[0] for r in reversed(rows)]
-            gains = [max(closes[i] - closes[i-1], 0) for i in range(1, len(closes))]
-            losses_list = [max(closes[i-1] - closes[i], 0) for i in range(1, len(closes))]
-            avg_gain = sum(gains) / period
-            avg_loss = sum(losses_list) / period
-            if avg_loss == 0:
-                return 100.0
-            rs = avg_gain / avg_loss
-            return 100 - (100 / (1 + rs))
+            return stream_indicators.current(symbol)["rsi"]
         except Exception:
             return None
 
-    for clean_symbol, hdata in list(holdings.items()):
-        amount = hdata.get("amount", 0)
-        if amount <= 0:
-            continue
-        # === 二重発火防止: シンボル別冷却 v6.5ar ===
-        import time as _time_sc
-        _sc_until = _sell_cooldown.get(clean_symbol, 0)
-        if _time_sc.time() < _sc_until:
+    for signal in _EXITS.drain():
+        clean_symbol = signal.symbol
+        hdata = holdings.get(clean_symbol)
+        if not hdata or hdata.get("amount", 0) <= 0:
             continue
+        amount = hdata["amount"]
         try:
-            # Tier0（BTC/ETH）: ローカルDB優先（Binance蓄積・API節約）
-            # VP銘柄: GeckoTerminal優先
-            current_price = 0.0
-            if clean_symbol in ("BTC", "ETH"):
-                from orchestration.data_collector import get_latest_price_from_db
-                _db_price = get_latest_price_from_db(clean_symbol)
-                if _db_price and _db_price > 0:
-                    current_price = _db_price
-                else:
-                    price_data = MarketData.fetch_token_data(clean_symbol)
-                    if price_data and price_data.get("status") == "success":
-                        current_price = float(price_data.get("priceUsd", 0.0))
-            elif clean_symbol in ("VIRTUAL", "AIXBT"):
-                price_data = MarketData._fetch_price_from_geckoterminal(clean_symbol)
-                if not price_data:
-                    price_data = MarketData.fetch_token_data(clean_symbol)
-                if price_data and price_data.get("status") == "success":
-                    current_price = float(price_data.get("priceUsd", 0.0))
-            else:
-                price_data = MarketData.fetch_token_data(clean_symbol)
-                if price_data and price_data.get("status") == "success":
-                    current_price = float(price_data.get("priceUsd", 0.0))
-            if current_price <= 0:
-                continue
-
+            current_price = signal.price
             pnl = pw.get_unrealized_pnl(clean_symbol, current_price)
-
-            # === 戦略別出口プロファイル読み込み ===
-            from core.config import EXIT_PROFILES, EXIT_PROFILE_DEFAULT
-            _exit_cat = hdata.get("exit_profile", EXIT_PROFILE_DEFAULT)
-            _exit_p = EXIT_PROFILES.get(_exit_cat, EXIT_PROFILES[EXIT_PROFILE_DEFAULT])
-            sl_pct = _exit_p["sl_pct"]
-            _trail_start = _exit_p["trailing_start"]
-            _trail_drop = _exit_p["trailing_drop"]
-            _hard_tp = _exit_p["hard_tp_pct"]
-            _time_limit = _exit_p["time_limit_hours"]
-            # v6.5as: AI戦略書のexit_paramsでconfig値を上書き
-            _ai_ep = hdata.get("entry_context", {}).get("exit_profile", {}) if isinstance(hdata.get("entry_context"), dict) else {}
-            if _ai_ep.get("rsi_exit") is not None:
-                _exit_p = dict(_exit_p)  # copy to avoid mutating config
-                _exit_p["rsi_exit"] = _ai_ep["rsi_exit"]
-            if _ai_ep.get("trailing_start"):
-                _trail_start = _ai_ep["trailing_start"]
-            if _ai_ep.get("trailing_drop"):
-                _trail_drop = _ai_ep["trailing_drop"]
-
-            # === S2: 戦略書シナリオモニタリング（Phase 0）===
-            _strategy = hdata.get("entry_context", {}).get("strategy") if isinstance(hdata.get("entry_context"), dict) else None
-            if _strategy and current_price > 0:
-                try:
-                    _s_thesis = _strategy.get("thesis", "?")[:50]
-                    _s_entry = float(_strategy.get("entry_price", hdata.get("avg_price", 0)))
-                    _s_bull = _strategy.get("bull_scenario", {})
-                    _s_bear = _strategy.get("bear_scenario", {})
-                    _s_target = float(_s_bull.get("target_price", 0))
-                    _s_stop = float(_s_bear.get("stop_price", 0))
-                    # bull進行度: entry→targetの何%まで来たか
-                    _bull_prog = 0
-                    if _s_target > _s_entry and _s_entry > 0:
-                        _bull_prog = (current_price - _s_entry) / (_s_target - _s_entry) * 100
-                    # bear進行度: entry→stopの何%まで来たか
-                    _bear_prog = 0
-                    if _s_entry > _s_stop and _s_entry > 0:
-                        _bear_prog = (_s_entry - current_price) / (_s_entry - _s_stop) * 100
-                    # invalidation条件チェック
-                    _inv_conditions = _strategy.get("invalidation", {}).get("conditions", [])
-                    # 60サイクル(30分)ごとにログ出力（毎30秒は過剰）
-                    _s2_cycle = getattr(check_tp_sl_all_positions, '_s2_cycle', 0)
-                    check_tp_sl_all_positions._s2_cycle = _s2_cycle + 1
-                    if _s2_cycle % 60 == 0:
-                        _s_tf = _strategy.get("thesis_timeframe", "?")
-                        logger.info(
-                            f"[S2] {clean_symbol} 戦略モニタ: {_s_thesis} | "
-                            f"TF={_s_tf} | bull={_bull_prog:.0f}% | bear={_bear_prog:.0f}% | "
-                            f"PnL={pnl['pnl_pct']:+.1f}% | "
-                            f"target=${_s_target:.4f} stop=${_s_stop:.4f}"
-                        )
-                        if _bear_prog >= 70:
-                            logger.warning(f"[S2] ⚠️ {clean_symbol} bear trigger接近: {_bear_prog:.0f}% → stop=${_s_stop:.4f}")
-                        if _bull_prog >= 80:
-                            logger.info(f"[S2] 🎯 {clean_symbol} bull target接近: {_bull_prog:.0f}% → target=${_s_target:.4f}")
-                except Exception as _s2e:
-                    pass
-
-            # === S3: 戦略書動的出口 ===
-            if _strategy and current_price > 0:
-                try:
-                    _s3_entry = float(hdata.get("avg_price", 0))
-                    _s3_bear = _strategy.get("bear_scenario", {})
-                    _s3_bull = _strategy.get("bull_scenario", {})
-                    _s3_stop = float(_s3_bear.get("stop_price", 0))
-                    _s3_target = float(_s3_bull.get("target_price", 0))
-
-                    # S3-1: 戦略SLで固定SLを上書き（固定SLの2倍が安全上限）
-                    if _s3_entry > 0 and _s3_stop > 0:
-                        _strat_sl_pct = (_s3_entry - _s3_stop) / _s3_entry * 100
-                        _max_sl = sl_pct * 2  # 固定SLの2倍まで許容
-                        if 0 < _strat_sl_pct <= _max_sl:
-                            sl_pct = _strat_sl_pct
-
-                    # S3-2: bear trigger接近(70%) → exit_profile 1段階引き締め
-                    if _s3_entry > 0 and _s3_stop > 0 and _s3_entry > _s3_stop:
-                        _s3_bear_prog = (_s3_entry - current_price) / (_s3_entry - _s3_stop) * 100
-                        if _s3_bear_prog >= 70:
-                            from core.config import EXIT_PROFILES
-                            _tighten_map = {"long": "mid", "mid": "short"}
-                            _new_cat = _tighten_map.get(_exit_cat)
-                            if _new_cat:
-                                _new_p = EXIT_PROFILES.get(_new_cat)
-                                if _new_p:
-                                    _trail_start = _new_p["trailing_start"]
-                                    _trail_drop = _new_p["trailing_drop"]
-                                    _hard_tp = _new_p["hard_tp_pct"]
-                                    _time_limit = _new_p["time_limit_hours"]
-                                    _s3_log_key = f"{clean_symbol}_{_exit_cat}_{_new_cat}"
-                                    if _s3_log_key not in _s3_dedup_cache:
-                                        logger.warning(f"[S3] {clean_symbol} exit引き締め: {_exit_cat}→{_new_cat} (bear={_s3_bear_prog:.0f}%)")
-                                        _s3_dedup_cache[_s3_log_key] = True
-
-                    # S3-3: bull target到達(100%) → トレール早期開始
-                    if _s3_entry > 0 and _s3_target > _s3_entry:
-                        _s3_bull_prog = (current_price - _s3_entry) / (_s3_target - _s3_entry) * 100
-                        if _s3_bull_prog >= 100 and pnl['pnl_pct'] > 0:
-                            _trail_start = min(_trail_start, max(2.0, pnl['pnl_pct'] * 0.8))
-                except Exception:
-                    pass
-
-            sell_reason = ""
-            sell_label = ""
-            # === F2: BTC急落リスク適用 v6.5ai ===
-            if _f2_level >= 3:
-                sell_reason = f"F2 L3 Emergency: BTC {_btc_24h_chg_f2:.1f}% — forced liquidation (profile: {_exit_cat})"
-                sell_label = "F2-L3"
-                logger.warning(f"[F2 L3] {clean_symbol} 緊急売却")
-            elif _f2_level >= 2 and pnl['pnl_pct'] > 0:
-                sell_reason = f"F2 L2 Profit-take: BTC {_btc_24h_chg_f2:.1f}% + profit {pnl['pnl_pct']:+.1f}% (profile: {_exit_cat})"
-                sell_label = "F2-L2"
-                logger.warning(f"[F2 L2] {clean_symbol} 含み益利確 +{pnl['pnl_pct']:.1f}%")
-            elif _f2_level >= 1:
-                sl_pct = sl_pct * 0.5  # SL引き締め
-
-            # === 第0層: 戦略書exit_stages判定 ===
-            _sell_fraction = 1.0  # デフォルト全量
-            if not sell_reason and _strategy:
-                _bull_stages = _strategy.get('bull_scenario', {}).get('exit_stages', [])
-                _bear_stages = _strategy.get('bear_scenario', {}).get('exit_stages', [])
-                _completed = hdata.get('completed_stages', [])
-                # Bear exit_stages（損切り）
-                for _si, _stg in enumerate(_bear_stages):
-                    _stg_id = f'bear_{_si}'
-                    if _stg_id in _completed:
-                        continue
-                    _trig = float(_stg.get('trigger_pct', -999))
-                    if pnl['pnl_pct'] <= _trig:
-                        _sf = min(100, max(1, int(_stg.get('sell_pct', 100)))) / 100.0
-                        _sell_fraction = _sf
-                        sell_reason = f"Strategy Bear Stage {_si}: {pnl['pnl_pct']:+.1f}% <= {_trig:+.1f}% (sell {_sf*100:.0f}%, {_stg.get('note','')})";
-                        sell_label = 'Strategy SL'
-                        _completed.append(_stg_id)
-                        logger.warning(f'[Exit Stage] 📉 {clean_symbol} bear stage {_si}: {pnl["pnl_pct"]:+.1f}% (sell {_sf*100:.0f}%)')
-                        break
-                # Bull exit_stages（利確）
-                if not sell_reason:
-                    for _si, _stg in enumerate(_bull_stages):
-                        _stg_id = f'bull_{_si}'
-                        if _stg_id in _completed:
-                            continue
-                        _trig = float(_stg.get('trigger_pct', 999))
-                        if pnl['pnl_pct'] >= _trig:
-                            _sf = min(100, max(1, int(_stg.get('sell_pct', 100)))) / 100.0
-                            _sell_fraction = _sf
-                            sell_reason = f"Strategy Bull Stage {_si}: {pnl['pnl_pct']:+.1f}% >= {_trig:+.1f}% (sell {_sf*100:.0f}%, {_stg.get('note','')})";
-                            sell_label = 'Strategy TP'
-                            _completed.append(_stg_id)
-                            logger.info(f'[Exit Stage] 📈 {clean_symbol} bull stage {_si}: {pnl["pnl_pct"]:+.1f}% (sell {_sf*100:.0f}%)')
-                            break
-                # completed_stagesを保存
-                if _completed and clean_symbol in pw.state.get('holdings', {}):
-                    pw.state['holdings'][clean_symbol]['completed_stages'] = _completed
-                    pw._save_wallet()
-
-            # === 第1層: 固定SL（戦略別） ===
-            if not sell_reason and pw.should_stop_loss(clean_symbol, current_price, stop_pct=sl_pct):
-                sell_reason = f"Stop Loss at {pnl['pnl_pct']:.1f}% (limit: -{sl_pct}%, profile: {_exit_cat})"
-                sell_label = "SL"
-                logger.warning(f"[TP/SL] 🛑 損切トリガー: {clean_symbol} {pnl['pnl_pct']:.1f}% (profile: {_exit_cat})")
-
-            # === 第2層: トレーリングストップ（戦略別開始・ドロップ幅） ===
-            elif pnl['pnl_pct'] >= _trail_start or hdata.get("high_water_pnl", 0) >= _trail_start:
-                prev_hw = hdata.get("high_water_pnl", pnl['pnl_pct'])
-                if pnl['pnl_pct'] > prev_hw:
-                    hdata["high_water_pnl"] = pnl['pnl_pct']
-                    pw.state["holdings"][clean_symbol]["high_water_pnl"] = pnl['pnl_pct']
-                    pw._save_wallet()
-                    logger.info(f"[TP/SL] 📈 高値更新: {clean_symbol} +{pnl['pnl_pct']:.1f}% (HWM)")
-                    prev_hw = pnl['pnl_pct']
-                drawdown_from_hw = prev_hw - pnl['pnl_pct']
-                if drawdown_from_hw >= _trail_drop:
-                    sell_reason = f"Trailing Stop at +{pnl['pnl_pct']:.1f}% (HWM: +{prev_hw:.1f}%, drop: -{drawdown_from_hw:.1f}%, profile: {_exit_cat})"
-                    sell_label = "Trail TP"
-                    logger.warning(f"[TP/SL] 🎯 トレーリング利確: {clean_symbol} +{pnl['pnl_pct']:.1f}% (HWM: +{prev_hw:.1f}%, profile: {_exit_cat})")
-
-            # === 第2層b: 固定TP上限（戦略別） ===
-            elif pnl['pnl_pct'] >= _hard_tp:
-                sell_reason = f"Hard TP Ceiling at +{pnl['pnl_pct']:.1f}% (ceiling: +{_hard_tp:.0f}%, profile: {_exit_cat})"
-                sell_label = "Hard TP"
-                logger.warning(f"[TP/SL] 🎯 固定上限利確: {clean_symbol} +{pnl['pnl_pct']:.1f}% (profile: {_exit_cat})")
-
-            # === 第3層: テクニカル出口（RSI > 閾値 + 含み益 > 1.5%）v6.5ai: プロファイル別RSI ===
-            elif pnl['pnl_pct'] > 1.5:
-                _rsi_exit_threshold = _exit_p.get("rsi_exit")
-                if _rsi_exit_threshold is not None:
-                    # v6.5as: AI戦略のbull_stage1未到達ならRSI Exitしない
-                    _min_profit_for_rsi = 3.0  # デフォルト最低利益条件
-                    try:
-                        _ec_strat = hdata.get("entry_context", {}) if isinstance(hdata.get("entry_context"), dict) else {}
-                        _bull_stages = _ec_strat.get("strategy", {}).get("bull_scenario", {}).get("exit_stages", []) if isinstance(_ec_strat.get("strategy"), dict) else []
-                        if _bull_stages and isinstance(_bull_stages[0], dict):
-                            _min_profit_for_rsi = max(3.0, _bull_stages[0].get("trigger_pct", 3.0))
-                    except Exception:
-                        pass
-                    if pnl['pnl_pct'] >= _min_profit_for_rsi:
-                        rsi_val = _calc_rsi(clean_symbol)
-                        if rsi_val is not None and rsi_val > _rsi_exit_threshold:
-                            sell_reason = f"RSI Exit at RSI={rsi_val:.1f} with +{pnl['pnl_pct']:.1f}% profit (RSI>{_rsi_exit_threshold}, min_profit={_min_profit_for_rsi:.1f}%, profile: {_exit_cat})"
-                            sell_label = "RSI Exit"
-                            logger.warning(f"[TP/SL] 📊 テクニカル出口: {clean_symbol} RSI={rsi_val:.1f}>{_rsi_exit_threshold} +{pnl['pnl_pct']:.1f}% (min={_min_profit_for_rsi:.1f}%, profile: {_exit_cat})")
-
-            # === 第4層: 時間制約（戦略別） ===
-            if not sell_reason:
-                entry_time_str = hdata.get("entry_time", "")
-                if entry_time_str:
-                    try:
-                        if entry_time_str.endswith('+00:00') or entry_time_str.endswith('Z'):
-                            entry_time = datetime.fromisoformat(entry_time_str.replace('Z', '+00:00'))
-                        else:
-                            entry_time = datetime.fromisoformat(entry_time_str).replace(tzinfo=timezone.utc)
-                        hours_held = (datetime.now(timezone.utc) - entry_time).total_seconds() / 3600
-                        if hours_held > _time_limit:
-                            sell_reason = f"Time Exit after {hours_held:.0f}h (limit: {_time_limit}h, profile: {_exit_cat}) with {pnl['pnl_pct']:+.1f}%"
-                            sell_label = "Time Exit"
-                            logger.warning(f"[TP/SL] ⏰ 時間制約: {clean_symbol} {hours_held:.0f}h (limit: {_time_limit}h, profile: {_exit_cat}) {pnl['pnl_pct']:+.1f}%")
-                    except Exception as _te:
-                        logger.error(f"[TP/SL] entry_time解析エラー: {_te}")
+            sell_reason, sell_label, _sell_fraction = signal.reason, signal.label, signal.fraction
+            _exit_cat, sl_pct = signal.profile, signal.sl_pct
 
             # === SELL実行 ===
             if sell_reason:
@@ -452,6 +175,13 @@ def check_tp_sl_all_positions():
                 result = pw.execute_trade(symbol=clean_symbol, action="SELL", amount_usd=sell_amount_usd, price=current_price, reason=sell_reason)
                 if result.get("status") == "success":
                     sell_executed = True
+                    # 戦略書exit_stages: completed_stagesを保存（執行できた段だけ・同じ段は二度発火させない）
+                    if signal.stage_id:
+                        _completed = list(hdata.get('completed_stages', []))
+                        if signal.stage_id not in _completed:
+                            _completed.append(signal.stage_id)
+                        hdata['completed_stages'] = _completed
+                        pw.update_holding(clean_symbol, completed_stages=_completed)
                     is_win = pnl['pnl_pct'] > 0
                     result_tag = "win" if is_win else "loss"
                     # サーキットブレーカー: SL記録
@@ -466,8 +196,7 @@ def check_tp_sl_all_positions():
                         logger.error(f"[CFO] SL記録エラー: {_cg_err}")
                     logger.info(f"[TP/SL] ✅ {sell_label}完了: {clean_symbol} ${sell_amount_usd:.2f} ({pnl['pnl_pct']:+.1f}%)")
                     # === 二重発火防止: 冷却セット v6.5ar ===
-                    import time as _time_sc2
-                    _sell_cooldown[clean_symbol] = _time_sc2.time() + SELL_COOLDOWN_SEC
+                    _EXITS.start_cooldown(clean_symbol)
 
                     # === SELL根拠スナップショット v6.5au ===
                     try:
@@ -566,9 +295,8 @@ def check_tp_sl_all_positions():
                         # pwは check_tp_sl_all_positions() のローカル変数（L82）— 同関数内で常に有効
                         _npin_section = ""
                         try:
-                            _pw_hist = pw.state.get("history", [])
                             # 同銘柄の直近50件に限定（古い履歴は不要、新しいラウンドトリップほど関連性高）
-                            _sym_hist = [h for h in _pw_hist if h.get("symbol") == clean_symbol][-50:]
+                            _sym_hist = pw.history(symbol=clean_symbol, limit=50)
                             # 今回のSELL(=最後のエントリー)より前のレコードからラウンドトリップ起点を探す
                             _rt_buys = []
                             _running_amt = 0.0
@@ -710,6 +438,9 @@ def check_tp_sl_all_positions():
                     if not is_win and '_scenario_outcome' in dir():
                         _s4_meta["scenario_outcome"] = _scenario_outcome
                         _s4_meta["strategy_quality_score"] = str(_strategy_quality)
+                    if memory is None:
+                        from core.memory_db import NeoMemoryDB
+                        memory = NeoMemoryDB()
                     memory.store(mem_text, metadata=_s4_meta)
 
                     # paper_trade.logに記録（Evaluatorが参照）
@@ -749,23 +480,42 @@ def check_tp_sl_all_positions():
                         )
                     except Exception as _de:
                         logger.error(f"[TP/SL] Discord報告失敗: {_de}")
+                else:
+                    # 執行できなかったシグナルの段・HWM を戻す（次の sync で保有内容から作り直して再判定）
+                    logger.warning(f"[TP/SL] {sell_label} 執行失敗: {clean_symbol} {result.get('reason', result)}")
+                    _EXITS.forget(clean_symbol)
 
         except Exception as e:
             logger.error(f"[TP/SL] {clean_symbol} チェックエラー: {e}")
+            _EXITS.forget(clean_symbol)
     return sell_executed
 
+
+def _watch_exits(timeout: float) -> bool:
+    """timeout 秒まで新着ティックを待ちながら出口を判定し、シグナルが出たら次サイクルを待たずに執行する
+    Returns: True if any SELL was executed"""
+    if not _EXITS.watch(timeout):
+        return False
+    try:
+        return check_tp_sl_all_positions()
+    except Exception as e:
+        logger.error(f"[TP/SL] ティック発火の執行エラー: {e}")
+        _EXITS.drain()  # 執行できなかったシグナルは捨てる（次のティックで再判定）
+        return False
+
 # --- 設定 ---
 CHECK_INTERVAL = 30           # 監視間隔（秒）
 VOLATILITY_THRESHOLD = 2.0    # ボラティリティ閾値（%）
 ALPHA_THRESHOLD = LEARNING_SHARPE_THRESHOLD if LEARNING_MODE else 5.0  # 学習モード中は緩和
-COUNCIL_COOLDOWN = 1800       # 冷却期間（30分）— Moltbook Rate Limit保護
-SWEEP_INTERVAL   = 120        # Sweepサイクル間隔（30秒×120=60分）
+COUNCIL_COOLDOWN = 1800       # 冷却期間（30分）— 銘柄ごと（SELL・Councilエラー後は全銘柄）
+SWEEP_INTERVAL_SEC     = 3600   # Sweep間隔（60分）
 # [v6.5ac] ARB_INTERVAL removed
-EVAL_INTERVAL    = 720        # Evaluatorサイクル間隔（30秒×720=6時間）
-CFR_INTERVAL     = 720        # Capital Flow Radar間隔（30秒×720=6時間）
-ENGAGE_INTERVAL  = 240
+EVAL_INTERVAL_SEC      = 21600  # Evaluator間隔（6時間）
+CFR_INTERVAL_SEC       = 21600  # Capital Flow Radar間隔（6時間）
+ENGAGE_INTERVAL_SEC    = 7200   # Moltbookエンゲージメント間隔（2時間）
 UNIFIED_COUNCIL_INTERVAL_SEC = 3600  # 1時間ごと（秒）— タイムスタンプベース・リスタート耐性あり
-HEARTBEAT_INTERVAL = 60       # 稼働報告間隔（30秒×60=30分）        # Moltbookエンゲージメント間隔（30秒×240=2時間）
+HEARTBEAT_INTERVAL_SEC = 1800   # 稼働報告間隔（30分）
+NO_TRADE_ALERT_HOURS   = 24     # 無取引アラート
 NIGHTLY_HOUR     = 2           # Nightly Batch実行時刻（JST 02:00 — now_jst_hourと比較）
 
 from logging.handlers import RotatingFileHandler as _RFH
@@ -1047,6 +797,436 @@ def _run_nightly_batch():
         logger.error(f"[Nightly] ログ切り詰め失敗: {e}")
 
 
+class RadarState:
+    """レーン間で共有する radar の状態（出口レーンの SELL で Council 冷却を始める・Heartbeat がサイクル数を出す 等）"""
+
+    def __init__(self, anchor_prices: dict):
+        self.anchor_prices = anchor_prices   # ボラティリティ判定の基準価格（トリガー発火時のみ更新）
+        self.processed_alphas = {}           # 処理済みアルファのタイムスタンプ
+        self.last_nightly_date = None        # 最後にNightly Batchを実行した日付
+        self.last_council_time = 0           # 全銘柄の冷却を始めた時刻（Councilエラー・SELL）
+        self.council_times = {}              # 銘柄別: 最後に評議会を召集した時刻（別銘柄の Council は並行できる）
+        self.cycle_count = 0                 # radar サイクル数（Council レーン）
+        self.consecutive_errors = 0
+        self.last_trade_time = time.time()
+        self.no_trade_alerted = False
+        self.councils = CouncilQueue()       # Council ジョブキュー（ワーカープロセスが実行）
+        self.council_pool = CouncilWorkerPool()
+
+
+def _exit_cycle(st: RadarState):
+    """出口レーン: 同期チェック → 次のサイクルまで新着ティックごとに判定（発火したらその場で執行）"""
+    try:
+        if check_tp_sl_all_positions():
+            st.last_council_time = time.time()
+            logger.info("[TP/SL] 🧊 SELL発火 → 冷却開始（30分）")
+    except Exception as _tpsl_e:
+        logger.error(f"[TP/SL] サイクルチェックエラー: {_tpsl_e}")
+    if _watch_exits(CHECK_INTERVAL):
+        st.last_council_time = time.time()
+        logger.info("[TP/SL] 🧊 ティック発火SELL → 冷却開始（30分）")
+
+
+def _collect_council_results(st: RadarState):
+    """ワーカーが終えた Council の結果を受け取り、冷却・連続エラー・無取引監視に反映する"""
+    try:
+        st.council_pool.ensure()
+        jobs = st.councils.results()
+    except Exception as e:
+        logger.error(f"[Council Pool] 結果取得エラー: {e}")
+        return
+    for job in jobs:
+        if job.status == DONE:
+            # 冷却は投入時に始めている（完了時に掛け直すと次の召集が実行時間ぶん遅れ、Council 同士が並行しない）
+            logger.info(f"✅ Council完了 #{job.id} {job.symbol}: {job.verdict}")
+            st.consecutive_errors = 0
+            if job.verdict in ("BUY", "SELL"):
+                st.last_trade_time = time.time()
+                st.no_trade_alerted = False
+            continue
+
+        # 実行しなかった・失敗したアルファは次サイクルで再判定できるよう処理済みマークを外す
+        if job.trigger_type == "ALPHA":
+            for _opp in [k for k in st.processed_alphas if normalize_symbol(k) == job.symbol]:
+                del st.processed_alphas[_opp]
+        if job.status != FAILED:
+            logger.warning(f"🚫 [CFO] Council未実行 #{job.id} {job.symbol}: {job.error}")
+            continue
+
+        logger.error(f"⚠️ Council Error #{job.id} {job.symbol}: {job.error}")
+        st.last_council_time = time.time()  # エラー時も冷却開始（連続エラー防止）
+        st.consecutive_errors += 1
+
+        DiscordReporter.send_log(
+            "❌ Council Error",
+            f"**Symbol:** {job.symbol}\n**Error:** {(job.error or '')[:500]}",
+            0xe74c3c
+        )
+        if st.consecutive_errors >= 3:
+            DiscordReporter.send_log(
+                "🚨 連続エラー警告",
+                f"Councilが{st.consecutive_errors}回連続エラー。手動確認が必要です。",
+                0xff0000
+            )
+
+
+def _cooldown_remaining(st: RadarState, symbol: str, now: float) -> float:
+    """銘柄の Council 冷却の残り秒（銘柄別の冷却と全銘柄の冷却の長い方）"""
+    last = max(st.last_council_time, st.council_times.get(normalize_symbol(symbol), 0))
+    return max(0, COUNCIL_COOLDOWN - (now - last))
+
+
+def _radar_cycle(st: RadarState):
+    """Council レーン: ボラティリティ・アルファ・定期ローテーションのトリガー監視と Council ジョブ投入"""
+    _collect_council_results(st)
+    st.cycle_count += 1
+    current_time = time.time()
+    time_since_last = current_time - st.last_council_time
+    cooldown_remaining = max(0, COUNCIL_COOLDOWN - time_since_last)
+    is_cooled_down = cooldown_remaining == 0
+
+    trigger_type = None
+    trigger_symbol = None
+    trigger_context = None
+
+    # ============================================================
+    # 1. ボラティリティ監視 (Tier1: VIRTUAL / AIXBT)
+    # ============================================================
+    current_price = st.anchor_prices.get("VIRTUAL", 0.0)  # ステータス表示用
+    for _vsym in VOLATILITY_WATCH_SYMBOLS:
+        try:
+            # SQLite優先（API呼び出し削減・429対策）
+            _vprice = PriceCache.get_price(_vsym, max_age=PRICE_MAX_AGE_SEC, sources=("db", "api"))
+            if _vprice > 0:
+                _anchor = st.anchor_prices.get(_vsym, 0.0)
+                _change = abs((_vprice - _anchor) / _anchor) * 100 if _anchor > 0 else 0
+
+                if _vsym == "VIRTUAL":
+                    current_price = _vprice  # ステータス表示用更新
+
+                if _change >= VOLATILITY_THRESHOLD:
+                    _dir = "上昇" if _vprice > _anchor else "下落"
+                    logger.warning(f"🚨 [VOLATILITY] {_vsym} {_dir} {_change:.2f}% (${_anchor:.6f} → ${_vprice:.6f})")
+
+                    _remaining = _cooldown_remaining(st, _vsym, current_time)
+                    if _remaining == 0 and trigger_type is None:
+                        trigger_type = "VOLATILITY"
+                        trigger_symbol = _vsym
+                        trigger_context = f"{_vsym}価格が{_change:.2f}%{_dir}（${_anchor:.6f}→${_vprice:.6f}）"
+                    else:
+                        logger.info(f"  ⏳ 冷却中（残り{int(_remaining/60)}分）— {_vsym}ボラトリガーを保留")
+
+                # アンカー価格はトリガー発火時のみ更新（毎サイクル更新すると30秒で2%必要になる）
+                if _change >= VOLATILITY_THRESHOLD:
+                    st.anchor_prices[_vsym] = _vprice
+        except Exception as e:
+            logger.error(f"ボラティリティ監視エラー [{_vsym}]: {e}")
+
+    # ============================================================
+    # 2. アルファ監視 (Blackboard経由)
+    # ============================================================
+    if trigger_type is None and is_cooled_down:
+        try:
+            board = NeoBlackboard.load()
+            strat = board.get("strategic_intel", {})
+            opps = strat.get("active_opportunities", {})
+
+            eligible = []
+            council_ok = [sym + "/USDT" for sym in COUNCIL_ELIGIBLE_SYMBOLS]
+            for s, d in opps.items():
+                if s not in council_ok:
+                    logger.debug(f"⏭️ [ALPHA] {s} はCouncil対象外 — スキップ")
+                    continue
+                sharpe = d.get("sharpe", 0.0)
+                last_detected = d.get("last_detected")
+                if (sharpe >= ALPHA_THRESHOLD and st.processed_alphas.get(s) != last_detected
+                        and _cooldown_remaining(st, s, current_time) == 0):
+                    eligible.append((s, d))
+
+            if eligible:
+                eligible.sort(key=lambda x: x[1].get("sharpe", 0.0), reverse=True)
+                symbol, data = eligible[0]
+
+                trigger_type = "ALPHA"
+                trigger_symbol = symbol
+                trigger_context = f"Alpha Sweep Hit: Sharpe={data['sharpe']}, confidence={data.get('confidence', 'N/A')}"
+
+                logger.warning(f"🔥 [ALPHA] {symbol} (Sharpe: {data['sharpe']}) 採択")
+        except Exception as e:
+            logger.error(f"アルファ監視エラー: {e}")
+
+    # ============================================================
+    # 2. 統合定期Council召集（タイムスタンプベース・2時間ローテーション）
+    #    順序: BTC → VIRTUAL → ETH → BTC → ...（AIXBTはTier2降格 v6.5ab）
+    #    リスタート耐性: Blackboardに最終実行時刻を永続保存
+    # ============================================================
+    if trigger_type is None:
+        _rotation_symbols = ["BTC", "VIRTUAL", "ETH"]
+        _now_ts = time.time()
+        try:
+            import json as _json_uc
+            with open("vault/blackboard/live_intel.json", "r") as _f_uc:
+                _bb_uc = _json_uc.load(_f_uc)
+            _last_uc_ts = float(_bb_uc.get("last_unified_council_ts", 0))
+            _last_uc_sym = _bb_uc.get("last_unified_council_symbol", "")
+        except Exception:
+            _last_uc_ts = 0
+            _last_uc_sym = ""
+        _elapsed = _now_ts - _last_uc_ts
+        if _elapsed >= UNIFIED_COUNCIL_INTERVAL_SEC:
+            # ローテーション: 前回の次の銘柄
+            if _last_uc_sym and _last_uc_sym in _rotation_symbols:
+                _uc_idx = (_rotation_symbols.index(_last_uc_sym) + 1) % len(_rotation_symbols)
+            else:
+                _uc_idx = 0
+            _uc_sym = _rotation_symbols[_uc_idx]
+            _uc_remaining = _cooldown_remaining(st, _uc_sym, current_time)
+            if _uc_remaining == 0:
+                _uc_tier = "TIER0" if _uc_sym in TIER0_SYMBOLS else "PERIODIC"
+                trigger_type = _uc_tier
+                trigger_symbol = _uc_sym
+                trigger_context = f"定期Council（2時間ローテーション）: {_uc_sym}"
+                # Blackboardに記録（永続化）
+                try:
+                    NeoBlackboard.patch({"last_unified_council_ts": _now_ts, "last_unified_council_symbol": _uc_sym})
+                except Exception as _uc_err:
+                    logger.warning(f"[COUNCIL] Blackboard書き込み失敗: {_uc_err}")
+                logger.info(f"⏰ [{_uc_tier}] 定期Council召集: {_uc_sym}（{_elapsed/3600:.1f}h経過）")
+            else:
+                logger.info(f"⏰ [COUNCIL] 定期Council時刻だが{_uc_sym}冷却中（残り{int(_uc_remaining/60)}分）— スキップ")
+
+    # ============================================================
+    # 3. Council召集（トリガー発火時のみ）
+    # ============================================================
+    if trigger_type and trigger_symbol:
+        # 最終ガード: COUNCIL_ELIGIBLE_SYMBOLSに含まれない銘柄はブロック
+        _clean_sym = trigger_symbol.split('/')[0].strip()
+        if _clean_sym not in COUNCIL_ELIGIBLE_SYMBOLS:
+            logger.warning(f"🚫 [GUARD] {trigger_symbol} はCOUNCIL_ELIGIBLE_SYMBOLS外 → Council召集ブロック")
+            trigger_type = None
+            trigger_symbol = None
+
+    if trigger_type and trigger_symbol:
+        # サーキットブレーカー: 全レイヤーチェック
+        try:
+            _cg = CostGuard()
+            _cg_ok, _cg_reason = _cg.approve_council()
+            if not _cg_ok:
+                logger.warning(f"🚫 [CFO] Council召集ブロック: {_cg_reason}")
+                DiscordReporter.send_log(
+                    "🚫 サーキットブレーカー発動",
+                    f"**Trigger:** {trigger_type} {trigger_symbol}\n**Reason:** {_cg_reason}",
+                    0xff6600
+                )
+                trigger_type = None
+                trigger_symbol = None
+        except Exception as _cg_err:
+            logger.error(f"[CFO] サーキットブレーカーチェックエラー: {_cg_err}")
+
+    if trigger_type and trigger_symbol:
+        # LLM 待ちで radar を止めないよう、Council はキューに積んでワーカープロセスに任せる
+        # 結果は次サイクル以降の _collect_council_results で受け取る
+        try:
+            job_id = st.councils.submit(
+                trigger_symbol, trigger_type, trigger_context,
+                sentiment_score=1.0 if trigger_type == "ALPHA" else 0.5
+            )
+        except Exception as e:
+            logger.error(f"⚠️ Council投入エラー: {e}", exc_info=True)
+            job_id = 0
+        if job_id is None:
+            logger.info(f"⏭️ [{trigger_type}] {trigger_symbol} はCouncil待機中/実行中 — 投入スキップ")
+        elif job_id:
+            logger.info(f"🏛️ Council召集: [{trigger_type}] {trigger_symbol} → ジョブ #{job_id} | {normalize_symbol(trigger_symbol)}冷却開始（{COUNCIL_COOLDOWN//60}分）")
+            st.council_times[normalize_symbol(trigger_symbol)] = time.time()
+
+            # アルファの処理済みマーク（実行されなかった場合は結果受け取り時に外す）
+            if trigger_type == "ALPHA":
+                board = NeoBlackboard.load()
+                opp_data = board.get("strategic_intel", {}).get("active_opportunities", {}).get(trigger_symbol, {})
+                st.processed_alphas[trigger_symbol] = opp_data.get("last_detected")
+
+            # Discord通知: Council開始
+            DiscordReporter.send_log(
+                f"📡 Radar Trigger: {trigger_type}",
+                f"**Symbol:** {trigger_symbol}\n**Context:** {trigger_context}\n**Council召集中...** (job #{job_id})",
+                0xf39c12
+            )
+
+    # ============================================================
+    # 3b. 長時間無取引検知
+    # ============================================================
+    hours_since_trade = (time.time() - st.last_trade_time) / 3600
+    if hours_since_trade > NO_TRADE_ALERT_HOURS and not st.no_trade_alerted:
+        DiscordReporter.send_log(
+            "⏰ 無取引アラート",
+            f"直近の取引から {hours_since_trade:.1f} 時間経過。\n"
+            f"BUYデッドロック再発や市場データ障害の可能性。",
+            0xf39c12
+        )
+        st.no_trade_alerted = True
+        logger.warning(f"[Monitor] 無取引 {hours_since_trade:.1f}h")
+
+    # ============================================================
+    # 4. ステータス表示
+    # ============================================================
+    if is_cooled_down:
+        alpha_status = "🟢 Ready"
+    else:
+        alpha_status = f"🧊 Cooling ({int(cooldown_remaining/60)}m)"
+
+    status = f"[Radar #{st.cycle_count}] VIRTUAL ${current_price:.4f} | {alpha_status}"
+
+    # 100サイクルごとにログ出力（ノイズ抑制）
+    if st.cycle_count % 100 == 0:
+        logger.info(status)
+    else:
+        print(f"\r{status}", end="", flush=True)
+
+
+def _run_evaluator():
+    logger.info("[Evaluator] 定期評価開始")
+    try:
+        evaluate_performance(send_dashboard=True)
+    except Exception as e:
+        logger.error(f"[Evaluator] エラー: {e}")
+
+
+def _run_capital_flow_radar():
+    try:
+        from tools.capital_flow_radar import run_capital_flow_radar
+        cfr = run_capital_flow_radar()
+        logger.info(f"📊 Capital Flow: score={cfr['score']} regime={cfr['regime']}")
+    except Exception as e:
+        logger.error(f"Capital Flow Radar error: {e}")
+
+
+def _run_sweep():
+    logger.info("[Sweep] 定期スキャン開始")
+    try:
+        run_sweep()
+        logger.info("[Sweep] 完了 — Blackboard更新済み")
+    except Exception as e:
+        logger.error(f"[Sweep] エラー: {e}")
+
+
+def _run_engager():
+    logger.info("[Engager] Moltbookエンゲージメント開始")
+    try:
+        from tools.moltbook_engager import MoltbookEngager
+        engage_result = MoltbookEngager.run_engagement_cycle()
+        r = engage_result.get("replies", {})
+        f = engage_result.get("feed", {})
+        s = engage_result.get("search", {})
+        logger.info(f"[Engager] 完了 — 返信:{r.get('replied',0)} upvote:{f.get('upvoted',0)} コメント:{f.get('commented',0)} 営業:{s.get('commented',0)}")
+    except Exception as e:
+        logger.error(f"[Engager] エラー: {e}")
+
+
+def _send_heartbeat(st: RadarState):
+    """Heartbeat稼働報告（30分ごと）"""
+    try:
+        from tools.paper_wallet import PaperWallet as _HBW
+        _hbw = _HBW()
+        _hb_usdc = _hbw.state.get("usd_balance", 0)
+        _hb_holdings = _hbw.state.get("holdings", {})
+        _hb_hist = _hbw.trade_count()
+        _hb_lines = []
+        _hb_lines.append("💰 USDC: ${:,.0f}".format(_hb_usdc))
+        _hb_total = _hb_usdc
+        for _hbs, _hbd in _hb_holdings.items():
+            try:
+                _hbpr = PriceCache.get_price(_hbs, max_age=PRICE_MAX_AGE_SEC)
+                if _hbpr > 0:
+                    _hb_val = _hbd["amount"] * _hbpr
+                    _hb_total += _hb_val
+                    _hb_pnl = ((_hbpr - _hbd["avg_price"]) / _hbd["avg_price"] * 100) if _hbd["avg_price"] > 0 else 0
+                    _hb_lines.append("📊 {}: {} ({:+.2f}%)".format(_hbs, DiscordReporter._fmt_price(_hbpr, _hbs), _hb_pnl))
+            except Exception:
+                pass
+        _hb_lines.append("💎 Total: ${:,.0f}".format(_hb_total))
+        # Tier別勝率
+        try:
+            _hb_bb = NeoBlackboard.load()
+            _hb_ps = _hb_bb.get("performance_summary", {})
+            _hb_t0a = _hb_ps.get("tier0_accuracy", 0)
+            _hb_t0n = _hb_ps.get("tier0_trades", 0)
+            _hb_t1a = _hb_ps.get("tier1_accuracy", 0)
+            _hb_t1n = _hb_ps.get("tier1_trades", 0)
+            _hb_total_acc = _hb_ps.get("accuracy_score", 0)
+            _hb_total_n = _hb_ps.get("total_evaluated_trades", 0)
+            _hb_lines.append("🎯 勝率: {:.1f}% ({}件) | T0:{:.0f}%({}) T1:{:.0f}%({})".format(
+                _hb_total_acc, _hb_total_n, _hb_t0a, _hb_t0n, _hb_t1a, _hb_t1n))
+        except Exception:
+            _hb_lines.append("🎯 Learn: {}/{}".format(_hb_hist, LEARNING_TARGET_TRADES))
+        # CFOステータス
+        try:
+            _hb_cg = CostGuard()
+            _hb_dd_ok, _hb_dd_pct = _hb_cg.check_drawdown()
+            _hb_hwm = _hb_cg._breaker.get("hwm", 0)
+            _hb_dd_status = f"{_hb_dd_pct:.1f}% ✅" if _hb_dd_ok else f"{_hb_dd_pct:.1f}% 🚫 BLOCKED"
+            _hb_lines.append("🛡️ CFO: DD={} | HWM: ${:,.0f}".format(_hb_dd_status, _hb_hwm))
+        except Exception:
+            pass
+        # 次ローテーション情報
+        try:
+            import json as _hb_json
+            with open("vault/blackboard/live_intel.json", "r") as _hb_f:
+                _hb_bbi = _hb_json.load(_hb_f)
+            _hb_last_ts = float(_hb_bbi.get("last_unified_council_ts", 0))
+            _hb_last_sym = _hb_bbi.get("last_unified_council_symbol", "?")
+            _hb_rotation = ["BTC", "VIRTUAL", "ETH"]
+            _hb_next_idx = (_hb_rotation.index(_hb_last_sym) + 1) % len(_hb_rotation) if _hb_last_sym in _hb_rotation else 0
+            _hb_next_sym = _hb_rotation[_hb_next_idx]
+            _hb_elapsed = time.time() - _hb_last_ts
+            _hb_remain = max(0, UNIFIED_COUNCIL_INTERVAL_SEC - _hb_elapsed)
+            _hb_lines.append("⏰ Next: {} (残{:.0f}分)".format(_hb_next_sym, _hb_remain / 60))
+        except Exception:
+            pass
+        _hb_lines.append("🔄 Cycle: #{}".format(st.cycle_count))
+        DiscordReporter.send_log("💓 Heartbeat", chr(10).join(_hb_lines), 0x3498db)
+        logger.info("[Heartbeat] ✅ 送信完了 (cycle #{})".format(st.cycle_count))
+    except Exception as _hbe:
+        logger.error("[Heartbeat] error: {}".format(_hbe))
+
+
+def _check_nightly(st: RadarState):
+    """Nightly Batch（JST 02:00 = UTC 17:00 に1日1回）"""
+    now_utc = datetime.now(timezone.utc)
+    now_jst_hour = (now_utc.hour + 9) % 24
+    today_str = now_utc.strftime('%Y-%m-%d')
+    if now_jst_hour == NIGHTLY_HOUR and st.last_nightly_date != today_str:
+        st.last_nightly_date = today_str
+        logger.info(f'[Nightly] 深夜バッチ開始 JST{now_jst_hour:02d}:00 ({today_str})')
+        try:
+            _run_nightly_batch()
+        except Exception as e:
+            logger.error(f'[Nightly] バッチ失敗: {e}')
+
+
+def _track_sell_aftermath():
+    """売却後価格追跡（v6.5ar）"""
+    try:
+        check_sell_aftermath()
+    except Exception as _sa_e:
+        logger.error(f'[売却追跡] メインループエラー: {_sa_e}')
+
+
+def build_scheduler(st: RadarState) -> Scheduler:
+    """radar の定期ジョブ。出口判定は専用レーンで回し、Council・定期リサーチが長引いても止まらない"""
+    sched = Scheduler()
+    sched.add("exits", lambda: _exit_cycle(st), 0, lane=LANE_EXIT, first_delay=0)
+    sched.add("radar", lambda: _radar_cycle(st), CHECK_INTERVAL, lane=LANE_COUNCIL, first_delay=0)
+    sched.add("sell_aftermath", _track_sell_aftermath, CHECK_INTERVAL, timeout=120, first_delay=0)
+    sched.add("sweep", _run_sweep, SWEEP_INTERVAL_SEC, timeout=1800, jitter=60)
+    sched.add("evaluator", _run_evaluator, EVAL_INTERVAL_SEC, timeout=600, jitter=60)
+    sched.add("capital_flow", _run_capital_flow_radar, CFR_INTERVAL_SEC, timeout=600, jitter=60)
+    sched.add("engager", _run_engager, ENGAGE_INTERVAL_SEC, timeout=1800, jitter=120)
+    sched.add("heartbeat", lambda: _send_heartbeat(st), HEARTBEAT_INTERVAL_SEC, timeout=120)
+    sched.add("nightly", lambda: _check_nightly(st), 60, timeout=3 * 3600)
+    return sched
+
+
 def start_hybrid_radar():
     print("=" * 60)
     print(f" 📡 Neo Hybrid Radar v2: UNIFIED TRIGGER MODE")
@@ -1056,8 +1236,9 @@ def start_hybrid_radar():
     
     # 初期価格の取得（Tier1全銘柄）
     anchor_prices = {}
+    _initial_data = MarketData.fetch_token_data_many(VOLATILITY_WATCH_SYMBOLS)
     for _sym in VOLATILITY_WATCH_SYMBOLS:
-        _data = MarketData.fetch_token_data(_sym)
+        _data = _initial_data.get(MarketData._normalize_symbol(_sym))
         _price = float(_data.get("priceUsd", 0.0)) if _data else 0.0
         if _price <= 0:
             logger.error(f"❌ {_sym} 初期価格取得失敗。5秒後リトライ...")
@@ -1066,16 +1247,8 @@ def start_hybrid_radar():
             _price = float(_data.get("priceUsd", 0.0)) if _data else 0.0
         anchor_prices[_sym] = _price
         logger.info(f"🎯 Anchor price [{_sym}]: ${_price:.6f}")
-    anchor_price = anchor_prices.get("VIRTUAL", 0.0)  # ステータス表示用
-    
-    processed_alphas = {}     # 処理済みアルファのタイムスタンプ
-    last_nightly_date = None  # 最後にNightly Batchを実行した日付
-    last_council_time = 0     # 最後に評議会を開いた時刻
-    cycle_count = 0
-    consecutive_errors = 0
-    last_trade_time = time.time()
-    NO_TRADE_ALERT_HOURS = 24
-    no_trade_alerted = False
+    st = RadarState(anchor_prices)
+    _MACRO.start()
 
     # v6.5au: 起動直後にダッシュボード送信
     try:
@@ -1084,403 +1257,13 @@ def start_hybrid_radar():
     except Exception as _e:
         logger.error(f'[Evaluator] 起動時送信失敗: {_e}')
 
+    st.council_pool.start()
     try:
-        while True:
-            cycle_count += 1
-            current_time = time.time()
-            time_since_last = current_time - last_council_time
-            cooldown_remaining = max(0, COUNCIL_COOLDOWN - time_since_last)
-            is_cooled_down = cooldown_remaining == 0
-            
-            trigger_type = None
-            trigger_symbol = None
-            trigger_context = None
-
-            # ============================================================
-            # 0. Alpha Sweep 自動実行（60分ごと）
-            # ============================================================
-            if cycle_count % EVAL_INTERVAL == 0:
-                logger.info(f"[Evaluator] 定期評価開始 (cycle={cycle_count})")
-                try:
-                    evaluate_performance(send_dashboard=True)
-                except Exception as e:
-                    logger.error(f"[Evaluator] エラー: {e}")
-
-            if cycle_count % CFR_INTERVAL == 0 and cycle_count > 0:
-                try:
-                    from tools.capital_flow_radar import run_capital_flow_radar
-                    cfr = run_capital_flow_radar()
-                    logger.info(f"📊 Capital Flow: score={cfr['score']} regime={cfr['regime']}")
-                except Exception as e:
-                    logger.error(f"Capital Flow Radar error: {e}")
-
-            if cycle_count % SWEEP_INTERVAL == 0:
-                logger.info(f"[Sweep] 定期スキャン開始 (cycle={cycle_count})")
-                try:
-                    run_sweep()
-                    logger.info("[Sweep] 完了 — Blackboard更新済み")
-                except Exception as e:
-                    logger.error(f"[Sweep] エラー: {e}")
-
-            # ============================================================
-            # 0a-1b. Arbitrage Spread Monitor（30分ごと）
-            # ============================================================
-            # [v6.5ac] Arbitrage monitoring removed — see .archive_deadcode_v65p/
-            # ============================================================
-            # 0a-2. Moltbookエンゲージメント（2時間ごと）
-            # ============================================================
-            if cycle_count % ENGAGE_INTERVAL == 0:
-                logger.info(f"[Engager] Moltbookエンゲージメント開始 (cycle={cycle_count})")
-                try:
-                    from tools.moltbook_engager import MoltbookEngager
-                    engage_result = MoltbookEngager.run_engagement_cycle()
-                    r = engage_result.get("replies", {})
-                    f = engage_result.get("feed", {})
-                    s = engage_result.get("search", {})
-                    logger.info(f"[Engager] 完了 — 返信:{r.get('replied',0)} upvote:{f.get('upvoted',0)} コメント:{f.get('commented',0)} 営業:{s.get('commented',0)}")
-                except Exception as e:
-                    logger.error(f"[Engager] エラー: {e}")
-
-            # ============================================================
-            # 0a-3. Heartbeat稼働報告（30分ごと）
-            # ============================================================
-            if cycle_count > 0 and cycle_count % HEARTBEAT_INTERVAL == 0:
-                try:
-                    from tools.paper_wallet import PaperWallet as _HBW
-                    _hbw = _HBW()
-                    _hb_usdc = _hbw.state.get("usd_balance", 0)
-                    _hb_holdings = _hbw.state.get("holdings", {})
-                    _hb_hist = len(_hbw.state.get("history", []))
-                    _hb_lines = []
-                    _hb_lines.append("💰 USDC: ${:,.0f}".format(_hb_usdc))
-                    _hb_total = _hb_usdc
-                    for _hbs, _hbd in _hb_holdings.items():
-                        try:
-                            if _hbs in ('BTC','ETH'):
-                                from orchestration.data_collector import get_latest_price_from_db
-                                _hbpr = get_latest_price_from_db(_hbs) or 0
-                            else:
-                                _hbp = MarketData._fetch_price_from_geckoterminal(_hbs)
-                                if not _hbp:
-                                    _hbp = MarketData.fetch_token_data(_hbs)
-                                _hbpr = float(_hbp.get('priceUsd', 0)) if _hbp and _hbp.get('status') == 'success' else 0
-                            if _hbpr > 0:
-                                _hb_val = _hbd["amount"] * _hbpr
-                                _hb_total += _hb_val
-                                _hb_pnl = ((_hbpr - _hbd["avg_price"]) / _hbd["avg_price"] * 100) if _hbd["avg_price"] > 0 else 0
-                                _hb_lines.append("📊 {}: {} ({:+.2f}%)".format(_hbs, DiscordReporter._fmt_price(_hbpr, _hbs), _hb_pnl))
-                        except Exception:
-                            pass
-                    _hb_lines.append("💎 Total: ${:,.0f}".format(_hb_total))
-                    # Tier別勝率
-                    try:
-                        _hb_bb = NeoBlackboard.load()
-                        _hb_ps = _hb_bb.get("performance_summary", {})
-                        _hb_t0a = _hb_ps.get("tier0_accuracy", 0)
-                        _hb_t0n = _hb_ps.get("tier0_trades", 0)
-                        _hb_t1a = _hb_ps.get("tier1_accuracy", 0)
-                        _hb_t1n = _hb_ps.get("tier1_trades", 0)
-                        _hb_total_acc = _hb_ps.get("accuracy_score", 0)
-                        _hb_total_n = _hb_ps.get("total_evaluated_trades", 0)
-                        _hb_lines.append("🎯 勝率: {:.1f}% ({}件) | T0:{:.0f}%({}) T1:{:.0f}%({})".format(
-                            _hb_total_acc, _hb_total_n, _hb_t0a, _hb_t0n, _hb_t1a, _hb_t1n))
-                    except Exception:
-                        _hb_lines.append("🎯 Learn: {}/{}".format(_hb_hist, LEARNING_TARGET_TRADES))
-                    # CFOステータス
-                    try:
-                        _hb_cg = CostGuard()
-                        _hb_dd_ok, _hb_dd_pct = _hb_cg.check_drawdown()
-                        _hb_hwm = _hb_cg._breaker.get("hwm", 0)
-                        _hb_dd_status = f"{_hb_dd_pct:.1f}% ✅" if _hb_dd_ok else f"{_hb_dd_pct:.1f}% 🚫 BLOCKED"
-                        _hb_lines.append("🛡️ CFO: DD={} | HWM: ${:,.0f}".format(_hb_dd_status, _hb_hwm))
-                    except Exception:
-                        pass
-                    # 次ローテーション情報
-                    try:
-                        import json as _hb_json
-                        with open("vault/blackboard/live_intel.json", "r") as _hb_f:
-                            _hb_bbi = _hb_json.load(_hb_f)
-                        _hb_last_ts = float(_hb_bbi.get("last_unified_council_ts", 0))
-                        _hb_last_sym = _hb_bbi.get("last_unified_council_symbol", "?")
-                        _hb_rotation = ["BTC", "VIRTUAL", "ETH"]
-                        _hb_next_idx = (_hb_rotation.index(_hb_last_sym) + 1) % len(_hb_rotation) if _hb_last_sym in _hb_rotation else 0
-                        _hb_next_sym = _hb_rotation[_hb_next_idx]
-                        _hb_elapsed = time.time() - _hb_last_ts
-                        _hb_remain = max(0, UNIFIED_COUNCIL_INTERVAL_SEC - _hb_elapsed)
-                        _hb_lines.append("⏰ Next: {} (残{:.0f}分)".format(_hb_next_sym, _hb_remain / 60))
-                    except Exception:
-                        pass
-                    _hb_lines.append("🔄 Cycle: #{}".format(cycle_count))
-                    DiscordReporter.send_log("💓 Heartbeat", chr(10).join(_hb_lines), 0x3498db)
-                    logger.info("[Heartbeat] ✅ 送信完了 (cycle #{})".format(cycle_count))
-                except Exception as _hbe:
-                    logger.error("[Heartbeat] error: {}".format(_hbe))
-
-            # ============================================================
-            # 0b. Nightly Batch（JST 02:00 = UTC 17:00 に1日1回）
-            # ============================================================
-            now_utc = datetime.now(timezone.utc)
-            now_jst_hour = (now_utc.hour + 9) % 24
-            today_str = now_utc.strftime('%Y-%m-%d')
-            if now_jst_hour == NIGHTLY_HOUR and last_nightly_date != today_str:
-                last_nightly_date = today_str
-                logger.info(f'[Nightly] 深夜バッチ開始 JST{now_jst_hour:02d}:00 ({today_str})')
-                try:
-                    _run_nightly_batch()
-                except Exception as e:
-                    logger.error(f'[Nightly] バッチ失敗: {e}')
-
-
-            # ============================================================
-            # 0-pre. 売却後価格追跡（v6.5ar）
-            # ============================================================
-            try:
-                check_sell_aftermath()
-            except Exception as _sa_e:
-                logger.error(f'[売却追跡] メインループエラー: {_sa_e}')
-
-            # ============================================================
-            # 0. TP/SLサイクルチェック（毎30秒・Council非依存）
-            # ============================================================
-            try:
-                if check_tp_sl_all_positions():
-                    last_council_time = time.time()
-                    logger.info("[TP/SL] 🧊 SELL発火 → 冷却開始（30分）")
-                    time.sleep(CHECK_INTERVAL)
-                    continue  # SL/TP発火サイクルではCouncil召集しない
-            except Exception as _tpsl_e:
-                logger.error(f"[TP/SL] サイクルチェックエラー: {_tpsl_e}")
-
-                        # ============================================================
-            # 1. ボラティリティ監視 (Tier1: VIRTUAL / AIXBT)
-            # ============================================================
-            current_price = anchor_prices.get("VIRTUAL", 0.0)  # ステータス表示用
-            for _vsym in VOLATILITY_WATCH_SYMBOLS:
-                try:
-                    # SQLite優先（API呼び出し削減・429対策）
-                    from orchestration.data_collector import get_latest_price_from_db
-                    _vprice = get_latest_price_from_db(_vsym)
-                    if _vprice is None:
-                        _vdata = MarketData.fetch_token_data(_vsym)
-                        _vprice = float(_vdata.get("priceUsd", 0.0)) if _vdata and _vdata.get("status") == "success" else 0.0
-                    if _vprice > 0:
-                        _anchor = anchor_prices.get(_vsym, 0.0)
-                        _change = abs((_vprice - _anchor) / _anchor) * 100 if _anchor > 0 else 0
-
-                        if _vsym == "VIRTUAL":
-                            current_price = _vprice  # ステータス表示用更新
-
-                        if _change >= VOLATILITY_THRESHOLD:
-                            _dir = "上昇" if _vprice > _anchor else "下落"
-                            logger.warning(f"🚨 [VOLATILITY] {_vsym} {_dir} {_change:.2f}% (${_anchor:.6f} → ${_vprice:.6f})")
-
-                            if is_cooled_down and trigger_type is None:
-                                trigger_type = "VOLATILITY"
-                                trigger_symbol = _vsym
-                                trigger_context = f"{_vsym}価格が{_change:.2f}%{_dir}（${_anchor:.6f}→${_vprice:.6f}）"
-                            else:
-                                logger.info(f"  ⏳ 冷却中（残り{int(cooldown_remaining/60)}分）— {_vsym}ボラトリガーを保留")
-
-                        # アンカー価格はトリガー発火時のみ更新（毎サイクル更新すると30秒で2%必要になる）
-                        if _change >= VOLATILITY_THRESHOLD:
-                            anchor_prices[_vsym] = _vprice
-                except Exception as e:
-                    logger.error(f"ボラティリティ監視エラー [{_vsym}]: {e}")
-
-            # ============================================================
-            # 2. アルファ監視 (Blackboard経由)
-            # ============================================================
-            if trigger_type is None and is_cooled_down:
-                try:
-                    board = NeoBlackboard.load()
-                    strat = board.get("strategic_intel", {})
-                    opps = strat.get("active_opportunities", {})
-
-                    eligible = []
-                    council_ok = [sym + "/USDT" for sym in COUNCIL_ELIGIBLE_SYMBOLS]
-                    for s, d in opps.items():
-                        if s not in council_ok:
-                            logger.debug(f"⏭️ [ALPHA] {s} はCouncil対象外 — スキップ")
-                            continue
-                        sharpe = d.get("sharpe", 0.0)
-                        last_detected = d.get("last_detected")
-                        if sharpe >= ALPHA_THRESHOLD and processed_alphas.get(s) != last_detected:
-                            eligible.append((s, d))
-
-                    if eligible:
-                        eligible.sort(key=lambda x: x[1].get("sharpe", 0.0), reverse=True)
-                        symbol, data = eligible[0]
-                        
-                        trigger_type = "ALPHA"
-                        trigger_symbol = symbol
-                        trigger_context = f"Alpha Sweep Hit: Sharpe={data['sharpe']}, confidence={data.get('confidence', 'N/A')}"
-                        
-                        logger.warning(f"🔥 [ALPHA] {symbol} (Sharpe: {data['sharpe']}) 採択")
-                except Exception as e:
-                    logger.error(f"アルファ監視エラー: {e}")
-
-            # ============================================================
-            # 2. 統合定期Council召集（タイムスタンプベース・2時間ローテーション）
-            #    順序: BTC → VIRTUAL → ETH → BTC → ...（AIXBTはTier2降格 v6.5ab）
-            #    リスタート耐性: Blackboardに最終実行時刻を永続保存
-            # ============================================================
-            if trigger_type is None:
-                _rotation_symbols = ["BTC", "VIRTUAL", "ETH"]
-                _now_ts = time.time()
-                try:
-                    import json as _json_uc
-                    with open("vault/blackboard/live_intel.json", "r") as _f_uc:
-                        _bb_uc = _json_uc.load(_f_uc)
-                    _last_uc_ts = float(_bb_uc.get("last_unified_council_ts", 0))
-                    _last_uc_sym = _bb_uc.get("last_unified_council_symbol", "")
-                except Exception:
-                    _last_uc_ts = 0
-                    _last_uc_sym = ""
-                _elapsed = _now_ts - _last_uc_ts
-                if _elapsed >= UNIFIED_COUNCIL_INTERVAL_SEC:
-                    if is_cooled_down:
-                        # ローテーション: 前回の次の銘柄
-                        if _last_uc_sym and _last_uc_sym in _rotation_symbols:
-                            _uc_idx = (_rotation_symbols.index(_last_uc_sym) + 1) % len(_rotation_symbols)
-                        else:
-                            _uc_idx = 0
-                        _uc_sym = _rotation_symbols[_uc_idx]
-                        _uc_tier = "TIER0" if _uc_sym in TIER0_SYMBOLS else "PERIODIC"
-                        trigger_type = _uc_tier
-                        trigger_symbol = _uc_sym
-                        trigger_context = f"定期Council（2時間ローテーション）: {_uc_sym}"
-                        # Blackboardに記録（永続化）
-                        try:
-                            import json as _json_ucw
-                            with open("vault/blackboard/live_intel.json", "r") as _f_ucw:
-                                _bb_ucw = _json_ucw.load(_f_ucw)
-                            _bb_ucw["last_unified_council_ts"] = _now_ts
-                            _bb_ucw["last_unified_council_symbol"] = _uc_sym
-                            with open("vault/blackboard/live_intel.json", "w") as _f_ucw:
-                                _json_ucw.dump(_bb_ucw, _f_ucw, indent=2, ensure_ascii=False)
-                        except Exception as _uc_err:
-                            logger.warning(f"[COUNCIL] Blackboard書き込み失敗: {_uc_err}")
-                        logger.info(f"⏰ [{_uc_tier}] 定期Council召集: {_uc_sym}（{_elapsed/3600:.1f}h経過）")
-                    else:
-                        logger.info(f"⏰ [COUNCIL] 定期Council時刻だが冷却中（残り{int(cooldown_remaining/60)}分）— スキップ")
-
-            # ============================================================
-            # 3. Council召集（トリガー発火時のみ）
-            # ============================================================
-            if trigger_type and trigger_symbol:
-                # 最終ガード: COUNCIL_ELIGIBLE_SYMBOLSに含まれない銘柄はブロック
-                _clean_sym = trigger_symbol.split('/')[0].strip()
-                if _clean_sym not in COUNCIL_ELIGIBLE_SYMBOLS:
-                    logger.warning(f"🚫 [GUARD] {trigger_symbol} はCOUNCIL_ELIGIBLE_SYMBOLS外 → Council召集ブロック")
-                    trigger_type = None
-                    trigger_symbol = None
-
-            if trigger_type and trigger_symbol:
-                # サーキットブレーカー: 全レイヤーチェック
-                try:
-                    _cg = CostGuard()
-                    _cg_ok, _cg_reason = _cg.approve_council()
-                    if not _cg_ok:
-                        logger.warning(f"🚫 [CFO] Council召集ブロック: {_cg_reason}")
-                        DiscordReporter.send_log(
-                            "🚫 サーキットブレーカー発動",
-                            f"**Trigger:** {trigger_type} {trigger_symbol}\n**Reason:** {_cg_reason}",
-                            0xff6600
-                        )
-                        trigger_type = None
-                        trigger_symbol = None
-                except Exception as _cg_err:
-                    logger.error(f"[CFO] サーキットブレーカーチェックエラー: {_cg_err}")
-
-            if trigger_type and trigger_symbol:
-                logger.info(f"🏛️ Council召集: [{trigger_type}] {trigger_symbol}")
-                
-                # Discord通知: Council開始
-                DiscordReporter.send_log(
-                    f"📡 Radar Trigger: {trigger_type}",
-                    f"**Symbol:** {trigger_symbol}\n**Context:** {trigger_context}\n**Council召集中...**",
-                    0xf39c12
-                )
-                
-                try:
-                    council = TrinityCouncil()
-                    result = council.run(
-                        sentiment_score=1.0 if trigger_type == "ALPHA" else 0.5,
-                        context=trigger_context,
-                        target_symbol=trigger_symbol
-                    )
-                    
-                    last_council_time = time.time()
-                    
-                    # アルファの処理済みマーク
-                    if trigger_type == "ALPHA":
-                        board = NeoBlackboard.load()
-                        opp_data = board.get("strategic_intel", {}).get("active_opportunities", {}).get(trigger_symbol, {})
-                        processed_alphas[trigger_symbol] = opp_data.get("last_detected")
-                    
-                    verdict = result.get("verdict", "UNKNOWN")
-                    logger.info(f"✅ Council完了: {verdict} | 冷却開始（{COUNCIL_COOLDOWN//60}分）")
-                    consecutive_errors = 0
-                    if verdict in ("BUY", "SELL"):
-                        last_trade_time = time.time()
-                        no_trade_alerted = False
-                    # 取引後に勝率を即時更新
-                    try:
-                        evaluate_performance(send_dashboard=False)
-                    except Exception as _e:
-                        logger.error(f"[Evaluator] Post-council error: {_e}")
-                    
-                except Exception as e:
-                    logger.error(f"⚠️ Council Error: {e}", exc_info=True)
-                    last_council_time = time.time()  # エラー時も冷却開始（連続エラー防止）
-                    consecutive_errors += 1
-                    
-                    DiscordReporter.send_log(
-                        "❌ Council Error",
-                        f"**Symbol:** {trigger_symbol}\n**Error:** {str(e)[:500]}",
-                        0xe74c3c
-                    )
-                    if consecutive_errors >= 3:
-                        DiscordReporter.send_log(
-                            "🚨 連続エラー警告",
-                            f"Councilが{consecutive_errors}回連続エラー。手動確認が必要です。",
-                            0xff0000
-                        )
-
-            # ============================================================
-            # 3b. 長時間無取引検知
-            # ============================================================
-            hours_since_trade = (time.time() - last_trade_time) / 3600
-            if hours_since_trade > NO_TRADE_ALERT_HOURS and not no_trade_alerted:
-                DiscordReporter.send_log(
-                    "⏰ 無取引アラート",
-                    f"直近の取引から {hours_since_trade:.1f} 時間経過。\n"
-                    f"BUYデッドロック再発や市場データ障害の可能性。",
-                    0xf39c12
-                )
-                no_trade_alerted = True
-                logger.warning(f"[Monitor] 無取引 {hours_since_trade:.1f}h")
-
-            # ============================================================
-            # 4. ステータス表示
-            # ============================================================
-            if is_cooled_down:
-                alpha_status = "🟢 Ready"
-            else:
-                alpha_status = f"🧊 Cooling ({int(cooldown_remaining/60)}m)"
-            
-            status = f"[Radar #{cycle_count}] VIRTUAL ${current_price:.4f} | {alpha_status}"
-            
-            # 100サイクルごとにログ出力（ノイズ抑制）
-            if cycle_count % 100 == 0:
-                logger.info(status)
-            else:
-                print(f"\r{status}", end="", flush=True)
-            
-            time.sleep(CHECK_INTERVAL)
-
+        build_scheduler(st).run_forever()
     except KeyboardInterrupt:
         logger.info("\n[Radar] Terminated by Commander. 👋")
+    finally:
+        st.council_pool.stop()
 
 if __name__ == "__main__":
     start_hybrid_radar()
@@ -72,7 +72,7 @@ except Exception as e:
 # Performance
 try:
     pw = PaperWallet()
-    hist = pw.state.get('history', [])
+    hist = pw.history()
     sells = [h for h in hist if h.get('action') == 'SELL']
     wins = sum(1 for h in sells if h.get('pnl_pct', 0) > 0)
     wr = (wins / len(sells) * 100) if sells else 0
@@ -49,7 +49,7 @@ except Exception as e:
 try:
     from tools.paper_wallet import PaperWallet
     pw = PaperWallet()
-    hist = pw.state.get('history', [])
+    hist = pw.history()
     buy_q = {}; wins = 0; losses = 0
     for h in hist:
         s = h.get('symbol', '')
@@ -148,7 +148,7 @@ except: pass
 try:
     from tools.paper_wallet import PaperWallet
     pw = PaperWallet()
-    hist = pw.state.get('history', [])
+    hist = pw.history()
     buy_q = {}; wins = 0; losses = 0
     for h in hist:
         s = h.get('symbol', '')
@@ -235,7 +235,7 @@ elif eval_type == 'signal_quality':
 from tools.paper_wallet import PaperWallet
 try:
     pw = PaperWallet()
-    hist = pw.state.get('history', [])
+    hist = pw.history()
     # FIFO matching for accurate win rate
     buy_q = {}
     wins = 0
@@ -0,0 +1,31 @@
+"""
+Neo Resource API のエンドポイントを一時ディレクトリのペーパーウォレットで呼ぶ
+  python -m pytest -q tests/test_neo_resource_api.py
+"""
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+sys.path.insert(0, '.')
+
+from tools.paper_wallet import PaperWallet
+from tools import neo_resource_api
+
+
+def test_historical_performance_counts_trades(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pw = PaperWallet()
+    pw.execute_trade("BTC", "BUY", 1000.0, 100.0, reason="test entry")
+    pw.execute_trade("BTC", "SELL", 500.0, 110.0, reason="TP +10.0%")
+    pw.execute_trade("BTC", "SELL", 400.0, 95.0, reason="SL -5.0%")
+
+    resp = neo_resource_api.historical_performance()
+
+    assert resp.status_code == 200
+    body = json.loads(resp.body)
+    assert body["total_trades"] == 3
+    assert body["closed_trades"] == 2
+    assert body["wins"] == 1
+    assert body["win_rate"] == 50.0
@@ -406,8 +406,9 @@ class DiscordReporter:
             from tools.market_data import MarketData
             w = PaperWallet()
             prices = {}
+            _holding_data = MarketData.fetch_token_data_many(w.state.get("holdings", {}).keys())
             for symbol in w.state.get("holdings", {}).keys():
-                data = MarketData.fetch_token_data(symbol)
+                data = _holding_data.get(MarketData._normalize_symbol(symbol))
                 if data and data.get("priceUsd"):
                     prices[symbol] = float(data["priceUsd"])
             summary = w.get_portfolio_summary(prices)
@@ -449,7 +450,7 @@ class DiscordReporter:
         try:
             from tools.paper_wallet import PaperWallet as _PW2
             _w2 = _PW2()
-            history_count = len(_w2.state.get("history", []))
+            history_count = _w2.trade_count()
         except Exception:
             pass
         mode_str = "📚 学習モード" if LEARNING_MODE else "⚡ 通常モード"
@@ -1,29 +1,32 @@
-import pandas as pd
-import pandas_ta as ta
+from core.stream_indicators import SymbolIndicators, EMA_SLOW, BB_LEN
 
 class NeoIndicators:
     @staticmethod
     def calculate_freqtrade_vibe(price_history: list):
         """
         freqtrade/technical の標準指標を計算し、Scoutが読みやすい形式に変換
+        （DataFrameを組まずに価格列を先頭から逐次更新で1パス）
         """
         if len(price_history) < 20:
             return {"status": "pending", "message": "データ蓄積中..."}
+        return NeoIndicators.vibe_from_snapshot(SymbolIndicators.from_prices("", price_history).snapshot())
 
-        df = pd.DataFrame(price_history, columns=['close'])
-        
-        # 指標計算 (freqtrade常用セット)
-        df['rsi'] = ta.rsi(df['close'], length=14)
-        df['ema9'] = ta.ema(df['close'], length=9)
-        df['ema20'] = ta.ema(df['close'], length=20)
-        bbands = ta.bbands(df['close'], length=20, std=2)
-        
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+    @staticmethod
+    def current_vibe(symbol: str):
+        """collector が更新しているストリーミング指標（5分ティック）から現在値を読む。蓄積不足なら None"""
+        from core import stream_indicators
+        snap = stream_indicators.current(symbol.split("/")[0].strip())
+        if snap["n"] < max(EMA_SLOW, BB_LEN) + 1:
+            return None
+        return NeoIndicators.vibe_from_snapshot(snap)
 
+    @staticmethod
+    def vibe_from_snapshot(snap: dict):
+        # 指標 (freqtrade常用セット: RSI14 / EMA9・20 / BB20-2σ)
+        close = snap["price"]
         return {
-            "rsi": round(latest['rsi'], 2),
-            "trend": "Upward" if latest['ema9'] > latest['ema20'] else "Downward",
-            "ema_cross": "Golden Cross" if (prev['ema9'] <= prev['ema20'] and latest['ema9'] > latest['ema20']) else "None",
-            "bb_position": "Overbought" if latest['close'] > bbands[[c for c in bbands.columns if c.startswith('BBU')][-1]].iloc[-1] else ("Oversold" if latest['close'] < bbands[[c for c in bbands.columns if c.startswith('BBL')][-1]].iloc[-1] else "Neutral")
+            "rsi": round(snap["rsi"], 2),
+            "trend": "Upward" if snap["ema_fast"] > snap["ema_slow"] else "Downward",
+            "ema_cross": "Golden Cross" if snap["ema_cross"] == "golden" else "None",
+            "bb_position": "Overbought" if close > snap["bb_upper"] else ("Oversold" if close < snap["bb_lower"] else "Neutral")
         }
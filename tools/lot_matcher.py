@@ -0,0 +1,210 @@
+"""
+FIFO ロット照合エンジン（取引台帳から逐次更新）
+BUY/SELL の FIFO 突き合わせが performance_evaluator / evolver_agent / h2_trade_analysis /
+tearsheet_generator / CostGuard.check_daily_loss にそれぞれ別実装され、呼ぶたびに全履歴
+（または paper_trade.log の正規表現パース）を走査していたのを1つにまとめる。
+
+- LotBook: メモリ上の照合本体。BUY で未決済ロットを積み、SELL で同銘柄の古いロットから数量（トークン）で消し込む。
+  部分約定は1つの決済レコードを数量按分で作る（1つの SELL が複数ロットにまたがれば複数レコード）
+- LotMatcher: 台帳（tools.trade_ledger）と同じ SQLite に 未決済ロット・決済レコード・カーソル（処理済み seq）を保持し、
+  sync() でカーソル以降の取引だけを LotBook に通す（O(新規取引)）。PaperWallet は取引ごとに sync する
+- ウォレットのリセット（created_at が変わる）を検出したら照合状態を作り直す
+
+決済レコード: symbol, buy_seq, sell_seq, buy_ts, sell_ts, entry_price, exit_price, amount_token,
+             amount_usd（= 数量×取得単価）, pnl_pct（%）, pnl_usd, buy_reason, sell_reason, strategy_tag
+"""
+import logging
+import os
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("neo.lot_matcher")
+
+DUST = 1e-6   # これ未満の残数量は消し込み済みとみなす（PaperWallet の保有 dust と同じ）
+
+CLOSED_FIELDS = ("symbol", "buy_seq", "sell_seq", "buy_ts", "sell_ts", "entry_price", "exit_price", "amount_token",
+                 "amount_usd", "pnl_pct", "pnl_usd", "buy_reason", "sell_reason", "strategy_tag")
+LOT_FIELDS = ("buy_seq", "symbol", "timestamp", "price", "amount_token", "reason", "strategy_tag")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS lot_cursor (
+        id       INTEGER PRIMARY KEY CHECK (id = 1),
+        last_seq INTEGER NOT NULL,
+        epoch    TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lots_open (
+        buy_seq      INTEGER PRIMARY KEY,
+        symbol       TEXT NOT NULL,
+        timestamp    TEXT,
+        price        REAL,
+        amount_token REAL,
+        reason       TEXT,
+        strategy_tag TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_lots_open_symbol ON lots_open (symbol, buy_seq)",
+    f"""
+    CREATE TABLE IF NOT EXISTS lots_closed (
+        id INTEGER PRIMARY KEY,
+        {", ".join(CLOSED_FIELDS)}
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_lots_closed_sell_ts ON lots_closed (sell_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_lots_closed_symbol ON lots_closed (symbol, sell_ts)",
+)
+
+_ready = set()   # スキーマ作成済みの台帳パス
+
+
+def normalize_symbol(symbol: str) -> str:
+    return (symbol or "").split("/")[0].strip().upper()
+
+
+class LotBook:
+    """FIFO ロット照合（メモリ上）。tx は PaperWallet の取引レコード形式（amount_token が無ければ amount_usd/price）"""
+
+    def __init__(self, lots: Iterable[Dict] = ()):
+        self.lots: Dict[str, deque] = defaultdict(deque)
+        for lot in lots:
+            self.lots[lot["symbol"]].append(dict(lot))
+
+    def apply(self, tx: Dict, seq: int = None) -> List[Dict]:
+        """取引1件を反映し、新たに確定した決済レコードを返す"""
+        action = str(tx.get("action", "")).upper()
+        symbol = normalize_symbol(tx.get("symbol"))
+        try:
+            price = float(tx.get("price") or 0)
+            amount = float(tx.get("amount_token") or 0)
+            if amount <= 0 and price > 0:
+                amount = float(tx.get("amount_usd") or 0) / price
+        except (TypeError, ValueError):
+            return []
+        if price <= 0 or amount <= DUST:
+            return []
+        if action == "BUY":
+            self.lots[symbol].append({"buy_seq": seq, "symbol": symbol, "timestamp": tx.get("timestamp", ""),
+                                      "price": price, "amount_token": amount, "reason": tx.get("reason", ""),
+                                      "strategy_tag": tx.get("strategy_tag")})
+            return []
+        if action != "SELL":
+            return []
+
+        closed = []
+        queue = self.lots.get(symbol)
+        left = amount
+        while left > DUST and queue:
+            lot = queue[0]
+            matched = min(lot["amount_token"], left)
+            closed.append({
+                "symbol": symbol, "buy_seq": lot["buy_seq"], "sell_seq": seq,
+                "buy_ts": lot["timestamp"], "sell_ts": tx.get("timestamp", ""),
+                "entry_price": lot["price"], "exit_price": price,
+                "amount_token": matched, "amount_usd": matched * lot["price"],
+                "pnl_pct": (price - lot["price"]) / lot["price"] * 100,
+                "pnl_usd": (price - lot["price"]) * matched,
+                "buy_reason": lot["reason"], "sell_reason": tx.get("reason", ""),
+                "strategy_tag": lot["strategy_tag"],
+            })
+            left -= matched
+            lot["amount_token"] -= matched
+            if lot["amount_token"] <= DUST:
+                queue.popleft()
+        return closed
+
+    def open_lots(self, symbol: str = None) -> List[Dict]:
+        symbols = [normalize_symbol(symbol)] if symbol else list(self.lots)
+        return [dict(lot) for s in symbols for lot in self.lots.get(s, ())]
+
+    @staticmethod
+    def match(trades: Iterable[Dict]) -> tuple:
+        """取引列を一括照合して (決済レコード, LotBook) を返す（台帳を使わない呼び出し元用: paper_trade.log など）"""
+        book, closed = LotBook(), []
+        for tx in trades:
+            closed.extend(book.apply(tx))
+        return closed, book
+
+
+class LotMatcher:
+    """台帳に永続化した FIFO 照合状態。sync() でカーソル以降の取引だけを照合する"""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        key = os.path.abspath(ledger.path)
+        if key not in _ready:
+            conn = ledger.conn
+            for stmt in SCHEMA:
+                conn.execute(stmt)
+            _ready.add(key)
+
+    def sync(self) -> int:
+        """未処理の取引を照合して、処理件数を返す"""
+        conn = self.ledger.conn
+        with self.ledger.transaction():
+            epoch = (self.ledger.load_state() or {}).get("created_at", "")
+            row = conn.execute("SELECT last_seq, epoch FROM lot_cursor WHERE id = 1").fetchone()
+            last_seq = row[0] if row else 0
+            max_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM trades").fetchone()[0]
+            if row is None or row[1] != epoch or last_seq > max_seq:
+                if row is not None:
+                    logger.info("Wallet reset detected — rebuilding lot state")
+                conn.execute("DELETE FROM lots_open")
+                conn.execute("DELETE FROM lots_closed")
+                last_seq = 0
+            trades = self.ledger.after(last_seq)
+            if not trades:
+                conn.execute("INSERT OR REPLACE INTO lot_cursor (id, last_seq, epoch) VALUES (1, ?, ?)", (last_seq, epoch))
+                return 0
+
+            symbols = sorted({normalize_symbol(tx.get("symbol")) for _, tx in trades})
+            marks = ",".join("?" * len(symbols))
+            rows = conn.execute(f"SELECT {', '.join(LOT_FIELDS)} FROM lots_open WHERE symbol IN ({marks}) "
+                                "ORDER BY buy_seq", symbols).fetchall()
+            book = LotBook(dict(zip(LOT_FIELDS, r)) for r in rows)
+            closed = []
+            for seq, tx in trades:
+                closed.extend(book.apply(tx, seq))
+
+            conn.execute(f"DELETE FROM lots_open WHERE symbol IN ({marks})", symbols)
+            conn.executemany(f"INSERT INTO lots_open ({', '.join(LOT_FIELDS)}) VALUES ({','.join('?' * len(LOT_FIELDS))})",
+                             [tuple(lot[f] for f in LOT_FIELDS) for lot in book.open_lots()])
+            conn.executemany(f"INSERT INTO lots_closed ({', '.join(CLOSED_FIELDS)}) "
+                             f"VALUES ({','.join('?' * len(CLOSED_FIELDS))})",
+                             [tuple(c[f] for f in CLOSED_FIELDS) for c in closed])
+            conn.execute("INSERT OR REPLACE INTO lot_cursor (id, last_seq, epoch) VALUES (1, ?, ?)",
+                         (trades[-1][0], epoch))
+        return len(trades)
+
+    # ================================================================
+    # 照会
+    # ================================================================
+    @staticmethod
+    def _where(symbol: Optional[str], since: Optional[str], column: str) -> tuple:
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?"); params.append(normalize_symbol(symbol))
+        if since is not None:
+            clauses.append(f"{column} >= ?"); params.append(since)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def closed_trades(self, symbol: str = None, since: str = None) -> List[Dict]:
+        """決済レコード（決済順）。since は決済時刻（ISO文字列）以上"""
+        where, params = self._where(symbol, since, "sell_ts")
+        rows = self.ledger.conn.execute(f"SELECT {', '.join(CLOSED_FIELDS)} FROM lots_closed{where} ORDER BY id",
+                                        params).fetchall()
+        return [dict(zip(CLOSED_FIELDS, r)) for r in rows]
+
+    def open_lots(self, symbol: str = None) -> List[Dict]:
+        """未決済ロット（取得順・amount_token は残数量）"""
+        where, params = self._where(symbol, None, "")
+        rows = self.ledger.conn.execute(f"SELECT {', '.join(LOT_FIELDS)} FROM lots_open{where} ORDER BY buy_seq",
+                                        params).fetchall()
+        return [dict(zip(LOT_FIELDS, r)) for r in rows]
+
+    def realized_pnl(self, since: str = None, symbol: str = None) -> float:
+        """実現損益（USD）の合計"""
+        where, params = self._where(symbol, since, "sell_ts")
+        return float(self.ledger.conn.execute(f"SELECT COALESCE(SUM(pnl_usd), 0) FROM lots_closed{where}",
+                                              params).fetchone()[0])
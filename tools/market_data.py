@@ -1,10 +1,9 @@
 import requests
 import json
-import os
 import time
 import logging
 import pandas as pd
-from core.utils import NeoUtils
+from core import cache_store, ohlcv_cache
 
 logger = logging.getLogger("neo.tools.market_data")
 
@@ -24,9 +23,15 @@ COINGECKO_ID_MAP = {
     "AIXBT": "aixbt",
 }
 
+# シンボル → Binance USDTペア（CoinGecko失敗時のフォールバック）
+BINANCE_PAIR_MAP = {"BTC": "BTCUSDT", "ETH": "ETHUSDT", "SOL": "SOLUSDT", "BNB": "BNBUSDT"}
+
 class MarketData:
     BASE_URL = "https://api.dexscreener.com/latest/dex/search"
     COINGECKO_OHLC_URL = "https://api.coingecko.com/api/v3/coins/{}/ohlc"
+    COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+    GECKOTERMINAL_POOLS_URL = "https://api.geckoterminal.com/api/v2/networks/base/pools"
+    BINANCE_TICKER_URL = "https://api.binance.com/api/v3/ticker/24hr"
     _GECKO_PAIRS = {
         "VIRTUAL": "0x3f0296BF652e19bca772EC3dF08b32732F93014A",
         "AIXBT":   "0xf1fdc83c3a336bdbdc9fb06e318b08eaddc82ff4",
@@ -42,6 +47,12 @@ class MarketData:
     _last_gt_call = 0
     _GT_INTERVAL = 10  # GeckoTerminal無料枠: 6req/min → 10秒間隔で安全
 
+    # 共有キャッシュストア（core.cache_store）のnamespace
+    _PRICE_CACHE_NS = "market_price"
+    _PRICE_CACHE_TTL = 90        # fetch_token_data の再取得間隔（秒）
+    _OHLCV_CACHE_NS = "ohlcv_coingecko"
+    _OHLCV_CACHE_TTL = 3600      # CoinGecko OHLC の再取得間隔（秒）
+
     @staticmethod
     def _normalize_symbol(query: str) -> str:
         """クエリからクリーンなシンボル名を抽出"""
@@ -76,44 +87,86 @@ class MarketData:
     def _fetch_price_from_geckoterminal(symbol: str):
         """GeckoTerminalからVP銘柄の価格取得（Base chain DEX実データ）"""
         import requests as _req
-        # GeckoTerminal レートリミット制御
-        elapsed = time.time() - MarketData._last_gt_call
-        if elapsed < MarketData._GT_INTERVAL:
-            wait_time = MarketData._GT_INTERVAL - elapsed
-            logger.debug(f"GT rate limit: waiting {wait_time:.1f}s")
-            time.sleep(wait_time)
-        MarketData._last_gt_call = time.time()
+        MarketData._gt_rate_limit_wait()
         clean = symbol.split('/')[0].strip().upper()
         pair_address = MarketData._GECKO_PAIRS.get(clean)
         if not pair_address:
             return None
         try:
-            url = f"https://api.geckoterminal.com/api/v2/networks/base/pools/{pair_address}"
+            url = f"{MarketData.GECKOTERMINAL_POOLS_URL}/{pair_address}"
             resp = _req.get(url, timeout=10)
             resp.raise_for_status()
             data = resp.json()
-            attrs = data.get("data", {}).get("attributes", {})
-            price = float(attrs.get("base_token_price_usd", 0) or 0)
-            if price <= 0:
-                return None
-            vol_24h = float(attrs.get("volume_usd", {}).get("h24", 0) or 0)
-            price_change_24h = float(attrs.get("price_change_percentage", {}).get("h24", 0) or 0)
-            return {
-                "status": "success",
-                "symbol": clean,
-                "name": clean,
-                "priceUsd": str(price),
-                "priceChange": {"h24": price_change_24h},
-                "volume": {"h24": vol_24h},
-                "liquidity": {},
-                "txns": {},
-                "whale_sentiment": "Neutral",
-                "timestamp": time.time()
-            }
+            return MarketData._gt_result(clean, data.get("data", {}).get("attributes", {}))
         except Exception as e:
             logger.warning(f"GeckoTerminal price fetch error for {symbol}: {e}")
             return None
 
+    @staticmethod
+    def _gt_rate_limit_wait():
+        """GeckoTerminal Rate Limit対策の待機"""
+        elapsed = time.time() - MarketData._last_gt_call
+        if elapsed < MarketData._GT_INTERVAL:
+            wait_time = MarketData._GT_INTERVAL - elapsed
+            logger.debug(f"GT rate limit: waiting {wait_time:.1f}s")
+            time.sleep(wait_time)
+        MarketData._last_gt_call = time.time()
+
+    @staticmethod
+    def _gt_result(symbol: str, attrs: dict):
+        """GeckoTerminal プール属性 → fetch_token_data 形式（価格なしはNone）"""
+        price = float(attrs.get("base_token_price_usd", 0) or 0)
+        if price <= 0:
+            return None
+        vol_24h = float((attrs.get("volume_usd") or {}).get("h24", 0) or 0)
+        price_change_24h = float((attrs.get("price_change_percentage") or {}).get("h24", 0) or 0)
+        return {
+            "status": "success",
+            "symbol": symbol,
+            "name": symbol,
+            "priceUsd": str(price),
+            "priceChange": {"h24": price_change_24h},
+            "volume": {"h24": vol_24h},
+            "liquidity": {},
+            "txns": {},
+            "whale_sentiment": "Neutral",
+            "timestamp": time.time()
+        }
+
+    @staticmethod
+    def _cg_result(symbol: str, d: dict):
+        """CoinGecko simple/price の1銘柄分 → fetch_token_data 形式（価格なしはNone）"""
+        price = d.get("usd", 0.0)
+        if not price or price <= 0:
+            return None
+        return {
+            "status": "success",
+            "symbol": symbol,
+            "name": symbol,
+            "priceUsd": str(price),
+            "priceChange": {"h24": d.get("usd_24h_change", 0.0)},
+            "volume": {"h24": d.get("usd_24h_vol", 0.0)},
+            "liquidity": {},
+            "txns": {},
+            "whale_sentiment": "Neutral",
+            "timestamp": time.time()
+        }
+
+    @staticmethod
+    def _binance_result(symbol: str, bd: dict):
+        """Binance ticker/24hr の1銘柄分 → fetch_token_data 形式（価格なしはNone）"""
+        price = float(bd.get("lastPrice", 0) or 0)
+        if price <= 0:
+            return None
+        return {
+            "status": "success", "symbol": symbol, "name": symbol,
+            "priceUsd": str(price),
+            "priceChange": {"h24": float(bd.get("priceChangePercent", 0))},
+            "volume": {"h24": float(bd.get("quoteVolume", 0))},
+            "liquidity": {}, "txns": {}, "whale_sentiment": "Neutral",
+            "timestamp": time.time()
+        }
+
     @staticmethod
     def fetch_btc_trend() -> dict:
         """BTC価格トレンドを3段階（24h/30d/180d）で取得
@@ -181,7 +234,7 @@ class MarketData:
             return None
         try:
             MarketData._rate_limit_wait()
-            url = "https://api.coingecko.com/api/v3/simple/price"
+            url = MarketData.COINGECKO_PRICE_URL
             params = {"ids": cg_id, "vs_currencies": "usd",
                       "include_24hr_change": "true", "include_24hr_vol": "true"}
             resp = requests.get(url, params=params, timeout=10)
@@ -189,22 +242,7 @@ class MarketData:
             data = resp.json()
             if cg_id not in data:
                 return None
-            d = data[cg_id]
-            price = d.get("usd", 0.0)
-            if not price or price <= 0:
-                return None
-            return {
-                "status": "success",
-                "symbol": symbol,
-                "name": symbol,
-                "priceUsd": str(price),
-                "priceChange": {"h24": d.get("usd_24h_change", 0.0)},
-                "volume": {"h24": d.get("usd_24h_vol", 0.0)},
-                "liquidity": {},
-                "txns": {},
-                "whale_sentiment": "Neutral",
-                "timestamp": time.time()
-            }
+            return MarketData._cg_result(symbol, data[cg_id])
         except Exception as e:
             logger.warning(f"CoinGecko price fetch error for {symbol}: {e}")
             return None
@@ -217,24 +255,17 @@ class MarketData:
         その他: DexScreener使用
         """
         clean_symbol = MarketData._normalize_symbol(query)
-        cache_file = f"data/market_cache_{clean_symbol}.json"
 
         # キャッシュTTL: 90秒以内の新鮮なキャッシュがあればAPI呼び出しをスキップ
-        _CACHE_TTL = 90
-        try:
-            cached = NeoUtils.read_json(cache_file)
-            if cached and float(cached.get("priceUsd", 0)) > 0:
-                _cache_age = time.time() - cached.get("timestamp", 0)
-                if _cache_age < _CACHE_TTL:
-                    return cached
-        except Exception:
-            pass
+        cached = MarketData._read_fresh_cache(clean_symbol, MarketData._PRICE_CACHE_TTL)
+        if cached:
+            return cached
 
         # VP銘柄はGeckoTerminalを優先（DexScreenerの誤マッチを防ぐ）
         if clean_symbol in MarketData._GECKO_PAIRS:
             gt_result = MarketData._fetch_price_from_geckoterminal(clean_symbol)
             if gt_result:
-                NeoUtils.write_json(cache_file, gt_result)
+                MarketData._write_cache(clean_symbol, gt_result)
                 return gt_result
             logger.warning(f"GeckoTerminal failed for {clean_symbol}, falling back")
 
@@ -242,40 +273,25 @@ class MarketData:
         if clean_symbol in COINGECKO_ID_MAP:
             cg_result = MarketData._fetch_price_from_coingecko(clean_symbol)
             if cg_result:
-                NeoUtils.write_json(cache_file, cg_result)
+                MarketData._write_cache(clean_symbol, cg_result)
                 return cg_result
             logger.warning(f"CoinGecko failed for {clean_symbol}, falling back to DexScreener")
 
-            # CoinGecko失敗時: DexScreenerの歪み価格を避けるためキャッシュ優先
-            try:
-                cached = NeoUtils.read_json(cache_file)
-                if cached and float(cached.get("priceUsd", 0)) > 0:
-                    _cache_age = time.time() - cached.get("timestamp", 0)
-                    if _cache_age < 1800:  # 30分以内のキャッシュなら使う
-                        logger.info(f"Using cached price for {clean_symbol} (age={_cache_age:.0f}s)")
-                        return cached
-            except Exception:
-                pass
+            # CoinGecko失敗時: DexScreenerの歪み価格を避けるためキャッシュ優先（30分以内）
+            cached = MarketData._read_fresh_cache(clean_symbol, 1800)
+            if cached:
+                logger.info(f"Using cached price for {clean_symbol} (age={time.time() - cached.get('timestamp', 0):.0f}s)")
+                return cached
             # Binanceフォールバック（BTC/ETH等の主要銘柄 — DexScreener Base chain歪み回避）
-            _binance_map = {"BTC": "BTCUSDT", "ETH": "ETHUSDT", "SOL": "SOLUSDT", "BNB": "BNBUSDT"}
-            if clean_symbol in _binance_map:
+            if clean_symbol in BINANCE_PAIR_MAP:
                 try:
-                    _br = requests.get("https://api.binance.com/api/v3/ticker/24hr",
-                                       params={"symbol": _binance_map[clean_symbol]}, timeout=10)
+                    _br = requests.get(MarketData.BINANCE_TICKER_URL,
+                                       params={"symbol": BINANCE_PAIR_MAP[clean_symbol]}, timeout=10)
                     _br.raise_for_status()
-                    _bd = _br.json()
-                    _bp = float(_bd.get("lastPrice", 0))
-                    if _bp > 0:
-                        _binance_result = {
-                            "status": "success", "symbol": clean_symbol, "name": clean_symbol,
-                            "priceUsd": str(_bp),
-                            "priceChange": {"h24": float(_bd.get("priceChangePercent", 0))},
-                            "volume": {"h24": float(_bd.get("quoteVolume", 0))},
-                            "liquidity": {}, "txns": {}, "whale_sentiment": "Neutral",
-                            "timestamp": time.time()
-                        }
-                        NeoUtils.write_json(cache_file, _binance_result)
-                        logger.info(f"Using Binance fallback for {clean_symbol}: ${_bp:,.2f}")
+                    _binance_result = MarketData._binance_result(clean_symbol, _br.json())
+                    if _binance_result:
+                        MarketData._write_cache(clean_symbol, _binance_result)
+                        logger.info(f"Using Binance fallback for {clean_symbol}: ${float(_binance_result['priceUsd']):,.2f}")
                         return _binance_result
                 except Exception as _be:
                     logger.warning(f"Binance price fallback failed for {clean_symbol}: {_be}")
@@ -312,15 +328,143 @@ class MarketData:
                 "whale_sentiment": whale_sentiment,
                 "timestamp": time.time()
             }
-            NeoUtils.write_json(cache_file, result)
+            MarketData._write_cache(clean_symbol, result)
             return result
         except Exception as e:
             logger.warning(f"Market API error: {e}. Attempting cache recovery.")
-            cached_data = NeoUtils.read_json(cache_file)
+            cached_data = cache_store.get(MarketData._PRICE_CACHE_NS, clean_symbol)
             if cached_data:
                 cached_data["status"] = "success_from_cache"
                 return cached_data
             return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def _read_fresh_cache(clean_symbol: str, ttl: float):
+        """TTL秒以内の価格キャッシュを返す（無ければNone）"""
+        try:
+            cached = cache_store.get(MarketData._PRICE_CACHE_NS, clean_symbol)
+            if cached and float(cached.get("priceUsd", 0)) > 0:
+                if time.time() - cached.get("timestamp", 0) < ttl:
+                    return cached
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _write_cache(clean_symbol: str, result: dict):
+        cache_store.put(MarketData._PRICE_CACHE_NS, clean_symbol, result)
+
+    @staticmethod
+    def _fetch_many_from_geckoterminal(symbols: list) -> dict:
+        """GeckoTerminal pools/multi で複数VPプールを1リクエスト取得"""
+        addr_to_sym = {MarketData._GECKO_PAIRS[s].lower(): s for s in symbols if s in MarketData._GECKO_PAIRS}
+        if not addr_to_sym:
+            return {}
+        try:
+            MarketData._gt_rate_limit_wait()
+            url = f"{MarketData.GECKOTERMINAL_POOLS_URL}/multi/{','.join(MarketData._GECKO_PAIRS[s] for s in addr_to_sym.values())}"
+            resp = requests.get(url, timeout=10)
+            resp.raise_for_status()
+            results = {}
+            for pool in resp.json().get("data", []):
+                attrs = pool.get("attributes", {})
+                sym = addr_to_sym.get(str(attrs.get("address", "")).lower())
+                if sym:
+                    result = MarketData._gt_result(sym, attrs)
+                    if result:
+                        results[sym] = result
+            return results
+        except Exception as e:
+            logger.warning(f"GeckoTerminal batch price fetch error for {list(addr_to_sym.values())}: {e}")
+            return {}
+
+    @staticmethod
+    def _fetch_many_from_coingecko(symbols: list) -> dict:
+        """CoinGecko simple/price で複数銘柄を1リクエスト取得"""
+        id_to_sym = {COINGECKO_ID_MAP[s]: s for s in symbols if s in COINGECKO_ID_MAP}
+        if not id_to_sym:
+            return {}
+        try:
+            MarketData._rate_limit_wait()
+            params = {"ids": ",".join(id_to_sym), "vs_currencies": "usd",
+                      "include_24hr_change": "true", "include_24hr_vol": "true"}
+            resp = requests.get(MarketData.COINGECKO_PRICE_URL, params=params, timeout=10)
+            resp.raise_for_status()
+            results = {}
+            for cg_id, d in resp.json().items():
+                sym = id_to_sym.get(cg_id)
+                result = MarketData._cg_result(sym, d) if sym else None
+                if result:
+                    results[sym] = result
+            return results
+        except Exception as e:
+            logger.warning(f"CoinGecko batch price fetch error for {list(id_to_sym.values())}: {e}")
+            return {}
+
+    @staticmethod
+    def _fetch_many_from_binance(symbols: list) -> dict:
+        """Binance ticker/24hr?symbols=[...] で複数銘柄を1リクエスト取得"""
+        pair_to_sym = {BINANCE_PAIR_MAP[s]: s for s in symbols if s in BINANCE_PAIR_MAP}
+        if not pair_to_sym:
+            return {}
+        try:
+            resp = requests.get(MarketData.BINANCE_TICKER_URL,
+                                params={"symbols": json.dumps(list(pair_to_sym), separators=(",", ":"))},
+                                timeout=10)
+            resp.raise_for_status()
+            results = {}
+            for bd in resp.json():
+                sym = pair_to_sym.get(bd.get("symbol"))
+                result = MarketData._binance_result(sym, bd) if sym else None
+                if result:
+                    results[sym] = result
+            return results
+        except Exception as e:
+            logger.warning(f"Binance batch price fetch error for {list(pair_to_sym.values())}: {e}")
+            return {}
+
+    @staticmethod
+    def fetch_token_data_many(queries) -> dict:
+        """複数銘柄の価格データを一括取得（プロバイダごとに1リクエスト）。
+        優先順は fetch_token_data と同じ（VP銘柄: GeckoTerminal → 主要銘柄: CoinGecko → Binance）。
+        DexScreener検索は1銘柄1リクエストのため、残りは fetch_token_data で個別取得する。
+        Returns: {正規化シンボル: fetch_token_data と同形式のdict}
+        """
+        results = {}
+        pending = []
+        for query in queries:
+            clean = MarketData._normalize_symbol(query)
+            if clean in results or clean in pending:
+                continue
+            cached = MarketData._read_fresh_cache(clean, MarketData._PRICE_CACHE_TTL)
+            if cached:
+                results[clean] = cached
+            else:
+                pending.append(clean)
+
+        fetched = {}
+        fetched.update(MarketData._fetch_many_from_geckoterminal(
+            [s for s in pending if s in MarketData._GECKO_PAIRS]))
+        cg_syms = [s for s in pending if s not in fetched and s in COINGECKO_ID_MAP]
+        fetched.update(MarketData._fetch_many_from_coingecko(cg_syms))
+        # CoinGecko失敗時: 30分以内のキャッシュ → Binance（fetch_token_data と同じ順）
+        for sym in cg_syms:
+            if sym not in fetched:
+                stale = MarketData._read_fresh_cache(sym, 1800)
+                if stale:
+                    results[sym] = stale
+        fetched.update(MarketData._fetch_many_from_binance(
+            [s for s in cg_syms if s not in fetched and s not in results]))
+        for sym, result in fetched.items():
+            MarketData._write_cache(sym, result)
+        results.update(fetched)
+
+        # 一括取得できなかった銘柄は単体経路へ（フォールバック・キャッシュ復旧を含む）
+        for sym in pending:
+            if sym not in results:
+                results[sym] = MarketData.fetch_token_data(sym)
+        return results
+
     @staticmethod
     def fetch_ohlcv_geckoterminal(symbol: str, days: int = 30) -> pd.DataFrame:
         """
@@ -398,19 +542,16 @@ class MarketData:
         symbol = MarketData._normalize_symbol(query)
         cg_id = MarketData._get_coingecko_id(symbol)
 
-        # --- Step 1: ローカルSQLite参照（I.1 data_collector蓄積データ） ---
+        # --- Step 1: ローカルSQLite参照（I.1 data_collector蓄積データ・npy mmapキャッシュ経由） ---
         try:
-            from orchestration.data_collector import get_ohlcv_from_db
             limit = days * 24 * 12  # 5分足換算（最大）
-            db_rows = get_ohlcv_from_db(symbol, limit=min(limit, 5000))
-            if len(db_rows) >= 10:  # 最低10件あれば使用
-                df = pd.DataFrame(db_rows, columns=["timestamp", "open", "high", "low", "close"])
-                df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
-                df = df.drop(columns=["timestamp"])
-                logger.info(f"OHLCV from local DB for {symbol}: {len(df)} rows")
+            df = ohlcv_cache.get_frame(symbol, limit=min(limit, 5000))
+            n_rows = len(df) if df is not None else 0
+            if n_rows >= 10:  # 最低10件あれば使用
+                logger.info(f"OHLCV from local DB for {symbol}: {n_rows} rows")
                 return df
             else:
-                logger.info(f"Local DB insufficient for {symbol} ({len(db_rows)} rows), falling back to GeckoTerminal")
+                logger.info(f"Local DB insufficient for {symbol} ({n_rows} rows), falling back to GeckoTerminal")
         except Exception as e:
             logger.warning(f"Local DB read failed for {symbol}: {e}, falling back to GeckoTerminal")
 
@@ -439,20 +580,15 @@ class MarketData:
             return pd.DataFrame(columns=["datetime", "open", "high", "low", "close"])
 
         # キャッシュ確認（1時間以内のキャッシュがあれば再利用）
-        cache_file = f"data/ohlcv_cache_{symbol}.json"
-        cache_path = os.path.join("/docker/openclaw-taan/data/.openclaw/workspace", cache_file)
-        
-        if os.path.exists(cache_path):
+        cache_key = f"{symbol}:{days}"
+        cached = cache_store.get(MarketData._OHLCV_CACHE_NS, cache_key)
+        if cached:
             try:
-                cache_age = time.time() - os.path.getmtime(cache_path)
-                if cache_age < 3600:  # 1時間以内
-                    with open(cache_path, "r") as f:
-                        cached = json.load(f)
-                    df = pd.DataFrame(cached, columns=["timestamp", "open", "high", "low", "close"])
-                    df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
-                    df = df.drop(columns=["timestamp"])
-                    logger.info(f"OHLCV cache hit for {symbol}: {len(df)} candles")
-                    return df
+                df = pd.DataFrame(cached, columns=["timestamp", "open", "high", "low", "close"])
+                df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+                df = df.drop(columns=["timestamp"])
+                logger.info(f"OHLCV cache hit for {symbol}: {len(df)} candles")
+                return df
             except Exception as e:
                 logger.warning(f"Cache read error for {symbol}: {e}")
 
@@ -470,10 +606,8 @@ class MarketData:
                 logger.error(f"CoinGecko returned empty/invalid data for {symbol}: {data}")
                 return pd.DataFrame(columns=["datetime", "open", "high", "low", "close"])
             
-            # キャッシュに保存
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            with open(cache_path, "w") as f:
-                json.dump(data, f)
+            # キャッシュに保存（期限切れ後もAPI失敗時のフォールバックに使う）
+            cache_store.put(MarketData._OHLCV_CACHE_NS, cache_key, data, ttl=MarketData._OHLCV_CACHE_TTL)
             
             # DataFrame変換: [timestamp_ms, open, high, low, close]
             df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close"])
@@ -492,10 +626,9 @@ class MarketData:
             logger.error(f"OHLCV fetch failed for {symbol}: {e}")
         
         # フォールバック: 古いキャッシュがあれば使う
-        if os.path.exists(cache_path):
+        cached = cache_store.get(MarketData._OHLCV_CACHE_NS, cache_key, include_expired=True)
+        if cached:
             try:
-                with open(cache_path, "r") as f:
-                    cached = json.load(f)
                 df = pd.DataFrame(cached, columns=["timestamp", "open", "high", "low", "close"])
                 df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
                 df = df.drop(columns=["timestamp"])
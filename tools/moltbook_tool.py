@@ -330,12 +330,12 @@ class MoltbookTool:
         try:
             from tools.paper_wallet import PaperWallet
             _pw = PaperWallet()
-            _hist = _pw.state.get("history", [])
-            _wins = sum(1 for h in _hist if h.get("action") == "SELL" and h.get("pnl_pct", 0) > 0)
-            _sells = sum(1 for h in _hist if h.get("action") == "SELL")
+            _sell_hist = _pw.history(action="SELL")
+            _wins = sum(1 for h in _sell_hist if h.get("pnl_pct", 0) > 0)
+            _sells = len(_sell_hist)
             _wr = (_wins / _sells * 100) if _sells > 0 else 0
             _holdings = list(_pw.state.get("holdings", {}).keys())
-            _neo_stats = f"Neo live stats: {len(_hist)} trades, {_wr:.0f}% win rate, holding {', '.join(_holdings) if _holdings else 'cash only'}."
+            _neo_stats = f"Neo live stats: {_pw.trade_count()} trades, {_wr:.0f}% win rate, holding {', '.join(_holdings) if _holdings else 'cash only'}."
         except Exception:
             _neo_stats = ""
         parts = [
@@ -402,11 +402,10 @@ class MoltbookTool:
         try:
             from tools.paper_wallet import PaperWallet
             _pw = PaperWallet()
-            _hist = _pw.state.get("history", [])
-            _sells = [h for h in _hist if h.get("action") == "SELL"]
+            _sells = _pw.history(action="SELL")
             _wins = sum(1 for s in _sells if s.get("pnl_pct", 0) > 0)
             _wr = (_wins / len(_sells) * 100) if _sells else 0
-            _stats = f"Neo live stats: {len(_hist)} trades, {_wr:.0f}% win rate, {len(_sells)} closed."
+            _stats = f"Neo live stats: {_pw.trade_count()} trades, {_wr:.0f}% win rate, {len(_sells)} closed."
         except Exception:
             _stats = "Neo is actively trading VP tokens."
         parts = [
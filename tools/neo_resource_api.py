@@ -57,8 +57,7 @@ def historical_performance():
         import re
         from tools.paper_wallet import PaperWallet
         pw = PaperWallet()
-        hist = pw.state.get("history", [])
-        sells = [h for h in hist if h.get("action") == "SELL"]
+        sells = pw.history(action="SELL")
         # PnLをreasonテキストから抽出（SELLレコードにpnl_pctキーがないため）
         pnls = []
         for h in sells:
@@ -70,7 +69,7 @@ def historical_performance():
         avg_pnl = sum(pnls) / len(pnls) if pnls else 0
         max_dd = min(pnls) if pnls else 0
         return JSONResponse({
-            "total_trades": len(hist),
+            "total_trades": pw.trade_count(),
             "closed_trades": len(sells),
             "win_rate": round(wr, 1),
             "wins": wins,
@@ -83,6 +82,9 @@ def historical_performance():
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+# vp_market_pulse が読む特徴量（ビルド時はこの列に必要なノードだけ計算する）
+PULSE_FEATURES = ["rsi_14", "ma20", "ma50", "bb_bandwidth_20", "returns"]
+
 @app.get("/resources/vp_market_pulse")
 def vp_market_pulse():
     """Resource 3: VP Market Pulse — テクニカルサマリー"""
@@ -92,8 +94,9 @@ def vp_market_pulse():
         result = {}
         for sym in ["VIRTUAL", "AIXBT"]:
             try:
-                df = MarketData.fetch_ohlcv_custom(sym, days=30)
-                df = FeatureBuilder.build_from_memory(df)
+                df = FeatureBuilder.load_from_store(sym, limit=1)
+                if df.empty:
+                    df = FeatureBuilder.build_from_memory(MarketData.fetch_ohlcv_custom(sym, days=30), PULSE_FEATURES)
                 last = df.iloc[-1]
                 result[sym] = {
                     "price": round(float(last['close']), 6),
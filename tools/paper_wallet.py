@@ -1,46 +1,96 @@
 import json
+import logging
 import os
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
+from tools.lot_matcher import LotMatcher
+from tools.trade_ledger import TradeLedger, ledger_path_for
+
+logger = logging.getLogger("neo.paper_wallet")
+
 class PaperWallet:
     """
     Manages a simulated crypto wallet for Paper Trading.
     Tracks USD balance, token holdings, and transaction history.
+    状態（残高・保有）はスナップショット1行、取引履歴は追記専用の台帳（tools.trade_ledger）に保存する。
+    履歴は state には載せず history() / trade_count() で必要な分だけ読む。
+    FIFO の決済レコード・未決済ロットは lots()（tools.lot_matcher・取引ごとに逐次更新）から読む。
     """
-    def __init__(self, data_path: str = "data/paper_wallet.json", initial_balance: float = 100000.0):
+    def __init__(self, data_path: str = "data/paper_wallet.json", initial_balance: float = 100000.0,
+                 ledger_path: str = None):
         self.data_path = data_path
         self.initial_balance = initial_balance
+        self.ledger = TradeLedger(ledger_path or ledger_path_for(data_path))
         self._load_wallet()
 
     def _load_wallet(self):
-        """Loads wallet state from JSON or initializes a new one."""
-        if os.path.exists(self.data_path):
-            try:
-                with open(self.data_path, 'r') as f:
-                    self.state = json.load(f)
-            except json.JSONDecodeError:
-                self._init_new_wallet()
-        else:
+        """Loads the wallet snapshot from the ledger (migrating the legacy JSON once) or initializes a new one."""
+        state = self.ledger.load_state()
+        if state is None and os.path.exists(self.data_path):
+            state = self._migrate_legacy_json()
+        if state is None:
             self._init_new_wallet()
+        else:
+            self.state = state
+
+    def _migrate_legacy_json(self) -> Optional[Dict]:
+        """旧 paper_wallet.json（history 入り）を台帳へ取り込む。JSON はバックアップとして残す（以後は更新しない）"""
+        try:
+            with open(self.data_path, 'r') as f:
+                legacy = json.load(f)
+        except json.JSONDecodeError:
+            return None
+        history = legacy.pop("history", [])
+        if self.ledger.import_history(history, legacy):
+            logger.info(f"Migrated {len(history)} trades from {self.data_path} to {self.ledger.path}")
+        return self.ledger.load_state()
 
     def _init_new_wallet(self):
         """Initializes a fresh wallet with starting capital."""
         self.state = {
             "usd_balance": self.initial_balance,
             "holdings": {},  # e.g., {"VIRTUAL": {"amount": 100, "avg_price": 2.5}}
-            "history": [],
             "created_at": datetime.now(timezone.utc).isoformat(),
             "last_updated": datetime.now(timezone.utc).isoformat()
         }
-        self._save_wallet()
+        self.ledger.clear(self.state)
+
+    def _reload(self):
+        state = self.ledger.load_state()
+        if state is not None:
+            self.state = state
 
     def _save_wallet(self):
-        """Saves current state to JSON."""
-        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        """Saves the current state snapshot (holdings を書き換えた呼び出し側もこれで保存する)."""
         self.state["last_updated"] = datetime.now(timezone.utc).isoformat()
-        with open(self.data_path, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        self.ledger.save_state(self.state)
+
+    def update_holding(self, symbol: str, **fields) -> bool:
+        """保有1銘柄の項目（high_water_pnl・completed_stages・entry_context 等）だけを書き換えて保存する。
+        最新のスナップショットを読み直してから反映するので、その間の他の取引・更新を上書きしない"""
+        with self.ledger.transaction():
+            self._reload()
+            holding = self.state["holdings"].get(symbol)
+            if holding is None:
+                return False
+            holding.update(fields)
+            self.state["last_updated"] = datetime.now(timezone.utc).isoformat()
+            self.ledger.save_state(self.state)
+        return True
+
+    def history(self, symbol: str = None, action: str = None, since: str = None, limit: int = None) -> List[Dict]:
+        """取引履歴（古い順）。symbol/action/since（ISO時刻以上）で絞り込み、limit は直近 n 件"""
+        return self.ledger.history(symbol=symbol, action=action, since=since, limit=limit)
+
+    def trade_count(self, symbol: str = None, action: str = None) -> int:
+        return self.ledger.count(symbol=symbol, action=action)
+
+    def lots(self) -> LotMatcher:
+        """FIFO ロット照合（未照合の取引を反映済み）"""
+        matcher = LotMatcher(self.ledger)
+        matcher.sync()
+        return matcher
 
     def get_balance(self) -> float:
         return self.state["usd_balance"]
@@ -56,12 +106,14 @@ class PaperWallet:
             total += data["amount"] * price
         return total
 
-    def execute_trade(self, symbol: str, action: str, amount_usd: float, price: float, reason: str = "") -> Dict:
+    def execute_trade(self, symbol: str, action: str, amount_usd: float, price: float, reason: str = "",
+                      extra: Optional[Dict] = None) -> Dict:
         """
         Executes a simulated trade.
         action: "BUY" or "SELL"
         amount_usd: Amount in USD to buy/sell
         price: Current token price
+        extra: 取引レコードに追加で残す項目（strategy_tag など）
         """
         timestamp = datetime.now(timezone.utc).isoformat()
         token_amount = amount_usd / price
@@ -73,59 +125,69 @@ class PaperWallet:
         elif action.upper() == "SELL":
             amount_usd *= (1 - TRADE_FEE_PCT)  # 手数料分USD受取額を減少
 
-        if action.upper() == "BUY":
-            if self.state["usd_balance"] < amount_usd:
-                return {"status": "failed", "reason": "Insufficient USD funds"}
+        # 最新のスナップショットを読み直してから適用（長く持っているインスタンスでも他スレッド・他プロセスの取引を消さない）
+        with self.ledger.transaction():
+            self._reload()
+            if action.upper() == "BUY":
+                if self.state["usd_balance"] < amount_usd:
+                    return {"status": "failed", "reason": "Insufficient USD funds"}
             
-            # Update Balance
-            self.state["usd_balance"] -= amount_usd
+                # Update Balance
+                self.state["usd_balance"] -= amount_usd
             
-            # Update Holdings
-            if symbol not in self.state["holdings"]:
-                self.state["holdings"][symbol] = {"amount": 0.0, "avg_price": 0.0, "entry_time": timestamp}
+                # Update Holdings
+                if symbol not in self.state["holdings"]:
+                    self.state["holdings"][symbol] = {"amount": 0.0, "avg_price": 0.0, "entry_time": timestamp}
             
-            current_holding = self.state["holdings"][symbol]
-            # Update Average Price (Weighted Average)
-            total_cost = (current_holding["amount"] * current_holding["avg_price"]) + amount_usd
-            new_amount = current_holding["amount"] + token_amount
-            current_holding["avg_price"] = total_cost / new_amount
-            current_holding["amount"] = new_amount
-            current_holding["entry_time"] = current_holding.get("entry_time", timestamp)
-
-        elif action.upper() == "SELL":
-            current_holding = self.state["holdings"].get(symbol, {"amount": 0.0})
-            if current_holding["amount"] < token_amount:
-                # Sell all if not enough (simple logic for now, or fail)
-                token_amount = current_holding["amount"]
-                amount_usd = token_amount * price # Recalculate USD based on actual holdings
+                current_holding = self.state["holdings"][symbol]
+                # Update Average Price (Weighted Average)
+                total_cost = (current_holding["amount"] * current_holding["avg_price"]) + amount_usd
+                new_amount = current_holding["amount"] + token_amount
+                current_holding["avg_price"] = total_cost / new_amount
+                current_holding["amount"] = new_amount
+                current_holding["entry_time"] = current_holding.get("entry_time", timestamp)
+
+            elif action.upper() == "SELL":
+                current_holding = self.state["holdings"].get(symbol, {"amount": 0.0})
+                if current_holding["amount"] < token_amount:
+                    # Sell all if not enough (simple logic for now, or fail)
+                    token_amount = current_holding["amount"]
+                    amount_usd = token_amount * price # Recalculate USD based on actual holdings
             
-            if token_amount <= 0:
-                 return {"status": "failed", "reason": "No holdings to sell"}
+                if token_amount <= 0:
+                     return {"status": "failed", "reason": "No holdings to sell"}
 
-            # Update Balance
-            self.state["usd_balance"] += amount_usd
+                # Update Balance
+                self.state["usd_balance"] += amount_usd
             
-            # Update Holdings
-            current_holding["amount"] -= token_amount
-            if current_holding["amount"] < 1e-6: # Cleanup dust
-                del self.state["holdings"][symbol]
-            else:
-                # 半量売却後フラグ（TP連打防止）
-                if "Take Profit" in reason or "take_profit" in reason.lower():
-                    current_holding["partial_tp_done"] = True
-
-        # Log Transaction
-        tx = {
-            "timestamp": timestamp,
-            "symbol": symbol,
-            "action": action,
-            "price": price,
-            "amount_token": token_amount,
-            "amount_usd": amount_usd,
-            "reason": reason
-        }
-        self.state["history"].append(tx)
-        self._save_wallet()
+                # Update Holdings
+                current_holding["amount"] -= token_amount
+                if current_holding["amount"] < 1e-6: # Cleanup dust
+                    del self.state["holdings"][symbol]
+                else:
+                    # 半量売却後フラグ（TP連打防止）
+                    if "Take Profit" in reason or "take_profit" in reason.lower():
+                        current_holding["partial_tp_done"] = True
+
+            # Log Transaction
+            tx = {
+                "timestamp": timestamp,
+                "symbol": symbol,
+                "action": action,
+                "price": price,
+                "amount_token": token_amount,
+                "amount_usd": amount_usd,
+                "reason": reason,
+                **(extra or {})
+            }
+            self.state["last_updated"] = timestamp
+            self.ledger.insert(tx)
+            self.ledger.save_state(self.state)
+
+        try:
+            LotMatcher(self.ledger).sync()
+        except Exception as e:  # 照合は次回の lots() でも追いつくので取引は成功扱い
+            logger.warning(f"Lot matching deferred: {e}")
         
         return {"status": "success", "tx": tx}
 
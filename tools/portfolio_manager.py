@@ -39,9 +39,10 @@ class PortfolioManager:
         """全資産のUSD評価額"""
         return self.wallet.get_portfolio_value(prices)
     
-    def execute_trade(self, symbol: str, action: str, amount_usd: float, price: float, reason: str = "") -> dict:
+    def execute_trade(self, symbol: str, action: str, amount_usd: float, price: float, reason: str = "",
+                      extra: dict = None) -> dict:
         """取引実行のパススルー"""
-        return self.wallet.execute_trade(symbol, action, amount_usd, price, reason)
+        return self.wallet.execute_trade(symbol, action, amount_usd, price, reason, extra=extra)
     
     def calculate_position_size(self, confidence_score: float) -> float:
         """信頼度に基づく投入額の計算"""
@@ -51,12 +52,11 @@ class PortfolioManager:
     
     def get_recent_trades(self, n: int = 5) -> list:
         """直近n件の取引履歴"""
-        history = self.wallet.state.get("history", [])
-        return history[-n:] if history else []
+        return self.wallet.history(limit=n)
     
     def get_trade_count(self) -> int:
         """総取引回数"""
-        return len(self.wallet.state.get("history", []))
+        return self.wallet.trade_count()
 
     def get_holding(self, symbol: str) -> float:
         """指定銘柄の保有量を返す"""
@@ -0,0 +1,213 @@
+"""
+プロセス内ホット価格キャッシュ（radarループ用）
+1サイクル内で同一銘柄の現在価格を何度も取得していた箇所（ボラ監視・TP/SL・Heartbeat・売却追跡）を
+1回の取得に集約する。
+
+- ソース別TTL: 取得結果をTTL内は再利用（DBは1サイクル1回まで）
+- エントリは取得元(source)と観測時刻を保持し、age（データの古さ）を返せる
+- 呼び出し側は max_age（許容する最大の古さ秒）を指定する（600s/1800sのハードコード廃止）
+- get_prices(symbols) でDB分は1クエリに束ねて取得
+- subscribe(fn) で新しい価格が入るたびに fn(PriceEntry) を呼ぶ（出口エンジンの価格イベント）
+"""
+import time
+import threading
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core import price_store
+from core.config import TIER0_SYMBOLS
+from tools.market_data import MarketData
+
+logger = logging.getLogger("neo.tools.price_cache")
+
+
+class PriceEntry:
+    __slots__ = ("symbol", "price", "source", "observed_at", "fetched_at")
+
+    def __init__(self, symbol: str, price: float, source: str, observed_at: float, fetched_at: float):
+        self.symbol = symbol
+        self.price = price
+        self.source = source
+        self.observed_at = observed_at   # 価格の観測時刻（DBティック時刻 / APIレスポンス時刻）
+        self.fetched_at = fetched_at     # キャッシュへ格納した時刻
+
+    @property
+    def age(self) -> float:
+        """データの古さ（秒）"""
+        return max(0.0, time.time() - self.observed_at)
+
+    def to_dict(self) -> dict:
+        return {"symbol": self.symbol, "price": self.price, "source": self.source, "age": round(self.age, 1)}
+
+    def __repr__(self):
+        return f"PriceEntry({self.symbol} ${self.price} src={self.source} age={self.age:.0f}s)"
+
+
+class PriceCache:
+    # ソース別の再取得間隔（秒）— radarの30秒サイクル内では同一ソースを1回しか叩かない
+    SOURCE_TTL = {
+        "db": 25,              # collectorの5分ティック（ローカルSQLite）
+        "geckoterminal": 25,   # VP銘柄のDEX実価格（10秒レート制限あり）
+        "api": 60,             # MarketData.fetch_token_data（内部に90秒JSONキャッシュあり）
+    }
+    DEFAULT_MAX_AGE = 600      # 既定の許容データ鮮度（旧 get_latest_price_from_db の10分）
+
+    _entries: Dict[Tuple[str, str], PriceEntry] = {}
+    _misses: Dict[Tuple[str, str], float] = {}   # 取得失敗もTTL内は再試行しない
+    _listeners: List[Callable[[PriceEntry], None]] = []
+    _lock = threading.RLock()
+
+    @staticmethod
+    def _normalize(symbol: str) -> str:
+        return symbol.split("/")[0].strip().upper()
+
+    @staticmethod
+    def default_sources(symbol: str) -> tuple:
+        """既定の取得優先順（Tier0: DB→API / VP銘柄: GeckoTerminal→API / その他: API）"""
+        if symbol in TIER0_SYMBOLS:
+            return ("db", "api")
+        if symbol in MarketData._GECKO_PAIRS:
+            return ("geckoterminal", "api")
+        return ("api",)
+
+    # ================================================================
+    # ソース別取得
+    # ================================================================
+    @classmethod
+    def _fetch(cls, symbol: str, source: str) -> Optional[PriceEntry]:
+        now = time.time()
+        if source == "db":
+            row = price_store.latest_tick(symbol)
+            if row and row[0] and row[0] > 0:
+                return PriceEntry(symbol, float(row[0]), "db", row[1] / 1000, now)
+            return None
+        if source == "geckoterminal":
+            data = MarketData._fetch_price_from_geckoterminal(symbol)
+        elif source == "api":
+            data = MarketData.fetch_token_data(symbol)
+        else:
+            raise ValueError(f"unknown price source: {source}")
+        if data and data.get("status") in ("success", "success_from_cache"):
+            price = float(data.get("priceUsd", 0) or 0)
+            if price > 0:
+                return PriceEntry(symbol, price, source, float(data.get("timestamp", now) or now), now)
+        return None
+
+    @classmethod
+    def _store(cls, symbol: str, source: str, entry: Optional[PriceEntry]):
+        key = (symbol, source)
+        with cls._lock:
+            if entry:
+                cls._entries[key] = entry
+                cls._misses.pop(key, None)
+            else:
+                cls._misses[key] = time.time()
+        if entry:
+            for fn in cls._listeners:
+                try:
+                    fn(entry)
+                except Exception as e:
+                    logger.warning(f"PriceCache listener error {symbol}: {e}")
+
+    @classmethod
+    def _lookup(cls, symbol: str, source: str) -> Optional[PriceEntry]:
+        """TTL内ならキャッシュを返し、期限切れならソースへ取得しに行く"""
+        key = (symbol, source)
+        ttl = cls.SOURCE_TTL.get(source, 30)
+        now = time.time()
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry and now - entry.fetched_at < ttl:
+                return entry
+            missed_at = cls._misses.get(key)
+            if missed_at and now - missed_at < ttl:
+                return None
+        try:
+            entry = cls._fetch(symbol, source)
+        except Exception as e:
+            logger.warning(f"PriceCache fetch error {symbol} ({source}): {e}")
+            entry = None
+        cls._store(symbol, source, entry)
+        return entry
+
+    # ================================================================
+    # 公開API
+    # ================================================================
+    @classmethod
+    def get(cls, symbol: str, max_age: Optional[float] = DEFAULT_MAX_AGE,
+            sources: Optional[Iterable[str]] = None) -> Optional[PriceEntry]:
+        """優先順にソースを試し、max_age秒以内の価格を返す（無ければNone）
+        max_age=None は鮮度を問わない。"""
+        symbol = cls._normalize(symbol)
+        for source in (sources or cls.default_sources(symbol)):
+            entry = cls._lookup(symbol, source)
+            if entry and (max_age is None or entry.age <= max_age):
+                return entry
+        return None
+
+    @classmethod
+    def get_price(cls, symbol: str, max_age: Optional[float] = DEFAULT_MAX_AGE,
+                  sources: Optional[Iterable[str]] = None) -> float:
+        """価格のみ返す互換ヘルパー（取得不可なら0.0）"""
+        entry = cls.get(symbol, max_age=max_age, sources=sources)
+        return entry.price if entry else 0.0
+
+    @classmethod
+    def get_prices(cls, symbols: Iterable[str], max_age: Optional[float] = DEFAULT_MAX_AGE,
+                   sources: Optional[Iterable[str]] = None) -> Dict[str, PriceEntry]:
+        """複数銘柄を一括取得。DBソースの期限切れ分は1クエリでまとめて更新する。
+        Returns: {symbol: PriceEntry}（取得できなかった銘柄は含まない）"""
+        syms = list(dict.fromkeys(cls._normalize(s) for s in symbols))
+        cls._prefetch_db([s for s in syms if "db" in (sources or cls.default_sources(s))])
+        result = {}
+        for sym in syms:
+            entry = cls.get(sym, max_age=max_age, sources=sources)
+            if entry:
+                result[sym] = entry
+        return result
+
+    @classmethod
+    def _prefetch_db(cls, symbols: list):
+        now = time.time()
+        ttl = cls.SOURCE_TTL["db"]
+        with cls._lock:
+            stale = [s for s in symbols
+                     if not ((e := cls._entries.get((s, "db"))) and now - e.fetched_at < ttl)
+                     and not ((m := cls._misses.get((s, "db"))) and now - m < ttl)]
+        if not stale:
+            return
+        try:
+            rows = price_store.latest_ticks(stale)
+        except Exception as e:
+            logger.warning(f"PriceCache DB batch error: {e}")
+            return
+        for sym in stale:
+            row = rows.get(sym)
+            entry = PriceEntry(sym, float(row[0]), "db", row[1] / 1000, now) if row and row[0] > 0 else None
+            cls._store(sym, "db", entry)
+
+    @classmethod
+    def put(cls, symbol: str, price: float, source: str, observed_at: Optional[float] = None):
+        """外部で取得した価格を登録（collector・イベント経由の供給用）"""
+        symbol = cls._normalize(symbol)
+        now = time.time()
+        cls._store(symbol, source, PriceEntry(symbol, float(price), source, observed_at or now, now))
+
+    @classmethod
+    def subscribe(cls, fn: Callable[[PriceEntry], None]):
+        """新しい価格（取得・put）ごとに fn(entry) を呼ぶ。同じ fn の二重登録はしない"""
+        with cls._lock:
+            if fn not in cls._listeners:
+                cls._listeners.append(fn)
+
+    @classmethod
+    def invalidate(cls, symbol: Optional[str] = None):
+        with cls._lock:
+            if symbol is None:
+                cls._entries.clear()
+                cls._misses.clear()
+                return
+            symbol = cls._normalize(symbol)
+            for key in [k for k in list(cls._entries) + list(cls._misses) if k[0] == symbol]:
+                cls._entries.pop(key, None)
+                cls._misses.pop(key, None)
@@ -0,0 +1,198 @@
+"""
+PaperWallet の状態スナップショット＋追記専用の取引台帳（SQLite）
+旧実装は取引のたびに data/paper_wallet.json（伸び続ける history を indent=2 で含む）を丸ごと書き直し、
+PaperWallet() を作るたび（30秒サイクル・heartbeat・CostGuard 判定ごと）に全履歴をパースしていた。
+
+- wallet 表: 状態スナップショット1行（usd_balance / holdings / created_at / last_updated の JSON）
+  → PaperWallet() の読み込みはこの1行だけ（保有銘柄数に比例・取引件数に依存しない）
+- trades 表: 取引1件=1行の追記専用。索引 (symbol, ts) と (ts)。読み出しは時刻順（同時刻は追記順 seq）で、
+  時刻は追記時の UTC ISO 文字列なので旧 history リストの並びと同じ
+  標準キー以外（strategy_tag など）は extra 列に JSON で保持し、読み出し時に元の dict に戻す
+- 取引の追記とスナップショット更新は1トランザクション（途中で落ちても台帳と残高がずれない）
+  PaperWallet は transaction() 内でスナップショットを読み直してから書き換える（別スレッド・別プロセスの更新を消さない）
+- 接続はスレッドごとにパスごとに1本を使い回す（WAL: 書き込み中も他プロセスの読み取りはブロックしない）
+旧 JSON からの移行は orchestration/migrate_paper_wallet.py（PaperWallet も初回読み込み時に自動で取り込む）。
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("neo.trade_ledger")
+
+BUSY_TIMEOUT_SEC = 10
+TX_FIELDS = ("timestamp", "symbol", "action", "price", "amount_token", "amount_usd", "reason")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS wallet (
+        id    INTEGER PRIMARY KEY CHECK (id = 1),
+        state TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trades (
+        seq          INTEGER PRIMARY KEY,
+        ts           TEXT NOT NULL,
+        symbol       TEXT NOT NULL,
+        action       TEXT NOT NULL,
+        price        REAL,
+        amount_token REAL,
+        amount_usd   REAL,
+        reason       TEXT,
+        extra        TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades (symbol, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (ts)",
+)
+
+_local = threading.local()
+
+
+def ledger_path_for(data_path: str) -> str:
+    """旧 JSON のパス（data/paper_wallet.json）→ 台帳のパス（data/paper_wallet.sqlite）"""
+    return os.path.splitext(data_path)[0] + ".sqlite"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    pool = getattr(_local, "conns", None)
+    if pool is None:
+        pool = _local.conns = {}
+    key = os.path.abspath(path)
+    conn = pool.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        conn = sqlite3.connect(key, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in SCHEMA:
+            conn.execute(stmt)
+        pool[key] = conn
+    return conn
+
+
+def _row(tx: Dict) -> tuple:
+    extra = {k: v for k, v in tx.items() if k not in TX_FIELDS}
+    return (tx.get("timestamp", ""), tx.get("symbol", ""), tx.get("action", ""), tx.get("price"),
+            tx.get("amount_token"), tx.get("amount_usd"), tx.get("reason", ""),
+            json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+def _tx(row: tuple) -> Dict:
+    tx = dict(zip(TX_FIELDS, row[:7]))
+    if row[7]:
+        tx.update(json.loads(row[7]))
+    return tx
+
+
+class TradeLedger:
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return _connect(self.path)
+
+    # ================================================================
+    # 状態スナップショット
+    # ================================================================
+    def load_state(self) -> Optional[Dict]:
+        row = self.conn.execute("SELECT state FROM wallet WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_state(self, state: Dict):
+        self.conn.execute("INSERT OR REPLACE INTO wallet (id, state) VALUES (1, ?)", (json.dumps(state),))
+
+    # ================================================================
+    # 追記
+    # ================================================================
+    def append(self, tx: Dict, state: Dict) -> int:
+        """取引1件の追記とスナップショット更新を1トランザクションで行い、seq を返す"""
+        with _transaction(self.conn):
+            seq = self.insert(tx)
+            self.save_state(state)
+        return seq
+
+    def insert(self, tx: Dict) -> int:
+        """取引1件の追記のみ（呼び出し側の transaction() 内で save_state と組にして使う）"""
+        cur = self.conn.execute(
+            "INSERT INTO trades (ts, symbol, action, price, amount_token, amount_usd, reason, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _row(tx))
+        return cur.lastrowid
+
+    def import_history(self, history: List[Dict], state: Dict) -> bool:
+        """旧 JSON の history と状態を取り込む。既に状態がある（移行済み・他プロセスが先に移行）なら何もしない"""
+        conn = self.conn
+        with _transaction(conn):
+            if conn.execute("SELECT 1 FROM wallet WHERE id = 1").fetchone():
+                return False
+            conn.execute("DELETE FROM trades")
+            conn.executemany(
+                "INSERT INTO trades (ts, symbol, action, price, amount_token, amount_usd, reason, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (_row(tx) for tx in history))
+            self.save_state(state)
+        return True
+
+    def clear(self, state: Dict):
+        """ウォレットのリセット（旧実装の history=[] に相当・台帳を空にする唯一の操作）"""
+        conn = self.conn
+        with _transaction(conn):
+            conn.execute("DELETE FROM trades")
+            self.save_state(state)
+
+    # ================================================================
+    # 読み出し
+    # ================================================================
+    @staticmethod
+    def _where(symbol: Optional[str], action: Optional[str], since: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?"); params.append(symbol)
+        if since is not None:
+            clauses.append("ts >= ?"); params.append(since)
+        if action is not None:
+            clauses.append("action = ?"); params.append(action)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def history(self, symbol: str = None, action: str = None, since: str = None, limit: int = None) -> List[Dict]:
+        """取引履歴（時刻順＝旧 history の並び）。limit は直近 n 件（索引を逆順にたどるだけで全件ソートしない）"""
+        where, params = self._where(symbol, action, since)
+        cols = "ts, symbol, action, price, amount_token, amount_usd, reason, extra"
+        if limit is None:
+            rows = self.conn.execute(f"SELECT {cols} FROM trades{where} ORDER BY ts, seq", params).fetchall()
+        else:
+            rows = self.conn.execute(f"SELECT {cols} FROM trades{where} ORDER BY ts DESC, seq DESC LIMIT ?",
+                                     params + [int(limit)]).fetchall()[::-1]
+        return [_tx(r) for r in rows]
+
+    def after(self, seq: int) -> List[tuple]:
+        """seq より後に追記された取引 [(seq, tx), ...]（追記順）"""
+        rows = self.conn.execute(
+            "SELECT seq, ts, symbol, action, price, amount_token, amount_usd, reason, extra "
+            "FROM trades WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+        return [(r[0], _tx(r[1:])) for r in rows]
+
+    def transaction(self) -> "_transaction":
+        return _transaction(self.conn)
+
+    def count(self, symbol: str = None, action: str = None, since: str = None) -> int:
+        where, params = self._where(symbol, action, since)
+        return self.conn.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+
+
+class _transaction:
+    """BEGIN IMMEDIATE … COMMIT（例外時は ROLLBACK）"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -35,11 +35,10 @@ echo "--- ④ PaperWallet状態 ---"
 import sys; sys.path.insert(0,'.')
 from tools.paper_wallet import PaperWallet
 pw = PaperWallet()
-hist = pw.state.get('history', [])
-print(f'  取引総数: {len(hist)}件')
+print(f'  取引総数: {pw.trade_count()}件')
 print(f'  USDC: \${pw.state[\"usd_balance\"]:,.2f}')
 print(f'  最新5件:')
-for h in hist[-5:]:
+for h in pw.history(limit=5):
     ts = h.get('timestamp','?')[:19]
     print(f\"    {ts} | {h.get('action')} {h.get('symbol')} @ \${h.get('price')}\")
 "
@@ -51,10 +50,9 @@ import sys; sys.path.insert(0,'.')
 from tools.paper_wallet import PaperWallet
 from datetime import datetime, timezone
 pw = PaperWallet()
-hist = pw.state.get('history', [])
 
 reset_ts = '2026-04-03T00:00:00'
-post_reset = [h for h in hist if h.get('timestamp','') >= reset_ts]
+post_reset = pw.history(since=reset_ts)
 
 buy_q = {}; wins = 0; losses = 0
 for h in post_reset:
@@ -8,7 +8,8 @@ import time
 import logging
 import urllib.request
 from datetime import datetime, timezone
-from pathlib import Path
+
+from core import cache_store
 
 logger = logging.getLogger("neo.vp_onchain")
 
@@ -19,7 +20,7 @@ VP_CONTRACT_ADDRESSES = {
     "LUNA":    None,  # 検索APIで取得
 }
 
-CACHE_FILE = Path("data/vp_onchain_cache.json")
+CACHE_NS   = "vp_onchain"  # core.cache_store のnamespace
 CACHE_TTL  = 300  # 5分キャッシュ
 
 
@@ -34,23 +35,6 @@ def _fetch_url(url: str) -> dict:
         return {}
 
 
-def _load_cache() -> dict:
-    if CACHE_FILE.exists():
-        try:
-            data = json.loads(CACHE_FILE.read_text())
-            if time.time() - data.get("_ts", 0) < CACHE_TTL:
-                return data
-        except Exception:
-            pass
-    return {}
-
-
-def _save_cache(data: dict):
-    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    data["_ts"] = time.time()
-    CACHE_FILE.write_text(json.dumps(data, ensure_ascii=False))
-
-
 def fetch_dex_data(symbol: str) -> dict:
     """
     DexScreener APIからDEX取引データを取得。
@@ -61,10 +45,10 @@ def fetch_dex_data(symbol: str) -> dict:
         price_change_24h: 24h価格変化(%)
         cex_dex_spread  : CEX-DEX価格乖離(%) ※CoinGeckoと比較
     """
-    cache = _load_cache()
     cache_key = f"dex_{symbol}"
-    if cache_key in cache:
-        return cache[cache_key]
+    cached = cache_store.get(CACHE_NS, cache_key)
+    if cached is not None:
+        return cached
 
     address = VP_CONTRACT_ADDRESSES.get(symbol)
     if address:
@@ -93,8 +77,7 @@ def fetch_dex_data(symbol: str) -> dict:
         "fetched_at":       datetime.now(timezone.utc).isoformat(),
     }
 
-    cache[cache_key] = result
-    _save_cache(cache)
+    cache_store.put(CACHE_NS, cache_key, result, ttl=CACHE_TTL)
     logger.info(f"[OnChain] {symbol} DEX: 価格=${result['price_usd']:.4f} 出来高=${result['volume_24h']:,.0f} 流動性=${result['liquidity_usd']:,.0f}")
     return result
 
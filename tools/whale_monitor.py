@@ -4,12 +4,12 @@ Base chain上のVIRTUAL/AIXBTトークンの大口Transferを監視する。
 """
 import os
 import json
-import time
 import logging
 from datetime import datetime, timezone
-from pathlib import Path
 from dotenv import load_dotenv
 
+from core import cache_store
+
 load_dotenv(dotenv_path=".env")
 logger = logging.getLogger("neo.whale_monitor")
 
@@ -24,7 +24,7 @@ VP_CONTRACTS = {
 BASE_PUBLIC_RPC     = "https://mainnet.base.org"  # 制限なし・無料
 WHALE_THRESHOLD_USD = 10_000  # $10K以上を大口と判定（VIRTUAL $0.64で約15,600枚）
 BLOCKS_TO_SCAN      = 300     # 約10分（Base: 2秒/block）
-CACHE_FILE          = Path("data/whale_cache.json")
+CACHE_NS            = "whale"  # core.cache_store のnamespace
 CACHE_TTL           = 300     # 5分キャッシュ
 
 _w3 = None
@@ -47,27 +47,11 @@ def _get_w3():
         logger.error(f"[K.3] web3接続失敗: {e}")
         return None
 
-def _load_cache() -> dict:
-    if CACHE_FILE.exists():
-        try:
-            data = json.loads(CACHE_FILE.read_text())
-            if time.time() - data.get("_ts", 0) < CACHE_TTL:
-                return data
-        except Exception:
-            pass
-    return {}
-
-def _save_cache(data: dict):
-    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    data["_ts"] = time.time()
-    CACHE_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2))
-
 def fetch_whale_events(symbol: str = "VIRTUAL") -> dict:
     """直近300ブロックの大口Transferを検出して返す。"""
-    cache = _load_cache()
-    key = f"whale_{symbol}"
-    if key in cache:
-        return cache[key]
+    cached = cache_store.get(CACHE_NS, symbol)
+    if cached is not None:
+        return cached
 
     address = VP_CONTRACTS.get(symbol)
     if not address:
@@ -149,8 +133,7 @@ def fetch_whale_events(symbol: str = "VIRTUAL") -> dict:
             "signal": signal, "scanned_blocks": BLOCKS_TO_SCAN,
             "fetched_at": datetime.now(timezone.utc).isoformat(),
         }
-        cache[key] = result
-        _save_cache(cache)
+        cache_store.put(CACHE_NS, symbol, result, ttl=CACHE_TTL)
         logger.info(f"[K.3] {symbol}: {len(large_txs)}件 ${vol:,.0f} signal={signal}")
         return result
 